@@ -78,6 +78,157 @@ def serialize_doc(doc):
         return DotDict(result)
     return doc
 
+# ==================== IMAGE VARIANTS ====================
+
+def get_image_variants(db, image_url: str):
+    """Get the responsive variant manifest for an image URL, if one has been generated"""
+    if not image_url:
+        return None
+    return db[IMAGE_VARIANTS].find_one(
+        {"original_url": image_url},
+        {"_id": 0, "original_url": 0, "updated_at": 0}
+    )
+
+def attach_image_variants(db, images: list) -> list:
+    """Add a `variants` manifest to gallery image dicts that don't have one yet"""
+    urls = [img.get("url") for img in images if isinstance(img, dict) and img.get("url") and not img.get("variants")]
+    if not urls:
+        return images
+    manifests = {
+        doc["original_url"]: doc
+        for doc in db[IMAGE_VARIANTS].find({"original_url": {"$in": urls}}, {"_id": 0, "updated_at": 0})
+    }
+    for img in images:
+        if isinstance(img, dict) and img.get("url") in manifests:
+            manifest = dict(manifests[img["url"]])
+            manifest.pop("original_url", None)
+            img["variants"] = manifest
+    return images
+
+def delete_image_variants(db, image_url: str, s3_service=None, pending_deletes: list = None):
+    """Delete stored variants of an image and forget its manifest"""
+    manifest = db[IMAGE_VARIANTS].find_one_and_delete({"original_url": image_url})
+    if not manifest:
+        return
+    variant_urls = [variant["url"] for variant in manifest.get("variants", []) if variant.get("url")]
+    if pending_deletes is not None:
+        pending_deletes.extend(variant_urls)
+    elif s3_service and s3_service.is_enabled():
+        s3_service.delete_files(variant_urls)
+
+def flush_image_deletes(pending_deletes: list, s3_service=None) -> int:
+    """Delete the objects collected by release_image(..., pending_deletes) in batched requests"""
+    if not pending_deletes or not s3_service or not s3_service.is_enabled():
+        return 0
+    deleted = s3_service.delete_files(pending_deletes)
+    print(f"Deleted {deleted} of {len(pending_deletes)} objects from S3")
+    return deleted
+
+def acquire_image(db, image_url: str):
+    """Record an additional reference to an already stored image"""
+    if image_url:
+        db[MEDIA_ASSETS].update_one({"url": image_url}, {"$inc": {"refcount": 1}})
+
+def release_image(db, image_url: str, s3_service=None, pending_deletes: list = None) -> bool:
+    """
+    Drop one reference to a stored image.
+    The object and its variants are only deleted once no article or gallery
+    references it any more; images that predate media_assets are deleted directly.
+    When pending_deletes is given, URLs are collected there for a later
+    flush_image_deletes() instead of being deleted one by one.
+    Returns True if the object was (or is queued to be) deleted.
+    """
+    from pymongo import ReturnDocument
+    
+    asset = db[MEDIA_ASSETS].find_one_and_update(
+        {"url": image_url},
+        {"$inc": {"refcount": -1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if asset:
+        if asset.get("refcount", 0) > 0:
+            print(f"Image still referenced {asset['refcount']} time(s), keeping: {image_url}")
+            return False
+        # Only the caller that removes the asset record deletes the object
+        removed = db[MEDIA_ASSETS].delete_one({"hash": asset["hash"], "refcount": {"$lte": 0}})
+        if removed.deleted_count == 0:
+            return False
+    
+    if pending_deletes is not None:
+        pending_deletes.append(image_url)
+    elif s3_service and s3_service.is_enabled():
+        s3_service.delete_file(image_url)
+    delete_image_variants(db, image_url, s3_service, pending_deletes)
+    return True
+
+def rename_image_urls(db, renames: list, folder_path: str = None):
+    """
+    Point stored references at renamed image objects.
+    renames is a list of (old_url, new_url, new_key) covering originals and variants;
+    media_assets, variant manifests, articles and galleries are rewritten in one pass each.
+    """
+    if not renames:
+        return
+    import re
+    
+    url_map = {old: new for old, new, _ in renames}
+    key_map = {new: key for _, new, key in renames}
+    pattern = re.compile("|".join(re.escape(old) for old in sorted(url_map, key=len, reverse=True)))
+    
+    def swap(value):
+        """Replace old URLs anywhere inside a string / list / dict in a single pass"""
+        if isinstance(value, str):
+            return pattern.sub(lambda m: url_map[m.group(0)], value)
+        if isinstance(value, list):
+            return [swap(item) for item in value]
+        if isinstance(value, dict):
+            return {k: swap(v) for k, v in value.items()}
+        return value
+    
+    old_urls = list(url_map)
+    
+    for old_url, new_url, new_key in renames:
+        db[MEDIA_ASSETS].update_one({"url": old_url}, {"$set": {"url": new_url, "key": new_key}})
+    
+    for manifest in db[IMAGE_VARIANTS].find({"original_url": {"$in": old_urls}}):
+        db[IMAGE_VARIANTS].update_one(
+            {"_id": manifest["_id"]},
+            {"$set": {field: swap(manifest.get(field)) for field in ("original_url", "original", "variants", "srcset")}}
+        )
+    
+    for article in db[ARTICLES].find({"image": {"$in": old_urls}}, {"_id": 1, "image": 1, "image_variants": 1}):
+        db[ARTICLES].update_one(
+            {"_id": article["_id"]},
+            {"$set": {"image": swap(article["image"]), "image_variants": swap(article.get("image_variants"))}}
+        )
+    
+    gallery_query = {"images": {"$regex": pattern.pattern}}
+    if folder_path:
+        gallery_query = {"$or": [{"folder_path": folder_path}, gallery_query]}
+    for gallery in db[GALLERIES].find(gallery_query, {"_id": 1, "images": 1}):
+        images_raw = gallery.get("images", [])
+        try:
+            images = json.loads(images_raw) if isinstance(images_raw, str) else images_raw
+        except Exception:
+            continue
+        
+        renamed = []
+        for image in images or []:
+            if isinstance(image, dict) and image.get("url") in url_map:
+                new_url = url_map[image["url"]]
+                image = swap(image)
+                image["name"] = new_url.rsplit("/", 1)[-1]
+                if key_map.get(new_url):
+                    image["s3_key"] = key_map[new_url]
+            else:
+                image = swap(image)
+            renamed.append(image)
+        
+        db[GALLERIES].update_one(
+            {"_id": gallery["_id"]},
+            {"$set": {"images": json.dumps(renamed) if isinstance(images_raw, str) else renamed}}
+        )
+
 # ==================== CATEGORY CRUD ====================
 
 def get_category(db, category_id: str):
@@ -512,6 +663,7 @@ def create_article(db, article: dict):
         "sponsored_link": article.get("sponsored_link"),
         "sponsored_label": article.get("sponsored_label"),
         "image": article.get("image"),
+        "image_variants": get_image_variants(db, article.get("image")),  # Responsive srcset manifest
         "image_gallery": article.get("image_gallery"),
         "gallery_id": article.get("gallery_id"),
         "youtube_url": article.get("youtube_url"),
@@ -623,8 +775,8 @@ def create_article_cms(db, article, slug: str, seo_title: str, seo_description:
     
     return create_article(db, article_dict)
 
-def update_article_cms(db, article_id: int, article: dict):
-    """Update article from CMS"""
+def update_article_cms(db, article_id: int, article: dict, s3_service=None):
+    """Update article from CMS; a replaced main image is released like on delete"""
     # Build update dict - only include fields that are in the article dict
     update_fields = {}
     
@@ -657,6 +809,14 @@ def update_article_cms(db, article_id: int, article: dict):
                 value = _clean_twitter_embed(value)
             update_fields[field] = value
     
+    # Keep the responsive variant manifest in step with the main image
+    replaced_image = None
+    if "image" in update_fields:
+        update_fields["image_variants"] = get_image_variants(db, update_fields["image"])
+        previous = db[ARTICLES].find_one({"id": article_id}, {"_id": 0, "image": 1})
+        if previous and previous.get("image") and previous["image"] != update_fields["image"]:
+            replaced_image = previous["image"]
+    
     # Handle language field - support both 'language' and 'article_language'
     if "article_language" in article:
         update_fields["article_language"] = article["article_language"] or "en"
@@ -681,6 +841,16 @@ def update_article_cms(db, article_id: int, article: dict):
     
     db[ARTICLES].update_one({"id": article_id}, update_data)
     
+    # Release the replaced image (deleted once unreferenced)
+    if replaced_image:
+        try:
+            if release_image(db, replaced_image, s3_service):
+                print(f"Deleted replaced article image from S3: {replaced_image}")
+            else:
+                print(f"Kept replaced article image (still referenced): {replaced_image}")
+        except Exception as e:
+            print(f"Failed to delete replaced article image from S3: {replaced_image}, Error: {e}")
+    
     # Manage top stories if is_top_story field is present
     if "is_top_story" in article:
         from datetime import timedelta
@@ -715,13 +885,15 @@ def delete_article(db, article_id: int, s3_service=None):
     # Get article to access image URLs
     article = db[ARTICLES].find_one({"id": article_id}, {"_id": 0})
     
-    if article and s3_service and s3_service.is_enabled():
-        # Delete main article image
+    if article:
+        # Release main article image (deleted once unreferenced)
         image_url = article.get("image")
         if image_url:
             try:
-                s3_service.delete_file(image_url)
-                print(f"Deleted article image from S3: {image_url}")
+                if release_image(db, image_url, s3_service):
+                    print(f"Deleted article image from S3: {image_url}")
+                else:
+                    print(f"Kept article image (still referenced): {image_url}")
             except Exception as e:
                 print(f"Failed to delete article image from S3: {image_url}, Error: {e}")
         
@@ -733,12 +905,13 @@ def delete_article(db, article_id: int, s3_service=None):
                 import json
                 gallery_urls = json.loads(image_gallery) if isinstance(image_gallery, str) else image_gallery
                 if isinstance(gallery_urls, list):
+                    pending_deletes = []
                     for url in gallery_urls:
                         try:
-                            s3_service.delete_file(url)
-                            print(f"Deleted gallery image from S3: {url}")
+                            release_image(db, url, s3_service, pending_deletes)
                         except Exception as e:
                             print(f"Failed to delete gallery image from S3: {url}, Error: {e}")
+                    flush_image_deletes(pending_deletes, s3_service)
             except Exception as e:
                 print(f"Failed to parse image_gallery: {e}")
     
@@ -1295,8 +1468,10 @@ def delete_theater_release(db, release_id: int, s3_service=None):
         image_url = release.get("movie_image")
         if image_url:
             try:
-                s3_service.delete_file(image_url)
-                print(f"Deleted theater release image from S3: {image_url}")
+                if release_image(db, image_url, s3_service):
+                    print(f"Deleted theater release image from S3: {image_url}")
+                else:
+                    print(f"Kept theater release image (still referenced): {image_url}")
             except Exception as e:
                 print(f"Failed to delete theater release image from S3: {image_url}, Error: {e}")
         
@@ -1304,8 +1479,10 @@ def delete_theater_release(db, release_id: int, s3_service=None):
         banner_url = release.get("movie_banner")
         if banner_url:
             try:
-                s3_service.delete_file(banner_url)
-                print(f"Deleted theater release banner from S3: {banner_url}")
+                if release_image(db, banner_url, s3_service):
+                    print(f"Deleted theater release banner from S3: {banner_url}")
+                else:
+                    print(f"Kept theater release banner (still referenced): {banner_url}")
             except Exception as e:
                 print(f"Failed to delete theater release banner from S3: {banner_url}, Error: {e}")
     
@@ -1323,8 +1500,10 @@ def delete_ott_release(db, release_id: int, s3_service=None):
         image_url = release.get("movie_image")
         if image_url:
             try:
-                s3_service.delete_file(image_url)
-                print(f"Deleted OTT release image from S3: {image_url}")
+                if release_image(db, image_url, s3_service):
+                    print(f"Deleted OTT release image from S3: {image_url}")
+                else:
+                    print(f"Kept OTT release image (still referenced): {image_url}")
             except Exception as e:
                 print(f"Failed to delete OTT release image from S3: {image_url}, Error: {e}")
     
@@ -1513,9 +1692,14 @@ def update_aws_config(db, config: dict):
     if "max_file_size_mb" in config:
         update_fields["max_file_size_mb"] = config.get("max_file_size_mb", 10)
     
+    update = {"$set": update_fields}
+    if set(update_fields) - {"type", "updated_at"}:
+        # Version stamp lets every worker's S3 client registry notice the change
+        update["$inc"] = {"config_version": 1}
+    
     db['system_settings'].update_one(
         {"type": "aws_config"},
-        {"$set": update_fields},
+        update,
         upsert=True
     )
     
@@ -2654,31 +2838,135 @@ def delete_gallery_entity(db, entity_id: int):
     
     return False
 
-def get_next_gallery_number(db, category_type: str, entity_name: str):
-    """Get the next gallery number for an entity"""
-    # Find all galleries for this entity
-    galleries = list(db[GALLERIES].find({
+def _gallery_number(gallery: dict):
+    """Gallery number from the folder_path tail (agents) or gallery_id suffix (CMS)"""
+    for value, separator in ((gallery.get("folder_path") or "", "/"), (gallery.get("gallery_id") or "", "_")):
+        try:
+            return int(value.split(separator)[-1])
+        except ValueError:
+            pass
+    return None
+
+def scan_next_gallery_number(db, category_type: str, entity_name: str) -> int:
+    """Next gallery number from the galleries already saved for an entity"""
+    galleries = db[GALLERIES].find({
         "category_type": category_type,
         "entity_name": entity_name
-    }, {"gallery_id": 1, "_id": 0}))
-    
-    if not galleries:
-        return 1
-    
-    # Extract numbers from gallery_id and find max
-    numbers = []
-    for g in galleries:
-        gallery_id = g.get("gallery_id", "")
-        # Try to extract the last number from gallery_id
-        parts = gallery_id.split("_")
-        if parts:
-            try:
-                numbers.append(int(parts[-1]))
-            except ValueError:
-                pass
+    }, {"gallery_id": 1, "folder_path": 1, "_id": 0})
     
+    numbers = [number for number in map(_gallery_number, galleries) if number is not None]
     return max(numbers) + 1 if numbers else 1
 
+def _counter_key(scope: str, key: str) -> dict:
+    return {"scope": scope, "key": key}
+
+def _ensure_counter(db, scope: str, key: str, field: str, seed) -> None:
+    """Create a counter on first use, seeded from storage by calling seed()"""
+    from pymongo.errors import DuplicateKeyError
+    
+    if db[GALLERY_COUNTERS].find_one(_counter_key(scope, key), {"_id": 1}):
+        return
+    try:
+        db[GALLERY_COUNTERS].update_one(
+            _counter_key(scope, key),
+            {"$max": {field: seed()}, "$setOnInsert": {"created_at": datetime.utcnow()}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        pass  # Another request seeded it first
+
+def _reserve_counter(db, scope: str, key: str, field: str, count: int, seed, at_least: int = None) -> int:
+    """Atomically reserve `count` numbers and return the first one"""
+    from pymongo import ReturnDocument
+    
+    _ensure_counter(db, scope, key, field, seed)
+    if at_least:
+        db[GALLERY_COUNTERS].update_one(_counter_key(scope, key), {"$max": {field: at_least}})
+    counter = db[GALLERY_COUNTERS].find_one_and_update(
+        _counter_key(scope, key),
+        {"$inc": {field: count}, "$set": {"updated_at": datetime.utcnow()}},
+        return_document=ReturnDocument.BEFORE
+    )
+    return counter[field]
+
+def _peek_counter(db, scope: str, key: str, field: str, seed) -> int:
+    _ensure_counter(db, scope, key, field, seed)
+    return db[GALLERY_COUNTERS].find_one(_counter_key(scope, key), {field: 1})[field]
+
+def set_gallery_counter(db, scope: str, key: str, field: str, value: int):
+    """Overwrite a counter (used by the repair command)"""
+    db[GALLERY_COUNTERS].update_one(
+        _counter_key(scope, key),
+        {"$set": {field: value, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+def read_gallery_counter(db, scope: str, key: str, field: str):
+    """Current counter value, or None if it has not been created yet"""
+    counter = db[GALLERY_COUNTERS].find_one(_counter_key(scope, key), {field: 1})
+    return counter.get(field) if counter else None
+
+def reset_gallery_counter(db, scope: str, key: str, field: str, value: int, expected) -> bool:
+    """
+    Set a counter only if it still holds `expected`, i.e. nothing was reserved
+    since it was read. A counter that does not exist yet is left to be seeded
+    from storage. Returns True if the counter was written.
+    """
+    if expected is None:
+        return False
+    result = db[GALLERY_COUNTERS].update_one(
+        {**_counter_key(scope, key), field: expected},
+        {"$set": {field: value, "updated_at": datetime.utcnow()}}
+    )
+    return result.matched_count > 0
+
+def _entity_counter_key(category_type: str, entity_name: str) -> str:
+    return f"{category_type}/{entity_name}"
+
+def get_next_gallery_number(db, category_type: str, entity_name: str):
+    """Get the next gallery number for an entity (without reserving it)"""
+    return _peek_counter(
+        db, "entity", _entity_counter_key(category_type, entity_name), "next_gallery_number",
+        lambda: scan_next_gallery_number(db, category_type, entity_name)
+    )
+
+def reserve_gallery_number(db, category_type: str, entity_name: str) -> int:
+    """Atomically claim the next gallery number for an entity"""
+    return _reserve_counter(
+        db, "entity", _entity_counter_key(category_type, entity_name), "next_gallery_number", 1,
+        lambda: scan_next_gallery_number(db, category_type, entity_name)
+    )
+
+def get_next_image_number(db, folder_path: str, scan_folder) -> int:
+    """Next image number in a gallery folder (without reserving it); scan_folder seeds new counters"""
+    return _peek_counter(db, "folder", folder_path, "next_image_number", lambda: scan_folder(folder_path))
+
+def reserve_image_numbers(db, folder_path: str, count: int, scan_folder, at_least: int = None) -> int:
+    """Atomically claim `count` consecutive image numbers in a gallery folder and return the first"""
+    return _reserve_counter(
+        db, "folder", folder_path, "next_image_number", count,
+        lambda: scan_folder(folder_path), at_least
+    )
+
+def note_image_number(db, folder_path: str, image_number: int):
+    """Keep an existing folder counter ahead of a number chosen by the client"""
+    db[GALLERY_COUNTERS].update_one(
+        _counter_key("folder", folder_path),
+        {"$max": {"next_image_number": image_number + 1}}
+    )
+
+def _bump_gallery_counter(db, gallery_data: dict):
+    """Keep the entity counter ahead of numbers picked outside reserve_gallery_number"""
+    category_type, entity_name = gallery_data.get("category_type"), gallery_data.get("entity_name")
+    number = _gallery_number(gallery_data)
+    if not category_type or not entity_name or number is None:
+        return
+    
+    key = _entity_counter_key(category_type, entity_name)
+    _ensure_counter(db, "entity", key, "next_gallery_number",
+                    lambda: scan_next_gallery_number(db, category_type, entity_name))
+    db[GALLERY_COUNTERS].update_one(_counter_key("entity", key), {"$max": {"next_gallery_number": number + 1}})
+
 # ==================== GALLERIES CRUD ====================
 
 def get_galleries(db, skip: int = 0, limit: int = 100):
@@ -2750,7 +3038,7 @@ def create_gallery(db, gallery_data: dict):
         "gallery_id": gallery_data["gallery_id"],
         "title": gallery_data["title"],
         "artists": json.dumps(gallery_data["artists"]) if isinstance(gallery_data["artists"], list) else gallery_data["artists"],
-        "images": json.dumps(gallery_data["images"]) if isinstance(gallery_data["images"], list) else gallery_data["images"],
+        "images": json.dumps(attach_image_variants(db, gallery_data["images"])) if isinstance(gallery_data["images"], list) else gallery_data["images"],
         "gallery_type": gallery_data.get("gallery_type", "vertical"),  # horizontal or vertical
         "category_type": gallery_data.get("category_type"),  # Actor, Actress, Events, etc.
         "entity_name": gallery_data.get("entity_name"),  # Selected actor/actress/event name
@@ -2767,6 +3055,7 @@ def create_gallery(db, gallery_data: dict):
     
     db[GALLERIES].insert_one(gallery_doc)
     del gallery_doc["_id"]
+    _bump_gallery_counter(db, gallery_doc)
     
     # Parse JSON for return
     gallery_doc["artists"] = json.loads(gallery_doc["artists"]) if gallery_doc["artists"] else []
@@ -2779,7 +3068,7 @@ def update_gallery(db, gallery_id: str, gallery_data: dict, s3_service=None):
     update_fields = {"updated_at": datetime.utcnow()}
     
     # If images are being updated, check for removed images and delete from S3
-    if "images" in gallery_data and s3_service and s3_service.is_enabled():
+    if "images" in gallery_data:
         # Get current gallery to compare images
         current_gallery = db[GALLERIES].find_one({"gallery_id": gallery_id}, {"_id": 0})
         
@@ -2817,20 +3106,21 @@ def update_gallery(db, gallery_id: str, gallery_data: dict, s3_service=None):
             # Find removed images
             removed_urls = current_urls - new_urls
             
-            # Delete removed images from S3
+            # Release removed images (deleted from S3 once unreferenced, in batches)
+            pending_deletes = []
             for url in removed_urls:
                 try:
-                    s3_service.delete_file(url)
-                    print(f"Deleted removed image from S3: {url}")
+                    release_image(db, url, s3_service, pending_deletes)
                 except Exception as e:
                     print(f"Failed to delete removed image from S3: {url}, Error: {e}")
+            flush_image_deletes(pending_deletes, s3_service)
     
     if "title" in gallery_data:
         update_fields["title"] = gallery_data["title"]
     if "artists" in gallery_data:
         update_fields["artists"] = json.dumps(gallery_data["artists"]) if isinstance(gallery_data["artists"], list) else gallery_data["artists"]
     if "images" in gallery_data:
-        update_fields["images"] = json.dumps(gallery_data["images"]) if isinstance(gallery_data["images"], list) else gallery_data["images"]
+        update_fields["images"] = json.dumps(attach_image_variants(db, gallery_data["images"])) if isinstance(gallery_data["images"], list) else gallery_data["images"]
     if "gallery_type" in gallery_data:
         update_fields["gallery_type"] = gallery_data["gallery_type"]
     if "category_type" in gallery_data:
@@ -2865,33 +3155,33 @@ def delete_gallery(db, gallery_id: str, s3_service=None):
     gallery = db[GALLERIES].find_one({"gallery_id": gallery_id}, {"_id": 0})
     
     if gallery:
-        # Delete images from S3 if service is available
-        if s3_service and s3_service.is_enabled():
-            images_raw = gallery.get("images", [])
-            # Parse JSON if stored as string
-            if isinstance(images_raw, str):
-                try:
-                    images = json.loads(images_raw)
-                except:
-                    images = []
+        # Release images; each is deleted from S3 once no other gallery or article uses it
+        images_raw = gallery.get("images", [])
+        # Parse JSON if stored as string
+        if isinstance(images_raw, str):
+            try:
+                images = json.loads(images_raw)
+            except:
+                images = []
+        else:
+            images = images_raw
+        
+        pending_deletes = []
+        for image in images:
+            # Handle both dict and string formats
+            if isinstance(image, dict):
+                image_url = image.get("url")
+            elif isinstance(image, str):
+                image_url = image
             else:
-                images = images_raw
+                image_url = None
                 
-            for image in images:
-                # Handle both dict and string formats
-                if isinstance(image, dict):
-                    image_url = image.get("url")
-                elif isinstance(image, str):
-                    image_url = image
-                else:
-                    image_url = None
-                    
-                if image_url:
-                    try:
-                        s3_service.delete_file(image_url)
-                        print(f"Deleted image from S3: {image_url}")
-                    except Exception as e:
-                        print(f"Failed to delete image from S3: {image_url}, Error: {e}")
+            if image_url:
+                try:
+                    release_image(db, image_url, s3_service, pending_deletes)
+                except Exception as e:
+                    print(f"Failed to delete image from S3: {image_url}, Error: {e}")
+        flush_image_deletes(pending_deletes, s3_service)
         
         # Remove topic associations
         db[GALLERY_TOPICS].delete_many({"gallery_id": gallery.get("id")})
@@ -26,6 +26,61 @@ GALLERY_POLITICS = "gallery_politics"
 GALLERY_TRAVEL = "gallery_travel"
 GALLERY_OTHERS = "gallery_others"
 GROUPED_POSTS = "grouped_posts"  # New collection for post aggregation
+COMMENTS = "comments"
+COMMENT_STATS = "comment_stats"  # Per-article comment counts and rating summary
+WATCH_INTENTS = "watch_intents"
+WATCH_INTENT_COUNTS = "watch_intent_counts"  # Per-video watch intent counters
+IMAGE_VARIANTS = "image_variants"  # Responsive variant manifests keyed by original image URL
+MEDIA_ASSETS = "media_assets"  # Content hash -> stored image URL, dimensions and refcount
+DIRECT_UPLOADS = "direct_uploads"  # Pending presigned browser-to-S3 uploads awaiting completion
+RENUMBER_JOBS = "renumber_jobs"  # Progress of background gallery folder renumbering
+GALLERY_COUNTERS = "gallery_counters"  # next_image_number per gallery folder, next_gallery_number per entity
+LLM_CACHE = "llm_cache"  # Cached LLM completions keyed by a hash of the request
+AGENT_JOBS = "agent_jobs"  # Queued and running agent runs with leases and stage progress
+AI_AGENTS = "ai_agents"
+RELEASE_FEED_ITEMS = "release_feed_items"  # Scraped OTT/theater release candidates, deduplicated on unique_key
+YOUTUBE_VIDEOS = "youtube_videos"  # Videos ingested from channel RSS feeds for the Video Agent
+
+# Indexes backing hot read paths. Unlike create_indexes() these are safe to
+# apply to the live database on every startup: each one is created on its
+# own, so a conflict on one collection never blocks the rest.
+QUERY_INDEXES = [
+    # Cursor pagination for article comments, newest first
+    (COMMENTS, [("article_id", 1), ("created_at", -1), ("id", -1)], {"name": "article_created_cursor"}),
+    (COMMENTS, [("article_id", 1), ("comment_type", 1), ("created_at", -1), ("id", -1)], {"name": "article_type_created_cursor"}),
+    (COMMENTS, [("id", 1)], {"name": "comment_id"}),
+    (COMMENT_STATS, [("article_id", 1)], {"name": "article_id_unique", "unique": True}),
+    # One watch intent per visitor per video; also serves the "already voted" lookup
+    (WATCH_INTENTS, [("video_id", 1), ("ip_address", 1)], {"name": "video_ip_unique", "unique": True}),
+    (WATCH_INTENTS, [("video_id", 1), ("created_at", -1)], {"name": "video_created"}),
+    (WATCH_INTENT_COUNTS, [("video_id", 1)], {"name": "video_id_unique", "unique": True}),
+    (IMAGE_VARIANTS, [("original_url", 1)], {"name": "original_url_unique", "unique": True}),
+    (ARTICLES, [("image", 1)], {"name": "image"}),
+    (MEDIA_ASSETS, [("hash", 1)], {"name": "hash_unique", "unique": True}),
+    (MEDIA_ASSETS, [("url", 1)], {"name": "url"}),
+    (DIRECT_UPLOADS, [("id", 1)], {"name": "id_unique", "unique": True}),
+    # Abandoned presigned uploads expire on their own
+    (DIRECT_UPLOADS, [("expires_at", 1)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+    (RENUMBER_JOBS, [("id", 1)], {"name": "id_unique", "unique": True}),
+    (RENUMBER_JOBS, [("created_at", 1)], {"name": "created_at_ttl", "expireAfterSeconds": 7 * 24 * 3600}),
+    (GALLERY_COUNTERS, [("scope", 1), ("key", 1)], {"name": "scope_key_unique", "unique": True}),
+    (LLM_CACHE, [("key", 1)], {"name": "key_unique", "unique": True}),
+    (LLM_CACHE, [("expires_at", 1)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+    (LLM_CACHE, [("last_used_at", 1)], {"name": "last_used_at_lru"}),
+    (AGENT_JOBS, [("id", 1)], {"name": "id_unique", "unique": True}),
+    (AGENT_JOBS, [("status", 1), ("run_after", 1), ("created_at", 1)], {"name": "status_run_after"}),
+    (AGENT_JOBS, [("agent_id", 1), ("created_at", -1)], {"name": "agent_created"}),
+    # One queued or running job per agent, across all API and worker processes
+    (AGENT_JOBS, [("agent_id", 1)], {"name": "agent_active_unique", "unique": True,
+                                     "partialFilterExpression": {"active": True}}),
+    (AGENT_JOBS, [("finished_at", 1)], {"name": "finished_at_ttl", "expireAfterSeconds": 30 * 24 * 3600}),
+    # Recurring agents due to fire, polled by every process's schedule tick
+    (AI_AGENTS, [("next_run_at", 1)], {"name": "next_run_at", "sparse": True}),
+    # Release scraper upserts on unique_key (normalized movie name + content type)
+    (RELEASE_FEED_ITEMS, [("unique_key", 1)], {"name": "unique_key_unique", "unique": True}),
+    # RSS ingestion upserts on video_id
+    (YOUTUBE_VIDEOS, [("video_id", 1)], {"name": "video_id_unique", "unique": True}),
+]
 
 def create_indexes(db):
     """
@@ -79,3 +134,17 @@ def create_indexes(db):
     except Exception as e:
         # Raise the exception so server.py can catch and handle it
         raise e
+
+def create_query_indexes(db):
+    """
+    Create the indexes listed in QUERY_INDEXES.
+    Failures are reported per index and never raised.
+    """
+    created = 0
+    for collection, keys, options in QUERY_INDEXES:
+        try:
+            db[collection].create_index(keys, **options)
+            created += 1
+        except Exception as e:
+            print(f"⚠️ Could not create index {options.get('name')} on {collection}: {e}")
+    print(f"✅ Query indexes ready ({created}/{len(QUERY_INDEXES)})")
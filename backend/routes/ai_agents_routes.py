@@ -11,9 +11,6 @@ import crud
 
 router = APIRouter()
 
-# Track running agents to prevent duplicate runs
-running_agents = set()
-
 class ReferenceUrlItem(BaseModel):
     """Reference URL with type specification"""
     url: str
@@ -42,11 +39,13 @@ class AIAgent(BaseModel):
     split_paragraphs: Optional[int] = 2  # Number of paragraphs for split
     reference_urls: Optional[List[Any]] = None  # Reference URLs - can be strings or ReferenceUrlItem objects
     posts_count: Optional[int] = 1  # Number of posts to create from listing page (1-100)
+    bulk_parallelism: Optional[int] = None  # Listing items processed at once (1-16, default AGENT_BULK_PARALLELISM)
     image_option: Optional[str] = None  # "ai_generate", "upload", "existing", "web_search"
     content_workflow: Optional[str] = None  # "in_review", "ready_to_publish", "auto_post"
     is_top_story: Optional[bool] = False  # Mark as top story
     comments_enabled: Optional[bool] = True  # Enable comments
     custom_prompt: Optional[str] = None  # Custom prompt for this agent instance (overrides category mapping)
+    pipeline_mode: Optional[str] = "multi_step"  # "multi_step" (5 LLM calls) or "single_pass" (one structured JSON call)
     
     # Photo Gallery Agent fields
     gallery_type: Optional[str] = "vertical"  # vertical or horizontal
@@ -134,6 +133,15 @@ async def update_category_prompt_mappings(mappings: List[CategoryPromptMapping],
 
 # ==================== AI Agents ====================
 
+def _reschedule():
+    """Recompute next runs of recurring agents after an agent changes"""
+    from services.agent_schedule_service import agent_schedule_service
+    try:
+        agent_schedule_service.recompute()
+    except Exception as e:
+        print(f"⚠️ Failed to recompute agent schedule: {e}")
+
+
 @router.get("/ai-agents")
 async def get_ai_agents(db = Depends(get_db)):
     """Get all AI agents"""
@@ -156,6 +164,7 @@ async def create_ai_agent(agent: AIAgent, db = Depends(get_db)):
     agent_data["updated_at"] = datetime.utcnow()
     
     created_agent = crud.create_ai_agent(db, agent_data)
+    _reschedule()
     return created_agent
 
 @router.put("/ai-agents/{agent_id}")
@@ -167,6 +176,7 @@ async def update_ai_agent(agent_id: str, agent: AIAgent, db = Depends(get_db)):
     updated_agent = crud.update_ai_agent(db, agent_id, agent_data)
     if not updated_agent:
         raise HTTPException(status_code=404, detail="Agent not found")
+    _reschedule()
     return updated_agent
 
 @router.delete("/ai-agents/{agent_id}")
@@ -175,6 +185,7 @@ async def delete_ai_agent(agent_id: str, db = Depends(get_db)):
     result = crud.delete_ai_agent(db, agent_id)
     if not result:
         raise HTTPException(status_code=404, detail="Agent not found")
+    _reschedule()
     return {"message": "Agent deleted successfully"}
 
 @router.post("/ai-agents/{agent_id}/toggle")
@@ -183,95 +194,116 @@ async def toggle_ai_agent(agent_id: str, db = Depends(get_db)):
     result = crud.toggle_ai_agent_status(db, agent_id)
     if not result:
         raise HTTPException(status_code=404, detail="Agent not found")
+    _reschedule()
     return result
 
 
 @router.post("/ai-agents/{agent_id}/run")
 async def run_ai_agent(agent_id: str, db = Depends(get_db)):
-    """Run an AI agent to generate content"""
-    from services.agent_runner_service import agent_runner
-    from services.gallery_agent_service import gallery_agent_runner
+    """Queue a run of an AI agent; poll /ai-agents/{agent_id}/status for progress and the result"""
+    from services.agent_job_service import agent_job_service, AgentAlreadyQueuedError
     
     # Check if agent exists
     agent = crud.get_ai_agent(db, agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    # Check if agent is already running
-    if agent_id in running_agents:
+    try:
+        job = agent_job_service.enqueue(agent)
+    except AgentAlreadyQueuedError:
         raise HTTPException(status_code=409, detail="Agent is already running")
     
-    try:
-        # Mark agent as running
-        running_agents.add(agent_id)
-        
-        # Run appropriate agent based on type
-        agent_type = agent.get('agent_type', 'post')
-        
-        if agent_type == 'photo_gallery':
-            # Use Gallery Agent Service
-            result = await gallery_agent_runner.run_gallery_agent(agent_id)
-        elif agent_type == 'tadka_pics':
-            # Use Tadka Pics Agent Service
-            from services.tadka_pics_agent_service import tadka_pics_agent_runner
-            result = await tadka_pics_agent_runner.run_tadka_pics_agent(agent_id)
-        elif agent_type == 'video':
-            # Use Video Agent Service
-            from services.video_agent_service import video_agent_runner
-            result = await video_agent_runner.run_video_agent(agent_id)
-        elif agent_type == 'tv_video':
-            # Use TV Video Agent Service
-            from services.tv_video_agent_service import tv_video_agent_service
-            result = await tv_video_agent_service.run_tv_video_agent(agent_id)
-        elif agent_type == 'reality_show':
-            # Use Reality Show Agent Service
-            from services.reality_show_agent_service import reality_show_agent_service
-            result = await reality_show_agent_service.run_reality_show_agent(agent_id)
-        elif agent_type == 'ott_release':
-            # Use OTT Release Agent Service
-            from services.ott_release_agent_service import ott_release_agent_service
-            result = await ott_release_agent_service.run_ott_release_agent(agent_id)
-        elif agent_type == 'theater_release':
-            # Use Theater Release Agent Service
-            from services.theater_release_agent_service import theater_release_agent_service
-            result = await theater_release_agent_service.run_theater_release_agent(agent_id)
-        elif agent_type == 'movie_review':
-            # Use Movie Review Agent Service
-            from services.movie_review_agent_service import movie_review_agent_service
-            result = await movie_review_agent_service.run_movie_review_agent(agent_id)
-        elif agent_type == 'ott_review':
-            # Use OTT Review Agent Service
-            from services.ott_review_agent_service import ott_review_agent_service
-            # Get agent config
-            agent_config = crud.get_ai_agent(db, agent_id)
-            result = await ott_review_agent_service.run(agent_config, db)
-        elif agent_type == 'cricket_schedules':
-            # Use Cricket Schedules Agent Service
-            from services.cricket_schedules_agent_service import cricket_schedules_agent
-            result = await cricket_schedules_agent.run_agent(agent_id)
-        else:
-            # Use Post Agent Service (default)
-            result = await agent_runner.run_agent(agent_id)
-        
-        return result
-        
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Agent execution failed: {str(e)}")
-    finally:
-        # Remove from running set
-        running_agents.discard(agent_id)
+    return {"success": True, "queued": True, "job_id": job["id"], "job": job}
+
+
+@router.get("/ai-agents/llm-cache/metrics")
+async def get_llm_cache_metrics():
+    """LLM response cache size and hit/miss counts per agent type (this worker)"""
+    from services.llm_cache_service import llm_cache_service
+    return llm_cache_service.get_metrics()
+
+
+@router.delete("/ai-agents/llm-cache/entries")
+async def clear_llm_cache(agent_type: Optional[str] = None):
+    """Drop cached LLM responses, optionally only those of one agent type"""
+    from services.llm_cache_service import llm_cache_service
+    return {"success": True, "deleted": llm_cache_service.clear(agent_type)}
+
+
+@router.get("/ai-agents/llm-rate-limits/metrics")
+async def get_llm_rate_limit_metrics():
+    """Queue depth, in-flight calls, concurrency limit and throttling per provider/model (this worker)"""
+    from services.llm_rate_limiter_service import llm_rate_limiter_service
+    return llm_rate_limiter_service.get_metrics()
+
+
+@router.get("/ai-agents/reference-fetch/metrics")
+async def get_reference_fetch_metrics():
+    """Reference page cache hits, revalidations, downloads and errors (this worker)"""
+    from services.reference_fetcher_service import reference_fetcher_service
+    return reference_fetcher_service.get_metrics()
 
 
 @router.get("/ai-agents/{agent_id}/status")
 async def get_agent_run_status(agent_id: str, db = Depends(get_db)):
-    """Check if an agent is currently running"""
+    """Whether an agent has a queued or running job, with the stage progress of its latest job"""
+    from services.agent_job_service import agent_job_service
+    
     agent = crud.get_ai_agent(db, agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
+    job = agent_job_service.get_latest_job(agent_id)
     return {
         "agent_id": agent_id,
-        "is_running": agent_id in running_agents
+        "is_running": bool(job and job.get("active")),
+        "job": job
     }
+
+
+# ==================== Agent Jobs ====================
+
+@router.get("/agent-schedule")
+async def get_agent_schedule():
+    """Upcoming runs of recurring agents, soonest first (next_run_at includes jitter)"""
+    from services.agent_schedule_service import agent_schedule_service
+    return {"schedule": agent_schedule_service.get_schedule()}
+
+
+@router.get("/agent-jobs")
+async def list_agent_jobs(agent_id: Optional[str] = None, status: Optional[str] = None, limit: int = 50):
+    """Recent agent jobs, newest first"""
+    from services.agent_job_service import agent_job_service
+    return {"jobs": agent_job_service.list_jobs(agent_id, status, min(max(1, limit), 200))}
+
+
+@router.get("/agent-jobs/{job_id}")
+async def get_agent_job(job_id: str):
+    """One agent job with its stage progress and result"""
+    from services.agent_job_service import agent_job_service
+    job = agent_job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/agent-jobs/{job_id}/cancel")
+async def cancel_agent_job(job_id: str):
+    """Cancel a queued job, or stop a running one at its next heartbeat"""
+    from services.agent_job_service import agent_job_service
+    job = agent_job_service.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/agent-jobs/{job_id}/retry")
+async def retry_agent_job(job_id: str):
+    """Queue a new run for the agent of a failed or cancelled job"""
+    from services.agent_job_service import agent_job_service, AgentAlreadyQueuedError
+    try:
+        return agent_job_service.retry(job_id)
+    except AgentAlreadyQueuedError:
+        raise HTTPException(status_code=409, detail="Agent is already running")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
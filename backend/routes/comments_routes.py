@@ -1,29 +1,132 @@
 from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, conint
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from typing import Literal, Optional, List
 from datetime import datetime, timezone
+import base64
 import uuid
 
 router = APIRouter()
 
+COMMENTS_PAGE_SIZE = 20
+COMMENTS_MAX_PAGE_SIZE = 100
+
 class CommentCreate(BaseModel):
     article_id: str
     name: str
     comment: str
-    comment_type: str = "regular"  # regular or review
-    rating: Optional[int] = None  # 1-5 stars for reviews
+    comment_type: Literal["regular", "review"] = "regular"  # also a comment_stats field path, so never free text
+    rating: Optional[conint(ge=1, le=5)] = None  # stars for reviews
 
 class CommentResponse(BaseModel):
     id: str
     article_id: str
     name: str
     comment: str
-    comment_type: str
+    comment_type: Literal["regular", "review"]
     rating: Optional[int] = None
     ip_address: str
     device_info: str
     created_at: str
 
+def _encode_comment_cursor(comment: dict) -> str:
+    """Encode the (created_at, id) position of a comment as an opaque cursor"""
+    raw = f"{comment['created_at']}|{comment['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_comment_cursor(cursor: str) -> tuple:
+    try:
+        created_at, comment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, comment_id
+
+
+def _rebuild_comment_stats(db, article_id: str) -> dict:
+    """Recompute the comment_stats document for an article from the comments collection"""
+    stats = {
+        "article_id": article_id,
+        "total_count": 0,
+        "counts": {},
+        "rating_count": 0,
+        "rating_sum": 0,
+        "rating_histogram": {},
+    }
+    pipeline = [
+        {"$match": {"article_id": article_id, "is_approved": True}},
+        {"$group": {
+            "_id": {"comment_type": "$comment_type", "rating": "$rating"},
+            "count": {"$sum": 1}
+        }}
+    ]
+    for row in db.comments.aggregate(pipeline):
+        comment_type = row["_id"].get("comment_type") or "regular"
+        rating = row["_id"].get("rating")
+        stats["total_count"] += row["count"]
+        stats["counts"][comment_type] = stats["counts"].get(comment_type, 0) + row["count"]
+        if rating:
+            stats["rating_count"] += row["count"]
+            stats["rating_sum"] += rating * row["count"]
+            stats["rating_histogram"][str(rating)] = stats["rating_histogram"].get(str(rating), 0) + row["count"]
+    stats["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+    db.comment_stats.update_one({"article_id": article_id}, {"$set": stats}, upsert=True)
+    return stats
+
+
+def _inc_comment_stats(db, article_id: str, increments: dict):
+    """
+    Apply $inc deltas to an article's comment_stats document.
+    Articles whose comments predate comment_stats are rebuilt from scratch
+    instead; the rebuild already reflects the write that triggered it.
+    """
+    if not db.comment_stats.find_one({"article_id": article_id}, {"_id": 1}):
+        _rebuild_comment_stats(db, article_id)
+        return
+
+    increments = {k: v for k, v in increments.items() if v}
+    if not increments:
+        return
+    db.comment_stats.update_one(
+        {"article_id": article_id},
+        {
+            "$inc": increments,
+            "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}
+        }
+    )
+
+
+def _comment_increments(comment_type: str, rating: Optional[int], sign: int) -> dict:
+    """$inc deltas for adding (sign=1) or removing (sign=-1) one comment"""
+    increments = {
+        "total_count": sign,
+        f"counts.{comment_type or 'regular'}": sign,
+    }
+    if rating:
+        increments["rating_count"] = sign
+        increments["rating_sum"] = sign * rating
+        increments[f"rating_histogram.{rating}"] = sign
+    return increments
+
+
+def _rating_change_increments(old_rating: Optional[int], new_rating: Optional[int]) -> dict:
+    """$inc deltas for changing the rating of an existing comment"""
+    increments = {}
+    if old_rating == new_rating:
+        return increments
+    if old_rating:
+        increments["rating_count"] = -1
+        increments["rating_sum"] = -old_rating
+        increments[f"rating_histogram.{old_rating}"] = -1
+    if new_rating:
+        increments["rating_count"] = increments.get("rating_count", 0) + 1
+        increments["rating_sum"] = increments.get("rating_sum", 0) + new_rating
+        increments[f"rating_histogram.{new_rating}"] = 1
+    return increments
+
+
 @router.post("/api/articles/{article_id}/comments")
 def add_comment(article_id: str, comment: CommentCreate, request: Request):
     """Add a comment to an article"""
@@ -74,6 +177,7 @@ def add_comment(article_id: str, comment: CommentCreate, request: Request):
     }
     
     db.comments.insert_one(comment_doc)
+    _inc_comment_stats(db, article_id, _comment_increments(comment_doc["comment_type"], comment_doc["rating"], 1))
     
     return {
         "success": True,
@@ -92,20 +196,68 @@ def add_comment(article_id: str, comment: CommentCreate, request: Request):
     }
 
 @router.get("/api/articles/{article_id}/comments")
-def get_comments(article_id: str, comment_type: Optional[str] = None):
-    """Get all comments for an article"""
+def get_comments(
+    article_id: str,
+    comment_type: Optional[str] = None,
+    limit: int = COMMENTS_PAGE_SIZE,
+    cursor: Optional[str] = None
+):
+    """
+    Get a page of comments for an article, newest first.
+    Pass the returned next_cursor back as `cursor` to fetch the following page.
+    """
     from server import db
     
+    limit = max(1, min(limit, COMMENTS_MAX_PAGE_SIZE))
+    
     query = {"article_id": article_id, "is_approved": True}
     if comment_type:
         query["comment_type"] = comment_type
-    
+    if cursor:
+        created_at, comment_id = _decode_comment_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": comment_id}}
+        ]
+    
+    # Fetch one extra row to know whether another page exists
     comments = list(db.comments.find(
         query,
         {"_id": 0}
-    ).sort("created_at", -1).limit(1000))
+    ).sort([("created_at", -1), ("id", -1)]).limit(limit + 1))
+    
+    has_more = len(comments) > limit
+    comments = comments[:limit]
+    next_cursor = _encode_comment_cursor(comments[-1]) if has_more else None
+    
+    stats = db.comment_stats.find_one({"article_id": article_id}, {"_id": 0})
+    if not stats:
+        stats = _rebuild_comment_stats(db, article_id)
+    count = stats["counts"].get(comment_type, 0) if comment_type else stats["total_count"]
+    
+    return {"comments": comments, "count": count, "next_cursor": next_cursor, "has_more": has_more}
+
+
+@router.get("/api/articles/{article_id}/comments/summary")
+def get_comments_summary(article_id: str):
+    """Get comment counts and the rating summary for an article without loading comments"""
+    from server import db
+    
+    stats = db.comment_stats.find_one({"article_id": article_id}, {"_id": 0})
+    if not stats:
+        stats = _rebuild_comment_stats(db, article_id)
     
-    return {"comments": comments, "count": len(comments)}
+    rating_count = stats.get("rating_count", 0)
+    average_rating = round(stats.get("rating_sum", 0) / rating_count, 1) if rating_count else None
+    
+    return {
+        "article_id": article_id,
+        "total_count": stats.get("total_count", 0),
+        "counts": stats.get("counts", {}),
+        "rating_count": rating_count,
+        "average_rating": average_rating,
+        "rating_histogram": {str(r): stats.get("rating_histogram", {}).get(str(r), 0) for r in range(1, 6)}
+    }
 
 
 @router.get("/api/articles/{article_id}/user-name")
@@ -192,6 +344,8 @@ def update_comment(article_id: str, comment_id: str, comment: CommentCreate, req
         {"id": comment_id, "article_id": article_id},
         {"$set": update_data}
     )
+    if existing_comment.get("is_approved", True):
+        _inc_comment_stats(db, article_id, _rating_change_increments(existing_comment.get("rating"), comment.rating))
     
     # Get updated comment
     updated_comment = db.comments.find_one({"id": comment_id}, {"_id": 0})
@@ -207,14 +361,19 @@ def delete_comment(article_id: str, comment_id: str):
     """Delete a comment (admin only)"""
     from server import db
     
-    result = db.comments.delete_one({
+    deleted_comment = db.comments.find_one_and_delete({
         "id": comment_id,
         "article_id": article_id
     })
     
-    if result.deleted_count == 0:
+    if not deleted_comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     
+    if deleted_comment.get("is_approved", True):
+        _inc_comment_stats(db, article_id, _comment_increments(
+            deleted_comment.get("comment_type"), deleted_comment.get("rating"), -1
+        ))
+    
     return {"success": True, "message": "Comment deleted successfully"}
 
 
@@ -333,6 +492,54 @@ class WatchIntentCreate(BaseModel):
     planning_to_watch: bool
     comment: Optional[str] = ""
 
+def _watch_response_key(planning_to_watch: bool) -> str:
+    return "planning_count" if planning_to_watch else "not_planning_count"
+
+
+def _rebuild_watch_counts(db, video_id: int) -> dict:
+    """Recompute the watch_intent_counts document for a video from watch_intents"""
+    planning = db.watch_intents.count_documents({"video_id": video_id, "planning_to_watch": True})
+    total = db.watch_intents.count_documents({"video_id": video_id})
+    counts = {
+        "video_id": video_id,
+        "planning_count": planning,
+        "not_planning_count": total - planning,
+        "total_count": total,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    db.watch_intent_counts.update_one({"video_id": video_id}, {"$set": counts}, upsert=True)
+    return counts
+
+
+def _get_watch_counts(db, video_id: int) -> dict:
+    counts = db.watch_intent_counts.find_one({"video_id": video_id}, {"_id": 0})
+    if not counts:
+        counts = _rebuild_watch_counts(db, video_id)
+    return counts
+
+
+def _inc_watch_counts(db, video_id: int, increments: dict):
+    """
+    Apply $inc deltas to a video's watch_intent_counts document.
+    Videos whose intents predate the counters are rebuilt instead.
+    """
+    if not db.watch_intent_counts.find_one({"video_id": video_id}, {"_id": 1}):
+        _rebuild_watch_counts(db, video_id)
+        return
+
+    increments = {k: v for k, v in increments.items() if v}
+    if not increments:
+        return
+    db.watch_intent_counts.update_one(
+        {"video_id": video_id},
+        {
+            "$inc": increments,
+            "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}
+        },
+        upsert=True
+    )
+
+
 # Watch Intent Endpoints
 @router.post("/api/videos/{video_id}/watch-intent")
 def add_watch_intent(video_id: int, intent: WatchIntentCreate, request: Request):
@@ -346,41 +553,51 @@ def add_watch_intent(video_id: int, intent: WatchIntentCreate, request: Request)
     
     # Get device info
     user_agent = request.headers.get("user-agent", "Unknown")
-    
-    # Check if user already submitted watch intent
-    existing_intent = db.watch_intents.find_one({
-        "video_id": video_id,
-        "ip_address": ip_address
-    })
-    
-    if existing_intent:
-        # Update existing intent
-        db.watch_intents.update_one(
-            {"_id": existing_intent["_id"]},
-            {"$set": {
-                "name": intent.name,
-                "planning_to_watch": intent.planning_to_watch,
-                "comment": intent.comment,
-                "updated_at": datetime.now(timezone.utc).isoformat()
-            }}
+    now = datetime.now(timezone.utc).isoformat()
+    
+    # Single upsert on the (video_id, ip_address) unique index; the previous
+    # document tells us whether this is a new vote or a changed one
+    def upsert_intent():
+        return db.watch_intents.find_one_and_update(
+            {"video_id": video_id, "ip_address": ip_address},
+            {
+                "$set": {
+                    "name": intent.name,
+                    "planning_to_watch": intent.planning_to_watch,
+                    "comment": intent.comment,
+                    "updated_at": now
+                },
+                "$setOnInsert": {
+                    "id": str(uuid.uuid4()),
+                    "device_info": user_agent,
+                    "created_at": now
+                }
+            },
+            projection={"_id": 0, "planning_to_watch": 1},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
         )
+    
+    try:
+        previous_intent = upsert_intent()
+    except DuplicateKeyError:
+        # Concurrent first vote from the same visitor; the retry updates it
+        previous_intent = upsert_intent()
+    
+    if previous_intent:
+        previous_planning = bool(previous_intent.get("planning_to_watch"))
+        if previous_planning != intent.planning_to_watch:
+            _inc_watch_counts(db, video_id, {
+                _watch_response_key(previous_planning): -1,
+                _watch_response_key(intent.planning_to_watch): 1
+            })
         return {"success": True, "message": "Your response has been updated!"}
-    else:
-        # Create new intent
-        intent_doc = {
-            "id": str(uuid.uuid4()),
-            "video_id": video_id,
-            "name": intent.name,
-            "planning_to_watch": intent.planning_to_watch,
-            "comment": intent.comment,
-            "ip_address": ip_address,
-            "device_info": user_agent,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }
-        
-        db.watch_intents.insert_one(intent_doc)
-        return {"success": True, "message": "Thank you for your response!"}
+    
+    _inc_watch_counts(db, video_id, {
+        "total_count": 1,
+        _watch_response_key(intent.planning_to_watch): 1
+    })
+    return {"success": True, "message": "Thank you for your response!"}
 
 
 @router.get("/api/videos/{video_id}/watch-count")
@@ -388,12 +605,13 @@ def get_watch_count(video_id: int):
     """Get count of people planning to watch the movie"""
     from server import db
     
-    count = db.watch_intents.count_documents({
-        "video_id": video_id,
-        "planning_to_watch": True
-    })
+    counts = _get_watch_counts(db, video_id)
     
-    return {"count": count}
+    return {
+        "count": counts.get("planning_count", 0),
+        "not_planning_count": counts.get("not_planning_count", 0),
+        "total_count": counts.get("total_count", 0)
+    }
 
 
 @router.get("/api/videos/{video_id}/watch-intent-user")
@@ -406,11 +624,10 @@ def get_user_watch_intent(video_id: int, request: Request):
     if "x-forwarded-for" in request.headers:
         ip_address = request.headers["x-forwarded-for"].split(",")[0].strip()
     
-    # Find existing intent from this IP for this video
+    # Point lookup on the (video_id, ip_address) unique index
     existing_intent = db.watch_intents.find_one(
         {"video_id": video_id, "ip_address": ip_address},
-        {"name": 1, "planning_to_watch": 1, "comment": 1, "_id": 0},
-        sort=[("created_at", -1)]
+        {"name": 1, "planning_to_watch": 1, "comment": 1, "_id": 0}
     )
     
     if existing_intent:
@@ -425,16 +642,18 @@ def get_user_watch_intent(video_id: int, request: Request):
 
 
 @router.get("/api/videos/{video_id}/watch-responses")
-def get_watch_responses(video_id: int):
-    """Get all user responses for this video"""
+def get_watch_responses(video_id: int, limit: int = 100):
+    """Get the most recent user responses for this video along with the response counts"""
     from server import db
     from datetime import datetime, timezone
     
-    # Fetch all watch intents for this video
+    limit = max(1, min(limit, 500))
+    
+    # Fetch the latest watch intents for this video
     intents_cursor = db.watch_intents.find(
         {"video_id": video_id},
         {"_id": 0, "id": 1, "name": 1, "planning_to_watch": 1, "comment": 1, "created_at": 1}
-    ).sort("created_at", -1)
+    ).sort("created_at", -1).limit(limit)
     
     responses = []
     for intent in intents_cursor:
@@ -454,5 +673,11 @@ def get_watch_responses(video_id: int):
             "time": time_str
         })
     
-    return {"responses": responses}
-
+    counts = _get_watch_counts(db, video_id)
+    
+    return {
+        "responses": responses,
+        "planning_count": counts.get("planning_count", 0),
+        "not_planning_count": counts.get("not_planning_count", 0),
+        "total_count": counts.get("total_count", 0)
+    }
@@ -0,0 +1,216 @@
+"""
+Direct Upload Routes
+Presigned browser-to-S3 uploads for CMS images and galleries. The API only
+signs the request and verifies the result, so image bytes never pass through
+the API workers.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime, timezone, timedelta
+import mimetypes
+import os
+import uuid
+
+import crud
+from database import get_db
+from models.mongodb_collections import DIRECT_UPLOADS
+from s3_service import s3_service
+from services.image_variant_service import image_variant_service
+from services.media_asset_service import media_asset_service, stage_s3_object, UploadRejected
+
+router = APIRouter()
+
+PRESIGN_EXPIRY_SECONDS = 900
+MULTIPART_PRESIGN_EXPIRY_SECONDS = 3600
+UPLOAD_TARGETS = ("articles", "galleries", "tadka-pics")
+
+
+class PresignRequest(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+    target: str = "articles"  # articles, galleries or tadka-pics
+    folder_path: Optional[str] = None  # gallery folder; with image_number gives {root}/{folder}/{n}.ext
+    image_number: Optional[int] = None
+
+
+class UploadedPart(BaseModel):
+    part_number: int
+    etag: str
+
+
+class CompleteRequest(BaseModel):
+    upload_id: str
+    parts: Optional[List[UploadedPart]] = None
+
+
+def _build_key(request: PresignRequest, db) -> str:
+    """Same folder layout as the proxied upload endpoints"""
+    from server import get_next_image_filename, get_image_root_folder
+
+    extension = os.path.splitext(request.filename)[1].lower() or mimetypes.guess_extension(request.content_type) or ".jpg"
+
+    if request.folder_path and request.image_number is not None:
+        folder_path = request.folder_path.strip("/")
+        if ".." in folder_path.split("/"):
+            raise HTTPException(status_code=400, detail="Invalid folder path")
+        crud.note_image_number(db, folder_path, request.image_number)
+        return f"{get_image_root_folder('galleries')}/{folder_path}/{request.image_number}{extension}"
+
+    date_path, filename = get_next_image_filename(content_type=request.target)
+    return f"{date_path}/{filename}{extension}"
+
+
+@router.post("/api/cms/direct-upload/presign")
+async def presign_direct_upload(request: PresignRequest, db = Depends(get_db)):
+    """
+    Issue a presigned POST (or presigned multipart part URLs for large files)
+    for one image. Returns 400 when S3 is disabled so the client can fall back
+    to the proxied upload endpoints.
+    """
+    if not s3_service.ensure_current(db):
+        raise HTTPException(status_code=400, detail="AWS S3 is not enabled")
+
+    if request.target not in UPLOAD_TARGETS:
+        raise HTTPException(status_code=400, detail=f"target must be one of {', '.join(UPLOAD_TARGETS)}")
+    if not request.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="Only image uploads are supported")
+
+    max_bytes = s3_service.max_file_size_bytes()
+    if request.size <= 0 or request.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"File size exceeds maximum allowed size of {max_bytes // (1024 * 1024)}MB")
+
+    key = _build_key(request, db)
+    upload = {
+        "id": str(uuid.uuid4()),
+        "key": key,
+        "content_type": request.content_type,
+        "size": request.size,
+        "target": request.target,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+    if request.size >= s3_service.transfer_config.multipart_threshold:
+        multipart = await s3_service.run_in_pool(
+            s3_service.start_presigned_multipart, key, request.content_type, request.size, MULTIPART_PRESIGN_EXPIRY_SECONDS
+        )
+        if not multipart:
+            raise HTTPException(status_code=500, detail="Failed to start multipart upload")
+        upload["s3_upload_id"] = multipart["upload_id"]
+        upload["expires_at"] = upload["created_at"] + timedelta(seconds=MULTIPART_PRESIGN_EXPIRY_SECONDS)
+        response = {
+            "mode": "multipart",
+            "part_size": multipart["part_size"],
+            "parts": multipart["parts"],
+        }
+    else:
+        post = await s3_service.run_in_pool(
+            s3_service.presign_post, key, request.content_type, max_bytes, PRESIGN_EXPIRY_SECONDS
+        )
+        if not post:
+            raise HTTPException(status_code=500, detail="Failed to presign upload")
+        upload["expires_at"] = upload["created_at"] + timedelta(seconds=PRESIGN_EXPIRY_SECONDS)
+        response = {"mode": "post", "url": post["url"], "fields": post["fields"]}
+
+    db[DIRECT_UPLOADS].insert_one(upload)
+    return {**response, "upload_id": upload["id"], "key": key, "expires_at": upload["expires_at"].isoformat()}
+
+
+async def _verify_and_ingest(db, upload: dict, request: CompleteRequest):
+    """Finish a multipart upload, verify the object and register it; returns (asset, staged)"""
+    if not s3_service.ensure_current(db):
+        raise HTTPException(status_code=400, detail="AWS S3 is not enabled")
+
+    key = upload["key"]
+    if upload.get("s3_upload_id"):
+        if not request.parts:
+            raise HTTPException(status_code=400, detail="parts are required to complete a multipart upload")
+        completed = await s3_service.run_in_pool(
+            s3_service.complete_multipart, key, upload["s3_upload_id"], [part.dict() for part in request.parts]
+        )
+        if not completed:
+            # Parts are kept so the browser can retry, or abort to release them
+            raise HTTPException(status_code=400, detail="Failed to complete multipart upload")
+
+    head = await s3_service.run_in_pool(s3_service.head_object, key)
+    if not head:
+        raise HTTPException(status_code=400, detail="Uploaded object not found in S3")
+
+    try:
+        staged = await s3_service.run_in_pool(stage_s3_object, key, upload["content_type"], s3_service.max_file_size_bytes())
+    except UploadRejected as e:
+        # Not an acceptable image: nothing left to retry
+        await s3_service.run_in_pool(s3_service.delete_object, key)
+        db[DIRECT_UPLOADS].delete_one({"id": upload["id"]})
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    try:
+        asset = await media_asset_service.ingest_staged(staged, key, stored_url=s3_service.build_url(key))
+    except Exception:
+        staged.cleanup()
+        raise
+    return asset, staged
+
+
+@router.post("/api/cms/direct-upload/complete")
+async def complete_direct_upload(request: CompleteRequest, db = Depends(get_db)):
+    """
+    Called by the browser once the object is in S3. Finishes multipart uploads,
+    then verifies the stored object (size limit, real image content) and
+    registers it in media_assets. Duplicate content is collapsed onto the
+    existing asset and the fresh copy is deleted.
+    """
+    # Claim the pending upload without removing it: if completion or
+    # verification fails, the browser can still retry complete or abort
+    upload = db[DIRECT_UPLOADS].find_one_and_update(
+        {"id": request.upload_id, "completing": {"$ne": True}},
+        {"$set": {"completing": True}},
+        projection={"_id": 0}
+    )
+    if not upload:
+        if db[DIRECT_UPLOADS].count_documents({"id": request.upload_id}, limit=1):
+            raise HTTPException(status_code=409, detail="Upload is already being completed")
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
+
+    try:
+        asset, staged = await _verify_and_ingest(db, upload, request)
+    except BaseException:
+        db[DIRECT_UPLOADS].update_one({"id": upload["id"]}, {"$unset": {"completing": ""}})
+        raise
+    db[DIRECT_UPLOADS].delete_one({"id": upload["id"]})
+    key = upload["key"]
+
+    if asset["deduplicated"]:
+        staged.cleanup()
+        if asset["key"] != key:
+            await s3_service.run_in_pool(s3_service.delete_object, key)
+    else:
+        staged.cleanup_after(image_variant_service.schedule(staged.path, key, asset["url"], staged.content_type))
+
+    return {
+        "success": True,
+        "url": asset["url"],
+        "s3_key": asset["key"],
+        "filename": os.path.basename(key),
+        "deduplicated": asset["deduplicated"],
+        "width": asset.get("width"),
+        "height": asset.get("height"),
+    }
+
+
+@router.delete("/api/cms/direct-upload/{upload_id}")
+async def abort_direct_upload(upload_id: str, db = Depends(get_db)):
+    """Cancel a pending upload, releasing any multipart parts or object already sent"""
+    upload = db[DIRECT_UPLOADS].find_one_and_delete({"id": upload_id, "completing": {"$ne": True}}, {"_id": 0})
+    if not upload:
+        if db[DIRECT_UPLOADS].count_documents({"id": upload_id}, limit=1):
+            raise HTTPException(status_code=409, detail="Upload is already being completed")
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
+    if s3_service.ensure_current(db):
+        if upload.get("s3_upload_id"):
+            await s3_service.run_in_pool(s3_service.abort_multipart, upload["key"], upload["s3_upload_id"])
+        # A failed complete may have left the object itself behind
+        await s3_service.run_in_pool(s3_service.delete_object, upload["key"])
+    return {"success": True}
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
 from typing import Optional
-import os
-import re
 from database import get_db
+from services.gallery_counter_service import scan_image_folder, rebuild_counters
+from services.gallery_renumber_service import gallery_renumber_service
+from services.image_variant_service import image_variant_service
+from services.media_asset_service import media_asset_service, stage_upload, UploadRejected
 import crud
 
 router = APIRouter()
@@ -18,17 +20,16 @@ async def upload_gallery_image(
     from server import s3_service
     
     try:
-        # Get AWS config
-        config = crud.get_aws_config(db)
-        
-        if not config or not config.get('is_enabled'):
+        # Reuse the process-wide client; it is rebuilt only when aws-config changes
+        if not s3_service.ensure_current(db):
             raise HTTPException(status_code=400, detail="AWS S3 is not enabled")
+        config = s3_service.config
         
-        # Initialize S3 service
-        s3_service.initialize(config)
-        
-        # Read file content
-        file_content = await file.read()
+        # Stream to a temp file in chunks, hashing and size-checking as it arrives
+        try:
+            staged = await stage_upload(file, s3_service.max_file_size_bytes())
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
         
         # Get file extension
         file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
@@ -39,17 +40,32 @@ async def upload_gallery_image(
         # Create S3 key with gallery folder structure: {galleries_root}/{folder_path}/{number}.ext
         s3_key = f"{galleries_root}/{folder_path}/{image_number}.{file_extension}"
         
-        # Upload to S3
-        url = s3_service.upload_file(file_content, s3_key, file.content_type)
+        # Upload to S3, or reuse the stored copy if these exact bytes were uploaded before
+        try:
+            asset = await media_asset_service.ingest_staged(staged, s3_key)
+        except Exception:
+            staged.cleanup()
+            raise
         
-        if not url:
+        if not asset:
+            staged.cleanup()
             raise HTTPException(status_code=500, detail="Failed to upload image to S3")
         
+        crud.note_image_number(db, folder_path.strip("/"), image_number)
+        
+        if asset["deduplicated"]:
+            staged.cleanup()
+        else:
+            # Responsive variants are built in the background from the staged file;
+            # the gallery picks up the manifest on save
+            staged.cleanup_after(image_variant_service.schedule(staged.path, s3_key, asset["url"], staged.content_type))
+        
         return {
             "success": True,
-            "url": url,
-            "s3_key": s3_key,
-            "filename": f"{image_number}.{file_extension}"
+            "url": asset["url"],
+            "s3_key": asset["key"],
+            "filename": f"{image_number}.{file_extension}",
+            "deduplicated": asset["deduplicated"]
         }
     except HTTPException:
         raise
@@ -57,139 +73,65 @@ async def upload_gallery_image(
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 @router.get("/api/cms/gallery-next-image-number")
-async def get_next_image_number(folder_path: str):
-    """Get the next available image number in a gallery folder"""
+def get_next_image_number(folder_path: str, db = Depends(get_db)):
+    """Get the next available image number in a gallery folder (read from its counter, nothing is reserved)"""
+    try:
+        next_number = crud.get_next_image_number(db, folder_path.strip("/"), scan_image_folder)
+        return {"next_number": next_number, "current_count": next_number - 1}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get next image number: {str(e)}")
+
+@router.post("/api/cms/gallery-image-numbers/reserve")
+def reserve_image_numbers(
+    folder_path: str = Form(...),
+    count: int = Form(1),
+    min_number: Optional[int] = Form(None),
+    db = Depends(get_db)
+):
+    """
+    Atomically reserve `count` consecutive image numbers in a gallery folder.
+    min_number lets the client skip past numbers it already holds in an unsaved gallery.
+    """
+    if count < 1 or count > 1000:
+        raise HTTPException(status_code=400, detail="count must be between 1 and 1000")
+    try:
+        first_number = crud.reserve_image_numbers(db, folder_path.strip("/"), count, scan_image_folder, min_number)
+        return {"first_number": first_number, "last_number": first_number + count - 1}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to reserve image numbers: {str(e)}")
+
+@router.post("/api/cms/gallery-counters/repair")
+def repair_gallery_counters(db = Depends(get_db)):
+    """Rebuild all image and gallery counters from storage"""
     from server import s3_service
     
     try:
-        if s3_service.is_enabled():
-            # S3 implementation
-            prefix = f"galleries/{folder_path}/"
-            objects = s3_service.list_objects(prefix=prefix)
-            
-            # Extract numbers from filenames
-            numbers = []
-            for obj in objects:
-                filename = obj['Key'].split('/')[-1]
-                # Extract number from filename (e.g., "1.jpg" -> 1)
-                match = re.match(r'^(\d+)\.[a-zA-Z]+$', filename)
-                if match:
-                    numbers.append(int(match.group(1)))
-            
-            # Find the next number
-            next_number = max(numbers) + 1 if numbers else 1
-            return {"next_number": next_number, "current_count": len(numbers)}
-        else:
-            # Local storage implementation
-            local_path = f"/app/frontend/public/uploads/galleries/{folder_path}"
-            os.makedirs(local_path, exist_ok=True)
-            
-            # Get all image files
-            files = os.listdir(local_path) if os.path.exists(local_path) else []
-            
-            # Extract numbers from filenames
-            numbers = []
-            for filename in files:
-                match = re.match(r'^(\d+)\.[a-zA-Z]+$', filename)
-                if match:
-                    numbers.append(int(match.group(1)))
-            
-            # Find the next number
-            next_number = max(numbers) + 1 if numbers else 1
-            return {"next_number": next_number, "current_count": len(numbers)}
+        s3_service.ensure_current(db)
+        return {"success": True, **rebuild_counters(db)}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get next image number: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to repair gallery counters: {str(e)}")
 
 @router.post("/api/cms/renumber-gallery-images")
 async def renumber_gallery_images(folder_path: str = Form(...)):
-    """Renumber all images in a gallery folder to be sequential (1, 2, 3, etc.)"""
-    from server import s3_service
-    
+    """
+    Renumber all images in a gallery folder to be sequential (1, 2, 3, etc.).
+    Runs as a background job; poll /api/cms/renumber-gallery-images/{job_id} for progress.
+    """
     try:
-        if s3_service.is_enabled():
-            # S3 implementation
-            prefix = f"galleries/{folder_path}/"
-            objects = s3_service.list_objects(prefix=prefix)
-            
-            # Get all image objects with their numbers
-            images = []
-            for obj in objects:
-                filename = obj['Key'].split('/')[-1]
-                match = re.match(r'^(\d+)\.([a-zA-Z]+)$', filename)
-                if match:
-                    images.append({
-                        'key': obj['Key'],
-                        'number': int(match.group(1)),
-                        'extension': match.group(2),
-                        'size': obj.get('Size', 0)
-                    })
-            
-            # Sort by current number
-            images.sort(key=lambda x: x['number'])
-            
-            # Renumber sequentially
-            renamed_count = 0
-            for idx, img in enumerate(images, start=1):
-                old_key = img['key']
-                new_filename = f"{idx}.{img['extension']}"
-                new_key = f"galleries/{folder_path}/{new_filename}"
-                
-                # Only rename if the number changed
-                if img['number'] != idx:
-                    # Copy to new name
-                    s3_service.copy_object(old_key, new_key)
-                    # Delete old
-                    s3_service.delete_object(old_key)
-                    renamed_count += 1
-            
-            return {
-                "success": True,
-                "message": f"Renumbered {renamed_count} images",
-                "total_images": len(images)
-            }
-        else:
-            # Local storage implementation
-            local_path = f"/app/frontend/public/uploads/galleries/{folder_path}"
-            
-            if not os.path.exists(local_path):
-                raise HTTPException(status_code=404, detail="Gallery folder not found")
-            
-            # Get all image files
-            files = os.listdir(local_path)
-            
-            # Get all images with their numbers
-            images = []
-            for filename in files:
-                match = re.match(r'^(\d+)\.([a-zA-Z]+)$', filename)
-                if match:
-                    images.append({
-                        'filename': filename,
-                        'number': int(match.group(1)),
-                        'extension': match.group(2)
-                    })
-            
-            # Sort by current number
-            images.sort(key=lambda x: x['number'])
-            
-            # Renumber sequentially
-            renamed_count = 0
-            for idx, img in enumerate(images, start=1):
-                old_path = os.path.join(local_path, img['filename'])
-                new_filename = f"{idx}.{img['extension']}"
-                new_path = os.path.join(local_path, new_filename)
-                
-                # Only rename if the number changed
-                if img['number'] != idx:
-                    # Use a temp name to avoid conflicts
-                    temp_path = os.path.join(local_path, f"temp_{idx}.{img['extension']}")
-                    os.rename(old_path, temp_path)
-                    os.rename(temp_path, new_path)
-                    renamed_count += 1
-            
-            return {
-                "success": True,
-                "message": f"Renumbered {renamed_count} images",
-                "total_images": len(images)
-            }
+        job = gallery_renumber_service.start(folder_path)
+        return {
+            "success": True,
+            "message": "Renumbering started",
+            "job_id": job["id"],
+            "status": job["status"]
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to renumber images: {str(e)}")
+
+@router.get("/api/cms/renumber-gallery-images/{job_id}")
+async def get_renumber_job(job_id: str):
+    """Get progress of a renumber job"""
+    job = gallery_renumber_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Renumber job not found")
+    return job
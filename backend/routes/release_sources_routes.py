@@ -185,6 +185,7 @@ async def get_unused_feed_items(
 async def fetch_all_sources(background_tasks: BackgroundTasks):
     """Fetch all active release sources"""
     from services.release_scraper_service import release_scraper_service
+    from services.http_client_service import http_client_service
     import asyncio
     import traceback
     
@@ -205,6 +206,7 @@ async def fetch_all_sources(background_tasks: BackgroundTasks):
             print(f"❌ fetch_all_sources error: {e}")
             traceback.print_exc()
         finally:
+            loop.run_until_complete(http_client_service.aclose())
             loop.close()
     
     background_tasks.add_task(run_fetch_all)
@@ -215,6 +217,19 @@ async def fetch_all_sources(background_tasks: BackgroundTasks):
     }
 
 
+@router.get("/fetch-summary")
+async def get_fetch_summary():
+    """Summary of the last fetch-all run (per-source timings and counts) and per-domain throttling"""
+    from services.release_scraper_service import release_scraper_service
+    from services.domain_throttle import domain_throttle
+    
+    return {
+        "is_running": release_scraper_service.is_running,
+        "last_run": release_scraper_service.last_run,
+        "domains": domain_throttle.get_metrics()
+    }
+
+
 @router.get("", response_model=List[ReleaseSourceResponse])
 async def get_release_sources():
     """Get all release sources"""
@@ -314,6 +329,7 @@ async def delete_release_source(source_id: str):
 async def fetch_release_source(source_id: str, background_tasks: BackgroundTasks):
     """Manually trigger fetch for a release source"""
     from services.release_scraper_service import release_scraper_service
+    from services.http_client_service import http_client_service
     
     source = db[RELEASE_SOURCES].find_one({"id": source_id})
     if not source:
@@ -328,6 +344,7 @@ async def fetch_release_source(source_id: str, background_tasks: BackgroundTasks
         try:
             loop.run_until_complete(release_scraper_service.fetch_source(source))
         finally:
+            loop.run_until_complete(http_client_service.aclose())
             loop.close()
     
     background_tasks.add_task(run_fetch)
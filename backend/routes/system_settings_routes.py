@@ -8,6 +8,7 @@ from typing import List, Optional, Dict
 from database import get_db
 import crud
 from s3_service import s3_service
+from services.media_asset_service import stage_upload, UploadRejected
 import hashlib
 import requests
 import os
@@ -104,9 +105,9 @@ async def update_aws_configuration(config: AWSConfigUpdate, db = Depends(get_db)
     # Update in database
     updated_config = crud.update_aws_config(db, update_data)
     
-    # Initialize S3 service with full config (including existing keys if not updated)
-    if updated_config.get('is_enabled'):
-        s3_service.initialize(updated_config)
+    # Refresh the S3 client with full config (including existing keys if not updated);
+    # other workers pick up the new config_version on their next check
+    s3_service.initialize(updated_config)
     
     # Return masked credentials
     if updated_config.get('aws_secret_access_key'):
@@ -159,22 +160,34 @@ async def test_aws_connection(db = Depends(get_db)):
         "tested_at": test_result["last_test_time"].isoformat()
     }
 
+@router.get("/system-settings/aws-config/metrics")
+async def get_aws_client_metrics(db = Depends(get_db)):
+    """S3 client registry and connection pool statistics"""
+    s3_service.ensure_current(db)
+    return s3_service.get_metrics()
+
+@router.get("/system-settings/http-clients/metrics")
+async def get_http_client_metrics():
+    """Shared scraper HTTP clients: per-host request counts, errors and latency"""
+    from services.http_client_service import http_client_service
+    return http_client_service.get_metrics()
+
 @router.post("/system-settings/upload-to-s3")
 async def upload_file_to_s3(file: UploadFile = File(...), db = Depends(get_db)):
     """Upload a file to S3 (used for testing and manual uploads)"""
-    config = crud.get_aws_config(db)
-    
-    if not config or not config.get('is_enabled'):
+    if not s3_service.ensure_current(db):
         raise HTTPException(status_code=400, detail="AWS S3 is not enabled")
     
-    # Initialize S3 service
-    s3_service.initialize(config)
-    
-    # Read file content
-    file_content = await file.read()
+    # Stream to a temp file in chunks (size-checked on the fly), then to S3
+    try:
+        staged = await stage_upload(file, s3_service.max_file_size_bytes())
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     
-    # Upload to S3
-    url = s3_service.upload_file(file_content, file.filename, file.content_type)
+    try:
+        url = await s3_service.upload_path_async(staged.path, file.filename, staged.content_type)
+    finally:
+        staged.cleanup()
     
     if not url:
         raise HTTPException(status_code=500, detail="Failed to upload to S3")
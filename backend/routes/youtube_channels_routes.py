@@ -291,7 +291,12 @@ async def update_youtube_channel(channel_id: str, channel: YouTubeChannelUpdate)
     if 'channel_id' in update_data and update_data['channel_id']:
         update_data['rss_url'] = RSS_URL_TEMPLATE.format(channel_id=update_data['channel_id'])
     
-    db[YOUTUBE_CHANNELS].update_one({"id": channel_id}, {"$set": update_data})
+    # Drop the feed validators and poll the channel on the next RSS tick,
+    # so changed URL or fetch filters take effect with a full download
+    db[YOUTUBE_CHANNELS].update_one(
+        {"id": channel_id},
+        {"$set": update_data, "$unset": {"rss_cache": "", "rss_next_poll_at": ""}}
+    )
     
     # Also update channel_type and languages in youtube_videos collection if changed
     video_update_data = {}
@@ -6,14 +6,18 @@ from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timezone
 from database import db
-from services.youtube_rss_service import youtube_rss_service
+from services.youtube_rss_service import (
+    youtube_rss_service, YOUTUBE_RSS_MIN_POLL_MINUTES, YOUTUBE_RSS_MAX_POLL_MINUTES
+)
 
 router = APIRouter(prefix="/youtube-rss", tags=["YouTube RSS"])
 
 
 class RSSConfigUpdate(BaseModel):
     enabled: bool
-    frequency_hours: int = 1  # 1, 2, 3, 4, 6, 12, 24
+    frequency_hours: int = 1  # 1, 2, 3, 4, 6, 12, 24 - retry interval for channels never fetched successfully
+    min_poll_minutes: Optional[int] = None  # bounds for each channel's adaptive poll interval
+    max_poll_minutes: Optional[int] = None
 
 
 class DeleteOldVideosRequest(BaseModel):
@@ -30,6 +34,8 @@ async def get_rss_config():
         return {
             "enabled": False,
             "frequency_hours": 1,
+            "min_poll_minutes": YOUTUBE_RSS_MIN_POLL_MINUTES,
+            "max_poll_minutes": YOUTUBE_RSS_MAX_POLL_MINUTES,
             "last_fetch": None,
             "next_fetch": None
         }
@@ -37,6 +43,8 @@ async def get_rss_config():
     return {
         "enabled": config.get("enabled", False),
         "frequency_hours": config.get("frequency_hours", 1),
+        "min_poll_minutes": config.get("min_poll_minutes") or YOUTUBE_RSS_MIN_POLL_MINUTES,
+        "max_poll_minutes": config.get("max_poll_minutes") or YOUTUBE_RSS_MAX_POLL_MINUTES,
         "last_fetch": config.get("last_fetch"),
         "next_fetch": config.get("next_fetch")
     }
@@ -54,6 +62,10 @@ async def update_rss_config(config: RSSConfigUpdate):
         "frequency_hours": config.frequency_hours,
         "updated_at": now
     }
+    if config.min_poll_minutes is not None:
+        update_data["min_poll_minutes"] = config.min_poll_minutes
+    if config.max_poll_minutes is not None:
+        update_data["max_poll_minutes"] = config.max_poll_minutes
     
     # Calculate next fetch time if enabled
     if config.enabled:
@@ -128,34 +140,14 @@ async def fetch_single_channel(channel_id: str):
     )
     
     # Store videos in database
-    new_videos = 0
-    updated_videos = 0
-    
-    for video in videos:
-        existing = db.youtube_videos.find_one({'video_id': video['video_id']})
-        if existing:
-            if video.get('updated_at') != existing.get('updated_at'):
-                db.youtube_videos.update_one(
-                    {'video_id': video['video_id']},
-                    {'$set': {
-                        'title': video['title'],
-                        'description': video['description'],
-                        'thumbnail': video['thumbnail'],
-                        'updated_at': video['updated_at'],
-                        'fetched_at': video['fetched_at']
-                    }}
-                )
-                updated_videos += 1
-        else:
-            db.youtube_videos.insert_one(video)
-            new_videos += 1
+    counts = youtube_rss_service.store_videos(videos)
     
     return {
         "success": True,
         "channel_name": channel.get('channel_name'),
         "videos_found": len(videos),
-        "new_videos": new_videos,
-        "updated_videos": updated_videos
+        "new_videos": counts['new'],
+        "updated_videos": counts['updated']
     }
 
 
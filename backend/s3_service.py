@@ -3,53 +3,264 @@ AWS S3 Service for Image/File Upload
 Handles all S3 operations based on stored configuration
 """
 import boto3
-from botocore.exceptions import ClientError
-from typing import Optional
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError, BotoCoreError
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict
+import asyncio
+import io
 import os
+import random
+import threading
+import time
 from pathlib import Path
 import mimetypes
 
+# Transfer tuning (override via environment)
+S3_MAX_CONCURRENCY = int(os.environ.get('S3_MAX_CONCURRENCY', '16'))  # parallel transfers per process
+S3_MULTIPART_THRESHOLD_MB = int(os.environ.get('S3_MULTIPART_THRESHOLD_MB', '8'))
+S3_MULTIPART_CHUNK_MB = int(os.environ.get('S3_MULTIPART_CHUNK_MB', '8'))
+S3_UPLOAD_RETRIES = int(os.environ.get('S3_UPLOAD_RETRIES', '3'))
+S3_DELETE_BATCH_SIZE = 1000  # delete_objects limit
+S3_CONFIG_CHECK_SECONDS = float(os.environ.get('S3_CONFIG_CHECK_SECONDS', '15'))  # how often to re-read the version stamp
+
+# Settings that require a new boto3 client when they change; anything else
+# (bucket, folders, size limit) is picked up by swapping the config only
+CLIENT_CONFIG_FIELDS = ('aws_access_key_id', 'aws_secret_access_key', 'aws_region', 'endpoint_url')
+
+# Error codes worth retrying; anything else (auth, bad request, size limit) fails fast
+RETRYABLE_ERROR_CODES = {
+    'SlowDown', 'Throttling', 'ThrottlingException', 'RequestTimeout', 'RequestTimeTooSkewed',
+    'InternalError', 'ServiceUnavailable', '500', '502', '503', '504'
+}
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES
+    return isinstance(error, (BotoCoreError, ConnectionError, TimeoutError))
+
+
 class S3Service:
     def __init__(self):
         self.s3_client = None
         self.config = None
+        self.config_version = None
+        self._client_fingerprint = None
+        self._last_version_check = 0.0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._metrics = {
+            'client_builds': 0,
+            'client_reuses': 0,
+            'version_checks': 0,
+            'transfers': 0,
+            'transfer_errors': 0,
+            'in_flight': 0,
+            'peak_in_flight': 0
+        }
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+            multipart_chunksize=S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+            max_concurrency=4,
+            use_threads=True
+        )
     
     def initialize(self, config: dict):
-        """Initialize S3 client with configuration"""
-        self.config = config
-        
-        if not config or not config.get('is_enabled'):
-            print("S3 initialization failed: Config not provided or not enabled")
-            self.s3_client = None
-            return False
-        
-        # Validate credentials
-        access_key = config.get('aws_access_key_id')
-        secret_key = config.get('aws_secret_access_key')
+        """
+        Initialize S3 client with configuration.
+        The existing client (and its connection pool) is kept when the
+        credentials, region and endpoint are unchanged.
+        """
+        with self._lock:
+            self.config = config
+            self.config_version = (config or {}).get('config_version', 0)
+            
+            if not config or not config.get('is_enabled'):
+                print("S3 initialization failed: Config not provided or not enabled")
+                self.s3_client = None
+                self._client_fingerprint = None
+                return False
+            
+            # Validate credentials
+            access_key = config.get('aws_access_key_id')
+            secret_key = config.get('aws_secret_access_key')
+            
+            if not access_key or not secret_key:
+                print(f"S3 initialization failed: Missing credentials (access_key: {bool(access_key)}, secret_key: {bool(secret_key)})")
+                self.s3_client = None
+                self._client_fingerprint = None
+                return False
+            
+            fingerprint = tuple(config.get(field) for field in CLIENT_CONFIG_FIELDS)
+            if self.s3_client is not None and fingerprint == self._client_fingerprint:
+                self._metrics['client_reuses'] += 1
+                return True
+            
+            try:
+                self.s3_client = boto3.client(
+                    's3',
+                    aws_access_key_id=access_key,
+                    aws_secret_access_key=secret_key,
+                    region_name=config.get('aws_region', 'us-east-1'),
+                    # Optional S3-compatible endpoint (MinIO, moto server) for local testing
+                    endpoint_url=config.get('endpoint_url') or None,
+                    config=Config(
+                        # Enough pooled connections for every transfer thread plus multipart parts
+                        max_pool_connections=S3_MAX_CONCURRENCY * 2,
+                        retries={'max_attempts': 3, 'mode': 'adaptive'},
+                        connect_timeout=10,
+                        read_timeout=60,
+                        tcp_keepalive=True
+                    )
+                )
+                self._client_fingerprint = fingerprint
+                self._metrics['client_builds'] += 1
+                print(f"✅ S3 client initialized successfully for region: {config.get('aws_region', 'us-east-1')} (config v{self.config_version})")
+                return True
+            except Exception as e:
+                print(f"❌ Failed to initialize S3 client: {e}")
+                self.s3_client = None
+                self._client_fingerprint = None
+                return False
+    
+    def ensure_current(self, db) -> bool:
+        """
+        Make sure the client matches the stored aws-config and return is_enabled().
+        Only the config_version stamp is read (at most every S3_CONFIG_CHECK_SECONDS);
+        the full config is loaded and the client rebuilt only when the stamp moves,
+        so per-request callers no longer pay a config read plus client construction.
+        """
+        now = time.monotonic()
+        if self.config is not None and now - self._last_version_check < S3_CONFIG_CHECK_SECONDS:
+            return bool(self.is_enabled())
+        self._last_version_check = now
+        self._metrics['version_checks'] += 1
         
-        if not access_key or not secret_key:
-            print(f"S3 initialization failed: Missing credentials (access_key: {bool(access_key)}, secret_key: {bool(secret_key)})")
-            self.s3_client = None
-            return False
+        stamp = db['system_settings'].find_one({"type": "aws_config"}, {"_id": 0, "config_version": 1})
+        if stamp is None:
+            return bool(self.is_enabled())
+        if self.config is not None and stamp.get('config_version', 0) == self.config_version:
+            return bool(self.is_enabled())
         
+        config = db['system_settings'].find_one({"type": "aws_config"}, {"_id": 0})
+        return bool(self.initialize(config))
+    
+    def get_metrics(self) -> dict:
+        """Client registry and connection pool statistics"""
+        metrics = {
+            **self._metrics,
+            'enabled': bool(self.is_enabled()),
+            'config_version': self.config_version,
+            'max_pool_connections': S3_MAX_CONCURRENCY * 2,
+            'max_concurrency': S3_MAX_CONCURRENCY,
+            'pools': []
+        }
         try:
-            self.s3_client = boto3.client(
-                's3',
-                aws_access_key_id=access_key,
-                aws_secret_access_key=secret_key,
-                region_name=config.get('aws_region', 'us-east-1')
-            )
-            print(f"✅ S3 client initialized successfully for region: {config.get('aws_region', 'us-east-1')}")
-            return True
-        except Exception as e:
-            print(f"❌ Failed to initialize S3 client: {e}")
-            self.s3_client = None
-            return False
+            # botocore keeps a urllib3 PoolManager per client; this is best-effort introspection
+            manager = self.s3_client._endpoint.http_session._manager
+            for key in list(manager.pools.keys()):
+                pool = manager.pools.get(key)
+                if pool is None:
+                    continue
+                metrics['pools'].append({
+                    'host': pool.host,
+                    'connections_opened': pool.num_connections,
+                    'requests': pool.num_requests,
+                    'idle_connections': pool.pool.qsize() if pool.pool else 0
+                })
+        except Exception:
+            pass
+        return metrics
+    
+    def _begin_transfer(self):
+        with self._lock:
+            self._metrics['transfers'] += 1
+            self._metrics['in_flight'] += 1
+            self._metrics['peak_in_flight'] = max(self._metrics['peak_in_flight'], self._metrics['in_flight'])
+    
+    def _end_transfer(self, failed: bool = False):
+        with self._lock:
+            self._metrics['in_flight'] -= 1
+            if failed:
+                self._metrics['transfer_errors'] += 1
     
     def is_enabled(self) -> bool:
         """Check if S3 is enabled and configured"""
         return self.s3_client is not None and self.config and self.config.get('is_enabled')
     
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Bounded pool used to run blocking boto3 calls off the event loop"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=S3_MAX_CONCURRENCY, thread_name_prefix='s3-transfer')
+        return self._executor
+    
+    def build_url(self, s3_key: str) -> str:
+        """Public URL for an object key"""
+        bucket_name = self.config.get('s3_bucket_name')
+        endpoint_url = self.config.get('endpoint_url')
+        if endpoint_url:
+            return f"{endpoint_url.rstrip('/')}/{bucket_name}/{s3_key}"
+        
+        region = self.config.get('aws_region', 'us-east-1')
+        if region == 'us-east-1':
+            return f"https://{bucket_name}.s3.amazonaws.com/{s3_key}"
+        return f"https://{bucket_name}.s3.{region}.amazonaws.com/{s3_key}"
+    
+    def key_from_url(self, file_url: str) -> Optional[str]:
+        """Extract the object key from a URL produced by build_url()"""
+        bucket_name = self.config.get('s3_bucket_name')
+        region = self.config.get('aws_region', 'us-east-1')
+        endpoint_url = self.config.get('endpoint_url')
+        
+        prefixes = [
+            f"{bucket_name}.s3.amazonaws.com/",  # https://bucket.s3.amazonaws.com/key
+            f"{bucket_name}.s3.{region}.amazonaws.com/",  # https://bucket.s3.region.amazonaws.com/key
+        ]
+        if endpoint_url:
+            prefixes.append(f"{endpoint_url.rstrip('/')}/{bucket_name}/")
+        
+        for prefix in prefixes:
+            if prefix in file_url:
+                parts = file_url.split(prefix, 1)
+                if len(parts) > 1 and parts[1]:
+                    return parts[1]
+        return None
+    
+    def _put_object(self, file_content: bytes, s3_key: str, content_type: str = None) -> str:
+        """Upload bytes, switching to multipart above the threshold. Raises on failure."""
+        bucket_name = self.config.get('s3_bucket_name')
+        
+        # Check file size limit
+        if len(file_content) > self.max_file_size_bytes():
+            raise ValueError(f"File size exceeds maximum allowed size of {self.config.get('max_file_size_mb')}MB")
+        
+        # Detect content type if not provided
+        if not content_type:
+            content_type, _ = mimetypes.guess_type(s3_key)
+            content_type = content_type or 'application/octet-stream'
+        
+        # Note: ACL is not used as most buckets have Block Public Access enabled
+        # Public access should be configured at the bucket level
+        if len(file_content) >= self.transfer_config.multipart_threshold:
+            self.s3_client.upload_fileobj(
+                io.BytesIO(file_content),
+                bucket_name,
+                s3_key,
+                ExtraArgs={'ContentType': content_type},
+                Config=self.transfer_config
+            )
+        else:
+            self.s3_client.put_object(
+                Bucket=bucket_name,
+                Key=s3_key,
+                Body=file_content,
+                ContentType=content_type
+            )
+        
+        return self.build_url(s3_key)
+    
     def upload_file(self, file_content: bytes, filename: str, content_type: str = None) -> Optional[str]:
         """
         Upload file to S3 and return the URL
@@ -59,47 +270,105 @@ class S3Service:
             return None
         
         try:
-            bucket_name = self.config.get('s3_bucket_name')
-            
             # Use filename as-is - it already contains the full path
             # (e.g., "articles/2025/12/05/1.png" or "galleries/2025/12/05/1.png")
-            s3_key = filename
-            
-            # Check file size limit
-            max_size = self.config.get('max_file_size_mb', 10) * 1024 * 1024  # Convert to bytes
-            if len(file_content) > max_size:
-                raise ValueError(f"File size exceeds maximum allowed size of {self.config.get('max_file_size_mb')}MB")
-            
-            # Detect content type if not provided
-            if not content_type:
-                content_type, _ = mimetypes.guess_type(filename)
-                content_type = content_type or 'application/octet-stream'
-            
-            # Upload to S3
-            # Note: ACL is not used as most buckets have Block Public Access enabled
-            # Public access should be configured at the bucket level
-            self.s3_client.put_object(
-                Bucket=bucket_name,
-                Key=s3_key,
-                Body=file_content,
-                ContentType=content_type
-            )
-            
-            # Construct and return URL
-            region = self.config.get('aws_region', 'us-east-1')
-            if region == 'us-east-1':
-                url = f"https://{bucket_name}.s3.amazonaws.com/{s3_key}"
-            else:
-                url = f"https://{bucket_name}.s3.{region}.amazonaws.com/{s3_key}"
-            
-            return url
-            
+            return self._put_object(file_content, filename, content_type)
         except Exception as e:
             import traceback
             print(f"S3 upload failed: {e}")
             print(f"Traceback: {traceback.format_exc()}")
             return None
     
+    def _put_path(self, path: str, s3_key: str, content_type: str = None) -> str:
+        """Upload a file on disk; boto3 reads it in chunks (multipart above the threshold). Raises on failure."""
+        if not content_type:
+            content_type, _ = mimetypes.guess_type(s3_key)
+            content_type = content_type or 'application/octet-stream'
+        self.s3_client.upload_file(
+            path,
+            self.config.get('s3_bucket_name'),
+            s3_key,
+            ExtraArgs={'ContentType': content_type},
+            Config=self.transfer_config
+        )
+        return self.build_url(s3_key)
+    
+    def max_file_size_bytes(self) -> int:
+        """Configured upload size limit"""
+        return int((self.config or {}).get('max_file_size_mb') or 10) * 1024 * 1024
+    
+    async def _transfer_with_retries(self, func, args: tuple, label: str, retries: int) -> Optional[str]:
+        """
+        Run a blocking transfer on the bounded pool, retrying throttling /
+        transient errors with jittered exponential backoff. Returns None on failure.
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(retries + 1):
+            self._begin_transfer()
+            try:
+                url = await loop.run_in_executor(self._get_executor(), func, *args)
+                self._end_transfer()
+                return url
+            except Exception as e:
+                self._end_transfer(failed=True)
+                if attempt >= retries or not _is_retryable(e):
+                    print(f"S3 upload failed for {label} after {attempt + 1} attempt(s): {e}")
+                    return None
+                delay = (0.5 * 2 ** attempt) + random.uniform(0, 0.5)
+                print(f"S3 upload retry {attempt + 1}/{retries} for {label} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+        return None
+    
+    async def upload_file_async(
+        self,
+        file_content: bytes,
+        filename: str,
+        content_type: str = None,
+        retries: int = S3_UPLOAD_RETRIES
+    ) -> Optional[str]:
+        """upload_file() for async code: runs on the bounded transfer pool with retries"""
+        if not self.is_enabled():
+            return None
+        return await self._transfer_with_retries(
+            self._put_object, (file_content, filename, content_type), filename, retries
+        )
+    
+    async def upload_path_async(
+        self,
+        path: str,
+        filename: str,
+        content_type: str = None,
+        retries: int = S3_UPLOAD_RETRIES
+    ) -> Optional[str]:
+        """Stream a file from disk to S3 without reading it into memory"""
+        if not self.is_enabled():
+            return None
+        return await self._transfer_with_retries(
+            self._put_path, (path, filename, content_type), filename, retries
+        )
+    
+    async def upload_many(self, items: List[Dict], retries: int = S3_UPLOAD_RETRIES) -> List[Optional[str]]:
+        """
+        Upload a batch in parallel (bounded by S3_MAX_CONCURRENCY).
+        Each item is {"content": bytes, "key": str, "content_type": str}; results keep item order,
+        with None for items that failed after retries.
+        """
+        return await asyncio.gather(*(
+            self.upload_file_async(item['content'], item['key'], item.get('content_type'), retries)
+            for item in items
+        ))
+    
+    async def run_in_pool(self, func, *args):
+        """Run any blocking S3 call on the bounded transfer pool"""
+        self._begin_transfer()
+        failed = True
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+            failed = False
+            return result
+        finally:
+            self._end_transfer(failed)
+    
     def delete_file(self, file_url: str) -> bool:
         """Delete file from S3 given its URL"""
         if not self.is_enabled():
@@ -107,21 +376,9 @@ class S3Service:
         
         try:
             bucket_name = self.config.get('s3_bucket_name')
-            region = self.config.get('aws_region', 'us-east-1')
             
             # Extract S3 key from URL
-            s3_key = None
-            
-            # Try standard URL format: https://bucket.s3.amazonaws.com/key
-            if f"{bucket_name}.s3.amazonaws.com/" in file_url:
-                parts = file_url.split(f"{bucket_name}.s3.amazonaws.com/")
-                if len(parts) > 1:
-                    s3_key = parts[1]
-            # Try regional URL format: https://bucket.s3.region.amazonaws.com/key
-            elif f"{bucket_name}.s3.{region}.amazonaws.com/" in file_url:
-                parts = file_url.split(f"{bucket_name}.s3.{region}.amazonaws.com/")
-                if len(parts) > 1:
-                    s3_key = parts[1]
+            s3_key = self.key_from_url(file_url)
             
             if s3_key:
                 self.s3_client.delete_object(
@@ -141,6 +398,129 @@ class S3Service:
         
         return False
     
+    def delete_objects(self, keys: List[str]) -> int:
+        """Delete many keys using delete_objects in batches of 1000. Returns the number deleted."""
+        if not self.is_enabled() or not keys:
+            return 0
+        
+        bucket_name = self.config.get('s3_bucket_name')
+        deleted = 0
+        for i in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+            batch = keys[i:i + S3_DELETE_BATCH_SIZE]
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=bucket_name,
+                    Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+                )
+                errors = response.get('Errors', [])
+                for error in errors:
+                    print(f"S3 batch delete failed for {error.get('Key')}: {error.get('Message')}")
+                deleted += len(batch) - len(errors)
+            except Exception as e:
+                print(f"S3 batch delete failed: {e}")
+        return deleted
+    
+    def delete_files(self, file_urls: List[str]) -> int:
+        """Batch version of delete_file()"""
+        if not self.is_enabled():
+            return 0
+        keys = []
+        for url in file_urls:
+            key = self.key_from_url(url)
+            if key:
+                keys.append(key)
+            else:
+                print(f"Failed to extract S3 key from URL: {url}")
+        return self.delete_objects(keys)
+    
+    def presign_post(self, s3_key: str, content_type: str, max_bytes: int, expires_in: int = 900) -> Optional[dict]:
+        """
+        Presigned POST for a browser upload of exactly one key.
+        The policy pins the key and Content-Type and caps the size.
+        """
+        if not self.is_enabled():
+            return None
+        try:
+            return self.s3_client.generate_presigned_post(
+                Bucket=self.config.get('s3_bucket_name'),
+                Key=s3_key,
+                Fields={'Content-Type': content_type},
+                Conditions=[
+                    {'Content-Type': content_type},
+                    ['content-length-range', 1, max_bytes]
+                ],
+                ExpiresIn=expires_in
+            )
+        except Exception as e:
+            print(f"S3 presign POST failed for {s3_key}: {e}")
+            return None
+    
+    def start_presigned_multipart(self, s3_key: str, content_type: str, size: int, expires_in: int = 3600) -> Optional[dict]:
+        """Create a multipart upload and presign a PUT URL for every part"""
+        if not self.is_enabled():
+            return None
+        bucket_name = self.config.get('s3_bucket_name')
+        part_size = self.transfer_config.multipart_chunksize
+        try:
+            upload = self.s3_client.create_multipart_upload(Bucket=bucket_name, Key=s3_key, ContentType=content_type)
+            upload_id = upload['UploadId']
+            part_count = max(1, -(-size // part_size))
+            parts = [
+                {
+                    'part_number': number,
+                    'url': self.s3_client.generate_presigned_url(
+                        'upload_part',
+                        Params={'Bucket': bucket_name, 'Key': s3_key, 'UploadId': upload_id, 'PartNumber': number},
+                        ExpiresIn=expires_in
+                    )
+                }
+                for number in range(1, part_count + 1)
+            ]
+            return {'upload_id': upload_id, 'part_size': part_size, 'parts': parts}
+        except Exception as e:
+            print(f"S3 multipart presign failed for {s3_key}: {e}")
+            return None
+    
+    def complete_multipart(self, s3_key: str, upload_id: str, parts: List[Dict]) -> bool:
+        """Finish a browser multipart upload; parts are {'part_number', 'etag'}"""
+        if not self.is_enabled():
+            return False
+        try:
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.config.get('s3_bucket_name'),
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': [
+                    {'PartNumber': int(part['part_number']), 'ETag': part['etag']}
+                    for part in sorted(parts, key=lambda p: int(p['part_number']))
+                ]}
+            )
+            return True
+        except Exception as e:
+            print(f"S3 complete multipart failed for {s3_key}: {e}")
+            return False
+    
+    def abort_multipart(self, s3_key: str, upload_id: str) -> bool:
+        if not self.is_enabled():
+            return False
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.config.get('s3_bucket_name'), Key=s3_key, UploadId=upload_id
+            )
+            return True
+        except Exception as e:
+            print(f"S3 abort multipart failed for {s3_key}: {e}")
+            return False
+    
+    def head_object(self, s3_key: str) -> Optional[dict]:
+        """Object metadata, or None if it does not exist"""
+        if not self.is_enabled():
+            return None
+        try:
+            return self.s3_client.head_object(Bucket=self.config.get('s3_bucket_name'), Key=s3_key)
+        except ClientError:
+            return None
+    
     def list_objects(self, prefix: str = "") -> list:
         """List objects in S3 bucket with given prefix"""
         if not self.is_enabled():
@@ -148,12 +528,12 @@ class S3Service:
         
         try:
             bucket_name = self.config.get('s3_bucket_name')
-            response = self.s3_client.list_objects_v2(
-                Bucket=bucket_name,
-                Prefix=prefix
-            )
-            
-            return response.get('Contents', [])
+            # Paginate: a single list_objects_v2 call stops at 1000 keys
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            objects = []
+            for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+                objects.extend(page.get('Contents', []))
+            return objects
         except Exception as e:
             print(f"S3 list objects failed: {e}")
             return []
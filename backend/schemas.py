@@ -219,6 +219,7 @@ class ArticleResponse(ArticleBase):
     updated_at: datetime
     published_at: Optional[datetime] = None
     gallery: Optional[dict] = None  # Add gallery field for formatted response
+    image_variants: Optional[dict] = None  # Responsive image srcset manifest
 
     class Config:
         from_attributes = True
@@ -389,6 +390,7 @@ class ArticleListResponse(BaseModel):
     short_title: Optional[str] = None
     summary: str
     image_url: Optional[str] = None
+    image_variants: Optional[dict] = None  # Responsive image srcset manifest
     youtube_url: Optional[str] = None  # Add youtube_url field
     author: Optional[str] = None
     language: str
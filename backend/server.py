@@ -8,13 +8,12 @@ from pathlib import Path
 from datetime import datetime, date, timezone
 import os
 import uuid
-import aiofiles
 # Rate limiting completely disabled for better user experience
 # All rate limiting functionality removed
 
 from database import get_db, db
 import schemas, crud
-from models.mongodb_collections import create_indexes, GALLERIES
+from models.mongodb_collections import create_indexes, create_query_indexes, GALLERIES
 from routes.auth_routes import router as auth_router
 from routes.system_settings_routes import router as system_settings_router
 from routes.ai_agents_routes import router as ai_agents_router
@@ -24,6 +23,7 @@ from routes.comments_routes import router as comments_router
 from routes.ott_platforms_routes import router as ott_platforms_router
 from routes.gallery_entities_routes import router as gallery_entities_router
 from routes.gallery_image_routes import router as gallery_image_router
+from routes.direct_upload_routes import router as direct_upload_router
 from routes.ad_settings_routes import router as ad_settings_router
 from routes.artists_routes import router as artists_router
 from routes.youtube_channels_routes import router as youtube_channels_router
@@ -35,6 +35,9 @@ from routes.cricket_schedules_routes import router as cricket_schedules_router
 from auth import create_default_admin
 from scheduler_service import article_scheduler
 from s3_service import s3_service
+from services.image_variant_service import image_variant_service
+from services.llm_gateway_service import llm_gateway_service
+from services.media_asset_service import media_asset_service, content_addressed_key, stage_upload, UploadRejected
 from datetime import datetime
 from pytz import timezone as pytz_timezone
 import os
@@ -117,6 +120,12 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"⚠️ S3 initialization failed: {e}. Using local storage.")
         
+        logger.info("Step 2b: Ensuring query indexes...")
+        try:
+            create_query_indexes(db)
+        except Exception as e:
+            logger.warning(f"⚠️ Query index creation failed: {e}")
+        
         logger.info("Step 3: Initializing OTT platforms...")
         # DISABLED: Using remote database as-is without initializing OTT platforms
         # try:
@@ -142,6 +151,20 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning(f"⚠️ YouTube RSS scheduler initialization failed: {e}")
         
+        logger.info("Step 6: Starting agent job workers...")
+        try:
+            from services.agent_job_service import agent_job_service
+            agent_job_service.start()
+        except Exception as e:
+            logger.warning(f"⚠️ Agent job workers failed to start: {e}")
+        
+        logger.info("Step 7: Starting recurring agent scheduler...")
+        try:
+            from services.agent_schedule_service import agent_schedule_service
+            agent_schedule_service.start()
+        except Exception as e:
+            logger.warning(f"⚠️ Recurring agent scheduler failed to start: {e}")
+        
         logger.info("""
         ========================================
         ✅ STARTUP COMPLETE - SERVER READY
@@ -173,6 +196,19 @@ async def lifespan(app: FastAPI):
         logger.info("✅ YouTube RSS scheduler stopped")
     except Exception as e:
         logger.warning(f"⚠️ YouTube RSS scheduler shutdown warning: {e}")
+    
+    from services.agent_schedule_service import agent_schedule_service
+    agent_schedule_service.stop()
+    from services.agent_job_service import agent_job_service
+    await agent_job_service.stop()
+    image_variant_service.shutdown()
+    await llm_gateway_service.aclose()
+    from services.reference_fetcher_service import reference_fetcher_service
+    reference_fetcher_service.shutdown()
+    from services.html_parser_service import html_parser_service
+    html_parser_service.shutdown()
+    from services.http_client_service import http_client_service
+    await http_client_service.aclose()
 
 # Create the main app without any rate limiting
 app = FastAPI(title="Blog CMS API", version="1.0.0", lifespan=lifespan)
@@ -2178,7 +2214,7 @@ async def update_cms_article(
                 reasons.append('Missing poster image')
             update_data['action_needed_reasons'] = reasons
     
-    updated_article = crud.update_article_cms(db, article_id, update_data)
+    updated_article = crud.update_article_cms(db, article_id, update_data, s3_service)
     return updated_article
 
 
@@ -2242,7 +2278,7 @@ async def patch_cms_article(
         elif update_data['is_published'] == False:
             update_data['status'] = 'draft'
     
-    updated_article = crud.update_article_cms(db, article_id, update_data)
+    updated_article = crud.update_article_cms(db, article_id, update_data, s3_service)
     return updated_article
 
 
@@ -2610,6 +2646,18 @@ async def update_state_language_mapping(mapping: dict, db = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 # File upload helper functions
+def get_image_root_folder(content_type: str = "articles") -> str:
+    """Root storage folder for a content type, honouring the S3 folder settings"""
+    if s3_service.is_enabled() and s3_service.config:
+        if content_type == "articles":
+            return s3_service.config.get('articles_root_folder', 'articles')
+        elif content_type == "galleries":
+            return s3_service.config.get('galleries_root_folder', 'galleries')
+        elif content_type == "tadka-pics":
+            return s3_service.config.get('tadka_pics_root_folder', 'tadka-pics')
+    # For local storage (and other content types), use content type directly
+    return content_type
+
 def get_next_image_filename(date: datetime = None, content_type: str = "articles") -> tuple:
     """
     Get a unique filename for the given date (EST timezone)
@@ -2629,19 +2677,7 @@ def get_next_image_filename(date: datetime = None, content_type: str = "articles
     day = date.strftime("%d")
     
     # Get root folder from S3 config based on content type
-    root_folder = ""
-    if s3_service.is_enabled() and s3_service.config:
-        if content_type == "articles":
-            root_folder = s3_service.config.get('articles_root_folder', 'articles')
-        elif content_type == "galleries":
-            root_folder = s3_service.config.get('galleries_root_folder', 'galleries')
-        elif content_type == "tadka-pics":
-            root_folder = s3_service.config.get('tadka_pics_root_folder', 'tadka-pics')
-        else:
-            root_folder = content_type
-    else:
-        # For local storage, use content type directly
-        root_folder = content_type
+    root_folder = get_image_root_folder(content_type)
     
     # For S3: Use root_folder/date path
     s3_date_path = f"{root_folder}/{year}/{month}/{day}"
@@ -2663,7 +2699,8 @@ def get_next_image_filename(date: datetime = None, content_type: str = "articles
 
 async def save_uploaded_file(upload_file: UploadFile, subfolder: str = None, content_type: str = "articles") -> str:
     """
-    Save uploaded file using date-based structure: images/YYYY/MM/DD/N.ext
+    Save uploaded file under a content-addressed key: content_type/ab/<sha256>.ext
+    Identical files are stored once and shared through the media_assets index
     Uses S3 (if enabled) or local storage (fallback)
     Returns the URL or path to the uploaded file
     """
@@ -2673,37 +2710,31 @@ async def save_uploaded_file(upload_file: UploadFile, subfolder: str = None, con
     # Get file extension
     file_extension = os.path.splitext(upload_file.filename)[1] or '.jpg'
     
-    # Get next filename using date-based structure with content type
-    date_path, next_num = get_next_image_filename(content_type=content_type)
-    filename_with_path = f"{date_path}/{next_num}{file_extension}"
-    
-    # Read file content
-    content = await upload_file.read()
-    
-    # Try S3 upload if enabled
-    if s3_service.is_enabled():
-        s3_url = s3_service.upload_file(
-            file_content=content,
-            filename=filename_with_path,
-            content_type=upload_file.content_type
-        )
-        
-        if s3_url:
-            logger.info(f"File uploaded to S3: {s3_url}")
-            return s3_url
-        else:
-            logger.warning("S3 upload failed, falling back to local storage")
+    # Stream to a temp file in chunks, hashing and size-checking as it arrives
+    try:
+        staged = await stage_upload(upload_file, s3_service.max_file_size_bytes())
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     
-    # Fallback to local storage
-    local_path = UPLOAD_DIR / date_path
-    local_path.mkdir(parents=True, exist_ok=True)
+    try:
+        filename_with_path = content_addressed_key(get_image_root_folder(content_type), staged.content_hash, file_extension)
+        asset = await media_asset_service.ingest_staged(staged, filename_with_path, local_fallback=True)
+    except Exception:
+        staged.cleanup()
+        raise
+    if not asset:
+        staged.cleanup()
+        raise HTTPException(status_code=500, detail="Failed to store uploaded file")
     
-    file_path = local_path / f"{next_num}{file_extension}"
-    async with aiofiles.open(file_path, 'wb') as f:
-        await f.write(content)
+    if asset["deduplicated"]:
+        logger.info(f"File already stored, reusing: {asset['url']}")
+        staged.cleanup()
+    else:
+        logger.info(f"File stored: {asset['url']}")
+        # The variant worker reads the staged file; it is removed once the task is done
+        staged.cleanup_after(image_variant_service.schedule(staged.path, asset["key"], asset["url"], staged.content_type))
     
-    # Return relative path for storage in database
-    return f"/uploads/{date_path}/{next_num}{file_extension}"
+    return asset["url"]
 
 # Theater Release endpoints
 @api_router.get("/cms/theater-releases", response_model=List[schemas.TheaterReleaseResponse])
@@ -3337,6 +3368,7 @@ app.include_router(comments_router)  # Add comments routes
 app.include_router(ott_platforms_router)  # Add OTT platforms routes
 app.include_router(gallery_entities_router)  # Add gallery entities routes
 app.include_router(gallery_image_router)  # Add gallery image routes
+app.include_router(direct_upload_router)  # Add presigned direct-to-S3 upload routes
 app.include_router(ad_settings_router, prefix="/api")  # Add ad settings routes
 app.include_router(artists_router, prefix="/api")  # Add artists routes
 app.include_router(ai_agents_router, prefix="/api")  # Add AI agents routes
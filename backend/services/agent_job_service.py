@@ -0,0 +1,433 @@
+"""
+Agent Job Service
+Persistent queue for agent runs in agent_jobs. The API only enqueues; workers
+claim jobs with find_one_and_update and hold a lease they renew by heartbeat.
+A job whose worker dies is picked up again once its lease expires. The lease
+is renewed from a thread, not the event loop: in-process workers run agents
+on the API loop, and agents still do blocking pymongo, PIL and trafilatura
+work that can stall it for longer than AGENT_JOB_LEASE_SECONDS. Each agent
+can have only one queued or running job, enforced by a unique index across
+all processes. Raised errors are retried with backoff; a result that reports
+failure is final unless the agent marks it {"retryable": True}.
+
+Workers run inside the API process (AGENT_WORKERS, 0 to disable) or as a
+separate process that can be scaled horizontally:
+
+    cd backend && python -m services.agent_job_service [workers]
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+import crud
+from database import db
+from models.mongodb_collections import AGENT_JOBS
+
+AGENT_WORKERS = int(os.environ.get("AGENT_WORKERS", "2"))
+AGENT_JOB_LEASE_SECONDS = int(os.environ.get("AGENT_JOB_LEASE_SECONDS", "60"))
+AGENT_JOB_HEARTBEAT_SECONDS = int(os.environ.get("AGENT_JOB_HEARTBEAT_SECONDS", "10"))
+AGENT_JOB_MAX_ATTEMPTS = int(os.environ.get("AGENT_JOB_MAX_ATTEMPTS", "2"))
+AGENT_JOB_POLL_SECONDS = float(os.environ.get("AGENT_JOB_POLL_SECONDS", "2"))
+RETRY_DELAY_SECONDS = 60  # doubled per attempt
+PROGRESS_HISTORY = 50  # stage records kept per job
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+# Job being executed by the current task, for report_progress()
+_current_job_id = contextvars.ContextVar("agent_job_id", default=None)
+
+
+class AgentAlreadyQueuedError(Exception):
+    """The agent already has a queued or running job"""
+
+    def __init__(self, job: Optional[Dict]):
+        super().__init__("Agent is already running")
+        self.job = job
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def report_progress(stage: str, message: str = None, items_done: int = None, items_total: int = None):
+    """
+    Record the stage of the job running in this task (no-op outside a job).
+    Called from agents, e.g. report_progress("generating", "Writing article 3/10", 2, 10).
+    """
+    job_id = _current_job_id.get()
+    if not job_id:
+        return
+    now = _now()
+    fields = {"stage": stage, "stage_message": message, "updated_at": now}
+    if items_done is not None:
+        fields["items_done"] = items_done
+    if items_total is not None:
+        fields["items_total"] = items_total
+    try:
+        db[AGENT_JOBS].update_one(
+            {"id": job_id},
+            {
+                "$set": fields,
+                "$push": {"progress": {"$each": [{"stage": stage, "message": message, "at": now}],
+                                       "$slice": -PROGRESS_HISTORY}},
+            }
+        )
+    except Exception as e:
+        print(f"⚠️ Could not record progress for job {job_id}: {e}")
+
+
+def result_error(result: Any) -> Optional[str]:
+    """Error of an agent result that reports failure ({'success': False} or status 'failed'), else None"""
+    if not isinstance(result, dict):
+        return None
+    if result.get("success") is False or result.get("status") == "failed":
+        return str(result.get("error") or result.get("message") or "Agent reported failure")
+    return None
+
+
+async def run_agent(agent_id: str) -> Dict:
+    """Run an agent with the service for its type and return that service's result"""
+    agent = crud.get_ai_agent(db, agent_id)
+    if not agent:
+        raise ValueError("Agent not found")
+    agent_type = agent.get('agent_type', 'post')
+
+    if agent_type == 'photo_gallery':
+        from services.gallery_agent_service import gallery_agent_runner
+        return await gallery_agent_runner.run_gallery_agent(agent_id)
+    if agent_type == 'tadka_pics':
+        from services.tadka_pics_agent_service import tadka_pics_agent_runner
+        return await tadka_pics_agent_runner.run_tadka_pics_agent(agent_id)
+    if agent_type == 'video':
+        from services.video_agent_service import video_agent_runner
+        return await video_agent_runner.run_video_agent(agent_id)
+    if agent_type == 'tv_video':
+        from services.tv_video_agent_service import tv_video_agent_service
+        return await tv_video_agent_service.run_tv_video_agent(agent_id)
+    if agent_type == 'reality_show':
+        from services.reality_show_agent_service import reality_show_agent_service
+        return await reality_show_agent_service.run_reality_show_agent(agent_id)
+    if agent_type == 'ott_release':
+        from services.ott_release_agent_service import ott_release_agent_service
+        return await ott_release_agent_service.run_ott_release_agent(agent_id)
+    if agent_type == 'theater_release':
+        from services.theater_release_agent_service import theater_release_agent_service
+        return await theater_release_agent_service.run_theater_release_agent(agent_id)
+    if agent_type == 'movie_review':
+        from services.movie_review_agent_service import movie_review_agent_service
+        return await movie_review_agent_service.run_movie_review_agent(agent_id)
+    if agent_type == 'ott_review':
+        from services.ott_review_agent_service import ott_review_agent_service
+        return await ott_review_agent_service.run(agent, db)
+    if agent_type == 'cricket_schedules':
+        from services.cricket_schedules_agent_service import cricket_schedules_agent
+        return await cricket_schedules_agent.run_agent(agent_id)
+
+    # Post agents (default)
+    from services.agent_runner_service import agent_runner
+    return await agent_runner.run_agent(agent_id)
+
+
+class AgentJobService:
+    """Enqueue, claim, heartbeat, cancel and retry agent jobs"""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._workers: List[asyncio.Task] = []
+        self._stopping = False
+
+    # ---- Queue ----
+
+    def enqueue(self, agent: Dict, trigger: str = "manual", retry_of: str = None) -> Dict:
+        """Queue a run of an agent; raises AgentAlreadyQueuedError if one is queued or running"""
+        now = _now()
+        job = {
+            "id": str(uuid.uuid4()),
+            "agent_id": agent["id"],
+            "agent_name": agent.get("agent_name"),
+            "agent_type": agent.get("agent_type", "post"),
+            "trigger": trigger,
+            "retry_of": retry_of,
+            "status": "queued",
+            "active": True,
+            "attempts": 0,
+            "max_attempts": AGENT_JOB_MAX_ATTEMPTS,
+            "run_after": now,
+            "cancel_requested": False,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "stage": "queued",
+            "stage_message": None,
+            "progress": [],
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+        try:
+            db[AGENT_JOBS].insert_one(job)
+        except DuplicateKeyError:
+            raise AgentAlreadyQueuedError(self.get_active_job(agent["id"]))
+        job.pop("_id", None)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        return db[AGENT_JOBS].find_one({"id": job_id}, {"_id": 0})
+
+    def get_active_job(self, agent_id: str) -> Optional[Dict]:
+        return db[AGENT_JOBS].find_one({"agent_id": agent_id, "active": True}, {"_id": 0})
+
+    def get_latest_job(self, agent_id: str) -> Optional[Dict]:
+        return db[AGENT_JOBS].find_one({"agent_id": agent_id}, {"_id": 0}, sort=[("created_at", -1)])
+
+    def list_jobs(self, agent_id: str = None, status: str = None, limit: int = 50) -> List[Dict]:
+        query = {}
+        if agent_id:
+            query["agent_id"] = agent_id
+        if status:
+            query["status"] = status
+        return list(db[AGENT_JOBS].find(query, {"_id": 0, "progress": 0}).sort("created_at", -1).limit(limit))
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """Cancel a queued job now, or ask the worker of a running job to stop it"""
+        now = _now()
+        job = db[AGENT_JOBS].find_one_and_update(
+            {"id": job_id, "status": "queued"},
+            {"$set": {"status": "cancelled", "stage": "cancelled", "finished_at": now, "updated_at": now},
+             "$unset": {"active": ""}},
+            projection={"_id": 0}, return_document=ReturnDocument.AFTER
+        )
+        if job:
+            return job
+        return db[AGENT_JOBS].find_one_and_update(
+            {"id": job_id, "status": "running"},
+            {"$set": {"cancel_requested": True, "updated_at": now}},
+            projection={"_id": 0}, return_document=ReturnDocument.AFTER
+        ) or self.get_job(job_id)
+
+    def retry(self, job_id: str) -> Dict:
+        """Queue a new run for the agent of a failed or cancelled job"""
+        job = self.get_job(job_id)
+        if not job:
+            raise ValueError("Job not found")
+        if job["status"] not in ("failed", "cancelled"):
+            raise ValueError(f"Only failed or cancelled jobs can be retried (job is {job['status']})")
+        agent = crud.get_ai_agent(db, job["agent_id"])
+        if not agent:
+            raise ValueError("Agent not found")
+        return self.enqueue(agent, trigger="retry", retry_of=job_id)
+
+    def claim(self) -> Optional[Dict]:
+        """Take the oldest runnable job and lease it to this worker"""
+        now = _now()
+        return db[AGENT_JOBS].find_one_and_update(
+            {"status": "queued", "run_after": {"$lte": now}},
+            {
+                "$set": {
+                    "status": "running",
+                    "stage": "starting",
+                    "lease_owner": self.worker_id,
+                    "lease_expires_at": now + timedelta(seconds=AGENT_JOB_LEASE_SECONDS),
+                    "started_at": now,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_after", 1), ("created_at", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    def recover_expired(self) -> int:
+        """Requeue running jobs whose worker stopped heartbeating (or fail them if out of attempts)"""
+        now = _now()
+        expired = {"status": "running", "lease_expires_at": {"$lt": now}}
+        failed = db[AGENT_JOBS].update_many(
+            {**expired, "$expr": {"$gte": ["$attempts", "$max_attempts"]}},
+            {"$set": {"status": "failed", "stage": "failed", "error": "Worker stopped responding",
+                      "finished_at": now, "updated_at": now},
+             "$unset": {"active": ""}}
+        )
+        requeued = db[AGENT_JOBS].update_many(
+            expired,
+            {"$set": {"status": "queued", "stage": "queued", "stage_message": "Worker stopped responding, requeued",
+                      "lease_owner": None, "lease_expires_at": None, "run_after": now, "updated_at": now}}
+        )
+        if failed.modified_count or requeued.modified_count:
+            print(f"♻️ Agent jobs with expired leases: {requeued.modified_count} requeued, {failed.modified_count} failed")
+        return failed.modified_count + requeued.modified_count
+
+    def _finish(self, job: Dict, status: str, result: Any = None, error: str = None):
+        now = _now()
+        if result is not None:
+            result = json.loads(json.dumps(result, default=str))  # agent results may hold ObjectIds
+        db[AGENT_JOBS].update_one(
+            {"id": job["id"], "lease_owner": self.worker_id},
+            {"$set": {"status": status, "stage": status, "result": result, "error": error,
+                      "lease_owner": None, "lease_expires_at": None, "finished_at": now, "updated_at": now},
+             "$unset": {"active": ""}}
+        )
+
+    def _requeue(self, job: Dict, message: str, delay_seconds: float = 0, count_attempt: bool = True):
+        now = _now()
+        update = {"$set": {"status": "queued", "stage": "queued", "stage_message": message,
+                           "lease_owner": None, "lease_expires_at": None,
+                           "run_after": now + timedelta(seconds=delay_seconds), "updated_at": now}}
+        if not count_attempt:
+            update["$inc"] = {"attempts": -1}
+        db[AGENT_JOBS].update_one({"id": job["id"], "lease_owner": self.worker_id}, update)
+
+    # ---- Workers ----
+
+    def _heartbeat(self, job: Dict, run_task: asyncio.Task, loop: asyncio.AbstractEventLoop, stopped: threading.Event):
+        """
+        Renew the lease until `stopped` is set (runs in its own thread, so it keeps
+        going while the event loop is blocked); stop the run when cancellation is
+        requested or the lease is lost.
+        """
+        while not stopped.wait(AGENT_JOB_HEARTBEAT_SECONDS):
+            now = _now()
+            try:
+                current = db[AGENT_JOBS].find_one_and_update(
+                    {"id": job["id"], "lease_owner": self.worker_id, "status": "running"},
+                    {"$set": {"lease_expires_at": now + timedelta(seconds=AGENT_JOB_LEASE_SECONDS), "heartbeat_at": now}},
+                    projection={"cancel_requested": 1}
+                )
+            except Exception as e:
+                print(f"⚠️ Could not renew lease of agent job {job['id']}: {e}")
+                continue
+            if current is None or current.get("cancel_requested"):
+                print(f"🛑 Stopping agent job {job['id']} ({'cancelled' if current else 'lease lost'})")
+                loop.call_soon_threadsafe(run_task.cancel)
+                return
+
+    async def _execute(self, job: Dict):
+        print(f"▶️ Agent job {job['id']} for {job.get('agent_name') or job['agent_id']} (attempt {job['attempts']})")
+        token = _current_job_id.set(job["id"])
+        try:
+            run_task = asyncio.create_task(run_agent(job["agent_id"]))
+        finally:
+            _current_job_id.reset(token)
+        heartbeat_stopped = threading.Event()
+        threading.Thread(
+            target=self._heartbeat,
+            args=(job, run_task, asyncio.get_running_loop(), heartbeat_stopped),
+            name=f"agent-job-heartbeat-{job['id']}",
+            daemon=True
+        ).start()
+
+        try:
+            result = await asyncio.shield(run_task)
+        except asyncio.CancelledError:
+            if not run_task.done():
+                # The worker itself is stopping: hand the job to another worker
+                run_task.cancel()
+                await asyncio.wait({run_task})
+                self._requeue(job, "Worker shut down, requeued", count_attempt=False)
+                raise
+            current = self.get_job(job["id"]) or {}
+            if current.get("cancel_requested"):
+                self._finish(job, "cancelled", error="Cancelled by user")
+            else:
+                print(f"⚠️ Agent job {job['id']} lost its lease; another worker owns it now")
+            return
+        except ValueError as e:
+            # Configuration problems (missing agent, API keys): retrying will not help
+            self._finish(job, "failed", error=str(e))
+            return
+        except Exception as e:
+            self._fail(job, str(e))
+            return
+        finally:
+            heartbeat_stopped.set()
+
+        # Most agents catch their own errors and report them in the result. A run
+        # that reports failure may already have uploaded images or used items, so
+        # it is only run again when the agent marks the result as retryable
+        error = result_error(result)
+        if error:
+            if result.get("retryable"):
+                self._fail(job, error, result)
+            else:
+                self._finish(job, "failed", result=result, error=error)
+                print(f"⚠️ Agent job {job['id']} failed: {error}")
+            return
+        self._finish(job, "completed", result=result)
+        print(f"✅ Agent job {job['id']} completed")
+
+    def _fail(self, job: Dict, error: str, result: Any = None):
+        """Retry a failed run with backoff, or mark the job failed once out of attempts"""
+        if job["attempts"] < job["max_attempts"]:
+            delay = RETRY_DELAY_SECONDS * 2 ** (job["attempts"] - 1)
+            print(f"⚠️ Agent job {job['id']} failed ({error}), retrying in {delay}s")
+            self._requeue(job, f"Attempt {job['attempts']} failed: {error}", delay)
+        else:
+            self._finish(job, "failed", result=result, error=error)
+
+    async def _worker(self, number: int):
+        while not self._stopping:
+            try:
+                await asyncio.to_thread(self.recover_expired)
+                job = await asyncio.to_thread(self.claim)
+            except Exception as e:
+                print(f"⚠️ Agent worker {number} could not poll the queue: {e}")
+                job = None
+            if job is None:
+                await asyncio.sleep(AGENT_JOB_POLL_SECONDS)
+                continue
+            await self._execute(job)
+
+    def start(self, workers: int = None):
+        """Start worker tasks on the running event loop"""
+        workers = AGENT_WORKERS if workers is None else workers
+        self._stopping = False
+        loop = asyncio.get_running_loop()
+        self._workers = [loop.create_task(self._worker(number)) for number in range(workers)]
+        if workers:
+            print(f"✅ {workers} agent job worker(s) started ({self.worker_id})")
+
+    async def stop(self):
+        """Stop the workers; jobs they were running are requeued for other workers"""
+        self._stopping = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+# Singleton instance
+agent_job_service = AgentJobService()
+
+
+async def _serve(workers: int):
+    from s3_service import s3_service
+    from services.llm_gateway_service import llm_gateway_service
+
+    s3_service.ensure_current(db)
+    agent_job_service.start(workers)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await agent_job_service.stop()
+        await llm_gateway_service.aclose()
+
+
+if __name__ == "__main__":
+    import sys
+
+    try:
+        asyncio.run(_serve(int(sys.argv[1]) if len(sys.argv) > 1 else max(AGENT_WORKERS, 1)))
+    except KeyboardInterrupt:
+        pass
@@ -5,94 +5,65 @@ Handles execution of AI agents to generate content using OpenAI, Gemini, or Anth
 import os
 import re
 import uuid
-import httpx
 import asyncio
 from datetime import datetime
 from typing import Optional, Dict, Any
-from openai import OpenAI
 from database import db
 import crud
+from services.llm_gateway_service import llm_gateway_service, LLMError, LLMResponseFormatError
+from services.bulk_worker_pool import run_bounded, bulk_parallelism
+from services.reference_fetcher_service import reference_fetcher_service
+from services.http_client_service import http_client_service
+from services.agent_job_service import report_progress
+
+# Pipeline modes for post agents: five sequential LLM calls, or one structured call
+PIPELINE_MULTI_STEP = 'multi_step'
+PIPELINE_SINGLE_PASS = 'single_pass'
+
+# Structured answer of the single-pass pipeline (also valid for OpenAI strict JSON mode)
+SINGLE_PASS_ARTICLE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "content": {"type": "string"},
+        "summary": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["title", "content", "summary", "tags"],
+    "additionalProperties": False
+}
 
 
 class AgentRunnerService:
     """Service to run AI agents and generate content"""
     
     def __init__(self):
-        self.client = None
+        self.llm = None  # LLMTarget for text generation
         self.model = None
         self.provider = None  # 'openai', 'gemini', or 'anthropic'
     
     def _initialize_ai_client(self):
-        """Initialize the appropriate AI client based on selected model"""
+        """Resolve the text model and provider from the AI API keys in system settings"""
         ai_config = crud.get_ai_api_keys(db)
         if not ai_config:
             raise ValueError("AI API keys not configured. Please add them in System Settings > API Keys.")
         
-        # Get the selected model
-        self.model = ai_config.get('default_text_model') or 'gpt-4o'
-        self.image_model = ai_config.get('default_image_model') or 'dall-e-3'
         self.ai_config = ai_config
-        
-        # Determine provider based on model name
-        model_lower = self.model.lower()
-        
-        if 'gemini' in model_lower or 'imagen' in model_lower:
-            self.provider = 'gemini'
-            if not ai_config.get('gemini_api_key'):
-                raise ValueError("Gemini API key not configured. Please add it in System Settings > API Keys.")
-            import google.generativeai as genai
-            genai.configure(api_key=ai_config['gemini_api_key'])
-            self.client = genai.GenerativeModel(self.model)
-            
-        elif 'claude' in model_lower or 'sonnet' in model_lower or 'opus' in model_lower or 'haiku' in model_lower:
-            self.provider = 'anthropic'
-            if not ai_config.get('anthropic_api_key'):
-                raise ValueError("Anthropic API key not configured. Please add it in System Settings > API Keys.")
-            import anthropic
-            self.client = anthropic.Anthropic(api_key=ai_config['anthropic_api_key'])
-            
-        else:
-            # Default to OpenAI
-            self.provider = 'openai'
-            if not ai_config.get('openai_api_key'):
-                raise ValueError("OpenAI API key not configured. Please add it in System Settings > API Keys.")
-            self.client = OpenAI(api_key=ai_config['openai_api_key'])
+        self.image_model = ai_config.get('default_image_model') or 'dall-e-3'
+        self.llm = llm_gateway_service.select(ai_config=ai_config)
+        self.model = self.llm.model
+        self.provider = self.llm.provider
         
         print(f"Initialized {self.provider} client with model: {self.model}")
-        return self.client
+        return self.llm
 
-    def _chat_completion(self, system_prompt: str, user_prompt: str, max_tokens: int = 20000) -> str:
+    async def _chat_completion(self, system_prompt: str, user_prompt: str, max_tokens: int = 20000, cache: bool = True) -> str:
         """Universal chat completion that works with OpenAI, Gemini, and Anthropic"""
         try:
-            if self.provider == 'openai':
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    max_completion_tokens=max_tokens
-                )
-                return response.choices[0].message.content.strip()
-                
-            elif self.provider == 'gemini':
-                # Gemini combines system and user prompts
-                full_prompt = f"{system_prompt}\n\n{user_prompt}"
-                response = self.client.generate_content(full_prompt)
-                return response.text.strip()
-                
-            elif self.provider == 'anthropic':
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=max_tokens,
-                    system=system_prompt,
-                    messages=[
-                        {"role": "user", "content": user_prompt}
-                    ]
-                )
-                return response.content[0].text.strip()
-                
-        except Exception as e:
+            return await llm_gateway_service.complete(
+                system_prompt, user_prompt, max_tokens, target=self.llm, cache=cache, agent_type='post'
+            )
+        except LLMError as e:
             raise Exception(f"Chat completion failed ({self.provider}): {str(e)}")
     
     def _get_category_prompt(self, category_slug: str) -> str:
@@ -225,7 +196,6 @@ class AgentRunnerService:
                 continue
                 
             try:
-                import trafilatura
                 from urllib.parse import urljoin
                 import re
                 
@@ -249,14 +219,6 @@ class AgentRunnerService:
                     fetched_content.append(f"**Could not fetch ESPN Cricinfo content**")
                     continue
                 
-                # Download the webpage
-                downloaded = trafilatura.fetch_url(url)
-                
-                if not downloaded:
-                    fetched_content.append(f"**Could not download page from {url}**")
-                    print(f"❌ Failed to download {url}")
-                    continue
-                
                 # Determine if this is a listing page based on url_type setting
                 if url_type == 'listing':
                     is_listing_page = True
@@ -276,6 +238,14 @@ class AgentRunnerService:
                     is_listing_page = (not has_article_id) or (category in listing_categories and not has_article_id)
                     print(f"🔧 Auto-detected: {'LISTING PAGE' if is_listing_page else 'DIRECT ARTICLE'} (has_article_id={has_article_id})")
                 
+                # Download the webpage (cached; listing pages expire sooner than articles)
+                downloaded = await reference_fetcher_service.fetch(url, 'listing' if is_listing_page else 'article')
+                
+                if not downloaded:
+                    fetched_content.append(f"**Could not download page from {url}**")
+                    print(f"❌ Failed to download {url}")
+                    continue
+                
                 if is_listing_page:
                     print(f"📋 Processing as LISTING PAGE - will find latest article first...")
                     
@@ -307,7 +277,7 @@ class AgentRunnerService:
                         print(f"📥 Now fetching content from the ACTUAL article page...")
                         
                         # IMPORTANT: Fetch the ACTUAL article page, NOT the listing page
-                        article_downloaded = trafilatura.fetch_url(article_url)
+                        article_downloaded = await reference_fetcher_service.fetch(article_url, 'article')
                         
                         if article_downloaded:
                             # Use custom extractor for Indian Express
@@ -318,16 +288,9 @@ class AgentRunnerService:
                                     original_title = title_from_extractor
                             else:
                                 # Extract content from the ACTUAL article using trafilatura (clean extraction)
-                                extracted = trafilatura.extract(
-                                    article_downloaded,
-                                    include_comments=False,
-                                    include_tables=True,
-                                    no_fallback=False,
-                                    favor_precision=True
-                                )
-                                metadata = trafilatura.extract_metadata(article_downloaded)
-                                if metadata and metadata.title:
-                                    original_title = metadata.title
+                                extracted, title_from_page = await reference_fetcher_service.extract(article_downloaded)
+                                if title_from_page:
+                                    original_title = title_from_page
                             
                             # Only extract YouTube URL from clean trafilatura content (not raw HTML)
                             # This avoids picking up ads and sidebar content
@@ -361,16 +324,9 @@ class AgentRunnerService:
                         if title_from_extractor:
                             original_title = title_from_extractor
                     else:
-                        extracted = trafilatura.extract(
-                            downloaded,
-                            include_comments=False,
-                            include_tables=True,
-                            no_fallback=False,
-                            favor_precision=True
-                        )
-                        metadata = trafilatura.extract_metadata(downloaded)
-                        if metadata and metadata.title:
-                            original_title = metadata.title
+                        extracted, title_from_page = await reference_fetcher_service.extract(downloaded)
+                        if title_from_page:
+                            original_title = title_from_page
                     
                     # Only extract YouTube URL from clean trafilatura content (not raw HTML)
                     # This avoids picking up ads and sidebar content
@@ -710,20 +666,18 @@ class AgentRunnerService:
         """
         try:
             import re
-            import httpx
             
             print(f"🏏 ESPN Cricinfo scraper: Finding {count} articles from RSS feed...")
             
             rss_url = "https://www.espncricinfo.com/rss/content/story/feeds/0.xml"
             
             # Fetch the RSS feed
-            with httpx.Client(timeout=30) as client:
-                response = client.get(rss_url)
-                if response.status_code != 200:
-                    print(f"❌ ESPN Cricinfo: Failed to fetch RSS feed (status {response.status_code})")
-                    return []
-                
-                rss_content = response.text
+            response = await http_client_service.client('feed').get(rss_url)
+            if response.status_code != 200:
+                print(f"❌ ESPN Cricinfo: Failed to fetch RSS feed (status {response.status_code})")
+                return []
+            
+            rss_content = response.text
             
             print(f"✅ ESPN Cricinfo: RSS feed downloaded ({len(rss_content)} bytes)")
             
@@ -897,10 +851,10 @@ Note: This is a news summary from ESPN Cricinfo RSS feed. Use this information t
         Returns: (content, title)
         """
         import re
-        from bs4 import BeautifulSoup
+        from services.html_parser_service import make_soup
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = make_soup(html_content)
             
             # Extract title
             title = ""
@@ -1086,7 +1040,7 @@ Structure your article into exactly {split_paragraphs} distinct paragraphs, clea
 
     async def _optimize_prompt(self, base_prompt: str) -> str:
         """Use OpenAI to optimize the prompt for better content generation"""
-        if not self.client:
+        if not self.llm:
             self._initialize_ai_client()
         
         # Check if the prompt contains reference content - if so, skip optimization
@@ -1104,7 +1058,7 @@ Original Prompt:
 Return ONLY the optimized prompt, nothing else."""
 
         try:
-            return self._chat_completion(
+            return await self._chat_completion(
                 "You are a prompt optimization expert.",
                 optimization_prompt,
                 20000
@@ -1115,7 +1069,7 @@ Return ONLY the optimized prompt, nothing else."""
 
     async def _generate_content(self, optimized_prompt: str) -> str:
         """Generate article content using OpenAI"""
-        if not self.client:
+        if not self.llm:
             self._initialize_ai_client()
         
         try:
@@ -1129,7 +1083,7 @@ Write engaging, factual, and well-structured articles based on the provided cont
             else:
                 system_prompt = "You are a professional news writer and journalist. Write engaging, factual, and well-structured articles."
             
-            content = self._chat_completion(
+            content = await self._chat_completion(
                 system_prompt,
                 optimized_prompt,
                 20000
@@ -1145,11 +1099,11 @@ Write engaging, factual, and well-structured articles based on the provided cont
 
     async def _polish_content(self, raw_content: str) -> str:
         """Post-process content to make it professional, elegant, and well-formatted"""
-        if not self.client:
+        if not self.llm:
             self._initialize_ai_client()
         
         try:
-            polished = self._chat_completion(
+            polished = await self._chat_completion(
                 "You are an expert news editor and content formatter. Your job is to polish articles and format them beautifully for web display.",
                 f"""Rewrite and FORMAT the following article for excellent readability.
 
@@ -1180,32 +1134,51 @@ Original Article:
                 20000
             )
             
-            # Clean up any remaining unwanted prefixes
-            polished = polished.replace("Headline:", "").replace("**Headline:**", "")
-            polished = polished.replace("Title:", "").replace("**Title:**", "")
-            polished = polished.replace("Article:", "").replace("**Article:**", "")
-            
-            # Remove em-dashes, horizontal rules, and separator lines between paragraphs
-            import re
-            polished = re.sub(r'\n\s*[—–-]+\s*\n', '\n\n', polished)  # Remove em-dash/en-dash/dash separators
-            polished = re.sub(r'\n\s*\*\*\*\s*\n', '\n\n', polished)  # Remove *** separators
-            polished = re.sub(r'\n\s*---+\s*\n', '\n\n', polished)  # Remove --- separators
-            polished = re.sub(r'^\s*[—–-]+\s*$', '', polished, flags=re.MULTILINE)  # Remove standalone dashes
-            
-            # Ensure proper paragraph separation
-            # Replace single newlines with double newlines for better display
-            polished = re.sub(r'\n(?!\n)', '\n\n', polished)
-            # Clean up any triple+ newlines
-            polished = re.sub(r'\n{3,}', '\n\n', polished)
-            
-            return polished
+            return self._format_article_body(polished)
         except Exception as e:
             print(f"Content polishing failed: {e}, using original content")
             return raw_content
 
+    def _format_article_body(self, text: str) -> str:
+        """Strip labels and separators and put a blank line between paragraphs"""
+        # Clean up any remaining unwanted prefixes
+        text = text.replace("Headline:", "").replace("**Headline:**", "")
+        text = text.replace("Title:", "").replace("**Title:**", "")
+        text = text.replace("Article:", "").replace("**Article:**", "")
+        
+        # Remove em-dashes, horizontal rules, and separator lines between paragraphs
+        text = re.sub(r'\n\s*[—–-]+\s*\n', '\n\n', text)  # Remove em-dash/en-dash/dash separators
+        text = re.sub(r'\n\s*\*\*\*\s*\n', '\n\n', text)  # Remove *** separators
+        text = re.sub(r'\n\s*---+\s*\n', '\n\n', text)  # Remove --- separators
+        text = re.sub(r'^\s*[—–-]+\s*$', '', text, flags=re.MULTILINE)  # Remove standalone dashes
+        
+        # Ensure proper paragraph separation
+        # Replace single newlines with double newlines for better display
+        text = re.sub(r'\n(?!\n)', '\n\n', text)
+        # Clean up any triple+ newlines
+        return re.sub(r'\n{3,}', '\n\n', text)
+
+    def _clean_title(self, title: str) -> str:
+        """Single-line headline without bullets, quotes or labels"""
+        if not title:
+            return title
+        # Take only the first line if multiple lines returned
+        title = title.split('\n')[0].strip()
+        # Remove leading bullet points or dashes (but not numbers that are part of the title like "2026")
+        if title.startswith('-') or title.startswith('•') or title.startswith('*'):
+            title = title[1:].strip()
+        title = title.strip('"\'')
+        return title.replace("Headline:", "").replace("Title:", "").strip()
+
+    def _fallback_title(self, content: str, original_title: str = "") -> str:
+        if original_title:
+            return original_title[:122] + '...' if len(original_title) > 125 else original_title
+        first_sentence = content.split('.')[0].strip() if content else "News Article"
+        return first_sentence[:122] + '...' if len(first_sentence) > 125 else first_sentence
+
     async def _generate_title(self, content: str, original_title: str = "") -> str:
         """Rewrite the original title using LLM, keeping it under 125 characters"""
-        if not self.client:
+        if not self.llm:
             self._initialize_ai_client()
         
         try:
@@ -1226,7 +1199,7 @@ RULES:
 
 Your response should be just the headline text, nothing more."""
 
-                title = self._chat_completion(
+                title = await self._chat_completion(
                     "You rewrite headlines. Return only ONE headline under 125 characters. No lists, no options, just one headline.",
                     prompt,
                     2000
@@ -1248,7 +1221,7 @@ RULES:
 
 Your response should be just the headline text, nothing more."""
 
-                title = self._chat_completion(
+                title = await self._chat_completion(
                     "You write headlines. Return only ONE headline under 125 characters. No lists, no options, just one headline.",
                     prompt,
                     2000
@@ -1256,23 +1229,16 @@ Your response should be just the headline text, nothing more."""
                 print(f"   ✅ LLM generated title: {title}")
             
             # Clean up the title
-            if title:
-                # Take only the first line if multiple lines returned
-                title = title.split('\n')[0].strip()
-                # Remove leading bullet points or dashes (but not numbers that are part of the title like "2026")
-                if title.startswith('-') or title.startswith('•') or title.startswith('*'):
-                    title = title[1:].strip()
-                title = title.strip('"\'')
-                title = title.replace("Headline:", "").replace("Title:", "").strip()
+            title = self._clean_title(title)
             
             # If title is still too long (over 125 chars), ask AI to shorten it
             if title and len(title) > 125:
                 print(f"   ⚠️ Title too long ({len(title)} chars), asking AI to shorten...")
-                title = self._chat_completion(
+                title = (await self._chat_completion(
                     "You shorten headlines to under 125 characters while keeping the meaning.",
                     f"Shorten this headline to UNDER 125 characters:\n\n{title}\n\nWrite only the shortened headline.",
                     500
-                ).strip('"\'')
+                )).strip('"\'')
                 print(f"   ✅ Shortened title ({len(title)} chars): {title}")
             
             # Final truncation safety check
@@ -1283,11 +1249,7 @@ Your response should be just the headline text, nothing more."""
             # If title generation failed or empty, use original title or content excerpt
             if not title:
                 print(f"   ⚠️ LLM returned empty title, using fallback...")
-                if original_title:
-                    title = original_title[:122] + '...' if len(original_title) > 125 else original_title
-                else:
-                    first_sentence = content.split('.')[0] if content else "News Article"
-                    title = first_sentence.strip()[:122] + '...' if len(first_sentence) > 125 else first_sentence.strip()
+                title = self._fallback_title(content, original_title)
             
             print(f"   📰 Final title ({len(title)} chars): {title}")
             return title
@@ -1295,18 +1257,15 @@ Your response should be just the headline text, nothing more."""
         except Exception as e:
             print(f"   ❌ Title generation failed: {e}")
             # Fallback to original title or content excerpt
-            if original_title:
-                return original_title[:122] + '...' if len(original_title) > 125 else original_title
-            first_sentence = content.split('.')[0] if content else "News Article"
-            return first_sentence[:122] + '...' if len(first_sentence) > 125 else first_sentence
+            return self._fallback_title(content, original_title)
 
     async def _generate_summary(self, content: str) -> str:
         """Generate an engaging summary for the content"""
-        if not self.client:
+        if not self.llm:
             self._initialize_ai_client()
         
         try:
-            summary = self._chat_completion(
+            summary = await self._chat_completion(
                 "You are an expert news editor. Write summaries that hook readers and make them want to read the full article.",
                 f"""Write a short, engaging summary for this news article.
 
@@ -1328,6 +1287,63 @@ Article:
             print(f"Summary generation failed: {e}")
             return content[:200] + "..."  # Fallback to truncated content
 
+    async def _generate_single_pass(self, base_prompt: str, original_title: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Write the article, headline, summary and tags in one structured LLM call.
+        Returns None when the answer is missing fields or not valid JSON, so the
+        caller can fall back to the multi-step pipeline. Timeouts and provider
+        errors are raised: the fallback would only hit the same provider again.
+        """
+        if not self.llm:
+            self._initialize_ai_client()
+        
+        if original_title:
+            title_rule = f'Rewrite this original headline with different words, same meaning and language: "{original_title}"'
+        else:
+            title_rule = "Write a headline for the article"
+        
+        prompt = f"""{base_prompt}
+
+**OUTPUT (single JSON object):**
+- "content": the finished article. Professional, elegant journalistic style. Lead with the most important news,
+  then supporting details and context, then a short conclusion. Paragraphs of 2-4 sentences separated by a
+  blank line. No labels like "Headline:", "Title:" or "Article:", no separators or horizontal rules.
+- "title": {title_rule}. Exactly ONE catchy headline, UNDER 125 characters, no quotes, numbering or bullets.
+- "summary": 2-3 sentence summary that hooks readers. Simple, concise language.
+- "tags": 3-6 short topic tags (names, places, subjects) taken from the article."""
+        
+        system_prompt = """You are a professional news writer and editor.
+Any reference content has ALREADY been provided in the prompt; you do NOT need web access.
+Write engaging, factual, well-structured articles and return them in the requested JSON format."""
+        
+        try:
+            result = await llm_gateway_service.complete_json(
+                system_prompt, prompt, SINGLE_PASS_ARTICLE_SCHEMA,
+                max_tokens=20000, target=self.llm, agent_type='post'
+            )
+        except LLMResponseFormatError as e:
+            print(f"   ⚠️ Single-pass response was not usable: {e}")
+            return None
+        except LLMError as e:
+            raise Exception(f"Chat completion failed ({self.provider}): {str(e)}")
+        
+        content = self._format_article_body(result['content'].strip())
+        title = self._clean_title(result['title'])
+        if not content.strip() or not title:
+            print("   ⚠️ Single-pass response is missing the article or headline")
+            return None
+        if len(title) > 125:
+            # Truncate at last complete word before 125 chars
+            title = title[:122].rsplit(' ', 1)[0] + '...'
+        
+        tags = [tag.strip() for tag in result['tags'] if tag.strip()]
+        return {
+            'content': content,
+            'title': title,
+            'summary': result['summary'].strip() or content[:200] + "...",
+            'tags': ', '.join(tags) if tags else None
+        }
+
     async def _get_image_for_content(self, content: str, title: str, image_option: str, category: str) -> Optional[str]:
         """Get image based on the image option selected"""
         if image_option == 'web_search':
@@ -1340,12 +1356,12 @@ Article:
 
     async def _search_web_image(self, content: str, title: str, category: str) -> Optional[str]:
         """Search for an image using OpenAI to generate search query"""
-        if not self.client:
+        if not self.llm:
             self._initialize_ai_client()
         
         try:
             # Generate search query
-            search_query = self._chat_completion(
+            search_query = await self._chat_completion(
                 "You are an image search expert. Generate a specific search query to find a relevant news image.",
                 f"Generate a Google image search query to find a relevant, high-quality image for this article. Category: {category}. Title: {title}. Return ONLY the search query, nothing else.",
                 100
@@ -1362,15 +1378,17 @@ Article:
 
     async def _generate_ai_image(self, content: str, title: str) -> Optional[str]:
         """Generate an image using the configured image generation model"""
-        if not self.client:
+        if not self.llm:
             self._initialize_ai_client()
         
         try:
             # Generate image prompt
-            image_prompt = self._chat_completion(
+            # Not cached: regenerating an image should not reuse the previous prompt
+            image_prompt = await self._chat_completion(
                 "Create a detailed image generation prompt.",
                 f"Create an image prompt for a news article image. Title: {title}. Make it professional, news-worthy, horizontal orientation. Return ONLY the prompt, max 100 words.",
-                200
+                200,
+                cache=False
             )
             
             # Check which image model to use
@@ -1393,27 +1411,23 @@ Article:
             print(f"AI image generation failed: {e}")
             return None
 
+    def _image_source(self, image: Optional[Dict]) -> Optional[str]:
+        """URL of a generated image, or a /tmp path when the provider returned bytes"""
+        if not image:
+            return None
+        if image.get('url'):
+            return image['url']
+        timestamp = int(datetime.now().timestamp() * 1000)
+        temp_path = f"/tmp/imagen_{timestamp}.png"
+        with open(temp_path, 'wb') as f:
+            f.write(image['content'])
+        return temp_path
+
     async def _generate_dalle_image(self, prompt: str, model: str = "dall-e-3") -> Optional[str]:
         """Generate image using OpenAI DALL-E or gpt-image-1"""
         try:
-            # Handle different image models
-            if model in ["gpt-image-1", "gpt-image"]:
-                image_response = self.client.images.generate(
-                    model="gpt-image-1",
-                    prompt=prompt,
-                    size="1536x1024",
-                    quality="medium",
-                    n=1
-                )
-            else:
-                image_response = self.client.images.generate(
-                    model=model,
-                    prompt=prompt,
-                    size="1792x1024" if model == "dall-e-3" else "1024x1024",
-                    quality="standard",
-                    n=1
-                )
-            return image_response.data[0].url
+            target = llm_gateway_service.select(model=model, ai_config=self.ai_config)
+            return self._image_source(await llm_gateway_service.generate_image(prompt, target=target))
         except Exception as e:
             print(f"Image generation failed: {e}")
             return None
@@ -1421,91 +1435,52 @@ Article:
     async def _generate_google_image(self, prompt: str) -> Optional[str]:
         """Generate image using Google Imagen API"""
         try:
-            import google.generativeai as genai
-            
-            gemini_api_key = self.ai_config.get('gemini_api_key')
-            if not gemini_api_key:
-                print("Gemini API key not configured for image generation")
-                return None
-            
-            genai.configure(api_key=gemini_api_key)
-            
-            # Use Imagen model
-            imagen = genai.ImageGenerationModel(self.image_model)
-            result = imagen.generate_images(
-                prompt=prompt,
-                number_of_images=1,
-                aspect_ratio="16:9"
-            )
-            
-            if result.images:
-                # Save image temporarily and return path
-                import base64
-                timestamp = int(datetime.now().timestamp() * 1000)
-                temp_path = f"/tmp/imagen_{timestamp}.png"
-                result.images[0].save(temp_path)
-                return temp_path
-            return None
-            
+            target = llm_gateway_service.select(model=self.image_model, ai_config=self.ai_config)
+            return self._image_source(await llm_gateway_service.generate_image(prompt, target=target))
         except Exception as e:
             print(f"Google Imagen generation failed: {e}")
-            # Fallback to DALL-E if available
-            if self.client:
+            # Fallback to DALL-E if an OpenAI key is available
+            if self.ai_config.get('openai_api_key'):
                 return await self._generate_dalle_image(prompt)
             return None
 
     async def _download_and_upload_image(self, image_source: str) -> Optional[str]:
         """Download image from URL or local path and upload to S3"""
         try:
-            from s3_service import s3_service
-            
-            # Generate filename
-            timestamp = int(datetime.now().timestamp() * 1000)
-            filename = f"ai_generated_{timestamp}.png"
-            temp_path = f"/tmp/{filename}"
+            from services.image_variant_service import image_variant_service
+            from services.media_asset_service import media_asset_service, hash_content, content_addressed_key
             
             # Check if it's a local file path or URL
             if image_source.startswith('/tmp/') or image_source.startswith('/'):
                 # Local file - just use it directly
-                temp_path = image_source
-                with open(temp_path, 'rb') as f:
+                with open(image_source, 'rb') as f:
                     image_data = f.read()
+                # Clean up temp file (generated images are handed over as /tmp paths)
+                if image_source.startswith('/tmp/'):
+                    os.remove(image_source)
             else:
                 # Download from URL
-                async with httpx.AsyncClient() as client:
+                async with http_client_service.session() as client:
                     response = await client.get(image_source, timeout=30.0)
                     if response.status_code != 200:
                         return None
                     image_data = response.content
-                
-                # Save temporarily
-                with open(temp_path, 'wb') as f:
-                    f.write(image_data)
-            
-            # Upload to S3 if enabled
-            if s3_service.is_enabled():
-                # Upload to S3
-                s3_url = s3_service.upload_file(temp_path, f"articles/{filename}")
-                
-                # Clean up temp file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                return s3_url
-            else:
-                # Save locally
-                local_path = f"/app/backend/uploads/articles/{filename}"
-                os.makedirs(os.path.dirname(local_path), exist_ok=True)
-                
-                # Move or copy file
-                if temp_path != local_path:
-                    with open(temp_path, 'rb') as f:
-                        image_data = f.read()
-                    with open(local_path, 'wb') as f:
-                        f.write(image_data)
-                    if os.path.exists(temp_path) and temp_path.startswith('/tmp/'):
-                        os.remove(temp_path)
-                
-                return f"/uploads/articles/{filename}"
+            
+            # Store under a content-addressed key (S3 if enabled, else local uploads/);
+            # an image fetched before is reused instead of uploaded again
+            content_hash = hash_content(image_data)
+            asset = await media_asset_service.ingest(
+                image_data,
+                content_addressed_key("articles", content_hash, ".png"),
+                content_type='image/png',
+                content_hash=content_hash,
+                local_fallback=True
+            )
+            if not asset:
+                return None
+            if not asset['deduplicated']:
+                image_variant_service.schedule(image_data, asset['key'], asset['url'])
+            return asset['url']
                 
         except Exception as e:
             print(f"Image download/upload failed: {e}")
@@ -1647,8 +1622,6 @@ Article:
     
     async def _run_agent_bulk(self, agent: Dict[str, Any], posts_count: int) -> Dict[str, Any]:
         """Run agent in bulk mode - create multiple articles from a listing page."""
-        import trafilatura
-        
         reference_urls = agent.get('reference_urls', [])
         if not reference_urls:
             return {
@@ -1693,64 +1666,30 @@ Article:
             
             print(f"\n✅ Found {len(espn_articles)} ESPN Cricinfo articles to process\n")
             
-            # Create articles for each ESPN article (using RSS data)
-            created_articles = []
-            failed_articles = []
+            # Create articles for each ESPN article (using RSS data), several at a time, one per URL
+            espn_articles = list({article['url']: article for article in espn_articles}.values())
             
-            for i, article_data in enumerate(espn_articles):
-                print(f"\n{'='*60}")
-                print(f"📰 Processing article {i+1}/{len(espn_articles)}: {article_data['title'][:50]}...")
-                print(f"{'='*60}")
+            async def process_espn_article(i: int, article_data: dict) -> Dict[str, Any]:
+                print(f"\n📰 Processing article {i+1}/{len(espn_articles)}: {article_data['title'][:50]}...")
                 
-                try:
-                    # Get content from RSS data
-                    content, title, image_url = await self._fetch_espn_cricinfo_content(article_data)
-                    
-                    # Create a modified agent with ESPN content as reference
-                    single_agent = dict(agent)
-                    single_agent['_espn_rss_content'] = content
-                    single_agent['_espn_title'] = title
-                    single_agent['_espn_image'] = image_url
-                    single_agent['reference_urls'] = [{'url': article_data['url'], 'url_type': 'direct'}]
-                    
-                    result = await self._run_agent_single(single_agent)
-                    
-                    if result.get('success'):
-                        created_articles.append({
-                            'url': article_data['url'],
-                            'article_id': result.get('article_id'),
-                            'title': result.get('title')
-                        })
-                        print(f"✅ Created article: {result.get('title', 'Unknown')}")
-                    else:
-                        failed_articles.append({
-                            'url': article_data['url'],
-                            'error': result.get('message', 'Unknown error')
-                        })
-                        print(f"❌ Failed to create article: {result.get('message')}")
-                        
-                except Exception as e:
-                    failed_articles.append({
-                        'url': article_data.get('url', 'Unknown'),
-                        'error': str(e)
-                    })
-                    print(f"❌ Exception creating article: {e}")
-            
-            success_count = len(created_articles)
-            fail_count = len(failed_articles)
-            
-            return {
-                'success': success_count > 0,
-                'message': f'Created {success_count} articles successfully' + (f', {fail_count} failed' if fail_count > 0 else ''),
-                'article_id': created_articles[0]['article_id'] if created_articles else None,
-                'created_count': success_count,
-                'failed_count': fail_count,
-                'created_articles': created_articles,
-                'failed_articles': failed_articles
-            }
+                # Get content from RSS data
+                content, title, image_url = await self._fetch_espn_cricinfo_content(article_data)
+                
+                # Create a modified agent with ESPN content as reference
+                single_agent = dict(agent)
+                single_agent['_espn_rss_content'] = content
+                single_agent['_espn_title'] = title
+                single_agent['_espn_image'] = image_url
+                single_agent['reference_urls'] = [{'url': article_data['url'], 'url_type': 'direct'}]
+                return await self._run_agent_single(single_agent)
+            
+            results = await run_bounded(
+                espn_articles, self._bulk_item(process_espn_article, len(espn_articles)), bulk_parallelism(agent)
+            )
+            return self._bulk_report([article['url'] for article in espn_articles], results)
         
         # For other scrapers, fetch the listing page
-        downloaded = trafilatura.fetch_url(listing_url)
+        downloaded = await reference_fetcher_service.fetch(listing_url, 'listing')
         if not downloaded:
             return {
                 'success': False,
@@ -1777,44 +1716,58 @@ Article:
         
         print(f"\n✅ Found {len(article_urls)} article URLs to process\n")
         
-        # Create articles for each URL
-        created_articles = []
-        failed_articles = []
+        # Create articles for each URL, several at a time; results keep the listing order
+        article_urls = list(dict.fromkeys(article_urls))  # one post per URL
         
-        for i, article_url in enumerate(article_urls):
-            print(f"\n{'='*60}")
-            print(f"📰 Processing article {i+1}/{len(article_urls)}: {article_url}")
-            print(f"{'='*60}")
+        async def process_article_url(i: int, article_url: str) -> Dict[str, Any]:
+            print(f"\n📰 Processing article {i+1}/{len(article_urls)}: {article_url}")
             
+            # Create a modified agent config with this specific URL
+            single_agent = dict(agent)
+            single_agent['reference_urls'] = [{'url': article_url, 'url_type': 'direct'}]
+            return await self._run_agent_single(single_agent)
+        
+        results = await run_bounded(
+            article_urls, self._bulk_item(process_article_url, len(article_urls)), bulk_parallelism(agent)
+        )
+        return self._bulk_report(article_urls, results)
+
+    def _bulk_item(self, process, total: int):
+        """Wrap a bulk item so an exception becomes a failed result instead of aborting the run"""
+        done = 0
+        
+        async def run(i: int, item) -> Dict[str, Any]:
+            nonlocal done
             try:
-                # Create a modified agent config with this specific URL
-                single_agent = dict(agent)
-                single_agent['reference_urls'] = [{'url': article_url, 'url_type': 'direct'}]
-                
-                result = await self._run_agent_single(single_agent)
-                
-                if result.get('success'):
-                    created_articles.append({
-                        'url': article_url,
-                        'article_id': result.get('article_id'),
-                        'title': result.get('title')
-                    })
-                    print(f"✅ Created article: {result.get('title', 'Unknown')}")
-                else:
-                    failed_articles.append({
-                        'url': article_url,
-                        'error': result.get('message', 'Unknown error')
-                    })
-                    print(f"❌ Failed to create article: {result.get('message')}")
-                    
+                result = await process(i, item)
             except Exception as e:
+                result = {'success': False, 'message': str(e)}
+            if result.get('success'):
+                print(f"✅ Created article: {result.get('title', 'Unknown')}")
+            else:
+                print(f"❌ Failed to create article: {result.get('message')}")
+            done += 1
+            report_progress('bulk', f"{done}/{total} articles processed", done, total)
+            return result
+        return run
+
+    def _bulk_report(self, urls: list, results: list) -> Dict[str, Any]:
+        """Summary of a bulk run; created/failed lists follow the listing order"""
+        created_articles = []
+        failed_articles = []
+        for url, result in zip(urls, results):
+            if result.get('success'):
+                created_articles.append({
+                    'url': url,
+                    'article_id': result.get('article_id'),
+                    'title': result.get('title')
+                })
+            else:
                 failed_articles.append({
-                    'url': article_url,
-                    'error': str(e)
+                    'url': url,
+                    'error': result.get('message', 'Unknown error')
                 })
-                print(f"❌ Exception creating article: {e}")
         
-        # Return summary
         success_count = len(created_articles)
         fail_count = len(failed_articles)
         
@@ -1832,7 +1785,7 @@ Article:
         """Run agent to create a single article from reference URLs."""
         try:
             # Ensure AI client is initialized
-            if not self.client:
+            if not self.llm:
                 self._initialize_ai_client()
             
             # Check for ESPN Cricinfo RSS content (pre-fetched)
@@ -1841,6 +1794,7 @@ Article:
             espn_image = agent.get('_espn_image')
             
             # Step 2: Fetch content from reference URLs
+            report_progress('fetching', 'Fetching reference content')
             reference_urls = agent.get('reference_urls', [])
             category = agent.get('category', '')
             scraper_website = agent.get('scraper_website', '')  # Website-specific scraper selection
@@ -1867,24 +1821,38 @@ Article:
             # Step 3: Build the final prompt with all dynamic placeholders and reference content
             base_prompt = self._build_final_prompt(agent, reference_content)
             
-            # Step 4: Optimize the prompt using OpenAI
-            optimized_prompt = await self._optimize_prompt(base_prompt)
-            
-            # Step 5: Generate content using the optimized prompt
-            raw_content = await self._generate_content(optimized_prompt)
-            
-            # Step 6: Polish the content to make it professional and elegant
-            print("Polishing content for professional quality...")
-            content = await self._polish_content(raw_content)
-            
-            # Step 7: Generate a compelling, simplified title (using original title if available)
-            print("Generating article title...")
-            title = await self._generate_title(content, original_title)
-            print(f"Generated title: {title}")
-            
-            # Step 8: Generate an engaging summary
-            print("Generating article summary...")
-            summary = await self._generate_summary(content)
+            # Steps 4-8 in one structured call when the agent uses the single-pass pipeline
+            report_progress('generating', 'Generating article')
+            generated = None
+            tags = None
+            if agent.get('pipeline_mode', PIPELINE_MULTI_STEP) == PIPELINE_SINGLE_PASS:
+                print("Generating article, title and summary in a single pass...")
+                generated = await self._generate_single_pass(base_prompt, original_title)
+                if not generated:
+                    print("Falling back to the multi-step pipeline...")
+            
+            if generated:
+                content, title, summary, tags = generated['content'], generated['title'], generated['summary'], generated['tags']
+                print(f"Generated title: {title}")
+            else:
+                # Step 4: Optimize the prompt using OpenAI
+                optimized_prompt = await self._optimize_prompt(base_prompt)
+                
+                # Step 5: Generate content using the optimized prompt
+                raw_content = await self._generate_content(optimized_prompt)
+                
+                # Step 6: Polish the content to make it professional and elegant
+                print("Polishing content for professional quality...")
+                content = await self._polish_content(raw_content)
+                
+                # Step 7: Generate a compelling, simplified title (using original title if available)
+                print("Generating article title...")
+                title = await self._generate_title(content, original_title)
+                print(f"Generated title: {title}")
+                
+                # Step 8: Generate an engaging summary
+                print("Generating article summary...")
+                summary = await self._generate_summary(content)
             
             # Step 9: Check for YouTube URL in reference content or generated content
             # For movie-news and state-news categories, auto-detect video content
@@ -1911,6 +1879,7 @@ Article:
                 content_type = 'video_post'
             
             # Step 10: Get image based on image option (skip for video posts)
+            report_progress('image', 'Preparing image')
             image_url = None
             if content_type != 'video_post':
                 # Use ESPN image if available
@@ -1958,6 +1927,7 @@ Article:
                 print(f"   🌍 No targeting specified - showing to all states")
             
             # Step 14: Create the article
+            report_progress('saving', 'Saving article')
             article_data = {
                 'title': title,
                 'content': main_content,
@@ -1971,6 +1941,7 @@ Article:
                 'category': agent.get('category', ''),
                 'content_type': content_type,
                 'image': image_url,
+                'tags': tags,
                 'is_top_story': agent.get('is_top_story', False),
                 'comments_enabled': agent.get('comments_enabled', True),
                 'status': status,
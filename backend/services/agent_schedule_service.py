@@ -0,0 +1,232 @@
+"""
+Agent Schedule Service
+Fires recurring agents (mode 'recurring') at their post_time in their
+timezone, on all days or on selected_days. Each agent document carries its
+next slot (next_run_slot, the nominal time) and next_run_at (the slot plus
+jitter). Agents sharing a slot are spread across AGENT_SCHEDULE_JITTER_SECONDS
+in a fixed order so they do not hit the LLM providers together.
+
+Every API process runs the tick, but a slot is fired at most once: the
+process that moves last_fired_slot to the slot with a conditional update is
+the one that enqueues the run.
+"""
+
+import hashlib
+import os
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+
+from database import db
+from models.mongodb_collections import AI_AGENTS
+
+AGENT_SCHEDULE_TICK_SECONDS = int(os.environ.get("AGENT_SCHEDULE_TICK_SECONDS", "30"))
+AGENT_SCHEDULE_JITTER_SECONDS = int(os.environ.get("AGENT_SCHEDULE_JITTER_SECONDS", "600"))
+AGENT_SCHEDULE_GRACE_SECONDS = int(os.environ.get("AGENT_SCHEDULE_GRACE_SECONDS", "900"))  # late firing allowed after downtime
+
+TIMEZONES = {"IST": "Asia/Kolkata", "EST": "America/New_York"}
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+POST_TIME_PATTERN = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*([AaPp][Mm])?\s*$")
+
+
+def parse_post_time(post_time: str) -> Optional[Tuple[int, int]]:
+    """'09:30 PM' or '21:30' -> (21, 30); None if unparseable"""
+    match = POST_TIME_PATTERN.match(post_time or "")
+    if not match:
+        return None
+    hour, minute, period = int(match.group(1)), int(match.group(2)), (match.group(3) or "").upper()
+    if period:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if period == "PM" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def agent_timezone(agent: Dict):
+    name = agent.get("timezone") or "IST"
+    try:
+        return pytz.timezone(TIMEZONES.get(name, name))
+    except pytz.UnknownTimeZoneError:
+        return pytz.timezone(TIMEZONES["IST"])
+
+
+def next_slot(agent: Dict, after: datetime) -> Optional[datetime]:
+    """First nominal run time (UTC) strictly after `after`, or None if the agent has no valid schedule"""
+    post_time = parse_post_time(agent.get("post_time"))
+    if not post_time:
+        return None
+    if agent.get("schedule_selection") == "scheduled_days":
+        days = {day.lower() for day in agent.get("selected_days") or []}
+        if not days:
+            return None
+    else:
+        days = set(WEEKDAYS)
+
+    tz = agent_timezone(agent)
+    local_date = after.astimezone(tz).date()
+    for offset in range(8):
+        date = local_date + timedelta(days=offset)
+        if WEEKDAYS[date.weekday()] not in days:
+            continue
+        local = tz.localize(datetime(date.year, date.month, date.day, *post_time))
+        slot = local.astimezone(timezone.utc)
+        if slot > after:
+            return slot
+    return None
+
+
+def spread_offsets(agent_ids: List[str]) -> Dict[str, float]:
+    """
+    Jitter in seconds for agents sharing one slot: each gets an equal share of
+    the jitter window in a fixed (hashed) order, plus a fixed offset within it.
+    """
+    ordered = sorted(agent_ids, key=lambda agent_id: hashlib.sha1(agent_id.encode()).hexdigest())
+    share = AGENT_SCHEDULE_JITTER_SECONDS / max(len(ordered), 1)
+    return {
+        agent_id: index * share + int(hashlib.sha1(agent_id.encode()).hexdigest()[:8], 16) % 1000 / 1000 * share / 2
+        for index, agent_id in enumerate(ordered)
+    }
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo:
+        return value
+    return value.replace(tzinfo=timezone.utc)  # pymongo returns naive UTC datetimes
+
+
+def plan_runs(agents: List[Dict], now: datetime) -> Dict[str, Tuple[datetime, datetime]]:
+    """
+    (next_run_slot, next_run_at) for every schedulable agent. A slot that came
+    due within the grace period but has not fired yet is kept. Offsets are
+    spread over every agent on the slot, including those that already fired
+    it, so firing agents one by one never pulls the rest forward.
+    """
+    after = now - timedelta(seconds=AGENT_SCHEDULE_GRACE_SECONDS)
+    slots = {}
+    fired = defaultdict(list)
+    for agent in agents:
+        last_fired = _as_utc(agent.get("last_fired_slot"))
+        if last_fired:
+            fired[last_fired].append(agent["id"])
+        if agent.get("mode") == "recurring" and agent.get("is_active", True):
+            slot = next_slot(agent, max(after, last_fired) if last_fired else after)
+            if slot:
+                slots[agent["id"]] = slot
+
+    by_slot = defaultdict(list)
+    for agent_id, slot in slots.items():
+        by_slot[slot].append(agent_id)
+    plan = {}
+    for slot, agent_ids in by_slot.items():
+        offsets = spread_offsets(agent_ids + fired.get(slot, []))
+        for agent_id in agent_ids:
+            plan[agent_id] = (slot, slot + timedelta(seconds=offsets[agent_id]))
+    return plan
+
+
+class AgentScheduleService:
+    """Computes next runs for recurring agents and enqueues them when due"""
+
+    JOB_ID = "recurring_agents_tick"
+
+    def __init__(self):
+        self.scheduler = None
+
+    def recompute(self) -> int:
+        """
+        Recompute next_run_slot/next_run_at for every agent (see plan_runs), so
+        an edit made at the scheduled minute does not skip the run.
+        """
+        agents = list(db[AI_AGENTS].find({}, {"_id": 0, "id": 1, "mode": 1, "is_active": 1, "schedule_selection": 1,
+                                              "selected_days": 1, "post_time": 1, "timezone": 1, "last_fired_slot": 1}))
+        plan = plan_runs(agents, datetime.now(timezone.utc))
+
+        for agent_id, (slot, run_at) in plan.items():
+            db[AI_AGENTS].update_one(
+                {"id": agent_id},
+                {"$set": {"next_run_slot": slot, "next_run_at": run_at}}
+            )
+        unscheduled = [agent["id"] for agent in agents if agent["id"] not in plan]
+        if unscheduled:
+            db[AI_AGENTS].update_many(
+                {"id": {"$in": unscheduled}, "next_run_at": {"$exists": True}},
+                {"$unset": {"next_run_slot": "", "next_run_at": ""}}
+            )
+        return len(plan)
+
+    def fire_due(self) -> List[str]:
+        """Enqueue every agent whose next_run_at has passed; returns the agent ids this process fired"""
+        from services.agent_job_service import agent_job_service, AgentAlreadyQueuedError
+
+        now = datetime.now(timezone.utc)
+        fired = []
+        claimed_any = False
+        due = db[AI_AGENTS].find(
+            {"mode": "recurring", "is_active": {"$ne": False}, "next_run_at": {"$lte": now}},
+            {"_id": 0}
+        )
+        for agent in due:
+            slot = agent["next_run_slot"]
+            # At most once per slot across processes: only one update can move last_fired_slot to this slot
+            claimed = db[AI_AGENTS].update_one(
+                {"id": agent["id"], "next_run_slot": slot, "last_fired_slot": {"$ne": slot}},
+                {"$set": {"last_fired_slot": slot, "last_scheduled_run": now}}
+            )
+            if not claimed.modified_count:
+                continue
+            claimed_any = True
+            try:
+                agent_job_service.enqueue(agent, trigger="schedule")
+                fired.append(agent["id"])
+                print(f"⏰ Scheduled run queued for agent {agent.get('agent_name') or agent['id']}")
+            except AgentAlreadyQueuedError:
+                print(f"⏭️ Skipping scheduled run of {agent.get('agent_name') or agent['id']}: previous run still active")
+        # A claimed slot is spent even when the run was skipped; move those agents to their next slot
+        if claimed_any:
+            self.recompute()
+        return fired
+
+    def get_schedule(self) -> List[Dict]:
+        return list(db[AI_AGENTS].find(
+            {"next_run_at": {"$exists": True}},
+            {"_id": 0, "id": 1, "agent_name": 1, "agent_type": 1, "post_time": 1, "timezone": 1,
+             "next_run_slot": 1, "next_run_at": 1, "last_fired_slot": 1}
+        ).sort("next_run_at", 1))
+
+    async def _tick(self):
+        import asyncio
+        try:
+            await asyncio.to_thread(self.fire_due)
+        except Exception as e:
+            print(f"❌ Recurring agent tick failed: {e}")
+
+    def start(self):
+        """Recompute the schedule and start ticking on the running event loop"""
+        self.stop()
+        self.recompute()
+        self.scheduler = AsyncIOScheduler()
+        self.scheduler.add_job(
+            self._tick,
+            trigger=IntervalTrigger(seconds=AGENT_SCHEDULE_TICK_SECONDS),
+            id=self.JOB_ID,
+            name="Recurring AI agents",
+            replace_existing=True
+        )
+        self.scheduler.start()
+        print(f"✅ Recurring agent scheduler started - tick: {AGENT_SCHEDULE_TICK_SECONDS}s")
+
+    def stop(self):
+        if self.scheduler and self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        self.scheduler = None
+
+
+# Singleton instance
+agent_schedule_service = AgentScheduleService()
@@ -3,14 +3,19 @@ Binged.com Scraper Service
 Specialized scraper for fetching OTT releases from binged.com
 """
 
-import httpx
-import asyncio
+from services.bulk_worker_pool import run_bounded
+from services.domain_throttle import domain_throttle
+from services.http_client_service import http_client_service
+import os
 from datetime import datetime, timezone
 from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
+from services.html_parser_service import html_parser_service, make_soup
 import re
 import uuid
 
+DETAIL_PARALLELISM = int(os.environ.get("BINGED_DETAIL_PARALLELISM", "4"))
+
 
 class BingedScraperService:
     """Service for fetching OTT release data from binged.com"""
@@ -186,18 +191,19 @@ class BingedScraperService:
         page = 1
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True, http2=True) as client:
+            async with http_client_service.session() as client:
                 while len(releases) < limit:
                     url = self._build_url(language, mode, page)
                     print(f"   📄 Fetching page {page}: {url}")
                     
-                    response = await client.get(url, headers=self.headers)
+                    async with domain_throttle.slot(url):
+                        response = await client.get(url, headers=self.headers)
                     
                     if response.status_code != 200:
                         print(f"   ❌ Failed to fetch page {page}: HTTP {response.status_code}")
                         break
                     
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                    soup = make_soup(response.text)
                     
                     # Find release links - look for links matching the pattern
                     release_links = soup.find_all('a', href=re.compile(
@@ -249,7 +255,6 @@ class BingedScraperService:
                         break
                     
                     page += 1
-                    await asyncio.sleep(0.5)  # Rate limiting
                 
         except Exception as e:
             print(f"   ❌ Error fetching releases list: {e}")
@@ -259,193 +264,210 @@ class BingedScraperService:
     async def fetch_release_details(self, url: str) -> Optional[Dict]:
         """Fetch detailed information for a single release"""
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True, http2=True) as client:
-                response = await client.get(url, headers=self.headers)
+            async with http_client_service.session() as client:
+                async with domain_throttle.slot(url):
+                    response = await client.get(url, headers=self.headers)
                 
                 if response.status_code != 200:
                     print(f"      ❌ Failed to fetch details: HTTP {response.status_code}")
                     return None
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Extract title first (used in multiple places)
-                title_elem = soup.find('title')
-                title_text = title_elem.get_text() if title_elem else ''
-                
-                # Extract movie name from h1
-                h1 = soup.find('h1')
-                movie_name = h1.get_text(strip=True) if h1 else None
-                
-                # Poster extraction removed - not needed
-                
-                # Extract meta description for synopsis
-                meta_desc = soup.find('meta', attrs={'name': 'description'})
-                synopsis = meta_desc.get('content') if meta_desc else None
-                
-                # Extract year, runtime, rating from the info line (2025 | Film | 15 | 2h 7m)
-                year = None
-                runtime = None
-                censor_rating = None
-                content_type = 'movie'
-                
-                # Look for the info text pattern
-                info_text = soup.get_text()
-                
-                # Extract year
-                year_match = re.search(r'\b(20[0-9]{2})\b', info_text)
-                if year_match:
-                    year = year_match.group(1)
-                
-                # Extract runtime
-                runtime_match = re.search(r'(\d+h\s*\d*m?)', info_text, re.I)
-                if runtime_match:
-                    runtime = self._extract_runtime_minutes(runtime_match.group(1))
-                
-                # Extract genres
-                genres = []
-                genre_links = soup.find_all('a', href=re.compile(r'\?genre='))
-                for g in genre_links:
-                    genre_text = g.get_text(strip=True)
-                    if genre_text and genre_text not in genres:
-                        genres.append(genre_text)
-                
-                # Extract languages - look for specific language section near genres
-                languages = []
-                
-                # Look for language text near the genres/info section
-                # Pattern: "Drama Mystery Malayalam, Tamil, Telugu, Kannada, Hindi"
-                genre_links = soup.find_all('a', href=re.compile(r'\?genre='))
-                if genre_links:
-                    last_genre = genre_links[-1]
-                    # Get the parent and look for language text after genres
-                    parent = last_genre.parent
-                    if parent:
-                        parent_text = parent.get_text()
-                        # Find all languages in the text and preserve their order
-                        # Use regex to find the language list portion (comma-separated languages)
-                        lang_pattern = r'(?:Malayalam|Tamil|Telugu|Kannada|Hindi|Bengali|Marathi|English|Gujarati|Punjabi|Odia|Korean|Japanese|Spanish|French|German|Chinese|Italian|Portuguese|Russian|Arabic|Turkish|Thai|Vietnamese|Indonesian|Malay)(?:\s*,\s*(?:Malayalam|Tamil|Telugu|Kannada|Hindi|Bengali|Marathi|English|Gujarati|Punjabi|Odia|Korean|Japanese|Spanish|French|German|Chinese|Italian|Portuguese|Russian|Arabic|Turkish|Thai|Vietnamese|Indonesian|Malay))*'
-                        lang_match = re.search(lang_pattern, parent_text, re.I)
-                        if lang_match:
-                            lang_str = lang_match.group(0)
-                            # Split by comma and clean up
-                            for lang in lang_str.split(','):
-                                lang = lang.strip()
-                                # Normalize case
-                                for known_lang in self.LANGUAGE_MAP.keys():
-                                    if lang.lower() == known_lang.lower():
-                                        if known_lang not in languages:
-                                            languages.append(known_lang)
-                                        break
-                
-                # Fallback: Also check the title for language hints if no languages found
-                if not languages:
-                    for lang in ['Malayalam', 'Hindi', 'Telugu', 'Tamil', 'Kannada', 'Bengali', 'Marathi']:
-                        if lang.lower() in title_text.lower() and lang not in languages:
-                            languages.append(lang)
-                
-                # Extract OTT platforms - look for specific streaming date section
-                ott_platforms = []
-                
-                # Look for the streaming date section which contains the actual platform
-                streaming_section = soup.find(string=re.compile(r'Streaming Date', re.I))
-                if streaming_section:
-                    parent = streaming_section.find_parent(['div', 'section', 'a'])
-                    if parent:
-                        # Look for platform logo in this section
-                        platform_img = parent.find('img')
-                        if platform_img:
-                            alt = platform_img.get('alt', '')
-                            platform = self._normalize_platform(alt)
-                            if platform and platform not in ott_platforms:
-                                ott_platforms.append(platform)
-                        # Also check text content
-                        section_text = parent.get_text()
-                        for key, value in self.OTT_PLATFORM_MAP.items():
-                            if re.search(rf'\b{key}\b', section_text, re.I) and value not in ott_platforms:
-                                ott_platforms.append(value)
-                
-                # Also look for platform in title
-                for key, value in self.OTT_PLATFORM_MAP.items():
-                    if re.search(rf'\b{key}\b', title_text, re.I) and value not in ott_platforms:
-                        ott_platforms.append(value)
-                
-                # Extract streaming/release date
-                release_date = None
-                date_match = re.search(r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4})', info_text, re.I)
-                if date_match:
-                    release_date = self._parse_date(date_match.group(1))
-                
-                # Extract director
-                director = None
-                director_section = soup.find(string=re.compile(r'Directed by:', re.I))
-                if director_section:
-                    parent = director_section.parent
-                    if parent:
-                        director_link = parent.find_next('a')
-                        if director_link:
-                            director = director_link.get_text(strip=True)
-                
-                # Extract cast
-                cast = []
-                cast_section = soup.find(string=re.compile(r'Starring:|Top Cast', re.I))
-                if cast_section:
-                    parent = cast_section.parent
-                    if parent:
-                        next_elem = parent.find_next(['div', 'section'])
-                        if next_elem:
-                            cast_links = next_elem.find_all('a', href=re.compile(r'/person/'))
-                            for c in cast_links[:10]:  # Limit to 10 cast members
-                                cast_name = c.get_text(strip=True)
-                                if cast_name and cast_name not in cast:
-                                    cast.append(cast_name)
-                
-                # Extract YouTube trailer
-                youtube_url = self._extract_youtube_url(soup)
-                
-                # Determine content type from the info line pattern (e.g., "2024 | Film | UA")
-                # Look for explicit type indicators in the page text
-                content_type_match = re.search(r'20\d{2}\s*[|·]\s*(Film|Tv\s*Show|TV\s*Show|Web\s*Series|Documentary)', info_text, re.I)
-                if content_type_match:
-                    type_str = content_type_match.group(1).lower().strip()
-                    if 'film' in type_str:
-                        content_type = 'Film'
-                    elif 'tv' in type_str or 'show' in type_str:
-                        content_type = 'Tv show'
-                    elif 'web' in type_str or 'series' in type_str:
-                        content_type = 'web_series'
-                    elif 'documentary' in type_str:
-                        content_type = 'documentary'
-                # Fallback checks if pattern not found
-                elif 'web-series' in url.lower() or 'season' in (movie_name or '').lower():
-                    content_type = 'web_series'
-                elif re.search(r'\btv\s*show\b', info_text, re.I):
-                    content_type = 'Tv show'
-                elif 'Documentary' in info_text:
-                    content_type = 'documentary'
-                
-                return {
-                    'movie_name': movie_name,
-                    'content_type': content_type,
-                    'year': year,
-                    'release_date': release_date,
-                    'runtime': runtime,
-                    'censor_rating': censor_rating,
-                    'genres': genres,
-                    'languages': languages if languages else ['English'],
-                    'ott_platforms': ott_platforms,
-                    'director': director,
-                    'cast': cast,
-                    'synopsis': synopsis,
-                    'poster_url': None,  # Not extracting poster
-                    'youtube_url': youtube_url,
-                    'source_url': url,
-                }
-                
+            
+            return await html_parser_service.parse(self.parse_release_details, response.text, url)
+            
         except Exception as e:
             print(f"      ❌ Error fetching release details: {e}")
             import traceback
             traceback.print_exc()
             return None
+
+    def parse_release_details(self, html: str, url: str) -> Optional[Dict]:
+        """Release fields from a binged detail page (run in the parse pool for large pages)"""
+        soup = make_soup(html)
+        
+        # Extract title first (used in multiple places)
+        title_elem = soup.find('title')
+        title_text = title_elem.get_text() if title_elem else ''
+        
+        # Extract movie name from h1
+        h1 = soup.find('h1')
+        movie_name = h1.get_text(strip=True) if h1 else None
+        
+        # Poster extraction removed - not needed
+        
+        # Extract meta description for synopsis
+        meta_desc = soup.find('meta', attrs={'name': 'description'})
+        synopsis = meta_desc.get('content') if meta_desc else None
+        
+        # Extract year, runtime, rating from the info line (2025 | Film | 15 | 2h 7m)
+        year = None
+        runtime = None
+        censor_rating = None
+        content_type = 'movie'
+        
+        # Look for the info text pattern
+        info_text = soup.get_text()
+        
+        # Extract year
+        year_match = re.search(r'\b(20[0-9]{2})\b', info_text)
+        if year_match:
+            year = year_match.group(1)
+        
+        # Extract runtime
+        runtime_match = re.search(r'(\d+h\s*\d*m?)', info_text, re.I)
+        if runtime_match:
+            runtime = self._extract_runtime_minutes(runtime_match.group(1))
+        
+        # Extract genres
+        genres = []
+        genre_links = soup.find_all('a', href=re.compile(r'\?genre='))
+        for g in genre_links:
+            genre_text = g.get_text(strip=True)
+            if genre_text and genre_text not in genres:
+                genres.append(genre_text)
+        
+        # Extract languages - look for specific language section near genres
+        languages = []
+        
+        # Look for language text near the genres/info section
+        # Pattern: "Drama Mystery Malayalam, Tamil, Telugu, Kannada, Hindi"
+        genre_links = soup.find_all('a', href=re.compile(r'\?genre='))
+        if genre_links:
+            last_genre = genre_links[-1]
+            # Get the parent and look for language text after genres
+            parent = last_genre.parent
+            if parent:
+                parent_text = parent.get_text()
+                # Find all languages in the text and preserve their order
+                # Use regex to find the language list portion (comma-separated languages)
+                lang_pattern = r'(?:Malayalam|Tamil|Telugu|Kannada|Hindi|Bengali|Marathi|English|Gujarati|Punjabi|Odia|Korean|Japanese|Spanish|French|German|Chinese|Italian|Portuguese|Russian|Arabic|Turkish|Thai|Vietnamese|Indonesian|Malay)(?:\s*,\s*(?:Malayalam|Tamil|Telugu|Kannada|Hindi|Bengali|Marathi|English|Gujarati|Punjabi|Odia|Korean|Japanese|Spanish|French|German|Chinese|Italian|Portuguese|Russian|Arabic|Turkish|Thai|Vietnamese|Indonesian|Malay))*'
+                lang_match = re.search(lang_pattern, parent_text, re.I)
+                if lang_match:
+                    lang_str = lang_match.group(0)
+                    # Split by comma and clean up
+                    for lang in lang_str.split(','):
+                        lang = lang.strip()
+                        # Normalize case
+                        for known_lang in self.LANGUAGE_MAP.keys():
+                            if lang.lower() == known_lang.lower():
+                                if known_lang not in languages:
+                                    languages.append(known_lang)
+                                break
+        
+        # Fallback: Also check the title for language hints if no languages found
+        if not languages:
+            for lang in ['Malayalam', 'Hindi', 'Telugu', 'Tamil', 'Kannada', 'Bengali', 'Marathi']:
+                if lang.lower() in title_text.lower() and lang not in languages:
+                    languages.append(lang)
+        
+        # Extract OTT platforms - look for specific streaming date section
+        ott_platforms = []
+        
+        # Look for the streaming date section which contains the actual platform
+        streaming_section = soup.find(string=re.compile(r'Streaming Date', re.I))
+        if streaming_section:
+            parent = streaming_section.find_parent(['div', 'section', 'a'])
+            if parent:
+                # Look for platform logo in this section
+                platform_img = parent.find('img')
+                if platform_img:
+                    alt = platform_img.get('alt', '')
+                    platform = self._normalize_platform(alt)
+                    if platform and platform not in ott_platforms:
+                        ott_platforms.append(platform)
+                # Also check text content
+                section_text = parent.get_text()
+                for key, value in self.OTT_PLATFORM_MAP.items():
+                    if re.search(rf'\b{key}\b', section_text, re.I) and value not in ott_platforms:
+                        ott_platforms.append(value)
+        
+        # Also look for platform in title
+        for key, value in self.OTT_PLATFORM_MAP.items():
+            if re.search(rf'\b{key}\b', title_text, re.I) and value not in ott_platforms:
+                ott_platforms.append(value)
+        
+        # Extract streaming/release date
+        release_date = None
+        date_match = re.search(r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4})', info_text, re.I)
+        if date_match:
+            release_date = self._parse_date(date_match.group(1))
+        
+        # Extract director
+        director = None
+        director_section = soup.find(string=re.compile(r'Directed by:', re.I))
+        if director_section:
+            parent = director_section.parent
+            if parent:
+                director_link = parent.find_next('a')
+                if director_link:
+                    director = director_link.get_text(strip=True)
+        
+        # Extract cast
+        cast = []
+        cast_section = soup.find(string=re.compile(r'Starring:|Top Cast', re.I))
+        if cast_section:
+            parent = cast_section.parent
+            if parent:
+                next_elem = parent.find_next(['div', 'section'])
+                if next_elem:
+                    cast_links = next_elem.find_all('a', href=re.compile(r'/person/'))
+                    for c in cast_links[:10]:  # Limit to 10 cast members
+                        cast_name = c.get_text(strip=True)
+                        if cast_name and cast_name not in cast:
+                            cast.append(cast_name)
+        
+        # Extract YouTube trailer
+        youtube_url = self._extract_youtube_url(soup)
+        
+        # Determine content type from the info line pattern (e.g., "2024 | Film | UA")
+        # Look for explicit type indicators in the page text
+        content_type_match = re.search(r'20\d{2}\s*[|·]\s*(Film|Tv\s*Show|TV\s*Show|Web\s*Series|Documentary)', info_text, re.I)
+        if content_type_match:
+            type_str = content_type_match.group(1).lower().strip()
+            if 'film' in type_str:
+                content_type = 'Film'
+            elif 'tv' in type_str or 'show' in type_str:
+                content_type = 'Tv show'
+            elif 'web' in type_str or 'series' in type_str:
+                content_type = 'web_series'
+            elif 'documentary' in type_str:
+                content_type = 'documentary'
+        # Fallback checks if pattern not found
+        elif 'web-series' in url.lower() or 'season' in (movie_name or '').lower():
+            content_type = 'web_series'
+        elif re.search(r'\btv\s*show\b', info_text, re.I):
+            content_type = 'Tv show'
+        elif 'Documentary' in info_text:
+            content_type = 'documentary'
+        
+        return {
+            'movie_name': movie_name,
+            'content_type': content_type,
+            'year': year,
+            'release_date': release_date,
+            'runtime': runtime,
+            'censor_rating': censor_rating,
+            'genres': genres,
+            'languages': languages if languages else ['English'],
+            'ott_platforms': ott_platforms,
+            'director': director,
+            'cast': cast,
+            'synopsis': synopsis,
+            'poster_url': None,  # Not extracting poster
+            'youtube_url': youtube_url,
+            'source_url': url,
+        }
+
+    async def _fetch_details(self, releases: List[Dict], release_type: str) -> List[Dict]:
+        """Detail pages for listed releases, several at a time (paced per domain), in listing order"""
+        async def fetch(i: int, release: Dict) -> Optional[Dict]:
+            print(f"   [{i + 1}/{len(releases)}] Fetching details for: {release['title']}")
+            details = await self.fetch_release_details(release['url'])
+            if details:
+                details['release_type'] = release_type
+            return details
+        
+        results = await run_bounded(releases, fetch, DETAIL_PARALLELISM)
+        return [details for details in results if details]
     
     async def fetch_ott_releases(
         self,
@@ -474,28 +496,14 @@ class BingedScraperService:
         if streaming_now:
             print(f"\n📺 Fetching 'Streaming Now' releases...")
             now_list = await self.fetch_releases_list(language, 'streaming-now', limit)
-            
-            for i, release in enumerate(now_list[:limit], 1):
-                print(f"   [{i}/{len(now_list)}] Fetching details for: {release['title']}")
-                details = await self.fetch_release_details(release['url'])
-                if details:
-                    details['release_type'] = 'streaming_now'
-                    all_releases.append(details)
-                await asyncio.sleep(0.3)  # Rate limiting
+            all_releases.extend(await self._fetch_details(now_list[:limit], 'streaming_now'))
         
         # Fetch from streaming-soon if requested and we haven't reached limit
         if streaming_soon and len(all_releases) < limit:
             remaining = limit - len(all_releases)
             print(f"\n📅 Fetching 'Streaming Soon' releases...")
             soon_list = await self.fetch_releases_list(language, 'streaming-soon', remaining)
-            
-            for i, release in enumerate(soon_list[:remaining], 1):
-                print(f"   [{i}/{len(soon_list)}] Fetching details for: {release['title']}")
-                details = await self.fetch_release_details(release['url'])
-                if details:
-                    details['release_type'] = 'streaming_soon'
-                    all_releases.append(details)
-                await asyncio.sleep(0.3)  # Rate limiting
+            all_releases.extend(await self._fetch_details(soon_list[:remaining], 'streaming_soon'))
         
         print(f"\n✅ Total releases fetched: {len(all_releases)}")
         return all_releases[:limit]
@@ -0,0 +1,107 @@
+"""
+Bulk Worker Pool
+Runs the items of a bulk agent run (listing-page articles, reviews) through a
+bounded pool of workers. Items start in input order and results come back in
+input order, so run reports do not depend on which item finished first.
+OrderedClaims keeps deduplication deterministic: when two items turn out to be
+the same story, the earlier one in the listing wins.
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+AGENT_BULK_PARALLELISM = int(os.environ.get("AGENT_BULK_PARALLELISM", "4"))
+MAX_BULK_PARALLELISM = 16
+
+
+def bulk_parallelism(agent: Dict) -> int:
+    """Items processed at once for an agent (its bulk_parallelism, else the default)"""
+    value = agent.get('bulk_parallelism') or AGENT_BULK_PARALLELISM
+    try:
+        return min(max(1, int(value)), MAX_BULK_PARALLELISM)
+    except (TypeError, ValueError):
+        return AGENT_BULK_PARALLELISM
+
+
+async def run_bounded(
+    items: Sequence,
+    worker: Callable[[int, Any], Awaitable],
+    parallelism: int,
+    start: int = 0
+) -> List:
+    """
+    Await worker(index, item) for every item with at most `parallelism` running.
+    Items are picked up in order; returns the results in input order.
+    Worker exceptions propagate after the other items have finished.
+    """
+    results = [None] * len(items)
+    errors = []
+    next_index = iter(range(len(items)))
+
+    async def run_worker():
+        for position in next_index:
+            try:
+                results[position] = await worker(start + position, items[position])
+            except Exception as e:
+                errors.append(e)
+
+    await asyncio.gather(*(run_worker() for _ in range(min(parallelism, len(items)))))
+    if errors:
+        raise errors[0]
+    return results
+
+
+async def run_until(
+    items: Sequence,
+    worker: Callable[[int, Any], Awaitable],
+    parallelism: int,
+    target: int,
+    succeeded: Callable[[Any], bool]
+) -> List:
+    """
+    Like run_bounded, but stop once `target` results count as succeeded.
+    Items go out in waves no larger than the successes still needed, so the
+    target is never overshot and the processed prefix does not depend on timing.
+    """
+    results = []
+    while len(results) < len(items):
+        needed = target - sum(1 for result in results if succeeded(result))
+        if needed <= 0:
+            break
+        wave = items[len(results):len(results) + min(parallelism, needed)]
+        results.extend(await run_bounded(wave, worker, parallelism, start=len(results)))
+    return results
+
+
+class OrderedClaims:
+    """
+    Per-run dedup keys granted in item order. claim(index, key) waits until
+    every earlier item has claimed a key or finished, then grants the key to
+    the first item that asks for it. Workers must call done(index) when they
+    finish (claims() does that).
+    """
+
+    def __init__(self, count: int):
+        self._keys = set()
+        self._turns = [asyncio.Event() for _ in range(count)]
+
+    def done(self, index: int):
+        self._turns[index].set()
+
+    async def claim(self, index: int, key: str) -> bool:
+        for turn in self._turns[:index]:
+            await turn.wait()
+        granted = key not in self._keys
+        self._keys.add(key)
+        self.done(index)
+        return granted
+
+    def claims(self, worker: Callable[[int, Any], Awaitable]) -> Callable[[int, Any], Awaitable]:
+        """Wrap a worker so its turn is always released"""
+        async def wrapped(index: int, item: Any):
+            try:
+                return await worker(index, item)
+            finally:
+                self.done(index)
+        return wrapped
@@ -3,12 +3,13 @@ Cricket Schedules Scraper Service
 Scrapes cricket match schedules from BBC Sport and ESPN Cricinfo
 """
 import re
-import httpx
-import trafilatura
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 
+from services.html_parser_service import make_soup
+from services.http_client_service import http_client_service
+
 
 class CricketSchedulesScraper:
     """Scraper for cricket match schedules from various sources"""
@@ -45,12 +46,12 @@ class CricketSchedulesScraper:
             print(f"   📅 Fetching {date_str}...")
             
             try:
-                downloaded = trafilatura.fetch_url(url)
+                downloaded = await http_client_service.get_text(url, headers=self.headers)
                 if not downloaded:
                     print(f"   ❌ Failed to download {url}")
                     continue
                 
-                soup = BeautifulSoup(downloaded, 'html.parser')
+                soup = make_soup(downloaded)
                 day_schedules = self._parse_bbc_page(soup, date_str)
                 
                 print(f"   ✅ Found {len(day_schedules)} matches for {date_str}")
@@ -176,17 +177,16 @@ class CricketSchedulesScraper:
         try:
             api_url = "https://hs-consumer-api.espncricinfo.com/v1/pages/matches/current"
             
-            with httpx.Client(timeout=30, headers=self.headers) as client:
-                response = client.get(api_url)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    schedules = self._parse_espn_api_response(data, days)
-                    print(f"✅ ESPN Cricinfo: Found {len(schedules)} matches")
-                else:
-                    print(f"❌ ESPN Cricinfo API returned {response.status_code}")
-                    # Fallback to RSS
-                    schedules = await self._scrape_espn_rss()
+            response = await http_client_service.client('api').get(api_url, headers={'User-Agent': self.headers['User-Agent']})
+            
+            if response.status_code == 200:
+                data = response.json()
+                schedules = self._parse_espn_api_response(data, days)
+                print(f"✅ ESPN Cricinfo: Found {len(schedules)} matches")
+            else:
+                print(f"❌ ESPN Cricinfo API returned {response.status_code}")
+                # Fallback to RSS
+                schedules = await self._scrape_espn_rss()
                     
         except Exception as e:
             print(f"❌ ESPN Cricinfo scraper error: {e}")
@@ -261,12 +261,11 @@ class CricketSchedulesScraper:
         try:
             rss_url = "https://www.espncricinfo.com/rss/content/story/feeds/0.xml"
             
-            with httpx.Client(timeout=30) as client:
-                response = client.get(rss_url)
-                if response.status_code == 200:
-                    # Parse RSS for any schedule-related content
-                    # This is a fallback and may not provide schedule data
-                    print("   ℹ️ ESPN RSS fallback used - limited schedule data")
+            response = await http_client_service.client('feed').get(rss_url)
+            if response.status_code == 200:
+                # Parse RSS for any schedule-related content
+                # This is a fallback and may not provide schedule data
+                print("   ℹ️ ESPN RSS fallback used - limited schedule data")
                     
         except Exception as e:
             print(f"   ❌ ESPN RSS fallback error: {e}")
@@ -0,0 +1,101 @@
+"""
+Domain Throttle
+Per-domain politeness for every outbound page fetch (release, IMDb and binged
+scrapers, and agent reference pages), so a site hit by both agents and
+scrapers sees one combined limit: each domain gets a token bucket
+(SCRAPER_DOMAIN_RPS requests per second with a small burst) and a cap on
+concurrent requests. Different domains never wait on each other, so a
+multi-source refresh can run its sources in parallel while each site still
+sees a steady, bounded request rate instead of fixed sleeps.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict
+from urllib.parse import urlparse
+
+SCRAPER_DOMAIN_RPS = float(os.environ.get("SCRAPER_DOMAIN_RPS", "2"))
+SCRAPER_DOMAIN_BURST = float(os.environ.get("SCRAPER_DOMAIN_BURST", "2"))
+SCRAPER_DOMAIN_CONCURRENCY = int(os.environ.get("SCRAPER_DOMAIN_CONCURRENCY", "2"))
+
+
+def domain_of(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class _Bucket:
+    """`rate` tokens per second up to `burst`; reservations queue callers behind each other"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.level = self.burst
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self.level = min(self.burst, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= 1
+        return -self.level / self.rate if self.level < 0 else 0.0
+
+
+class DomainThrottle:
+    """Token bucket and concurrency cap per domain, shared by all fetchers in the process"""
+
+    def __init__(self, rate: float = SCRAPER_DOMAIN_RPS, burst: float = SCRAPER_DOMAIN_BURST,
+                 concurrency: int = SCRAPER_DOMAIN_CONCURRENCY):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self._lock = threading.Lock()  # buckets are shared across event loops (background fetch threads)
+        self._buckets: Dict[str, _Bucket] = {}
+        self._semaphores = weakref.WeakKeyDictionary()  # loop -> {domain: Semaphore}
+        self.stats: Dict[str, Dict] = {}
+
+    def _semaphore(self, domain: str) -> asyncio.Semaphore:
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if domain not in semaphores:
+            semaphores[domain] = asyncio.Semaphore(self.concurrency)
+        return semaphores[domain]
+
+    def _reserve(self, domain: str) -> float:
+        with self._lock:
+            bucket = self._buckets.get(domain)
+            if bucket is None:
+                bucket = self._buckets[domain] = _Bucket(self.rate, self.burst)
+            delay = bucket.reserve()
+            stats = self.stats.setdefault(domain, {"requests": 0, "throttled_seconds": 0.0})
+            stats["requests"] += 1
+            stats["throttled_seconds"] += delay
+            return delay
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Hold a request slot for url's domain, waiting for its bucket"""
+        domain = domain_of(url)
+        async with self._semaphore(domain):
+            delay = self._reserve(domain)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            return {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "concurrency": self.concurrency,
+                "domains": {domain: {"requests": stats["requests"],
+                                     "throttled_seconds": round(stats["throttled_seconds"], 2)}
+                            for domain, stats in sorted(self.stats.items())},
+            }
+
+
+# Singleton instance
+domain_throttle = DomainThrottle()
@@ -5,7 +5,6 @@ Handles execution of AI agents to scrape and create photo galleries
 import os
 import re
 import uuid
-import httpx
 import asyncio
 import tempfile
 import shutil
@@ -13,6 +12,11 @@ from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List, Tuple
 from urllib.parse import urljoin, urlparse
 from database import db
+from services.http_client_service import http_client_service
+from services.image_fetcher_service import image_fetcher_service, FetchBudget
+from services.image_variant_service import image_variant_service
+from services.llm_gateway_service import llm_gateway_service
+from services.media_asset_service import media_asset_service, stage_file
 import crud
 
 
@@ -20,56 +24,29 @@ class GalleryAgentService:
     """Service to run Photo Gallery AI agents"""
     
     def __init__(self):
-        self.client = None
+        self.llm = None  # LLMTarget resolved from system settings
         self.model = None
         self.provider = None
         
     def _initialize_ai_client(self):
-        """Initialize the appropriate AI client based on selected model"""
+        """Resolve the text model and provider from the AI API keys in system settings"""
         ai_config = crud.get_ai_api_keys(db)
         if not ai_config:
             raise ValueError("AI API keys not configured. Please add them in System Settings > API Keys.")
         
-        self.model = ai_config.get('default_text_model') or 'gpt-4o'
         self.ai_config = ai_config
-        
-        model_lower = self.model.lower()
-        
-        if 'gemini' in model_lower:
-            self.provider = 'gemini'
-            if not ai_config.get('gemini_api_key'):
-                raise ValueError("Gemini API key not configured.")
-            import google.generativeai as genai
-            genai.configure(api_key=ai_config['gemini_api_key'])
-            self.client = genai.GenerativeModel(self.model)
-            
-        elif 'claude' in model_lower or 'sonnet' in model_lower:
-            self.provider = 'anthropic'
-            if not ai_config.get('anthropic_api_key'):
-                raise ValueError("Anthropic API key not configured.")
-            from anthropic import Anthropic
-            self.client = Anthropic(api_key=ai_config['anthropic_api_key'])
-            
-        else:
-            self.provider = 'openai'
-            if not ai_config.get('openai_api_key'):
-                raise ValueError("OpenAI API key not configured.")
-            from openai import OpenAI
-            self.client = OpenAI(api_key=ai_config['openai_api_key'])
+        self.llm = llm_gateway_service.select(ai_config=ai_config)
+        self.model = self.llm.model
+        self.provider = self.llm.provider
     
     def _initialize_s3_service(self):
-        """Initialize S3 service using existing s3_service from server"""
+        """Use the shared s3_service, refreshing it only if aws-config changed"""
         from s3_service import s3_service
         
-        # Get AWS config and initialize if not already done
-        aws_config = crud.get_aws_config(db)
-        if not aws_config:
+        if s3_service.config is None and not crud.get_aws_config(db):
             raise ValueError("AWS configuration not found. Please configure S3 in System Settings.")
         
-        if not s3_service.is_enabled():
-            s3_service.initialize(aws_config)
-        
-        if not s3_service.is_enabled():
+        if not s3_service.ensure_current(db):
             raise ValueError("S3 service is not enabled. Please check AWS configuration in System Settings.")
         
         self.s3_service = s3_service
@@ -80,7 +57,7 @@ class GalleryAgentService:
         import trafilatura
         
         print(f"📥 Fetching page: {url}")
-        downloaded = trafilatura.fetch_url(url)
+        downloaded = await http_client_service.get_text(url)
         
         if not downloaded:
             raise ValueError(f"Could not download page: {url}")
@@ -92,9 +69,9 @@ class GalleryAgentService:
 
     async def _find_latest_gallery_url(self, html: str, base_url: str) -> Optional[str]:
         """Find the latest gallery URL from a listing page"""
-        from bs4 import BeautifulSoup
+        from services.html_parser_service import make_soup
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         parsed_base = urlparse(base_url)
         base_domain = f"{parsed_base.scheme}://{parsed_base.netloc}"
         
@@ -149,8 +126,7 @@ class GalleryAgentService:
 
     async def _extract_gallery_images(self, html: str, base_url: str, max_images: int = 50) -> List[Dict]:
         """Extract all gallery images from the page, handling pagination"""
-        from bs4 import BeautifulSoup
-        import trafilatura
+        from services.html_parser_service import make_soup
         
         all_images = []
         seen_urls = set()  # Track all seen URLs to avoid duplicates
@@ -159,7 +135,7 @@ class GalleryAgentService:
         current_url = base_url
         
         while len(all_images) < max_images:
-            soup = BeautifulSoup(current_html, 'html.parser')
+            soup = make_soup(current_html)
             visited_urls.add(current_url)
             
             # Remove sidebar, related, and footer sections to avoid picking up other galleries
@@ -250,7 +226,7 @@ class GalleryAgentService:
             
             if next_url and next_url not in visited_urls:
                 print(f"📄 Following pagination to: {next_url}")
-                next_html = trafilatura.fetch_url(next_url)
+                next_html = await http_client_service.get_text(next_url)
                 if next_html:
                     current_html = next_html
                     current_url = next_url
@@ -303,8 +279,6 @@ class GalleryAgentService:
 
     async def _download_images(self, images: List[Dict], temp_dir: str) -> List[Dict]:
         """Download images to temp directory, filtering out placeholder images"""
-        downloaded = []
-        
         # Minimum file size to filter out placeholders (10KB)
         MIN_IMAGE_SIZE = 10 * 1024  # 10KB
         
@@ -315,83 +289,44 @@ class GalleryAgentService:
             'data:image', 'base64'
         ]
         
-        valid_image_count = 0
+        urls = []
+        for img in images:
+            url = img['url']
+            if any(pattern in url.lower() for pattern in placeholder_patterns):
+                print(f"⏭️ Skipping placeholder URL: {url[:60]}...")
+                continue
+            urls.append(url)
         
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-            for i, img in enumerate(images):
-                try:
-                    url = img['url']
-                    
-                    # Skip placeholder URLs
-                    url_lower = url.lower()
-                    if any(pattern in url_lower for pattern in placeholder_patterns):
-                        print(f"⏭️ Skipping placeholder URL: {url[:60]}...")
-                        continue
-                    
-                    print(f"⬇️ Downloading image {i+1}/{len(images)}: {url[:80]}...")
-                    
-                    response = await client.get(url, headers={
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                    })
-                    
-                    if response.status_code == 200:
-                        file_size = len(response.content)
-                        
-                        # Skip tiny images (likely placeholders)
-                        if file_size < MIN_IMAGE_SIZE:
-                            print(f"⏭️ Skipping small image ({file_size} bytes < {MIN_IMAGE_SIZE}): likely placeholder")
-                            continue
-                        
-                        # Determine file extension from content-type first, then URL
-                        content_type = response.headers.get('content-type', '')
-                        ext = '.jpg'  # default
-                        
-                        if 'webp' in content_type:
-                            ext = '.webp'
-                        elif 'png' in content_type:
-                            ext = '.png'
-                        elif 'gif' in content_type:
-                            ext = '.gif'
-                        elif 'jpeg' in content_type or 'jpg' in content_type:
-                            ext = '.jpg'
-                        else:
-                            # Fallback to URL extension
-                            url_ext = os.path.splitext(urlparse(url).path)[1].lower()
-                            if url_ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif']:
-                                ext = url_ext if url_ext != '.jpeg' else '.jpg'
-                        
-                        valid_image_count += 1
-                        filename = f"image_{valid_image_count:03d}{ext}"
-                        filepath = os.path.join(temp_dir, filename)
-                        
-                        with open(filepath, 'wb') as f:
-                            f.write(response.content)
-                        
-                        downloaded.append({
-                            'local_path': filepath,
-                            'filename': filename,
-                            'original_url': url,
-                            'size': file_size
-                        })
-                        print(f"✅ Downloaded: {filename} ({file_size} bytes)")
-                    else:
-                        print(f"❌ Failed to download: {url} (status: {response.status_code})")
-                        
-                except Exception as e:
-                    print(f"❌ Error downloading {img['url']}: {e}")
-                    continue
+        print(f"⬇️ Downloading {len(urls)} images...")
+        
+        # Concurrent, per-host limited; placeholders and non-images are rejected from
+        # headers / magic bytes before their bodies are downloaded
+        fetched = await image_fetcher_service.fetch_many(urls, temp_dir, min_size=MIN_IMAGE_SIZE, budget=FetchBudget())
+        
+        downloaded = []
+        for result in fetched:
+            if not result:
+                continue
+            filename = f"image_{len(downloaded) + 1:03d}{result['ext']}"
+            filepath = os.path.join(temp_dir, filename)
+            os.replace(result['local_path'], filepath)
+            downloaded.append({
+                'local_path': filepath,
+                'filename': filename,
+                'original_url': result['original_url'],
+                'size': result['size']
+            })
+            print(f"✅ Downloaded: {filename} ({result['size']} bytes)")
         
         print(f"📊 Downloaded {len(downloaded)} valid images (skipped {len(images) - len(downloaded)} placeholders/small files)")
         return downloaded
 
     async def _upload_images_to_s3(self, images: List[Dict], folder_path: str) -> List[Dict]:
-        """Upload images to S3 using existing s3_service and return their URLs"""
-        uploaded = []
-        
+        """Upload images to S3 in parallel and return their URLs in source order"""
         # Get galleries root folder from config
         galleries_root = self.s3_service.config.get('galleries_root_folder', 'galleries')
         
-        for i, img in enumerate(images):
+        async def upload_one(i: int, img: Dict) -> Optional[Dict]:
             try:
                 local_path = img['local_path']
                 
@@ -416,29 +351,42 @@ class GalleryAgentService:
                 print(f"☁️ Uploading to S3: {s3_key}")
                 
                 # Read file content
-                with open(local_path, 'rb') as f:
-                    file_content = f.read()
+                # Hashed and uploaded straight from the downloaded file, never read whole
+                staged = await asyncio.to_thread(stage_file, local_path, content_type)
                 
-                # Use existing s3_service upload method
-                url = self.s3_service.upload_file(file_content, s3_key, content_type)
+                # Images already stored by an earlier run or upload are reused, not re-uploaded.
+                # Transient S3 errors are retried inside the transfer layer.
+                asset = await media_asset_service.ingest_staged(staged, s3_key)
+                url = asset['url'] if asset else None
                 
-                if url:
-                    uploaded.append({
-                        'id': str(uuid.uuid4()),
-                        'name': new_filename,
-                        'url': url,
-                        's3_key': s3_key,
-                        'size': img['size']
-                    })
-                    print(f"✅ Uploaded: {url}")
-                else:
+                if not url:
                     print(f"❌ Failed to upload {new_filename}: s3_service returned None")
+                    return None
+                
+                if asset['deduplicated']:
+                    variants = crud.get_image_variants(db, url)
+                else:
+                    # Build responsive variants in the process pool next to the original
+                    variants = await image_variant_service.create_variants(local_path, s3_key, url)
+                print(f"✅ Uploaded: {url}")
+                return {
+                    'id': str(uuid.uuid4()),
+                    'name': new_filename,
+                    'url': url,
+                    's3_key': asset['key'],
+                    'size': img['size'],
+                    'variants': variants
+                }
                 
             except Exception as e:
                 print(f"❌ Error uploading {img['filename']}: {e}")
-                continue
+                return None
         
-        return uploaded
+        # Images are streamed from disk, so memory stays flat however many run at once;
+        # transfers are bounded by the S3 pool and variants by the process pool.
+        # gather keeps results in image order so numbering matches the gallery
+        results = await asyncio.gather(*(upload_one(i, img) for i, img in enumerate(images)))
+        return [result for result in results if result]
 
     async def _extract_artist_name(self, html: str, title: str) -> str:
         """Extract artist/celebrity name from page content using AI"""
@@ -464,24 +412,9 @@ Instructions:
 Artist Name:"""
 
         try:
-            if self.provider == 'openai':
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=50,
-                    temperature=0.1
-                )
-                return response.choices[0].message.content.strip()
-            elif self.provider == 'gemini':
-                response = self.client.generate_content(prompt)
-                return response.text.strip()
-            elif self.provider == 'anthropic':
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=50,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return response.content[0].text.strip()
+            return await llm_gateway_service.complete(
+                None, prompt, 50, target=self.llm, temperature=0.1, agent_type='photo_gallery'
+            )
         except Exception as e:
             print(f"Error extracting artist name: {e}")
             return "Unknown"
@@ -529,24 +462,9 @@ Instructions:
 Output:"""
 
         try:
-            if self.provider == 'openai':
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=500,
-                    temperature=0.7
-                )
-                result = response.choices[0].message.content.strip()
-            elif self.provider == 'gemini':
-                response = self.client.generate_content(prompt)
-                result = response.text.strip()
-            elif self.provider == 'anthropic':
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=500,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                result = response.content[0].text.strip()
+            result = await llm_gateway_service.complete(
+                None, prompt, 500, target=self.llm, temperature=0.7, agent_type='photo_gallery'
+            )
             
             # Parse title and content
             lines = result.split('\n', 1)
@@ -695,7 +613,7 @@ Output:"""
             # entity_name: spaces and dashes replaced with underscores
             entity_folder_name = entity_name.lower().replace(' ', '_').replace('-', '_')
             orientation_folder = 'h' if gallery_type == 'horizontal' else 'v'
-            next_number = crud.get_next_gallery_number(db, gallery_category, entity_name) or 1
+            next_number = crud.reserve_gallery_number(db, gallery_category, entity_name)
             folder_path = f"{gallery_category.lower()}/{entity_folder_name}/{orientation_folder}/{next_number}"
             
             print(f"📂 Gallery folder path: {folder_path}")
@@ -757,6 +675,8 @@ Output:"""
             }
             
             print("📝 Creating article with Photo Gallery content type...")
+            # The article shares the gallery's first image, so it holds its own reference
+            crud.acquire_image(db, article_data['image'])
             article = crud.create_article(db, article_data)
             print(f"✅ Article created with ID: {article.get('id')}")
             
@@ -0,0 +1,91 @@
+"""
+Gallery Counter Service
+Storage side of the gallery counters kept in gallery_counters. Counters are
+seeded from a storage scan the first time a folder is used and are reserved
+atomically afterwards, so uploads never list S3 prefixes. The repair command
+rebuilds every counter from storage:
+
+    cd backend && python -m services.gallery_counter_service
+"""
+
+import os
+from collections import defaultdict
+from typing import Dict, Iterable
+
+import crud
+from models.mongodb_collections import GALLERIES
+from services.gallery_renumber_service import ORIGINAL_PATTERN
+
+LOCAL_GALLERIES_ROOT = "/app/frontend/public/uploads/galleries"
+
+
+def _next_number(filenames: Iterable[str]) -> int:
+    numbers = [int(match.group(1)) for name in filenames for match in [ORIGINAL_PATTERN.match(name)] if match]
+    return max(numbers) + 1 if numbers else 1
+
+
+def scan_image_folder(folder_path: str) -> int:
+    """Next image number in a gallery folder according to storage"""
+    from s3_service import s3_service
+
+    if s3_service.is_enabled():
+        galleries_root = s3_service.config.get("galleries_root_folder", "galleries")
+        prefix = f"{galleries_root}/{folder_path}/"
+        return _next_number(obj["Key"][len(prefix):] for obj in s3_service.list_objects(prefix))
+
+    local_path = os.path.join(LOCAL_GALLERIES_ROOT, folder_path)
+    return _next_number(os.listdir(local_path) if os.path.isdir(local_path) else [])
+
+
+def _scan_all_image_folders() -> Dict[str, int]:
+    """Next image number for every gallery folder in storage"""
+    from s3_service import s3_service
+
+    folders = defaultdict(list)
+    if s3_service.is_enabled():
+        galleries_root = s3_service.config.get("galleries_root_folder", "galleries")
+        for obj in s3_service.list_objects(f"{galleries_root}/"):
+            folder_path, _, filename = obj["Key"][len(galleries_root) + 1:].rpartition("/")
+            if folder_path:
+                folders[folder_path].append(filename)
+    else:
+        for dirpath, _, filenames in os.walk(LOCAL_GALLERIES_ROOT):
+            folder_path = os.path.relpath(dirpath, LOCAL_GALLERIES_ROOT)
+            if folder_path != ".":
+                folders[folder_path].extend(filenames)
+
+    return {folder_path: _next_number(names) for folder_path, names in folders.items()}
+
+
+def rebuild_counters(db) -> Dict[str, int]:
+    """
+    Overwrite every counter from storage: image counters from the gallery
+    folders in S3 (or local uploads), gallery counters from saved galleries.
+    """
+    image_counters = _scan_all_image_folders()
+    for folder_path, next_number in image_counters.items():
+        crud.set_gallery_counter(db, "folder", folder_path, "next_image_number", next_number)
+
+    entities = db[GALLERIES].aggregate([
+        {"$match": {"category_type": {"$ne": None}, "entity_name": {"$ne": None}}},
+        {"$group": {"_id": {"category_type": "$category_type", "entity_name": "$entity_name"}}}
+    ])
+    gallery_counters = 0
+    for entity in entities:
+        category_type, entity_name = entity["_id"]["category_type"], entity["_id"]["entity_name"]
+        crud.set_gallery_counter(
+            db, "entity", f"{category_type}/{entity_name}", "next_gallery_number",
+            crud.scan_next_gallery_number(db, category_type, entity_name)
+        )
+        gallery_counters += 1
+
+    print(f"✅ Rebuilt {len(image_counters)} image counters and {gallery_counters} gallery counters")
+    return {"image_counters": len(image_counters), "gallery_counters": gallery_counters}
+
+
+if __name__ == "__main__":
+    from database import db
+    from s3_service import s3_service
+
+    s3_service.ensure_current(db)
+    rebuild_counters(db)
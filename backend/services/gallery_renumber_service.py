@@ -0,0 +1,216 @@
+"""
+Gallery Renumber Service
+Renumbers the images in a gallery folder to 1..N as a background job.
+Moves are planned as a permutation and applied in two phases: every moving
+object (and its responsive variants) is copied to a temporary key, then to its
+final key. No copy can overwrite an image that has not moved yet. Copies run
+in parallel and deletes are batched. The folder's image counter is reset to
+N + 1 only if nothing reserved a number while the job ran.
+"""
+
+import asyncio
+import os
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import crud
+from database import db
+from models.mongodb_collections import RENUMBER_JOBS
+
+RENUMBER_CONCURRENCY = int(os.environ.get("RENUMBER_CONCURRENCY", "16"))
+PROGRESS_EVERY = 10  # copies between progress writes
+
+ORIGINAL_PATTERN = re.compile(r"^(\d+)\.([a-zA-Z]+)$")
+VARIANT_PATTERN = re.compile(r"^(\d+)_([a-z0-9]+)\.([a-zA-Z]+)$")
+
+
+def plan_renumber(filenames: List[str]) -> List[Tuple[str, str]]:
+    """
+    Map the numbered images in a folder onto 1..N, keeping their order.
+    Returns (old_name, new_name) for every file that moves, including
+    variants such as 3_card.webp that follow their original.
+    """
+    originals = sorted(
+        (int(match.group(1)), name, match.group(2))
+        for name in filenames
+        for match in [ORIGINAL_PATTERN.match(name)] if match
+    )
+
+    moves = []
+    new_numbers = {}
+    for index, (number, name, extension) in enumerate(originals, start=1):
+        new_numbers.setdefault(number, index)
+        if number != index:
+            moves.append((name, f"{index}.{extension}"))
+
+    for name in filenames:
+        match = VARIANT_PATTERN.match(name)
+        if not match:
+            continue
+        number = int(match.group(1))
+        if number in new_numbers and new_numbers[number] != number:
+            moves.append((name, f"{new_numbers[number]}_{match.group(2)}.{match.group(3)}"))
+
+    return moves
+
+
+class GalleryRenumberService:
+    """Runs renumber jobs in the background and records their progress"""
+
+    def __init__(self):
+        self._tasks = set()
+
+    def start(self, folder_path: str) -> Dict:
+        """Queue a renumber job for a folder and return it immediately"""
+        job = {
+            "id": str(uuid.uuid4()),
+            "folder_path": folder_path,
+            "status": "queued",
+            "phase": None,
+            "completed_steps": 0,
+            "total_steps": 0,
+            "total_images": 0,
+            "renamed_count": 0,
+            "error": None,
+            "created_at": datetime.now(timezone.utc),
+            "updated_at": datetime.now(timezone.utc),
+        }
+        db[RENUMBER_JOBS].insert_one(job)
+        job.pop("_id", None)
+
+        task = asyncio.get_running_loop().create_task(self._run(job["id"], folder_path))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        return db[RENUMBER_JOBS].find_one({"id": job_id}, {"_id": 0})
+
+    def _read_counter(self, folder_path: str):
+        """Image counter before planning; numbers reserved after this must not be handed out again"""
+        return crud.read_gallery_counter(db, "folder", folder_path, "next_image_number")
+
+    def _reset_counter(self, folder_path: str, counter_before, total_images: int):
+        """Point the counter after the renumbered images unless it moved while the job ran"""
+        if not crud.reset_gallery_counter(db, "folder", folder_path, "next_image_number", total_images + 1, counter_before):
+            print(f"ℹ️ Image counter for {folder_path} moved during renumber, leaving it as is")
+
+    def _update(self, job_id: str, **fields):
+        db[RENUMBER_JOBS].update_one(
+            {"id": job_id},
+            {"$set": {**fields, "updated_at": datetime.now(timezone.utc)}}
+        )
+
+    async def _run(self, job_id: str, folder_path: str):
+        from s3_service import s3_service
+
+        try:
+            if s3_service.is_enabled():
+                await self._run_s3(job_id, folder_path)
+            else:
+                await asyncio.to_thread(self._run_local, job_id, folder_path)
+        except Exception as e:
+            print(f"❌ Renumber job {job_id} for {folder_path} failed: {e}")
+            self._update(job_id, status="failed", error=str(e))
+
+    async def _copy_all(self, job_id: str, pairs: List[Tuple[str, str]], progress: Dict):
+        from s3_service import s3_service
+
+        semaphore = asyncio.Semaphore(RENUMBER_CONCURRENCY)
+
+        async def copy(source: str, dest: str):
+            async with semaphore:
+                if not await s3_service.run_in_pool(s3_service.copy_object, source, dest):
+                    raise RuntimeError(f"Failed to copy {source} to {dest}")
+            progress["completed"] += 1
+            if progress["completed"] % PROGRESS_EVERY == 0:
+                self._update(job_id, completed_steps=progress["completed"])
+
+        await asyncio.gather(*(copy(source, dest) for source, dest in pairs))
+        self._update(job_id, completed_steps=progress["completed"])
+
+    async def _run_s3(self, job_id: str, folder_path: str):
+        from s3_service import s3_service
+
+        galleries_root = s3_service.config.get("galleries_root_folder", "galleries")
+        prefix = f"{galleries_root}/{folder_path}/"
+        counter_before = self._read_counter(folder_path)
+        objects = await s3_service.run_in_pool(s3_service.list_objects, prefix)
+        names = [obj["Key"][len(prefix):] for obj in objects if "/" not in obj["Key"][len(prefix):]]
+
+        moves = plan_renumber(names)
+        total_images = sum(1 for name in names if ORIGINAL_PATTERN.match(name))
+        self._update(
+            job_id,
+            status="running",
+            total_images=total_images,
+            total_steps=len(moves) * 2,
+            renamed_count=sum(1 for old, _ in moves if ORIGINAL_PATTERN.match(old))
+        )
+        if not moves:
+            self._reset_counter(folder_path, counter_before, total_images)
+            self._update(job_id, status="completed", phase="done")
+            return
+
+        temp_prefix = f"{prefix}.renumber-{job_id[:8]}/"
+        progress = {"completed": 0}
+
+        # Phase 1: copy every moving object aside; originals stay until all copies succeed
+        self._update(job_id, phase="copy_to_temp")
+        try:
+            await self._copy_all(job_id, [(prefix + old, temp_prefix + new) for old, new in moves], progress)
+        except Exception:
+            await s3_service.run_in_pool(s3_service.delete_objects, [temp_prefix + new for _, new in moves])
+            raise
+        await s3_service.run_in_pool(s3_service.delete_objects, [prefix + old for old, _ in moves])
+
+        # Phase 2: temp keys to final keys. On failure the temp copies are kept for recovery.
+        self._update(job_id, phase="copy_to_final", temp_prefix=temp_prefix)
+        await self._copy_all(job_id, [(temp_prefix + new, prefix + new) for _, new in moves], progress)
+        await s3_service.run_in_pool(s3_service.delete_objects, [temp_prefix + new for _, new in moves])
+
+        # Point galleries, articles and the media index at the new URLs
+        self._update(job_id, phase="update_references")
+        renames = [
+            (s3_service.build_url(prefix + old), s3_service.build_url(prefix + new), prefix + new)
+            for old, new in moves
+        ]
+        await asyncio.to_thread(crud.rename_image_urls, db, renames, folder_path)
+        self._reset_counter(folder_path, counter_before, total_images)
+
+        self._update(job_id, status="completed", phase="done", temp_prefix=None)
+        print(f"✅ Renumbered {len(moves)} objects in {prefix}")
+
+    def _run_local(self, job_id: str, folder_path: str):
+        local_path = f"/app/frontend/public/uploads/galleries/{folder_path}"
+        if not os.path.exists(local_path):
+            raise FileNotFoundError("Gallery folder not found")
+
+        counter_before = self._read_counter(folder_path)
+        names = [name for name in os.listdir(local_path) if os.path.isfile(os.path.join(local_path, name))]
+        moves = plan_renumber(names)
+        total_images = sum(1 for name in names if ORIGINAL_PATTERN.match(name))
+        self._update(
+            job_id,
+            status="running",
+            total_images=total_images,
+            total_steps=len(moves) * 2,
+            renamed_count=sum(1 for old, _ in moves if ORIGINAL_PATTERN.match(old))
+        )
+
+        temp_dir = os.path.join(local_path, f".renumber-{job_id[:8]}")
+        os.makedirs(temp_dir, exist_ok=True)
+        for old, new in moves:
+            os.rename(os.path.join(local_path, old), os.path.join(temp_dir, new))
+        for _, new in moves:
+            os.rename(os.path.join(temp_dir, new), os.path.join(local_path, new))
+        os.rmdir(temp_dir)
+        self._reset_counter(folder_path, counter_before, total_images)
+
+        self._update(job_id, status="completed", phase="done", completed_steps=len(moves) * 2)
+
+
+# Singleton instance
+gallery_renumber_service = GalleryRenumberService()
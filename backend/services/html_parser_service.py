@@ -0,0 +1,82 @@
+"""
+HTML Parser Service
+One place to build BeautifulSoup trees for the scrapers. The tree builder is
+pluggable (HTML_PARSER_BACKEND): html.parser by default, or lxml, which builds
+trees several times faster. lxml stays opt-in until the parser corpus in
+tests/html_corpus holds recorded real pages showing the site parsers extract
+the same fields with it; it falls back to html.parser when not installed.
+Site parsers keep the bs4 API either way.
+
+Large pages (IMDb and binged detail pages) are parsed in a process pool so a
+scraper run does not hold the event loop while building and walking trees.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from bs4 import BeautifulSoup
+
+HTML_PARSE_POOL_MIN_BYTES = int(os.environ.get("HTML_PARSE_POOL_MIN_BYTES", str(256 * 1024)))
+HTML_PARSE_WORKERS = int(os.environ.get("HTML_PARSE_WORKERS", "2"))
+
+BACKENDS = ("lxml", "html.parser")
+
+
+def _available(backend: str) -> bool:
+    if backend == "lxml":
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            return False
+    return backend in BACKENDS
+
+
+def default_backend() -> str:
+    configured = os.environ.get("HTML_PARSER_BACKEND", "html.parser")
+    if _available(configured):
+        return configured
+    return "html.parser"
+
+
+HTML_PARSER_BACKEND = default_backend()
+
+
+def make_soup(html, backend: Optional[str] = None) -> BeautifulSoup:
+    """BeautifulSoup tree of html (str or bytes) using the configured backend"""
+    return BeautifulSoup(html, backend or HTML_PARSER_BACKEND)
+
+
+class HtmlParserService:
+    """Runs page parsers inline for small pages and in a worker pool for large ones"""
+
+    def __init__(self, max_workers: int = HTML_PARSE_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def parse(self, parser: Callable[..., Any], html: str, *args) -> Any:
+        """
+        parser(html, *args) -> result. The parser and its arguments must be
+        picklable (a module function or a method of a scraper singleton) and
+        should build its tree with make_soup.
+        """
+        if self.max_workers <= 0 or len(html) < HTML_PARSE_POOL_MIN_BYTES:
+            return parser(html, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), parser, html, *args)
+
+    def shutdown(self):
+        """Stop the worker pool (called on application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+html_parser_service = HtmlParserService()
@@ -0,0 +1,178 @@
+"""
+HTTP Client Service
+Process-wide pooled httpx clients for scrapers and agents. Each profile
+(browser pages, feeds, JSON APIs, images) gets one long-lived client per event loop
+with keep-alive, HTTP/2 where the h2 package is installed, and shared
+limits and timeouts, so repeated calls reuse connections instead of paying
+a new TLS handshake each time. Every request is timed per host.
+Clients are closed from the application lifespan.
+"""
+
+import asyncio
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+import httpx
+
+# Tuning (override via environment)
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+BROWSER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+try:
+    import h2  # noqa: F401 - httpx needs it for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+PROFILES = {
+    # Web pages: listing pages, articles, galleries
+    "default": {
+        "headers": {
+            "User-Agent": BROWSER_USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+        },
+        "timeout": httpx.Timeout(30.0, connect=10.0),
+    },
+    # RSS/Atom feeds
+    "feed": {
+        "headers": {
+            "User-Agent": BROWSER_USER_AGENT,
+            "Accept": "application/rss+xml,application/atom+xml,application/xml;q=0.9,*/*;q=0.8",
+        },
+        "timeout": httpx.Timeout(20.0, connect=10.0),
+    },
+    # JSON APIs
+    "api": {
+        "headers": {"User-Agent": BROWSER_USER_AGENT, "Accept": "application/json"},
+        "timeout": httpx.Timeout(30.0, connect=10.0),
+    },
+    # Image downloads for the gallery and Tadka Pics agents
+    "image": {
+        "headers": {
+            "User-Agent": BROWSER_USER_AGENT,
+            "Accept": "image/avif,image/webp,image/png,image/jpeg,image/*;q=0.8,*/*;q=0.5",
+        },
+        "timeout": httpx.Timeout(30.0, connect=10.0),
+    },
+}
+
+
+class _HostStats:
+    __slots__ = ("requests", "errors", "total_seconds", "max_seconds", "statuses")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.statuses: Dict[int, int] = {}
+
+    def as_dict(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_ms": round(1000 * self.total_seconds / self.requests, 1) if self.requests else 0.0,
+            "max_ms": round(1000 * self.max_seconds, 1),
+            "statuses": dict(self.statuses),
+        }
+
+
+class _TimedTransport(httpx.AsyncBaseTransport):
+    """Records time to response headers (each redirect hop separately) per host"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, stats: Dict[str, _HostStats]):
+        self.transport = transport
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        stats = self.stats.setdefault(host, _HostStats())
+        start = time.monotonic()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception:
+            stats.errors += 1
+            raise
+        elapsed = time.monotonic() - start
+        stats.requests += 1
+        stats.total_seconds += elapsed
+        stats.max_seconds = max(stats.max_seconds, elapsed)
+        stats.statuses[response.status_code] = stats.statuses.get(response.status_code, 0) + 1
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class HttpClientService:
+    """Long-lived pooled clients, one per profile and event loop"""
+
+    def __init__(self):
+        self._clients = weakref.WeakKeyDictionary()  # loop -> {profile: client}
+        self.host_stats: Dict[str, _HostStats] = {}
+
+    def client(self, profile: str = "default") -> httpx.AsyncClient:
+        """Shared client for a profile; do not close it"""
+        clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        client = clients.get(profile)
+        if client is None or client.is_closed:
+            client = clients[profile] = self._create(profile)
+        return client
+
+    @asynccontextmanager
+    async def session(self, profile: str = "default"):
+        """`async with` form of client(); leaves the shared client open"""
+        yield self.client(profile)
+
+    async def get_text(self, url: str, profile: str = "default", **kwargs) -> Optional[str]:
+        """Body of a successful GET as text, or None (drop-in for trafilatura.fetch_url)"""
+        try:
+            response = await self.client(profile).get(url, **kwargs)
+        except httpx.HTTPError as e:
+            print(f"❌ GET {url} failed: {e}")
+            return None
+        if response.status_code != 200:
+            print(f"❌ GET {url} returned {response.status_code}")
+            return None
+        return response.text
+
+    def _create(self, profile: str) -> httpx.AsyncClient:
+        settings = PROFILES[profile]
+        limits = httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        )
+        transport = httpx.AsyncHTTPTransport(http2=HTTP2_AVAILABLE, limits=limits, retries=1)
+        return httpx.AsyncClient(
+            transport=_TimedTransport(transport, self.host_stats),
+            headers=settings["headers"],
+            timeout=settings["timeout"],
+            follow_redirects=True
+        )
+
+    async def aclose(self):
+        """Close the clients of the current event loop (application shutdown)"""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+    def get_metrics(self) -> Dict:
+        """Per-host request counts, errors and latency to response headers (this worker)"""
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "profiles": sorted(PROFILES),
+            "open_clients": sum(len(clients) for clients in self._clients.values()),
+            "hosts": {host: stats.as_dict() for host, stats in sorted(self.host_stats.items())},
+        }
+
+
+# Singleton instance
+http_client_service = HttpClientService()
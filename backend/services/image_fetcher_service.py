@@ -0,0 +1,217 @@
+"""
+Image Fetcher Service
+Shared downloader for agents that pull images from third-party pages.
+Fetches run concurrently with per-host limits over the shared "image"
+client of http_client_service (HTTP/2, per-host latency metrics). Each
+response is checked (headers, then the first bytes) before the body is read,
+and accepted bodies are streamed straight to temp files. Every run has a
+byte budget and a time budget.
+"""
+
+import asyncio
+import os
+import random
+import time
+import weakref
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import aiofiles
+import httpx
+
+from services.http_client_service import http_client_service
+from services.media_asset_service import sniff_content_type
+
+# Tuning (override via environment)
+IMAGE_FETCH_CONCURRENCY = int(os.environ.get("IMAGE_FETCH_CONCURRENCY", "12"))
+IMAGE_FETCH_PER_HOST = int(os.environ.get("IMAGE_FETCH_PER_HOST", "4"))
+IMAGE_FETCH_RETRIES = int(os.environ.get("IMAGE_FETCH_RETRIES", "2"))
+IMAGE_FETCH_MAX_IMAGE_MB = int(os.environ.get("IMAGE_FETCH_MAX_IMAGE_MB", "25"))
+IMAGE_FETCH_RUN_BUDGET_MB = int(os.environ.get("IMAGE_FETCH_RUN_BUDGET_MB", "500"))
+IMAGE_FETCH_RUN_BUDGET_SECONDS = float(os.environ.get("IMAGE_FETCH_RUN_BUDGET_SECONDS", "180"))
+
+CHUNK_SIZE = 64 * 1024
+SNIFF_BYTES = 64
+
+# Headers that do not say anything useful about the body; the magic-byte sniff decides
+GENERIC_CONTENT_TYPES = {"", "application/octet-stream", "binary/octet-stream"}
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+    "image/avif": ".avif",
+}
+
+
+class FetchBudget:
+    """Byte and wall-clock limits shared by all fetches of one agent run"""
+
+    def __init__(self, max_bytes: int = None, max_seconds: float = None):
+        self.max_bytes = max_bytes if max_bytes is not None else IMAGE_FETCH_RUN_BUDGET_MB * 1024 * 1024
+        self.deadline = time.monotonic() + (max_seconds if max_seconds is not None else IMAGE_FETCH_RUN_BUDGET_SECONDS)
+        self.bytes_used = 0
+
+    def exhausted(self) -> bool:
+        return self.bytes_used >= self.max_bytes or time.monotonic() >= self.deadline
+
+    def remaining_seconds(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+
+class _Rejected(Exception):
+    """The response is not an acceptable image; not retried"""
+
+
+class _RetryableStatus(Exception):
+    """Throttled or server error; retried, honouring Retry-After"""
+
+    def __init__(self, response: httpx.Response):
+        super().__init__(f"status {response.status_code}")
+        retry_after = response.headers.get("retry-after", "")
+        self.retry_after = float(retry_after) if retry_after.isdigit() else None
+
+
+class _LoopState:
+    """Semaphores are bound to one event loop"""
+
+    def __init__(self):
+        self.concurrency = asyncio.Semaphore(IMAGE_FETCH_CONCURRENCY)
+        self.hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def host_semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self.hosts:
+            self.hosts[host] = asyncio.Semaphore(IMAGE_FETCH_PER_HOST)
+        return self.hosts[host]
+
+
+class ImageFetcherService:
+    """Concurrent, budgeted image downloader"""
+
+    def __init__(self):
+        self._states = weakref.WeakKeyDictionary()
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = _LoopState()
+            self._states[loop] = state
+        return state
+
+    async def fetch_many(
+        self,
+        urls: List[str],
+        temp_dir: str,
+        min_size: int = 0,
+        budget: Optional[FetchBudget] = None
+    ) -> List[Optional[Dict]]:
+        """
+        Download urls into temp_dir concurrently.
+        Returns one entry per url in the same order, None for skipped or failed
+        images. Otherwise: {'local_path', 'size', 'content_type', 'ext', 'original_url'}.
+        """
+        budget = budget or FetchBudget()
+        return await asyncio.gather(*(
+            self._fetch(url, os.path.join(temp_dir, f"fetch_{index:03d}"), min_size, budget)
+            for index, url in enumerate(urls)
+        ))
+
+    async def _fetch(self, url: str, path_base: str, min_size: int, budget: FetchBudget) -> Optional[Dict]:
+        state = self._state()
+        host = urlparse(url).netloc.lower()
+
+        async with state.concurrency, state.host_semaphore(host):
+            for attempt in range(IMAGE_FETCH_RETRIES + 1):
+                if budget.exhausted():
+                    print(f"⏭️ Fetch budget exhausted, skipping: {url[:80]}")
+                    return None
+                try:
+                    return await asyncio.wait_for(
+                        self._download(http_client_service.client("image"), url, path_base, min_size, budget),
+                        timeout=budget.remaining_seconds()
+                    )
+                except _Rejected as e:
+                    print(f"⏭️ Skipping {url[:80]}: {e}")
+                    return None
+                except asyncio.TimeoutError:
+                    print(f"⏭️ Fetch time budget reached while downloading: {url[:80]}")
+                    return None
+                except (httpx.TransportError, _RetryableStatus) as e:
+                    if attempt >= IMAGE_FETCH_RETRIES:
+                        print(f"❌ Error downloading {url[:80]} after {attempt + 1} attempt(s): {e}")
+                        return None
+                    delay = getattr(e, "retry_after", None) or (0.5 * 2 ** attempt + random.uniform(0, 0.5))
+                    await asyncio.sleep(min(delay, 10.0, budget.remaining_seconds()))
+                except Exception as e:
+                    print(f"❌ Error downloading {url[:80]}: {e}")
+                    return None
+        return None
+
+    async def _download(self, client: httpx.AsyncClient, url: str, path_base: str, min_size: int, budget: FetchBudget) -> Dict:
+        max_bytes = IMAGE_FETCH_MAX_IMAGE_MB * 1024 * 1024
+
+        async with client.stream("GET", url) as response:
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise _RetryableStatus(response)
+            if response.status_code != 200:
+                raise _Rejected(f"status {response.status_code}")
+
+            # Reject from headers before any body bytes are read
+            header_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+            if header_type not in GENERIC_CONTENT_TYPES and not header_type.startswith("image/"):
+                raise _Rejected(f"content-type {header_type}")
+            content_length = response.headers.get("content-length")
+            if content_length and content_length.isdigit():
+                if int(content_length) < min_size:
+                    raise _Rejected(f"small image ({content_length} bytes < {min_size}), likely placeholder")
+                if int(content_length) > max_bytes:
+                    raise _Rejected(f"image larger than {IMAGE_FETCH_MAX_IMAGE_MB}MB")
+
+            chunks = response.aiter_bytes(CHUNK_SIZE)
+            head = b""
+            async for chunk in chunks:
+                head += chunk
+                if len(head) >= SNIFF_BYTES:
+                    break
+
+            content_type = sniff_content_type(head[:SNIFF_BYTES])
+            if not content_type or content_type not in EXTENSIONS:
+                raise _Rejected(f"not a supported image ({content_type or 'unknown format'})")
+
+            path = path_base + EXTENSIONS[content_type]
+            size = len(head)
+            budget.bytes_used += len(head)
+            try:
+                async with aiofiles.open(path, "wb") as out:
+                    await out.write(head)
+                    async for chunk in chunks:
+                        size += len(chunk)
+                        budget.bytes_used += len(chunk)
+                        if size > max_bytes:
+                            raise _Rejected(f"image larger than {IMAGE_FETCH_MAX_IMAGE_MB}MB")
+                        if budget.bytes_used > budget.max_bytes:
+                            raise _Rejected("run byte budget exhausted")
+                        await out.write(chunk)
+            except BaseException:
+                if os.path.exists(path):
+                    os.remove(path)
+                raise
+
+        if size < min_size:
+            os.remove(path)
+            raise _Rejected(f"small image ({size} bytes < {min_size}), likely placeholder")
+
+        return {
+            "local_path": path,
+            "size": size,
+            "content_type": content_type,
+            "ext": EXTENSIONS[content_type],
+            "original_url": url,
+        }
+
+
+# Singleton instance
+image_fetcher_service = ImageFetcherService()
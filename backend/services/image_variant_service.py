@@ -0,0 +1,233 @@
+"""
+Image Variant Service
+Builds responsive derivatives (thumb, card, hero, full) of uploaded images in a
+process pool and stores them next to the original on S3 or local uploads/
+"""
+
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+UPLOAD_DIR = Path(__file__).parent.parent / "uploads"
+
+# Variant name -> max width in pixels. Override with
+# IMAGE_VARIANT_SIZES="thumb:150,card:300,hero:800,full:1600"
+DEFAULT_VARIANT_SIZES = {
+    "thumb": 150,
+    "card": 300,
+    "hero": 800,
+    "full": 1600,
+}
+
+# Output formats in order of preference. Override with IMAGE_VARIANT_FORMATS="avif,webp,jpeg";
+# avif is only produced when the installed Pillow has an AVIF encoder.
+DEFAULT_VARIANT_FORMATS = ["webp", "jpeg"]
+
+FORMAT_SETTINGS = {
+    "jpeg": {"ext": "jpg", "content_type": "image/jpeg", "save": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True}},
+    "webp": {"ext": "webp", "content_type": "image/webp", "save": {"format": "WEBP", "quality": 80, "method": 4}},
+    "avif": {"ext": "avif", "content_type": "image/avif", "save": {"format": "AVIF", "quality": 60}},
+}
+
+# Formats Pillow cannot meaningfully resize (animations, vectors) are stored as originals only
+SKIPPED_CONTENT_TYPES = {"image/gif", "image/svg+xml"}
+
+
+def _parse_variant_sizes(value: Optional[str]) -> Dict[str, int]:
+    if not value:
+        return dict(DEFAULT_VARIANT_SIZES)
+    sizes = {}
+    for item in value.split(","):
+        name, _, width = item.partition(":")
+        if name.strip() and width.strip().isdigit():
+            sizes[name.strip()] = int(width)
+    return sizes or dict(DEFAULT_VARIANT_SIZES)
+
+
+def _parse_variant_formats(value: Optional[str]) -> List[str]:
+    if not value:
+        return list(DEFAULT_VARIANT_FORMATS)
+    formats = [f.strip().lower() for f in value.split(",") if f.strip().lower() in FORMAT_SETTINGS]
+    return formats or list(DEFAULT_VARIANT_FORMATS)
+
+
+def build_variants(image_source: Union[bytes, str], sizes: Dict[str, int], formats: List[str]) -> Dict:
+    """
+    Decode an image (bytes or a file path) once and encode every size/format combination.
+    Runs inside a worker process, so it only takes and returns plain data.
+    Output images carry no EXIF/metadata; orientation is baked in first.
+    """
+    from PIL import Image, ImageOps, features
+
+    if "avif" in formats and not features.check("avif"):
+        formats = [f for f in formats if f != "avif"]
+
+    with Image.open(io.BytesIO(image_source) if isinstance(image_source, bytes) else image_source) as source:
+        original_width, original_height = source.size
+        if source.getexif().get(0x0112) in (5, 6, 7, 8):
+            original_width, original_height = original_height, original_width
+
+        # Let the JPEG decoder downscale while decoding when the original is far larger than needed
+        largest = max(sizes.values())
+        source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source)
+
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+        variants = []
+        seen_widths = set()
+        # Largest first so smaller variants are resampled from an already reduced image
+        for name, max_width in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+            width = min(max_width, image.width)
+            if width in seen_widths:
+                continue
+            seen_widths.add(width)
+
+            height = max(1, round(image.height * width / image.width))
+            if width != image.width:
+                image = image.resize((width, height), Image.LANCZOS)
+
+            for fmt in formats:
+                settings = FORMAT_SETTINGS[fmt]
+                output = image
+                if fmt == "jpeg" and image.mode == "RGBA":
+                    output = Image.new("RGB", image.size, (255, 255, 255))
+                    output.paste(image, mask=image.split()[-1])
+
+                buffer = io.BytesIO()
+                output.save(buffer, **settings["save"])
+                variants.append({
+                    "name": name,
+                    "width": width,
+                    "height": height,
+                    "format": fmt,
+                    "ext": settings["ext"],
+                    "content_type": settings["content_type"],
+                    "data": buffer.getvalue(),
+                })
+
+    return {"width": original_width, "height": original_height, "variants": variants}
+
+
+def build_srcset_manifest(original_url: str, width: int, height: int, variants: List[Dict]) -> Dict:
+    """Build the manifest stored alongside articles and gallery images"""
+    srcset = {}
+    for variant in sorted(variants, key=lambda v: v["width"]):
+        srcset.setdefault(variant["format"], []).append(f"{variant['url']} {variant['width']}w")
+
+    return {
+        "original": original_url,
+        "width": width,
+        "height": height,
+        "variants": [
+            {k: variant[k] for k in ("name", "width", "height", "format", "url")}
+            for variant in variants
+        ],
+        "srcset": {fmt: ", ".join(entries) for fmt, entries in srcset.items()},
+    }
+
+
+class ImageVariantService:
+    """Generates and stores responsive image variants off the request path"""
+
+    def __init__(self):
+        self.sizes = _parse_variant_sizes(os.environ.get("IMAGE_VARIANT_SIZES"))
+        self.formats = _parse_variant_formats(os.environ.get("IMAGE_VARIANT_FORMATS"))
+        self.max_workers = int(os.environ.get("IMAGE_VARIANT_WORKERS", "2"))
+        self._executor = None
+        self._pending = set()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self):
+        """Stop the worker pool (called on application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @staticmethod
+    def supports(content_type: Optional[str]) -> bool:
+        return bool(content_type) and content_type.startswith("image/") and content_type not in SKIPPED_CONTENT_TYPES
+
+    @staticmethod
+    def variant_key(original_key: str, name: str, ext: str) -> str:
+        """articles/2025/12/05/123_ab.png -> articles/2025/12/05/123_ab_card.webp"""
+        base, _ = os.path.splitext(original_key)
+        return f"{base}_{name}.{ext}"
+
+    async def _store_variant(self, key: str, data: bytes, content_type: str) -> Optional[str]:
+        from s3_service import s3_service
+
+        if s3_service.is_enabled():
+            return await s3_service.upload_file_async(data, key, content_type)
+
+        local_path = UPLOAD_DIR / key
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(local_path.write_bytes, data)
+        return f"/uploads/{key}"
+
+    async def create_variants(self, image_source: Union[bytes, str], original_key: str, original_url: str) -> Optional[Dict]:
+        """
+        Build, store and register variants for an image already stored under original_key.
+        image_source is the image bytes or a path the worker process can read.
+        Returns the srcset manifest, or None if the image could not be processed.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._get_executor(), build_variants, image_source, self.sizes, self.formats)
+        except Exception as e:
+            print(f"⚠️ Image variant generation failed for {original_key}: {e}")
+            return None
+
+        # Variants upload in parallel on the shared S3 transfer pool
+        urls = await asyncio.gather(*(
+            self._store_variant(
+                self.variant_key(original_key, variant["name"], variant["ext"]),
+                variant["data"],
+                variant["content_type"]
+            )
+            for variant in result["variants"]
+        ))
+        stored = [{**variant, "url": url} for variant, url in zip(result["variants"], urls) if url]
+
+        if not stored:
+            return None
+
+        manifest = build_srcset_manifest(original_url, result["width"], result["height"], stored)
+        self._record_manifest(original_url, manifest)
+        print(f"🖼️ Stored {len(stored)} variants for {original_key}")
+        return manifest
+
+    def _record_manifest(self, original_url: str, manifest: Dict):
+        """Persist the manifest and attach it to any article already using this image"""
+        from database import db
+        from models.mongodb_collections import IMAGE_VARIANTS, ARTICLES
+
+        db[IMAGE_VARIANTS].update_one(
+            {"original_url": original_url},
+            {"$set": {**manifest, "original_url": original_url, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        db[ARTICLES].update_many({"image": original_url}, {"$set": {"image_variants": manifest}})
+
+    def schedule(self, image_source: Union[bytes, str], original_key: str, original_url: str, content_type: Optional[str] = None):
+        """Queue variant generation in the background and return the task (None if unsupported)"""
+        if content_type and not self.supports(content_type):
+            return None
+        task = asyncio.get_running_loop().create_task(self.create_variants(image_source, original_key, original_url))
+        # Keep a reference until done so the task is not garbage collected mid-flight
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+
+
+# Singleton instance
+image_variant_service = ImageVariantService()
@@ -3,12 +3,17 @@ IMDb Scraper Service
 Scrapes theater release information from IMDb for Indian movies
 """
 
+import os
 import re
-import httpx
-from bs4 import BeautifulSoup
+from services.bulk_worker_pool import run_bounded
+from services.domain_throttle import domain_throttle
+from services.http_client_service import http_client_service
+from services.html_parser_service import html_parser_service, make_soup
 from typing import List, Dict, Optional
 from datetime import datetime
 
+DETAIL_PARALLELISM = int(os.environ.get("IMDB_DETAIL_PARALLELISM", "4"))
+
 
 class IMDbScraperService:
     """Service to scrape movie release data from IMDb"""
@@ -101,16 +106,17 @@ class IMDbScraperService:
         releases = []
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+            async with http_client_service.session() as client:
                 print(f"   📄 Fetching IMDb calendar: {url}")
                 
-                response = await client.get(url, headers=self.headers)
+                async with domain_throttle.slot(url):
+                    response = await client.get(url, headers=self.headers)
                 
                 if response.status_code != 200:
                     print(f"   ❌ Failed to fetch: HTTP {response.status_code}")
                     return releases
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = make_soup(response.text)
                 
                 date_pattern = r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2},\s+\d{4}'
                 seen_ids = set()
@@ -175,16 +181,17 @@ class IMDbScraperService:
         releases = []
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+            async with http_client_service.session() as client:
                 print(f"   📄 Fetching IMDb search: {url}")
                 
-                response = await client.get(url, headers=self.headers)
+                async with domain_throttle.slot(url):
+                    response = await client.get(url, headers=self.headers)
                 
                 if response.status_code != 200:
                     print(f"   ❌ Failed to fetch: HTTP {response.status_code}")
                     return releases
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = make_soup(response.text)
                 
                 # Find movie entries - IMDb search results
                 movie_items = soup.find_all('a', href=re.compile(r'/title/tt\d+'))
@@ -235,294 +242,299 @@ class IMDbScraperService:
     async def fetch_movie_details(self, imdb_url: str, include_english: bool = True) -> Optional[Dict]:
         """Fetch detailed movie information from IMDb movie page"""
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(imdb_url, headers=self.headers)
+            async with http_client_service.session() as client:
+                async with domain_throttle.slot(imdb_url):
+                    response = await client.get(imdb_url, headers=self.headers)
                 
                 if response.status_code != 200:
                     print(f"      ❌ Failed to fetch details: HTTP {response.status_code}")
                     return None
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                html_str = str(soup)
-                
-                # Extract movie name from title tag or h1
-                movie_name = None
-                title_tag = soup.find('title')
-                if title_tag:
-                    title_text = title_tag.get_text(strip=True)
-                    # Remove " - IMDb" suffix
-                    movie_name = re.sub(r'\s*[-–]\s*IMDb.*$', '', title_text).strip()
-                    # Remove year in parentheses for cleaner title
-                    movie_name = re.sub(r'\s*\(\d{4}\)\s*$', '', movie_name).strip()
-                
-                if not movie_name:
-                    h1 = soup.find('h1')
-                    if h1:
-                        movie_name = h1.get_text(strip=True)
-                
-                # Extract year
-                year = None
-                year_match = re.search(r'\((\d{4})\)', html_str)
-                if year_match:
-                    year = int(year_match.group(1))
-                
-                # Extract release date - try multiple methods
-                release_date = None
-                date_pattern = r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{1,2},?\s+\d{4}'
-                
-                # Method 1: Look for "Release date" or "Releases" text
-                for search_text in ['Release date', 'Releases', 'Release Date']:
-                    release_info = soup.find(string=re.compile(search_text, re.I))
-                    if release_info:
-                        # Get parent and siblings to find the actual date
-                        parent = release_info.find_parent()
+            
+            return await html_parser_service.parse(self.parse_movie_details, response.text, imdb_url, include_english)
+            
+        except Exception as e:
+            print(f"      ❌ Error fetching movie details: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def parse_movie_details(self, html: str, imdb_url: str, include_english: bool = True) -> Optional[Dict]:
+        """Movie fields from an IMDb title page (run in the parse pool for large pages)"""
+        soup = make_soup(html)
+        html_str = str(soup)
+        
+        # Extract movie name from title tag or h1
+        movie_name = None
+        title_tag = soup.find('title')
+        if title_tag:
+            title_text = title_tag.get_text(strip=True)
+            # Remove " - IMDb" suffix
+            movie_name = re.sub(r'\s*[-–]\s*IMDb.*$', '', title_text).strip()
+            # Remove year in parentheses for cleaner title
+            movie_name = re.sub(r'\s*\(\d{4}\)\s*$', '', movie_name).strip()
+        
+        if not movie_name:
+            h1 = soup.find('h1')
+            if h1:
+                movie_name = h1.get_text(strip=True)
+        
+        # Extract year
+        year = None
+        year_match = re.search(r'\((\d{4})\)', html_str)
+        if year_match:
+            year = int(year_match.group(1))
+        
+        # Extract release date - try multiple methods
+        release_date = None
+        date_pattern = r'(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s+\d{1,2},?\s+\d{4}'
+        
+        # Method 1: Look for "Release date" or "Releases" text
+        for search_text in ['Release date', 'Releases', 'Release Date']:
+            release_info = soup.find(string=re.compile(search_text, re.I))
+            if release_info:
+                # Get parent and siblings to find the actual date
+                parent = release_info.find_parent()
+                if parent:
+                    # Search in parent and its parent for dates
+                    for _ in range(3):
                         if parent:
-                            # Search in parent and its parent for dates
-                            for _ in range(3):
-                                if parent:
-                                    parent_text = parent.get_text()
-                                    date_match = re.search(date_pattern, parent_text, re.I)
-                                    if date_match:
-                                        release_date = self._parse_date(date_match.group(0))
-                                        if release_date:
-                                            break
-                                    parent = parent.find_parent()
-                        if release_date:
-                            break
-                
-                # Method 2: Look for data-testid attribute for release date
-                if not release_date:
-                    release_containers = soup.find_all(['li', 'div', 'span'], {'data-testid': re.compile(r'release', re.I)})
-                    for container in release_containers:
-                        container_text = container.get_text()
-                        date_match = re.search(date_pattern, container_text, re.I)
-                        if date_match:
-                            release_date = self._parse_date(date_match.group(0))
-                            if release_date:
-                                break
-                
-                # Method 3: Look for "Coming soon" or upcoming section
-                if not release_date:
-                    upcoming_section = soup.find(string=re.compile(r'Coming soon|Upcoming|In theaters', re.I))
-                    if upcoming_section:
-                        parent = upcoming_section.find_parent()
+                            parent_text = parent.get_text()
+                            date_match = re.search(date_pattern, parent_text, re.I)
+                            if date_match:
+                                release_date = self._parse_date(date_match.group(0))
+                                if release_date:
+                                    break
+                            parent = parent.find_parent()
+                if release_date:
+                    break
+        
+        # Method 2: Look for data-testid attribute for release date
+        if not release_date:
+            release_containers = soup.find_all(['li', 'div', 'span'], {'data-testid': re.compile(r'release', re.I)})
+            for container in release_containers:
+                container_text = container.get_text()
+                date_match = re.search(date_pattern, container_text, re.I)
+                if date_match:
+                    release_date = self._parse_date(date_match.group(0))
+                    if release_date:
+                        break
+        
+        # Method 3: Look for "Coming soon" or upcoming section
+        if not release_date:
+            upcoming_section = soup.find(string=re.compile(r'Coming soon|Upcoming|In theaters', re.I))
+            if upcoming_section:
+                parent = upcoming_section.find_parent()
+                if parent:
+                    for _ in range(3):
                         if parent:
-                            for _ in range(3):
-                                if parent:
-                                    parent_text = parent.get_text()
-                                    date_match = re.search(date_pattern, parent_text, re.I)
-                                    if date_match:
-                                        release_date = self._parse_date(date_match.group(0))
-                                        if release_date:
-                                            break
-                                    parent = parent.find_parent()
-                
-                # Method 4: Search entire page for a release date near India/IN
-                if not release_date:
-                    # Look for dates near "India" text
-                    india_refs = soup.find_all(string=re.compile(r'\bIndia\b|\bIN\b', re.I))
-                    for ref in india_refs[:5]:
-                        parent = ref.find_parent()
+                            parent_text = parent.get_text()
+                            date_match = re.search(date_pattern, parent_text, re.I)
+                            if date_match:
+                                release_date = self._parse_date(date_match.group(0))
+                                if release_date:
+                                    break
+                            parent = parent.find_parent()
+        
+        # Method 4: Search entire page for a release date near India/IN
+        if not release_date:
+            # Look for dates near "India" text
+            india_refs = soup.find_all(string=re.compile(r'\bIndia\b|\bIN\b', re.I))
+            for ref in india_refs[:5]:
+                parent = ref.find_parent()
+                if parent:
+                    for _ in range(3):
                         if parent:
-                            for _ in range(3):
-                                if parent:
-                                    parent_text = parent.get_text()
-                                    date_match = re.search(date_pattern, parent_text, re.I)
-                                    if date_match:
-                                        release_date = self._parse_date(date_match.group(0))
-                                        if release_date:
-                                            break
-                                    parent = parent.find_parent()
-                        if release_date:
-                            break
-                
-                # If no release date found, try to get from year
-                if not release_date and year:
-                    release_date = f"{year}-01-01"
-                
-                # Extract languages - ONLY from specific language sections, not entire page
-                languages = []
-                
-                # Method 1: Look for chip elements that contain language names
-                # These are the most reliable - IMDb shows language chips near the title
-                known_languages = ['Malayalam', 'Telugu', 'Tamil', 'Hindi', 'Kannada', 'Bengali', 
-                                   'Marathi', 'Gujarati', 'Punjabi', 'Odia', 'English', 
-                                   'Korean', 'Japanese', 'Spanish', 'French', 'German', 'Chinese']
-                
-                chips = soup.find_all(['span', 'a'], class_=re.compile(r'chip|ipc-chip', re.I))
-                for chip in chips:
-                    chip_text = chip.get_text(strip=True)
-                    if chip_text in known_languages and chip_text not in languages:
-                        languages.append(chip_text)
-                
-                # Method 2: Look for language links in specific sections
-                if not languages:
-                    lang_section = soup.find(string=re.compile(r'^Languages?$', re.I))
-                    if lang_section:
-                        parent = lang_section.find_parent()
+                            parent_text = parent.get_text()
+                            date_match = re.search(date_pattern, parent_text, re.I)
+                            if date_match:
+                                release_date = self._parse_date(date_match.group(0))
+                                if release_date:
+                                    break
+                            parent = parent.find_parent()
+                if release_date:
+                    break
+        
+        # If no release date found, try to get from year
+        if not release_date and year:
+            release_date = f"{year}-01-01"
+        
+        # Extract languages - ONLY from specific language sections, not entire page
+        languages = []
+        
+        # Method 1: Look for chip elements that contain language names
+        # These are the most reliable - IMDb shows language chips near the title
+        known_languages = ['Malayalam', 'Telugu', 'Tamil', 'Hindi', 'Kannada', 'Bengali', 
+                           'Marathi', 'Gujarati', 'Punjabi', 'Odia', 'English', 
+                           'Korean', 'Japanese', 'Spanish', 'French', 'German', 'Chinese']
+        
+        chips = soup.find_all(['span', 'a'], class_=re.compile(r'chip|ipc-chip', re.I))
+        for chip in chips:
+            chip_text = chip.get_text(strip=True)
+            if chip_text in known_languages and chip_text not in languages:
+                languages.append(chip_text)
+        
+        # Method 2: Look for language links in specific sections
+        if not languages:
+            lang_section = soup.find(string=re.compile(r'^Languages?$', re.I))
+            if lang_section:
+                parent = lang_section.find_parent()
+                if parent:
+                    # Go up to find the container
+                    for _ in range(3):
                         if parent:
-                            # Go up to find the container
-                            for _ in range(3):
-                                if parent:
-                                    lang_links = parent.find_all('a', href=re.compile(r'/search/title.*language'))
-                                    for link in lang_links:
-                                        lang = link.get_text(strip=True)
-                                        if lang in known_languages and lang not in languages:
-                                            languages.append(lang)
-                                    if languages:
-                                        break
-                                    parent = parent.find_parent()
-                
-                # Method 3: Look in data-testid sections
-                if not languages:
-                    lang_containers = soup.find_all('li', {'data-testid': re.compile(r'language', re.I)})
-                    for container in lang_containers:
-                        links = container.find_all('a')
-                        for link in links:
-                            lang = link.get_text(strip=True)
-                            if lang in known_languages and lang not in languages:
-                                languages.append(lang)
-                
-                # Method 4: Check movie title for language hints (Indian films often have language in title)
-                if not languages and movie_name:
-                    title_lower = movie_name.lower()
-                    if 'telugu' in title_lower:
-                        languages = ['Telugu']
-                    elif 'tamil' in title_lower:
-                        languages = ['Tamil']
-                    elif 'malayalam' in title_lower:
-                        languages = ['Malayalam']
-                    elif 'kannada' in title_lower:
-                        languages = ['Kannada']
-                    elif 'hindi' in title_lower:
-                        languages = ['Hindi']
-                    elif 'bengali' in title_lower or 'bangla' in title_lower:
-                        languages = ['Bengali']
-                    elif 'marathi' in title_lower:
-                        languages = ['Marathi']
-                
-                # Filter English if needed
-                if not include_english and languages == ['English']:
-                    return None
-                
-                # Default to Hindi if no language found (Indian releases)
-                if not languages:
-                    languages = ['Hindi']
-                
-                # Extract genres - try multiple methods
-                genres = []
-                
-                # Method 1: Look for chip elements with genre text
-                chips = soup.find_all(['span', 'a'], class_=re.compile(r'chip|ipc-chip', re.I))
-                common_genres = ['Action', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 
-                                 'Documentary', 'Drama', 'Family', 'Fantasy', 'Horror', 'Musical',
-                                 'Mystery', 'Romance', 'Sci-Fi', 'Sport', 'Thriller', 'War', 'Western',
-                                 'History', 'Music', 'News', 'Reality-TV', 'Talk-Show']
-                for chip in chips:
-                    chip_text = chip.get_text(strip=True)
-                    if chip_text in common_genres and chip_text not in genres:
-                        genres.append(chip_text)
-                
-                # Method 2: Look for genre links
-                if not genres:
-                    genre_links = soup.find_all('a', href=re.compile(r'/search/title.*genres'))
-                    for link in genre_links:
-                        genre = link.get_text(strip=True)
-                        if genre and genre not in genres and len(genre) < 20 and genre.lower() not in ['imdb', 'menu']:
-                            genres.append(genre)
-                
-                # Method 3: Look in storyline section
-                if not genres:
-                    storyline = soup.find(['div', 'section'], {'data-testid': re.compile(r'storyline', re.I)})
-                    if storyline:
-                        for genre in common_genres:
-                            if re.search(rf'\b{genre}\b', storyline.get_text(), re.I) and genre not in genres:
-                                genres.append(genre)
-                
-                # Dedupe while preserving order
-                genres = list(dict.fromkeys(genres))
-                
-                # Extract director - try multiple methods
-                director = None
-                
-                # Method 1: Look for Director label
-                director_section = soup.find('li', {'data-testid': re.compile(r'director', re.I)})
-                if director_section:
-                    director_link = director_section.find('a', href=re.compile(r'/name/nm\d+'))
-                    if director_link:
-                        director = director_link.get_text(strip=True)
-                
-                # Method 2: Look for "Director" or "Directors" text
-                if not director:
-                    for text in ['Director', 'Directors']:
-                        director_label = soup.find(string=re.compile(rf'^{text}s?$', re.I))
-                        if director_label:
-                            parent = director_label.find_parent()
-                            if parent:
-                                # Go up a few levels to find the container
-                                for _ in range(3):
-                                    if parent.parent:
-                                        parent = parent.parent
-                                    director_link = parent.find('a', href=re.compile(r'/name/nm\d+'))
-                                    if director_link:
-                                        director = director_link.get_text(strip=True)
-                                        break
-                            if director:
+                            lang_links = parent.find_all('a', href=re.compile(r'/search/title.*language'))
+                            for link in lang_links:
+                                lang = link.get_text(strip=True)
+                                if lang in known_languages and lang not in languages:
+                                    languages.append(lang)
+                            if languages:
                                 break
-                
-                # Method 3: Look in credits section
-                if not director:
-                    credits = soup.find_all('a', href=re.compile(r'/name/nm\d+'))
-                    for credit in credits[:20]:
-                        # Check if this name appears near "Director" text
-                        parent = credit.find_parent()
-                        if parent and re.search(r'director', parent.get_text(), re.I):
-                            director = credit.get_text(strip=True)
-                            break
-                
-                # Extract cast
-                cast = []
-                cast_section = soup.find_all('a', href=re.compile(r'/name/nm\d+'))
-                for link in cast_section[:15]:  # Limit to first 15 names
-                    name = link.get_text(strip=True)
-                    if name and len(name) > 2 and name not in cast:
-                        # Skip if it's the director
-                        if name != director:
-                            cast.append(name)
-                    if len(cast) >= 10:
-                        break
-                
-                # Extract runtime
-                runtime = None
-                runtime_match = re.search(r'(\d+h\s*\d*m|\d+\s*min)', html_str, re.I)
-                if runtime_match:
-                    runtime = self._extract_runtime_minutes(runtime_match.group(1))
-                
-                # Extract IMDb ID
-                imdb_id = None
-                imdb_match = re.search(r'(tt\d+)', imdb_url)
-                if imdb_match:
-                    imdb_id = imdb_match.group(1)
-                
-                return {
-                    'movie_name': movie_name,
-                    'year': year,
-                    'release_date': release_date,
-                    'runtime': runtime,
-                    'genres': genres,
-                    'languages': languages,
-                    'original_language': languages[0] if languages else 'Hindi',
-                    'director': director,
-                    'cast': cast,
-                    'imdb_id': imdb_id,
-                    'source_url': imdb_url,
-                }
-                
-        except Exception as e:
-            print(f"      ❌ Error fetching movie details: {e}")
-            import traceback
-            traceback.print_exc()
+                            parent = parent.find_parent()
+        
+        # Method 3: Look in data-testid sections
+        if not languages:
+            lang_containers = soup.find_all('li', {'data-testid': re.compile(r'language', re.I)})
+            for container in lang_containers:
+                links = container.find_all('a')
+                for link in links:
+                    lang = link.get_text(strip=True)
+                    if lang in known_languages and lang not in languages:
+                        languages.append(lang)
+        
+        # Method 4: Check movie title for language hints (Indian films often have language in title)
+        if not languages and movie_name:
+            title_lower = movie_name.lower()
+            if 'telugu' in title_lower:
+                languages = ['Telugu']
+            elif 'tamil' in title_lower:
+                languages = ['Tamil']
+            elif 'malayalam' in title_lower:
+                languages = ['Malayalam']
+            elif 'kannada' in title_lower:
+                languages = ['Kannada']
+            elif 'hindi' in title_lower:
+                languages = ['Hindi']
+            elif 'bengali' in title_lower or 'bangla' in title_lower:
+                languages = ['Bengali']
+            elif 'marathi' in title_lower:
+                languages = ['Marathi']
+        
+        # Filter English if needed
+        if not include_english and languages == ['English']:
             return None
+        
+        # Default to Hindi if no language found (Indian releases)
+        if not languages:
+            languages = ['Hindi']
+        
+        # Extract genres - try multiple methods
+        genres = []
+        
+        # Method 1: Look for chip elements with genre text
+        chips = soup.find_all(['span', 'a'], class_=re.compile(r'chip|ipc-chip', re.I))
+        common_genres = ['Action', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 
+                         'Documentary', 'Drama', 'Family', 'Fantasy', 'Horror', 'Musical',
+                         'Mystery', 'Romance', 'Sci-Fi', 'Sport', 'Thriller', 'War', 'Western',
+                         'History', 'Music', 'News', 'Reality-TV', 'Talk-Show']
+        for chip in chips:
+            chip_text = chip.get_text(strip=True)
+            if chip_text in common_genres and chip_text not in genres:
+                genres.append(chip_text)
+        
+        # Method 2: Look for genre links
+        if not genres:
+            genre_links = soup.find_all('a', href=re.compile(r'/search/title.*genres'))
+            for link in genre_links:
+                genre = link.get_text(strip=True)
+                if genre and genre not in genres and len(genre) < 20 and genre.lower() not in ['imdb', 'menu']:
+                    genres.append(genre)
+        
+        # Method 3: Look in storyline section
+        if not genres:
+            storyline = soup.find(['div', 'section'], {'data-testid': re.compile(r'storyline', re.I)})
+            if storyline:
+                for genre in common_genres:
+                    if re.search(rf'\b{genre}\b', storyline.get_text(), re.I) and genre not in genres:
+                        genres.append(genre)
+        
+        # Dedupe while preserving order
+        genres = list(dict.fromkeys(genres))
+        
+        # Extract director - try multiple methods
+        director = None
+        
+        # Method 1: Look for Director label
+        director_section = soup.find('li', {'data-testid': re.compile(r'director', re.I)})
+        if director_section:
+            director_link = director_section.find('a', href=re.compile(r'/name/nm\d+'))
+            if director_link:
+                director = director_link.get_text(strip=True)
+        
+        # Method 2: Look for "Director" or "Directors" text
+        if not director:
+            for text in ['Director', 'Directors']:
+                director_label = soup.find(string=re.compile(rf'^{text}s?$', re.I))
+                if director_label:
+                    parent = director_label.find_parent()
+                    if parent:
+                        # Go up a few levels to find the container
+                        for _ in range(3):
+                            if parent.parent:
+                                parent = parent.parent
+                            director_link = parent.find('a', href=re.compile(r'/name/nm\d+'))
+                            if director_link:
+                                director = director_link.get_text(strip=True)
+                                break
+                    if director:
+                        break
+        
+        # Method 3: Look in credits section
+        if not director:
+            credits = soup.find_all('a', href=re.compile(r'/name/nm\d+'))
+            for credit in credits[:20]:
+                # Check if this name appears near "Director" text
+                parent = credit.find_parent()
+                if parent and re.search(r'director', parent.get_text(), re.I):
+                    director = credit.get_text(strip=True)
+                    break
+        
+        # Extract cast
+        cast = []
+        cast_section = soup.find_all('a', href=re.compile(r'/name/nm\d+'))
+        for link in cast_section[:15]:  # Limit to first 15 names
+            name = link.get_text(strip=True)
+            if name and len(name) > 2 and name not in cast:
+                # Skip if it's the director
+                if name != director:
+                    cast.append(name)
+            if len(cast) >= 10:
+                break
+        
+        # Extract runtime
+        runtime = None
+        runtime_match = re.search(r'(\d+h\s*\d*m|\d+\s*min)', html_str, re.I)
+        if runtime_match:
+            runtime = self._extract_runtime_minutes(runtime_match.group(1))
+        
+        # Extract IMDb ID
+        imdb_id = None
+        imdb_match = re.search(r'(tt\d+)', imdb_url)
+        if imdb_match:
+            imdb_id = imdb_match.group(1)
+        
+        return {
+            'movie_name': movie_name,
+            'year': year,
+            'release_date': release_date,
+            'runtime': runtime,
+            'genres': genres,
+            'languages': languages,
+            'original_language': languages[0] if languages else 'Hindi',
+            'director': director,
+            'cast': cast,
+            'imdb_id': imdb_id,
+            'source_url': imdb_url,
+        }
 
     async def fetch_theater_releases(
         self,
@@ -535,6 +547,7 @@ class IMDbScraperService:
         
         print(f"\n🎬 Fetching theater releases from {len(reference_urls)} URL(s)")
         
+        urls = []
         for url_item in reference_urls:
             # Handle both string URLs and dict format {url: "...", url_type: "..."}
             if isinstance(url_item, dict):
@@ -542,20 +555,18 @@ class IMDbScraperService:
             else:
                 url = url_item
             
-            if not url or not str(url).strip():
-                continue
-            
-            url = str(url).strip()
-            
+            if url and str(url).strip():
+                urls.append(str(url).strip())
+        
+        async def fetch_list(index: int, url: str) -> List[Dict]:
             # Determine URL type and fetch accordingly
             if 'calendar' in url.lower():
-                releases = await self.fetch_calendar_releases(url, limit, include_english)
-            elif 'search' in url.lower():
-                releases = await self.fetch_search_releases(url, limit, include_english)
-            else:
-                # Default to search behavior
-                releases = await self.fetch_search_releases(url, limit, include_english)
-            
+                return await self.fetch_calendar_releases(url, limit, include_english)
+            # Search pages and anything else use the search parser
+            return await self.fetch_search_releases(url, limit, include_english)
+        
+        # Listing pages in parallel (paced per domain); results keep the URL order
+        for releases in await run_bounded(urls, fetch_list, DETAIL_PARALLELISM):
             all_releases.extend(releases)
         
         # Remove duplicates by IMDb ID
@@ -572,13 +583,15 @@ class IMDbScraperService:
         
         print(f"\n📥 Fetching details for {len(unique_releases)} movies...")
         
-        # Fetch detailed info for each release
+        # Fetch detailed info for each release, several at a time (paced per domain)
+        async def fetch_details(index: int, release: Dict) -> Optional[Dict]:
+            print(f"   [{index + 1}/{len(unique_releases)}] Fetching details for: {release.get('title', 'Unknown')}")
+            return await self.fetch_movie_details(release['imdb_url'], include_english)
+        
+        all_details = await run_bounded(unique_releases, fetch_details, DETAIL_PARALLELISM)
+        
         detailed_releases = []
-        for i, release in enumerate(unique_releases, 1):
-            print(f"   [{i}/{len(unique_releases)}] Fetching details for: {release.get('title', 'Unknown')}")
-            
-            details = await self.fetch_movie_details(release['imdb_url'], include_english)
-            
+        for release, details in zip(unique_releases, all_details):
             if details:
                 # Skip English-only if not including English
                 if not include_english:
@@ -0,0 +1,136 @@
+"""
+LLM Cache Service
+Content-addressed cache of LLM completions in MongoDB. The key is a hash of
+provider, model, prompts and generation settings, so re-running an agent on
+unchanged input returns the stored response instead of calling the provider.
+Entries expire through a TTL index. Once the collection grows past
+LLM_CACHE_MAX_ENTRIES, the least recently used entries are evicted.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from database import db
+from models.mongodb_collections import LLM_CACHE
+
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_HOURS = float(os.environ.get("LLM_CACHE_TTL_HOURS", "72"))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "5000"))
+EVICT_CHECK_EVERY = 50  # stores between size checks
+
+
+def cache_key(provider: str, model: str, system_prompt: Optional[str], user_prompt: str,
+              max_tokens: int, temperature: Optional[float] = None, response_format: Optional[str] = None) -> str:
+    payload = json.dumps(
+        [provider, model, system_prompt or "", user_prompt, max_tokens, temperature, response_format],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCacheService:
+    """Lookup/store of LLM responses with per-agent-type hit and miss counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0, "stores": 0})
+        self._stores_since_check = 0
+
+    def _count(self, agent_type: str, field: str):
+        with self._lock:
+            self._stats[agent_type or "other"][field] += 1
+
+    def get(self, key: str, agent_type: str = None) -> Optional[str]:
+        """Return the cached response (refreshing its LRU timestamp) or None"""
+        now = datetime.now(timezone.utc)
+        try:
+            entry = db[LLM_CACHE].find_one_and_update(
+                {"key": key, "expires_at": {"$gt": now}},
+                {"$set": {"last_used_at": now}, "$inc": {"hits": 1}},
+                projection={"_id": 0, "response": 1}
+            )
+        except Exception as e:
+            print(f"⚠️ LLM cache lookup failed: {e}")
+            entry = None
+
+        self._count(agent_type, "hits" if entry else "misses")
+        return entry["response"] if entry else None
+
+    def put(self, key: str, response: str, provider: str, model: str, agent_type: str = None):
+        """Store a response; empty responses are not cached"""
+        if not response:
+            return
+        now = datetime.now(timezone.utc)
+        try:
+            db[LLM_CACHE].update_one(
+                {"key": key},
+                {
+                    "$set": {
+                        "response": response,
+                        "provider": provider,
+                        "model": model,
+                        "agent_type": agent_type or "other",
+                        "last_used_at": now,
+                        "expires_at": now + timedelta(hours=LLM_CACHE_TTL_HOURS),
+                    },
+                    "$setOnInsert": {"created_at": now, "hits": 0},
+                },
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return  # Stored concurrently by another worker
+        except Exception as e:
+            print(f"⚠️ LLM cache store failed: {e}")
+            return
+
+        self._count(agent_type, "stores")
+        with self._lock:
+            self._stores_since_check += 1
+            check = self._stores_since_check >= EVICT_CHECK_EVERY
+            if check:
+                self._stores_since_check = 0
+        if check:
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries beyond LLM_CACHE_MAX_ENTRIES"""
+        excess = db[LLM_CACHE].estimated_document_count() - LLM_CACHE_MAX_ENTRIES
+        if excess <= 0:
+            return 0
+        oldest = db[LLM_CACHE].find({}, {"_id": 1}).sort("last_used_at", 1).limit(excess)
+        result = db[LLM_CACHE].delete_many({"_id": {"$in": [entry["_id"] for entry in oldest]}})
+        print(f"🧹 Evicted {result.deleted_count} LLM cache entries")
+        return result.deleted_count
+
+    def clear(self, agent_type: str = None) -> int:
+        query = {"agent_type": agent_type} if agent_type else {}
+        return db[LLM_CACHE].delete_many(query).deleted_count
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            by_agent_type = {
+                agent_type: {
+                    **stats,
+                    "hit_rate": round(stats["hits"] / (stats["hits"] + stats["misses"]), 3)
+                    if stats["hits"] + stats["misses"] else 0.0
+                }
+                for agent_type, stats in self._stats.items()
+            }
+        return {
+            "enabled": LLM_CACHE_ENABLED,
+            "entries": db[LLM_CACHE].estimated_document_count(),
+            "max_entries": LLM_CACHE_MAX_ENTRIES,
+            "ttl_hours": LLM_CACHE_TTL_HOURS,
+            "by_agent_type": by_agent_type,
+        }
+
+
+# Singleton instance
+llm_cache_service = LLMCacheService()
@@ -0,0 +1,333 @@
+"""
+LLM Gateway Service
+One async entry point for every agent that talks to OpenAI, Anthropic or
+Gemini. The provider and model come from the AI API keys in system settings.
+Calls use the SDKs' async clients, so a 200 s completion no longer blocks the
+event loop. Every call goes through the shared rate limiter, runs under an
+asyncio timeout per attempt and is cancelled (HTTP request included) when its
+task is cancelled.
+"""
+
+import asyncio
+import json
+import os
+import re
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import jsonschema
+
+import crud
+from database import db
+from services.llm_cache_service import llm_cache_service, cache_key, LLM_CACHE_ENABLED
+from services.llm_rate_limiter_service import (
+    llm_rate_limiter_service, estimate_tokens, error_status, THROTTLE_STATUS_CODES
+)
+
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "225"))
+LLM_IMAGE_TIMEOUT_SECONDS = float(os.environ.get("LLM_IMAGE_TIMEOUT_SECONDS", "180"))
+
+ANTHROPIC_MODEL_HINTS = ("claude", "sonnet", "opus", "haiku", "anthropic")
+GEMINI_MODEL_HINTS = ("gemini", "imagen")
+API_KEY_FIELDS = {
+    "openai": "openai_api_key",
+    "anthropic": "anthropic_api_key",
+    "gemini": "gemini_api_key",
+}
+PROVIDER_NAMES = {"openai": "OpenAI", "anthropic": "Anthropic", "gemini": "Gemini"}
+
+
+class LLMError(Exception):
+    """An LLM call failed"""
+
+
+class LLMTimeoutError(LLMError):
+    """An LLM call did not finish within its timeout"""
+
+
+class LLMResponseFormatError(LLMError):
+    """A structured response was not valid JSON or did not match its schema"""
+
+
+@dataclass(frozen=True)
+class LLMTarget:
+    """Provider, model and key a call is sent to"""
+    provider: str  # 'openai', 'anthropic' or 'gemini'
+    model: str
+    api_key: str = field(repr=False)
+
+
+def provider_for_model(model: str) -> str:
+    model_lower = model.lower()
+    if any(hint in model_lower for hint in GEMINI_MODEL_HINTS):
+        return "gemini"
+    if any(hint in model_lower for hint in ANTHROPIC_MODEL_HINTS):
+        return "anthropic"
+    return "openai"
+
+
+def parse_json_response(text: str, schema: Dict) -> Dict:
+    """Parse a model's JSON answer (tolerating code fences) and validate it against schema"""
+    cleaned = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    try:
+        data = json.loads(cleaned)
+    except ValueError:
+        # Some models wrap the object in prose; take the outermost braces
+        start, end = cleaned.find("{"), cleaned.rfind("}")
+        if start == -1 or end <= start:
+            raise LLMResponseFormatError("Response is not JSON")
+        try:
+            data = json.loads(cleaned[start:end + 1])
+        except ValueError as e:
+            raise LLMResponseFormatError(f"Response is not JSON: {e}")
+    try:
+        jsonschema.validate(data, schema)
+    except jsonschema.ValidationError as e:
+        raise LLMResponseFormatError(f"Response does not match schema: {e.message}")
+    return data
+
+
+class LLMGatewayService:
+    """Async completions and image generation across providers"""
+
+    def __init__(self):
+        # SDK async clients hold an httpx pool bound to the loop that created it
+        self._clients = weakref.WeakKeyDictionary()
+
+    def select(self, model: str = None, ai_config: Dict = None, image: bool = False) -> LLMTarget:
+        """
+        Resolve the model (default_text_model or default_image_model unless given)
+        and its provider key from the AI API keys in system settings.
+        """
+        ai_config = ai_config or crud.get_ai_api_keys(db)
+        if not ai_config:
+            raise ValueError("AI API keys not configured. Please add them in System Settings > API Keys.")
+
+        if not model and image:
+            model = ai_config.get("default_image_model") or "dall-e-3"
+        elif not model:
+            model = ai_config.get("default_text_model") or "gpt-4o"
+        provider = provider_for_model(model)
+        api_key = ai_config.get(API_KEY_FIELDS[provider])
+        if not api_key:
+            raise ValueError(f"{PROVIDER_NAMES[provider]} API key not configured. Please add it in System Settings > API Keys.")
+        return LLMTarget(provider=provider, model=model, api_key=api_key)
+
+    def _client(self, provider: str, api_key: str):
+        loop = asyncio.get_running_loop()
+        clients = self._clients.setdefault(loop, {})
+        key: Tuple[str, str] = (provider, api_key)
+        if key not in clients:
+            if provider == "openai":
+                from openai import AsyncOpenAI
+                clients[key] = AsyncOpenAI(api_key=api_key, max_retries=0)  # retried by the rate limiter
+            elif provider == "anthropic":
+                from anthropic import AsyncAnthropic
+                clients[key] = AsyncAnthropic(api_key=api_key, max_retries=0)
+            else:
+                from google import genai
+                clients[key] = genai.Client(api_key=api_key)
+        return clients[key]
+
+    async def aclose(self):
+        """Close the clients of the current event loop (application shutdown)"""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for (provider, _), client in clients.items():
+            try:
+                if provider == "gemini":
+                    await client.aio.aclose()
+                else:
+                    await client.close()
+            except Exception as e:
+                print(f"⚠️ Failed to close {provider} client: {e}")
+
+    async def complete(
+        self,
+        system_prompt: Optional[str],
+        user_prompt: str,
+        max_tokens: int = 2000,
+        target: LLMTarget = None,
+        temperature: float = None,
+        timeout: float = None,
+        cache: bool = True,
+        agent_type: str = None,
+        json_schema: Dict = None
+    ) -> str:
+        """
+        Chat completion with the configured (or given) target.
+        Identical requests are answered from the LLM cache unless cache=False;
+        agent_type labels the cache hit/miss metrics. With json_schema the
+        provider's JSON mode is used and the answer must validate against it
+        (LLMResponseFormatError otherwise); only valid answers are cached.
+        Throttled and transient provider errors are retried by the rate limiter.
+        Raises LLMTimeoutError when an attempt takes longer than `timeout`
+        seconds and LLMError on provider errors.
+        """
+        target = target or self.select()
+        timeout = timeout or LLM_TIMEOUT_SECONDS
+
+        key = None
+        if cache and LLM_CACHE_ENABLED:
+            key = cache_key(
+                target.provider, target.model, system_prompt, user_prompt, max_tokens, temperature,
+                json.dumps(json_schema, sort_keys=True) if json_schema else None
+            )
+            cached = await asyncio.to_thread(llm_cache_service.get, key, agent_type)
+            if cached is not None:
+                return cached
+
+        try:
+            result, _ = await llm_rate_limiter_service.run(
+                target.provider,
+                target.model,
+                lambda: asyncio.wait_for(
+                    self._complete(target, system_prompt, user_prompt, max_tokens, temperature, timeout, json_schema),
+                    timeout=timeout
+                ),
+                tokens=estimate_tokens(system_prompt, user_prompt, max_tokens=max_tokens),
+                used_tokens=lambda answer: answer[1]
+            )
+        except asyncio.TimeoutError:
+            raise LLMTimeoutError(f"{target.provider} call timed out after {timeout:.0f}s")
+        except (asyncio.CancelledError, LLMError):
+            raise
+        except Exception as e:
+            raise LLMError(f"Chat completion failed ({target.provider}): {e}") from e
+
+        if json_schema:
+            parse_json_response(result, json_schema)
+        if key:
+            await asyncio.to_thread(llm_cache_service.put, key, result, target.provider, target.model, agent_type)
+        return result
+
+    async def complete_json(self, system_prompt: Optional[str], user_prompt: str, schema: Dict, **kwargs) -> Dict:
+        """complete() in JSON mode, returning the parsed and validated object"""
+        text = await self.complete(system_prompt, user_prompt, json_schema=schema, **kwargs)
+        return parse_json_response(text, schema)
+
+    async def _complete(self, target: LLMTarget, system_prompt, user_prompt, max_tokens, temperature, timeout, json_schema=None) -> Tuple[str, Optional[int]]:
+        """(answer text, input + output tokens reported by the provider, or None)"""
+        client = self._client(target.provider, target.api_key)
+
+        if json_schema and target.provider != "openai":
+            # OpenAI enforces the schema itself; other providers get it in the prompt
+            user_prompt = (
+                f"{user_prompt}\n\nRespond with a single JSON object only, no prose or code fences, "
+                f"matching this JSON Schema:\n{json.dumps(json_schema)}"
+            )
+
+        if target.provider == "openai":
+            messages = [{"role": "user", "content": user_prompt}]
+            if system_prompt:
+                messages.insert(0, {"role": "system", "content": system_prompt})
+            extra = {"temperature": temperature} if temperature is not None else {}
+            if json_schema:
+                extra["response_format"] = {
+                    "type": "json_schema",
+                    "json_schema": {"name": "response", "schema": json_schema, "strict": True}
+                }
+            response = await client.chat.completions.create(
+                model=target.model,
+                messages=messages,
+                max_completion_tokens=max_tokens,
+                timeout=timeout,
+                **extra
+            )
+            usage = getattr(response, "usage", None)
+            used = usage.prompt_tokens + usage.completion_tokens if usage else None
+            return (response.choices[0].message.content or "").strip(), used
+
+        if target.provider == "anthropic":
+            extra = {"system": system_prompt} if system_prompt else {}
+            if temperature is not None:
+                extra["temperature"] = temperature
+            response = await client.messages.create(
+                model=target.model,
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": user_prompt}],
+                timeout=timeout,
+                **extra
+            )
+            usage = getattr(response, "usage", None)
+            used = usage.input_tokens + usage.output_tokens if usage else None
+            return response.content[0].text.strip(), used
+
+        from google.genai import types
+        response = await client.aio.models.generate_content(
+            model=target.model,
+            contents=user_prompt,
+            config=types.GenerateContentConfig(
+                system_instruction=system_prompt or None,
+                max_output_tokens=max_tokens,
+                temperature=temperature,
+                response_mime_type="application/json" if json_schema else None
+            )
+        )
+        usage = getattr(response, "usage_metadata", None)
+        used = getattr(usage, "total_token_count", None) if usage else None
+        return (response.text or "").strip(), used
+
+    async def generate_image(self, prompt: str, target: LLMTarget = None, timeout: float = None) -> Optional[Dict]:
+        """
+        Generate one landscape image. Returns {'url': ...} for OpenAI models or
+        {'content': bytes} for Imagen, None if the provider returned nothing.
+        """
+        target = target or self.select(image=True)
+        timeout = timeout or LLM_IMAGE_TIMEOUT_SECONDS
+        try:
+            # Only retried when throttled: a failed generation may still have been billed
+            return await llm_rate_limiter_service.run(
+                target.provider,
+                target.model,
+                lambda: asyncio.wait_for(self._generate_image(target, prompt, timeout), timeout=timeout),
+                retryable=lambda e: error_status(e) in THROTTLE_STATUS_CODES
+            )
+        except asyncio.TimeoutError:
+            raise LLMTimeoutError(f"{target.provider} image generation timed out after {timeout:.0f}s")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            raise LLMError(f"Image generation failed ({target.model}): {e}") from e
+
+    async def _generate_image(self, target: LLMTarget, prompt: str, timeout: float) -> Optional[Dict]:
+        client = self._client(target.provider, target.api_key)
+
+        if target.provider == "gemini":
+            from google.genai import types
+            response = await client.aio.models.generate_images(
+                model=target.model,
+                prompt=prompt,
+                config=types.GenerateImagesConfig(number_of_images=1, aspect_ratio="16:9")
+            )
+            if response.generated_images:
+                return {"content": response.generated_images[0].image.image_bytes}
+            return None
+
+        if target.provider != "openai":
+            raise LLMError(f"{target.model} does not support image generation")
+
+        if target.model in ("gpt-image-1", "gpt-image"):
+            response = await client.images.generate(
+                model="gpt-image-1", prompt=prompt, size="1536x1024", quality="medium", n=1, timeout=timeout
+            )
+        else:
+            response = await client.images.generate(
+                model=target.model,
+                prompt=prompt,
+                size="1792x1024" if target.model == "dall-e-3" else "1024x1024",
+                quality="standard",
+                n=1,
+                timeout=timeout
+            )
+        image = response.data[0]
+        if image.url:
+            return {"url": image.url}
+        if image.b64_json:
+            import base64
+            return {"content": base64.b64decode(image.b64_json)}
+        return None
+
+
+# Singleton instance
+llm_gateway_service = LLMGatewayService()
@@ -0,0 +1,287 @@
+"""
+LLM Rate Limiter Service
+Coordinates every LLM call against the provider's rate limits, whichever agent
+makes it. Each provider/model gets a requests-per-minute and a tokens-per-minute
+token bucket, plus an adaptive concurrency limit (AIMD: +1 slot per limit's
+worth of successes, halved on a 429). Retry-After pauses the whole model, and
+retryable failures are retried with jittered exponential backoff.
+
+A call reserves its prompt size plus an expected completion (not the whole
+max_tokens budget) up front; once the provider reports usage, the reservation
+is settled against the real count, giving back or charging the difference.
+
+Limits per provider are set below; LLM_RATE_LIMITS overrides them per provider
+or model as JSON, e.g. {"openai/gpt-4o": {"rpm": 500, "tpm": 30000}}.
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "3"))
+LLM_INITIAL_CONCURRENCY = int(os.environ.get("LLM_INITIAL_CONCURRENCY", "4"))
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "16"))
+LLM_BACKOFF_BASE_SECONDS = 1.0
+LLM_BACKOFF_MAX_SECONDS = 60.0
+# Completion tokens reserved up front per call; settled against reported usage afterwards
+LLM_COMPLETION_TOKEN_ESTIMATE = int(os.environ.get("LLM_COMPLETION_TOKEN_ESTIMATE", "2000"))
+
+DEFAULT_LIMITS = {
+    "openai": {"rpm": 500, "tpm": 200000},
+    "anthropic": {"rpm": 50, "tpm": 40000},
+    "gemini": {"rpm": 150, "tpm": 1000000},
+}
+RATE_LIMIT_OVERRIDES = json.loads(os.environ.get("LLM_RATE_LIMITS") or "{}")
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504, 529}
+THROTTLE_STATUS_CODES = {429, 529}  # 529: Anthropic "overloaded"
+CONNECTION_ERROR_NAMES = {"APIConnectionError", "ConnectError", "ReadError", "RemoteProtocolError"}
+
+
+def estimate_tokens(*texts: Optional[str], max_tokens: int = 0) -> int:
+    """Rough prompt size (4 characters per token) plus the expected completion, capped at max_tokens"""
+    return sum(len(text) for text in texts if text) // 4 + min(max_tokens, LLM_COMPLETION_TOKEN_ESTIMATE)
+
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status of an SDK error (status_code on OpenAI/Anthropic, code on Gemini)"""
+    for attr in ("status_code", "code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Retry-After of the response that caused an SDK error, if any"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for header in ("retry-after-ms", "retry-after"):
+        value = headers.get(header)
+        if not value:
+            continue
+        try:
+            seconds = float(value)
+        except ValueError:
+            continue  # HTTP-date form; fall back to backoff
+        return seconds / 1000 if header == "retry-after-ms" else seconds
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    status = error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return type(error).__name__ in CONNECTION_ERROR_NAMES
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units per minute up to one minute's worth. Reservations
+    are taken immediately (the level may go negative); the caller waits the
+    returned delay, so concurrent callers queue up behind each other.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= min(amount, self.capacity)  # an oversized call still gets through, alone
+        return -self.level / self.rate if self.level < 0 else 0.0
+
+    def settle(self, reserved: float, used: float):
+        """Correct an earlier reservation to what was actually used (refund or extra charge, no wait)"""
+        reserved = min(reserved, self.capacity)
+        self.level = min(self.capacity, self.level + reserved - used)
+
+
+class _ModelLimiter:
+    """Buckets, concurrency and counters for one provider/model"""
+
+    def __init__(self, rpm: float, tpm: float, max_concurrency: int):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.limit = float(min(LLM_INITIAL_CONCURRENCY, max_concurrency))
+        self.in_flight = 0
+        self.pacing = 0  # holding a slot while the buckets refill
+        self.blocked_until = 0.0
+        self.waiters = deque()  # (loop, event) in arrival order
+        self.stats = {"calls": 0, "throttled": 0, "retries": 0, "failures": 0}
+
+    def wake(self):
+        """Hand free slots to waiters in order; the slot is counted before they resume"""
+        while self.waiters and self.in_flight < int(self.limit):
+            loop, event = self.waiters.popleft()
+            self.in_flight += 1
+            loop.call_soon_threadsafe(event.set)
+
+
+class LLMRateLimiterService:
+    """Per-provider, per-model admission control for LLM calls"""
+
+    def __init__(self, limits: Dict = None, overrides: Dict = None):
+        # Locked by a thread lock, not an asyncio one: agents also run on their own event loops
+        self._lock = threading.Lock()
+        self._limits = limits or DEFAULT_LIMITS
+        self._overrides = RATE_LIMIT_OVERRIDES if overrides is None else overrides
+        self._models: Dict[Tuple[str, str], _ModelLimiter] = {}
+
+    def _limiter(self, provider: str, model: str) -> _ModelLimiter:
+        key = (provider, model)
+        if key not in self._models:
+            config = {
+                "max_concurrency": LLM_MAX_CONCURRENCY,
+                **self._limits.get(provider, DEFAULT_LIMITS["openai"]),
+                **self._overrides.get(provider, {}),
+                **self._overrides.get(f"{provider}/{model}", {}),
+            }
+            self._models[key] = _ModelLimiter(config["rpm"], config["tpm"], int(config["max_concurrency"]))
+        return self._models[key]
+
+    async def _acquire(self, limiter: _ModelLimiter):
+        with self._lock:
+            if not limiter.waiters and limiter.in_flight < int(limiter.limit):
+                limiter.in_flight += 1
+                return
+            entry = (asyncio.get_running_loop(), asyncio.Event())
+            limiter.waiters.append(entry)
+        try:
+            await entry[1].wait()
+        except asyncio.CancelledError:
+            with self._lock:
+                if entry in limiter.waiters:
+                    limiter.waiters.remove(entry)
+                else:
+                    # A slot was handed over as we were cancelled; pass it on
+                    limiter.in_flight -= 1
+                    limiter.wake()
+            raise
+
+    def _release(self, limiter: _ModelLimiter, succeeded: bool = False, throttled: bool = False,
+                 retry_after: float = None):
+        with self._lock:
+            limiter.in_flight -= 1
+            if succeeded:
+                limiter.limit = min(float(limiter.max_concurrency), limiter.limit + 1 / limiter.limit)
+            elif throttled:
+                limiter.limit = max(1.0, limiter.limit / 2)
+                limiter.stats["throttled"] += 1
+            if retry_after:
+                limiter.blocked_until = max(limiter.blocked_until, time.monotonic() + retry_after)
+            limiter.wake()
+
+    async def _pace(self, limiter: _ModelLimiter, tokens: int):
+        """Wait out Retry-After and both buckets while holding the slot"""
+        with self._lock:
+            delay = max(
+                limiter.blocked_until - time.monotonic(),
+                limiter.requests.reserve(1),
+                limiter.tokens.reserve(tokens),
+            )
+            if delay > 0:
+                limiter.pacing += 1
+        if delay <= 0:
+            return
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            with self._lock:
+                limiter.pacing -= 1
+
+    def _refund(self, limiter: _ModelLimiter, tokens: int):
+        """Give back the token reservation of an attempt that did not complete"""
+        with self._lock:
+            limiter.tokens.settle(tokens, 0)
+
+    async def run(
+        self,
+        provider: str,
+        model: str,
+        call: Callable[[], Awaitable],
+        tokens: int = 0,
+        idempotent: bool = True,
+        retryable: Callable[[Exception], bool] = is_retryable,
+        used_tokens: Callable[[Any], Optional[int]] = None,
+    ):
+        """
+        Run call() once a slot and bucket capacity are available for the model.
+        Retryable failures are retried up to LLM_MAX_RETRIES times with jittered
+        backoff (or Retry-After) when idempotent; the last error is re-raised.
+        used_tokens(result) -> the provider-reported token count of a successful
+        call, used to settle the `tokens` reserved for it. A failed attempt gives
+        its reservation back, so retries do not drain the TPM bucket.
+        """
+        with self._lock:
+            limiter = self._limiter(provider, model)
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            await self._acquire(limiter)
+            try:
+                await self._pace(limiter, tokens)
+                with self._lock:
+                    limiter.stats["calls"] += 1
+                result = await call()
+            except asyncio.CancelledError:
+                self._refund(limiter, tokens)
+                self._release(limiter)
+                raise
+            except Exception as e:
+                self._refund(limiter, tokens)
+                status = error_status(e)
+                retry_after = retry_after_seconds(e)
+                self._release(limiter, throttled=status in THROTTLE_STATUS_CODES, retry_after=retry_after)
+                if not (idempotent and attempt < LLM_MAX_RETRIES and retryable(e)):
+                    with self._lock:
+                        limiter.stats["failures"] += 1
+                    raise
+                with self._lock:
+                    limiter.stats["retries"] += 1
+                delay = retry_after or random.uniform(0.5, 1.0) * min(
+                    LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt
+                )
+                print(f"⏳ {provider}/{model} call failed ({status or type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            used = used_tokens(result) if used_tokens else None
+            if used is not None:
+                with self._lock:
+                    limiter.tokens.settle(tokens, used)
+            self._release(limiter, succeeded=True)
+            return result
+
+    def get_metrics(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            models = {
+                f"{provider}/{model}": {
+                    **limiter.stats,
+                    "queue_depth": len(limiter.waiters) + limiter.pacing,
+                    "waiting_for_slot": len(limiter.waiters),
+                    "pacing": limiter.pacing,
+                    "in_flight": limiter.in_flight,
+                    "concurrency_limit": int(limiter.limit),
+                    "max_concurrency": limiter.max_concurrency,
+                    "rpm": limiter.requests.capacity,
+                    "tpm": limiter.tokens.capacity,
+                    "blocked_for_seconds": round(max(0.0, limiter.blocked_until - now), 1),
+                }
+                for (provider, model), limiter in self._models.items()
+            }
+        return {
+            "queue_depth": sum(m["queue_depth"] for m in models.values()),
+            "models": models,
+        }
+
+
+# Singleton instance
+llm_rate_limiter_service = LLMRateLimiterService()
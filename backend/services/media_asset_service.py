@@ -0,0 +1,341 @@
+"""
+Media Asset Service
+Content-addressed image storage: every ingested file is hashed (SHA-256) and
+registered in media_assets, so identical bytes are stored once and shared by
+reference count across uploads, galleries and agents
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from pymongo import ReturnDocument
+from database import db
+from models.mongodb_collections import MEDIA_ASSETS
+
+UPLOAD_DIR = Path(__file__).parent.parent / "uploads"
+
+# Uploads are streamed to disk in chunks of this size, so memory per upload stays bounded
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Leading bytes -> content type, checked against what the browser claims
+MAGIC_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"\x00\x00\x01\x00", "image/x-icon"),
+    (b"\x1a\x45\xdf\xa3", "video/webm"),
+    (b"%PDF", "application/pdf"),
+]
+
+
+class UploadRejected(Exception):
+    """Raised while staging an upload that is too large or not what it claims to be"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def hash_content(content: bytes) -> str:
+    """SHA-256 hex digest used as the asset identity"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def content_addressed_key(root_folder: str, content_hash: str, extension: str) -> str:
+    """articles + abcdef... + .jpg -> articles/ab/abcdef....jpg"""
+    extension = extension if extension.startswith(".") else f".{extension}"
+    return f"{root_folder}/{content_hash[:2]}/{content_hash}{extension.lower()}"
+
+
+def read_image_dimensions(source: Union[bytes, str]) -> tuple:
+    """Read width/height from the image header (bytes or a file path) without decoding pixels"""
+    try:
+        from PIL import Image
+        with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+            return image.size
+    except Exception:
+        return None, None
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Identify common image/video formats from their leading bytes"""
+    for signature, content_type in MAGIC_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand in (b"avif", b"avis"):
+            return "image/avif"
+        if brand in (b"heic", b"heix", b"mif1"):
+            return "image/heic"
+        return "video/mp4"
+    stripped = head.lstrip()
+    if stripped.startswith(b"<svg") or (stripped.startswith(b"<?xml") and b"<svg" in head):
+        return "image/svg+xml"
+    return None
+
+
+class StagedUpload:
+    """An upload streamed to a temp file, with its hash, size and sniffed type"""
+
+    def __init__(self, path: str, size: int, content_hash: str, content_type: Optional[str]):
+        self.path = path
+        self.size = size
+        self.content_hash = content_hash
+        self.content_type = content_type
+
+    def cleanup(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def cleanup_after(self, task: Optional[asyncio.Task]):
+        """Remove the temp file once a background task reading it has finished"""
+        if task is None:
+            self.cleanup()
+        else:
+            task.add_done_callback(lambda _: self.cleanup())
+
+
+class _StagingWriter:
+    """Writes chunks to a temp file, hashing, size-checking and sniffing as they arrive"""
+
+    def __init__(self, declared_type: Optional[str], max_bytes: int):
+        fd, self.path = tempfile.mkstemp(prefix="upload_")
+        self._file = os.fdopen(fd, "wb")
+        self._digest = hashlib.sha256()
+        self.declared_type = declared_type
+        self.content_type = declared_type
+        self.max_bytes = max_bytes
+        self.size = 0
+
+    def write(self, chunk: bytes):
+        if self.size == 0:
+            sniffed = sniff_content_type(chunk[:64])
+            if sniffed:
+                self.content_type = sniffed
+            elif (self.declared_type or "").startswith("image/") and self.declared_type != "image/svg+xml":
+                raise UploadRejected("File content is not a recognised image format")
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadRejected(
+                f"File size exceeds maximum allowed size of {self.max_bytes // (1024 * 1024)}MB",
+                status_code=413
+            )
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    def finish(self) -> StagedUpload:
+        self._file.close()
+        if self.size == 0:
+            self.discard()
+            raise UploadRejected("Uploaded file is empty")
+        return StagedUpload(self.path, self.size, self._digest.hexdigest(), self.content_type)
+
+    def discard(self):
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def stage_upload(upload_file, max_bytes: int) -> StagedUpload:
+    """
+    Stream an UploadFile to a temp file in UPLOAD_CHUNK_SIZE chunks, hashing and
+    enforcing max_bytes as data arrives. The first chunk is sniffed so a file
+    claiming to be an image must actually look like one.
+    Raises UploadRejected; the temp file is removed on failure.
+    """
+    writer = _StagingWriter(upload_file.content_type, max_bytes)
+    try:
+        while True:
+            chunk = await upload_file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            await asyncio.to_thread(writer.write, chunk)
+        return writer.finish()
+    except BaseException:
+        writer.discard()
+        raise
+
+
+def stage_s3_object(key: str, declared_type: Optional[str], max_bytes: int) -> StagedUpload:
+    """
+    Blocking: stream an object that a browser uploaded directly to S3 into a temp
+    file, with the same hashing, size and content checks as stage_upload()
+    """
+    from s3_service import s3_service
+
+    writer = _StagingWriter(declared_type, max_bytes)
+    try:
+        response = s3_service.s3_client.get_object(Bucket=s3_service.config.get("s3_bucket_name"), Key=key)
+        for chunk in response["Body"].iter_chunks(UPLOAD_CHUNK_SIZE):
+            writer.write(chunk)
+        return writer.finish()
+    except BaseException:
+        writer.discard()
+        raise
+
+
+def stage_file(path: str, content_type: Optional[str] = None) -> StagedUpload:
+    """
+    Blocking: hash a file that is already on disk (an agent download) in
+    UPLOAD_CHUNK_SIZE chunks so it can go through ingest_staged(). The file is
+    not copied; the caller still owns it.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if size == 0:
+                content_type = sniff_content_type(chunk[:64]) or content_type
+            digest.update(chunk)
+            size += len(chunk)
+    return StagedUpload(path, size, digest.hexdigest(), content_type)
+
+
+class MediaAssetService:
+    """Hash-indexed store in front of S3 / local uploads"""
+
+    def find(self, content_hash: str) -> Optional[Dict]:
+        return db[MEDIA_ASSETS].find_one({"hash": content_hash}, {"_id": 0})
+
+    def _acquire(self, content_hash: str) -> Optional[Dict]:
+        """Take one more reference on an existing asset"""
+        return db[MEDIA_ASSETS].find_one_and_update(
+            {"hash": content_hash},
+            {"$inc": {"refcount": 1}, "$set": {"last_used_at": datetime.now(timezone.utc)}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _store(self, content: bytes, key: str, content_type: Optional[str], local_fallback: bool) -> Optional[str]:
+        from s3_service import s3_service
+
+        if s3_service.is_enabled():
+            url = await s3_service.upload_file_async(content, key, content_type)
+            if url or not local_fallback:
+                return url
+            print(f"⚠️ S3 upload failed for {key}, falling back to local storage")
+
+        local_path = UPLOAD_DIR / key
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(local_path.write_bytes, content)
+        return f"/uploads/{key}"
+
+    async def _store_path(self, path: str, key: str, content_type: Optional[str], local_fallback: bool) -> Optional[str]:
+        from s3_service import s3_service
+
+        if s3_service.is_enabled():
+            url = await s3_service.upload_path_async(path, key, content_type)
+            if url or not local_fallback:
+                return url
+            print(f"⚠️ S3 upload failed for {key}, falling back to local storage")
+
+        local_path = UPLOAD_DIR / key
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(shutil.copyfile, path, local_path)
+        return f"/uploads/{key}"
+
+    def _register(self, content_hash: str, url: str, key: str, content_type: Optional[str],
+                  size: int, width: Optional[int], height: Optional[int]) -> Dict:
+        now = datetime.now(timezone.utc)
+        asset = db[MEDIA_ASSETS].find_one_and_update(
+            {"hash": content_hash},
+            {
+                "$setOnInsert": {
+                    "hash": content_hash,
+                    "url": url,
+                    "key": key,
+                    "content_type": content_type,
+                    "size": size,
+                    "width": width,
+                    "height": height,
+                    "created_at": now
+                },
+                "$inc": {"refcount": 1},
+                "$set": {"last_used_at": now}
+            },
+            projection={"_id": 0},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        # A concurrent ingest of the same bytes may have won the upsert; its
+        # object is the canonical one and ours is just an orphaned duplicate
+        return {**asset, "deduplicated": asset["key"] != key}
+
+    async def ingest(
+        self,
+        content: bytes,
+        key: str,
+        content_type: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        local_fallback: bool = False
+    ) -> Optional[Dict]:
+        """
+        Register content and return its asset record with a `deduplicated` flag.
+        If identical bytes were stored before, the existing asset gains a
+        reference and nothing is uploaded; otherwise the content is written to
+        `key` (use content_addressed_key() unless a layout is required).
+        With local_fallback, a failed S3 upload is written to uploads/ instead.
+        Returns None if storage failed.
+        """
+        content_hash = content_hash or hash_content(content)
+
+        existing = self._acquire(content_hash)
+        if existing:
+            print(f"♻️ Reusing stored asset {existing['key']} for {key}")
+            return {**existing, "deduplicated": True}
+
+        url = await self._store(content, key, content_type, local_fallback)
+        if not url:
+            return None
+
+        width, height = await asyncio.to_thread(read_image_dimensions, content)
+        return self._register(content_hash, url, key, content_type, len(content), width, height)
+
+    async def ingest_staged(
+        self,
+        staged: StagedUpload,
+        key: str,
+        local_fallback: bool = False,
+        stored_url: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        ingest() for a StagedUpload: the file is streamed from disk, never loaded whole.
+        Pass stored_url when the object is already at `key` (direct browser uploads);
+        it is then only registered.
+        """
+        existing = self._acquire(staged.content_hash)
+        if existing:
+            print(f"♻️ Reusing stored asset {existing['key']} for {key}")
+            return {**existing, "deduplicated": True}
+
+        url = stored_url or await self._store_path(staged.path, key, staged.content_type, local_fallback)
+        if not url:
+            return None
+
+        width, height = await asyncio.to_thread(read_image_dimensions, staged.path)
+        return self._register(staged.content_hash, url, key, staged.content_type, staged.size, width, height)
+
+
+# Singleton instance
+media_asset_service = MediaAssetService()
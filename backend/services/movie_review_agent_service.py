@@ -4,14 +4,23 @@ Simplified flow: Scrape single URL -> Store temp -> LLM rewrite -> Create articl
 """
 
 import asyncio
+import contextvars
 from datetime import datetime, timezone
 from typing import Dict, Optional
 from database import db
 import crud
+from services.llm_gateway_service import llm_gateway_service, LLMTimeoutError
+from services.bulk_worker_pool import run_until, bulk_parallelism, OrderedClaims
+from services.agent_job_service import report_progress
 import re
 import json
 from bs4 import BeautifulSoup
 
+LLM_CALL_TIMEOUT_SECONDS = 225
+
+# Scraped data of the review being processed, per asyncio task so reviews can run concurrently
+_temp_review_data = contextvars.ContextVar('temp_review_data', default=None)
+
 # Default rating verdicts mapping (used if not configured in system settings)
 DEFAULT_RATING_VERDICTS = {
     0.00: {"tag": "Disaster", "verdict": "Complete disaster! Skip entirely. Not even worth OTT."},
@@ -42,12 +51,20 @@ class MovieReviewAgentService:
     """Service for running Movie Review agents"""
     
     def __init__(self):
-        self.llm_client = None
+        self.llm = None
         self.llm_model = None
         self.llm_provider = None
         self.temp_review_data = None  # Temporary storage for scraped data
         self.rating_verdicts = None  # Rating verdicts mapping from system settings
     
+    @property
+    def temp_review_data(self) -> Optional[Dict]:
+        return _temp_review_data.get()
+    
+    @temp_review_data.setter
+    def temp_review_data(self, value: Optional[Dict]):
+        _temp_review_data.set(value)
+    
     def _load_rating_verdicts(self):
         """Load rating verdicts from system settings or use defaults"""
         try:
@@ -93,87 +110,21 @@ class MovieReviewAgentService:
         return verdict_data
     
     def _initialize_llm(self):
-        """Initialize LLM client based on system settings"""
-        ai_config = crud.get_ai_api_keys(db)
-        if not ai_config:
-            raise ValueError("AI API keys not configured. Please add them in System Settings > API Keys.")
-        
-        self.llm_model = ai_config.get('default_text_model') or 'gpt-4o'
-        model_lower = self.llm_model.lower()
-        
-        if 'gemini' in model_lower:
-            self.llm_provider = 'gemini'
-            if not ai_config.get('gemini_api_key'):
-                raise ValueError("Gemini API key not configured.")
-            import google.generativeai as genai
-            genai.configure(api_key=ai_config['gemini_api_key'])
-            self.llm_client = genai.GenerativeModel(self.llm_model)
-            
-        elif 'claude' in model_lower or 'sonnet' in model_lower or 'opus' in model_lower:
-            self.llm_provider = 'anthropic'
-            if not ai_config.get('anthropic_api_key'):
-                raise ValueError("Anthropic API key not configured.")
-            import anthropic
-            self.llm_client = anthropic.Anthropic(api_key=ai_config['anthropic_api_key'])
-            
-        else:
-            self.llm_provider = 'openai'
-            if not ai_config.get('openai_api_key'):
-                raise ValueError("OpenAI API key not configured.")
-            from openai import OpenAI
-            self.llm_client = OpenAI(api_key=ai_config['openai_api_key'])
+        """Resolve the LLM model and provider from system settings"""
+        self.llm = llm_gateway_service.select()
+        self.llm_model = self.llm.model
+        self.llm_provider = self.llm.provider
         
         print(f"   🤖 Initialized {self.llm_provider} with model: {self.llm_model}")
     
-    def _llm_complete(self, system_prompt: str, user_prompt: str, max_tokens: int = 2000) -> str:
+    async def _llm_complete(self, system_prompt: str, user_prompt: str, max_tokens: int = 2000, cache: bool = True) -> str:
         """Universal LLM completion with timeout handling"""
-        import signal
-        
-        def timeout_handler(signum, frame):
-            raise TimeoutError("LLM call timed out")
-        
         try:
-            # Set a 225 second timeout for LLM calls (5x increased)
-            old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(225)
-            
-            try:
-                if self.llm_provider == 'openai':
-                    response = self.llm_client.chat.completions.create(
-                        model=self.llm_model,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        max_completion_tokens=max_tokens,
-                        timeout=200
-                    )
-                    result = response.choices[0].message.content.strip()
-                    
-                elif self.llm_provider == 'gemini':
-                    full_prompt = f"{system_prompt}\n\n{user_prompt}"
-                    response = self.llm_client.generate_content(full_prompt)
-                    result = response.text.strip()
-                    
-                elif self.llm_provider == 'anthropic':
-                    response = self.llm_client.messages.create(
-                        model=self.llm_model,
-                        max_tokens=max_tokens,
-                        system=system_prompt,
-                        messages=[{"role": "user", "content": user_prompt}]
-                    )
-                    result = response.content[0].text.strip()
-                else:
-                    result = ""
-                    
-                signal.alarm(0)
-                return result
-                
-            finally:
-                signal.alarm(0)
-                signal.signal(signal.SIGALRM, old_handler)
-                
-        except TimeoutError:
+            return await llm_gateway_service.complete(
+                system_prompt, user_prompt, max_tokens, target=self.llm, timeout=LLM_CALL_TIMEOUT_SECONDS,
+                cache=cache, agent_type='movie_review'
+            )
+        except LLMTimeoutError:
             print(f"   ⚠️ LLM call timed out, using raw content")
             return ""
         except Exception as e:
@@ -286,26 +237,46 @@ class MovieReviewAgentService:
                     print(f"   📄 Detected as Direct Article")
                     review_urls = [ref_url]
                 
-                # Process each review URL (stop when we've created enough reviews)
-                for review_url in review_urls:
-                    # Check if we've already created enough reviews
-                    if results["reviews_created"] >= max_reviews:
-                        print(f"   ✅ Reached max reviews limit ({max_reviews}), stopping...")
-                        break
-                    
+                # Process review URLs a few at a time (stop when we've created enough reviews).
+                # Each review reports into its own results, merged in listing order.
+                claims = OrderedClaims(len(review_urls))
+                processed = 0
+                
+                async def process_review(index: int, review_url: str) -> Dict:
+                    nonlocal processed
+                    item_results = self._empty_results()
                     try:
                         await self._process_single_review(
                             review_url=review_url,
                             article_language=article_language,
                             content_workflow=content_workflow,
                             rating_strategy=rating_strategy,
-                            results=results,
-                            review_website=review_website
+                            results=item_results,
+                            review_website=review_website,
+                            claims=claims,
+                            index=index
                         )
                     except Exception as e:
                         error_msg = f"Error processing {review_url}: {str(e)}"
                         print(f"   ❌ {error_msg}")
-                        results["errors"].append(error_msg)
+                        item_results["errors"].append(error_msg)
+                    processed += 1
+                    report_progress('reviews', f"{processed} review(s) processed from {ref_url}")
+                    return item_results
+                
+                for item_results in await run_until(
+                    review_urls,
+                    claims.claims(process_review),
+                    bulk_parallelism(agent),
+                    target=max_reviews - results["reviews_created"],
+                    succeeded=lambda item: item["reviews_created"] > 0
+                ):
+                    for key, value in item_results.items():
+                        results[key] += value
+                
+                if results["reviews_created"] >= max_reviews:
+                    print(f"   ✅ Reached max reviews limit ({max_reviews}), stopping...")
+                    break
             
         except Exception as e:
             results["status"] = "failed"
@@ -315,10 +286,19 @@ class MovieReviewAgentService:
         
         print(f"\n   📊 Final Results: {results['reviews_created']} created, {results['reviews_skipped']} skipped")
         return results
-        
-        return results
     
-    def _rewrite_from_temp(self, language: str) -> Dict:
+    def _empty_results(self) -> Dict:
+        """Counters and lists one review contributes to the run results"""
+        return {
+            "reviews_scraped": 0,
+            "reviews_created": 0,
+            "reviews_skipped": 0,
+            "errors": [],
+            "created_reviews": [],
+            "skipped_reviews": []
+        }
+    
+    async def _rewrite_from_temp(self, language: str) -> Dict:
         """Rewrite review sections from temp storage using LLM, with fallback to raw content"""
         
         if not self.temp_review_data:
@@ -355,7 +335,7 @@ Only include genuine positives, not neutral observations.
 Story Review:
 {story_review_text}"""
                 
-                result_works = self._llm_complete(system_prompt, what_works_prompt)
+                result_works = await self._llm_complete(system_prompt, what_works_prompt)
                 rewritten['what_works'] = result_works if result_works else ''
                 print(f"      ✅ Extracted what works: {len(rewritten['what_works'])} chars")
             except Exception as e:
@@ -371,7 +351,7 @@ Only include genuine negatives or criticisms, not neutral observations.
 Story Review:
 {story_review_text}"""
                 
-                result_doesnt_work = self._llm_complete(system_prompt, what_doesnt_work_prompt)
+                result_doesnt_work = await self._llm_complete(system_prompt, what_doesnt_work_prompt)
                 rewritten['what_doesnt_work'] = result_doesnt_work if result_doesnt_work else ''
                 print(f"      ✅ Extracted what doesn't work: {len(rewritten['what_doesnt_work'])} chars")
             except Exception as e:
@@ -383,7 +363,7 @@ Story Review:
             if what_works_raw:
                 print(f"      - Processing highlights...")
                 try:
-                    result = self._llm_complete(system_prompt, f'Rewrite these highlights/positives for "{movie_name}" as 4-6 bullet points starting with •:\n\n' + what_works_raw)
+                    result = await self._llm_complete(system_prompt, f'Rewrite these highlights/positives for "{movie_name}" as 4-6 bullet points starting with •:\n\n' + what_works_raw)
                     rewritten['what_works'] = result if result else what_works_raw
                 except Exception as e:
                     print(f"      ⚠️ LLM failed for highlights, using raw content: {str(e)[:50]}")
@@ -395,7 +375,7 @@ Story Review:
             if what_doesnt_work_raw:
                 print(f"      - Processing drawbacks...")
                 try:
-                    result = self._llm_complete(system_prompt, f'Rewrite these drawbacks/negatives for "{movie_name}" as 3-5 bullet points starting with •:\n\n' + what_doesnt_work_raw)
+                    result = await self._llm_complete(system_prompt, f'Rewrite these drawbacks/negatives for "{movie_name}" as 3-5 bullet points starting with •:\n\n' + what_doesnt_work_raw)
                     rewritten['what_doesnt_work'] = result if result else what_doesnt_work_raw
                 except Exception as e:
                     print(f"      ⚠️ LLM failed for drawbacks, using raw content: {str(e)[:50]}")
@@ -416,7 +396,7 @@ Story Review:
             if raw_content:
                 print(f"      - Processing {label}...")
                 try:
-                    result = self._llm_complete(system_prompt, prompt_prefix + raw_content)
+                    result = await self._llm_complete(system_prompt, prompt_prefix + raw_content)
                     rewritten[field] = result if result else raw_content
                 except Exception as e:
                     print(f"      ⚠️ LLM failed for {label}, using raw content: {str(e)[:50]}")
@@ -718,18 +698,18 @@ Story Review:
         
         Returns list of review URLs found on the page
         """
-        import httpx
-        from bs4 import BeautifulSoup
+        from services.http_client_service import http_client_service
+        from services.html_parser_service import make_soup
         import json
         
         print(f"      🔍 Scraping listing page: {listing_url}")
         
         try:
-            async with httpx.AsyncClient(follow_redirects=True, timeout=30.0) as client:
+            async with http_client_service.session() as client:
                 response = await client.get(listing_url)
                 response.raise_for_status()
                 
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = make_soup(response.content)
                 review_links = []
                 
                 # Check if this is Pinkvilla - special handling for JSON-LD
@@ -880,7 +860,8 @@ Story Review:
         
         return review_links[:max_links]
     
-    async def _process_single_review(self, review_url: str, article_language: str, content_workflow: str, rating_strategy: str, results: dict, review_website: str = ''):
+    async def _process_single_review(self, review_url: str, article_language: str, content_workflow: str, rating_strategy: str, results: dict, review_website: str = '',
+                                     claims: OrderedClaims = None, index: int = 0):
         """
         Process a single review URL - check if exists, scrape, and create if needed
         
@@ -891,6 +872,8 @@ Story Review:
             rating_strategy: 'lowest', 'highest', 'average'
             results: Results dict to update
             review_website: Website source to force specific scraper (optional)
+            claims: Movies claimed by reviews of this run processed concurrently (optional)
+            index: Position of this review in the run, for claims
         """
         from services.movie_review_scraper_service import movie_review_scraper
         
@@ -981,6 +964,17 @@ Story Review:
                     })
                     return
             
+            # Another review of this run may be creating the same movie; the earlier listing entry wins
+            if claims and not await claims.claim(index, f"{content_language_code}:{clean_movie_name.lower()}"):
+                print(f"      ⏭️  SKIPPED: '{movie_name}' ({article_language}) is already being created in this run")
+                results["reviews_skipped"] += 1
+                results["skipped_reviews"].append({
+                    "movie_name": movie_name,
+                    "language": article_language,
+                    "reason": "Duplicate in this run"
+                })
+                return
+            
             # Step 4: Review doesn't exist - create it
             print(f"      ✅ NEW MOVIE: '{movie_name}' ({article_language}) - Creating review...")
             
@@ -1021,12 +1015,12 @@ Story Review:
             }
             
             # Initialize LLM if not already done
-            if not self.llm_client:
+            if not self.llm:
                 self._initialize_llm()
             
             # Rewrite sections
             print(f"      ✍️  Rewriting with LLM...")
-            rewritten_sections = self._rewrite_from_temp(article_language)
+            rewritten_sections = await self._rewrite_from_temp(article_language)
             
             # Create article
             print(f"      📝 Creating article...")
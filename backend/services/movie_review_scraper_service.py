@@ -4,8 +4,9 @@ Generic scraper for extracting movie review data from various websites
 Supports: greatandhra.com, gulte.com, and other Telugu/Hindi movie review sites
 """
 
-import httpx
+from services.http_client_service import http_client_service
 from bs4 import BeautifulSoup
+from services.html_parser_service import html_parser_service, make_soup
 import re
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
@@ -75,7 +76,7 @@ class MovieReviewScraper:
         print(f"🎬 Scraping review from: {url}")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+            async with http_client_service.session() as client:
                 response = await client.get(url, headers=self.headers)
                 response.raise_for_status()
                 html = response.text
@@ -83,7 +84,11 @@ class MovieReviewScraper:
             print(f"❌ Error fetching URL: {e}")
             raise Exception(f"Failed to fetch review page: {str(e)}")
         
-        soup = BeautifulSoup(html, 'html.parser')
+        return await html_parser_service.parse(self.parse_review, html, url, force_source)
+    
+    def parse_review(self, html: str, url: str, force_source: str = None) -> MovieReviewData:
+        """Review fields from a fetched review page with the site-specific parser"""
+        soup = make_soup(html)
         
         # Use forced source or detect from URL
         if force_source:
@@ -9,7 +9,10 @@ import json
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 import os
-import asyncio
+
+from services.llm_gateway_service import llm_gateway_service
+from services.bulk_worker_pool import run_until, bulk_parallelism, OrderedClaims
+from services.agent_job_service import report_progress
 
 
 class OTTReviewAgentService:
@@ -52,13 +55,13 @@ class OTTReviewAgentService:
     
     def __init__(self):
         self.temp_review_data = {}
-        self.llm_client = None
+        self.llm = None
         self.llm_model = None
         self.llm_provider = None
         self.llm_initialized = False
     
     def _initialize_llm(self, db):
-        """Initialize LLM client based on system settings"""
+        """Resolve the LLM model and provider from system settings"""
         if self.llm_initialized:
             return
             
@@ -68,24 +71,9 @@ class OTTReviewAgentService:
                 print("   ⚠️ No AI API keys configured - LLM rewriting disabled")
                 return
             
-            self.llm_model = ai_config.get('default_text_model') or 'gpt-4o'
-            model_lower = self.llm_model.lower()
-            
-            # Determine provider based on model name
-            if 'gemini' in model_lower:
-                self.llm_provider = 'gemini'
-                import google.generativeai as genai
-                genai.configure(api_key=ai_config['gemini_api_key'])
-                self.llm_client = genai.GenerativeModel(self.llm_model)
-            elif 'claude' in model_lower or 'anthropic' in model_lower:
-                self.llm_provider = 'anthropic'
-                import anthropic
-                self.llm_client = anthropic.Anthropic(api_key=ai_config['anthropic_api_key'])
-            else:
-                # Default to OpenAI
-                self.llm_provider = 'openai'
-                from openai import OpenAI
-                self.llm_client = OpenAI(api_key=ai_config['openai_api_key'])
+            self.llm = llm_gateway_service.select(ai_config=ai_config)
+            self.llm_model = self.llm.model
+            self.llm_provider = self.llm.provider
             
             self.llm_initialized = True
             print(f"   🤖 Initialized {self.llm_provider} with model: {self.llm_model}")
@@ -93,42 +81,23 @@ class OTTReviewAgentService:
             print(f"   ⚠️ Failed to initialize LLM: {str(e)}")
             self.llm_initialized = False
     
-    def _llm_complete(self, system_prompt: str, user_prompt: str, max_tokens: int = 1500) -> str:
+    async def _llm_complete(self, system_prompt: str, user_prompt: str, max_tokens: int = 1500, cache: bool = True) -> str:
         """Make LLM completion call"""
-        if not self.llm_client:
+        if not self.llm:
             return None
         
         try:
-            if self.llm_provider == 'openai':
-                response = self.llm_client.chat.completions.create(
-                    model=self.llm_model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    max_tokens=max_tokens,
-                    temperature=0.7
-                )
-                return response.choices[0].message.content.strip()
-            elif self.llm_provider == 'gemini':
-                full_prompt = f"{system_prompt}\n\n{user_prompt}"
-                response = self.llm_client.generate_content(full_prompt)
-                return response.text.strip()
-            elif self.llm_provider == 'anthropic':
-                response = self.llm_client.messages.create(
-                    model=self.llm_model,
-                    max_tokens=max_tokens,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": user_prompt}]
-                )
-                return response.content[0].text.strip()
+            return await llm_gateway_service.complete(
+                system_prompt, user_prompt, max_tokens, target=self.llm, temperature=0.7,
+                cache=cache, agent_type='ott_review'
+            )
         except Exception as e:
             print(f"      ⚠️ LLM call failed: {str(e)[:100]}")
             return None
     
-    def _rewrite_section(self, content: str, section_type: str, title: str) -> str:
+    async def _rewrite_section(self, content: str, section_type: str, title: str) -> str:
         """Rewrite a review section to be more concise with proper paragraphs"""
-        if not content or not self.llm_client:
+        if not content or not self.llm:
             return content
         
         system_prompt = """You are an expert entertainment critic. Rewrite the given content to be:
@@ -150,7 +119,7 @@ class OTTReviewAgentService:
         user_prompt = prompts.get(section_type, f'Rewrite this in 2-3 concise paragraphs:\n\n{content}')
         
         try:
-            result = self._llm_complete(system_prompt, user_prompt)
+            result = await self._llm_complete(system_prompt, user_prompt)
             if result:
                 return result
         except Exception as e:
@@ -336,27 +305,53 @@ class OTTReviewAgentService:
                     # Direct review URL
                     review_urls = [ref_url]
                 
-                # Process each review
-                for review_url in review_urls:
-                    if results["reviews_created"] >= max_reviews:
-                        print(f"   ✅ Reached max reviews limit ({max_reviews}), stopping...")
-                        break
-                    
+                # Process reviews a few at a time; LLM rate limits are handled by the gateway.
+                # Each review reports into its own results, merged in listing order.
+                claims = OrderedClaims(len(review_urls))
+                processed = 0
+                
+                async def process_review(index: int, review_url: str) -> Dict:
+                    nonlocal processed
+                    item_results = {
+                        "reviews_scraped": 0,
+                        "reviews_created": 0,
+                        "reviews_skipped": 0,
+                        "skipped_reviews": [],
+                        "created_reviews": [],
+                        "errors": []
+                    }
                     try:
                         await self._process_single_review(
                             review_url=review_url,
                             article_language=article_language,
                             content_workflow=content_workflow,
                             ott_lookup=ott_lookup,
-                            results=results,
-                            db=db
+                            results=item_results,
+                            db=db,
+                            claims=claims,
+                            index=index
                         )
-                        # Small delay between reviews to avoid rate limiting
-                        await asyncio.sleep(0.5)
                     except Exception as e:
                         error_msg = f"Error processing {review_url}: {str(e)}"
                         print(f"   ❌ {error_msg}")
-                        results["errors"].append(error_msg)
+                        item_results["errors"].append(error_msg)
+                    processed += 1
+                    report_progress('reviews', f"{processed} review(s) processed from {ref_url}")
+                    return item_results
+                
+                for item_results in await run_until(
+                    review_urls,
+                    claims.claims(process_review),
+                    bulk_parallelism(agent),
+                    target=max_reviews - results["reviews_created"],
+                    succeeded=lambda item: item["reviews_created"] > 0
+                ):
+                    for key, value in item_results.items():
+                        results[key] += value
+                
+                if results["reviews_created"] >= max_reviews:
+                    print(f"   ✅ Reached max reviews limit ({max_reviews}), stopping...")
+                    break
             
         except Exception as e:
             results["status"] = "failed"
@@ -371,8 +366,8 @@ class OTTReviewAgentService:
     
     async def _process_single_review(self, review_url: str, article_language: str, 
                                       content_workflow: str, ott_lookup: Dict,
-                                      results: dict, db):
-        """Process a single OTT review"""
+                                      results: dict, db, claims=None, index: int = 0):
+        """Process a single OTT review; claims dedups titles across reviews of one run"""
         from services.ott_review_scraper_service import ott_review_scraper
         from services.binged_scraper_service import binged_scraper
         import crud
@@ -414,6 +409,16 @@ class OTTReviewAgentService:
             
             # Try to match with OTT releases data
             normalized_title = self._normalize_title_for_matching(title)
+            
+            # Another review of this run may be creating the same title; the earlier listing entry wins
+            if claims and not await claims.claim(index, normalized_title):
+                print(f"      ⏭️  SKIPPED: '{title}' is already being created in this run")
+                results["reviews_skipped"] += 1
+                results["skipped_reviews"].append({
+                    "title": title,
+                    "reason": "Duplicate in this run"
+                })
+                return
             ott_info = ott_lookup.get(normalized_title)
             
             # Try partial matching if exact match not found
@@ -583,35 +588,35 @@ class OTTReviewAgentService:
         # Story/Synopsis section - rewrite to be concise
         story_content = review_data.story_synopsis or review_data.synopsis
         if story_content and self.llm_initialized:
-            rewritten_story = self._rewrite_section(story_content, 'story', review_data.title)
+            rewritten_story = await self._rewrite_section(story_content, 'story', review_data.title)
             if rewritten_story:
                 story_content = rewritten_story
         
         # Performances section - rewrite to 2-3 paragraphs
         performances_content = review_data.performances
         if performances_content and self.llm_initialized:
-            rewritten_perf = self._rewrite_section(performances_content, 'performances', review_data.title)
+            rewritten_perf = await self._rewrite_section(performances_content, 'performances', review_data.title)
             if rewritten_perf:
                 performances_content = rewritten_perf
         
         # Analysis section - rewrite to 2-3 paragraphs
         analysis_content = review_data.analysis
         if analysis_content and self.llm_initialized:
-            rewritten_analysis = self._rewrite_section(analysis_content, 'analysis', review_data.title)
+            rewritten_analysis = await self._rewrite_section(analysis_content, 'analysis', review_data.title)
             if rewritten_analysis:
                 analysis_content = rewritten_analysis
         
         # Technical Aspects section - rewrite to 1-2 paragraphs
         technical_content = review_data.technical_aspects
         if technical_content and self.llm_initialized:
-            rewritten_tech = self._rewrite_section(technical_content, 'technical', review_data.title)
+            rewritten_tech = await self._rewrite_section(technical_content, 'technical', review_data.title)
             if rewritten_tech:
                 technical_content = rewritten_tech
         
         # Verdict section - rewrite to be concise
         verdict_content = review_data.verdict
         if verdict_content and self.llm_initialized:
-            rewritten_verdict = self._rewrite_section(verdict_content, 'verdict', review_data.title)
+            rewritten_verdict = await self._rewrite_section(verdict_content, 'verdict', review_data.title)
             if rewritten_verdict:
                 verdict_content = rewritten_verdict
         
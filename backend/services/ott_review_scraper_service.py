@@ -2,8 +2,8 @@
 OTT Review Scraper Service
 Scrapes OTT movie and web series reviews from binged.com/category/reviews/
 """
-import httpx
-from bs4 import BeautifulSoup
+from services.http_client_service import http_client_service
+from services.html_parser_service import make_soup
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict
 import re
@@ -83,11 +83,11 @@ class OTTReviewScraper:
         print(f"🔍 Fetching OTT review links from {url}")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True, http2=True) as client:
+            async with http_client_service.session() as client:
                 response = await client.get(url, headers=self.headers)
                 response.raise_for_status()
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = make_soup(response.text)
                 review_links = []
                 
                 # Find review article links - binged.com uses specific patterns
@@ -146,11 +146,11 @@ class OTTReviewScraper:
         data.source_url = url
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True, http2=True) as client:
+            async with http_client_service.session() as client:
                 response = await client.get(url, headers=self.headers)
                 response.raise_for_status()
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = make_soup(response.text)
                 
                 # Extract title from h1
                 title_elem = soup.find('h1')
@@ -0,0 +1,268 @@
+"""
+Reference Fetcher Service
+Async page fetcher for agent reference URLs (listing pages and articles).
+Pages are fetched over the shared HTTP client under domain_throttle, the same
+per-domain limits the release scrapers use, and cached on disk: a
+fresh copy is served without a request, a stale one is revalidated with
+If-None-Match / If-Modified-Since. Listing pages go stale quickly, article
+pages much later. The cache is pruned every few minutes: entries not written
+for REFERENCE_CACHE_MAX_AGE_SECONDS are removed, then the oldest ones until it
+fits in REFERENCE_CACHE_MAX_MB. Trafilatura extraction runs in a process pool so parsing
+large pages does not block the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from services.domain_throttle import domain_throttle
+from services.http_client_service import http_client_service
+
+# Tuning (override via environment)
+REFERENCE_CACHE_DIR = os.environ.get("REFERENCE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "tadka_reference_cache"))
+REFERENCE_LISTING_TTL_SECONDS = int(os.environ.get("REFERENCE_LISTING_TTL_SECONDS", "300"))
+REFERENCE_ARTICLE_TTL_SECONDS = int(os.environ.get("REFERENCE_ARTICLE_TTL_SECONDS", str(24 * 3600)))
+REFERENCE_FETCH_CONCURRENCY = int(os.environ.get("REFERENCE_FETCH_CONCURRENCY", "16"))
+REFERENCE_FETCH_RETRIES = int(os.environ.get("REFERENCE_FETCH_RETRIES", "1"))
+REFERENCE_EXTRACT_WORKERS = int(os.environ.get("REFERENCE_EXTRACT_WORKERS", "2"))
+REFERENCE_CACHE_MAX_MB = int(os.environ.get("REFERENCE_CACHE_MAX_MB", "512"))
+REFERENCE_CACHE_MAX_AGE_SECONDS = int(os.environ.get("REFERENCE_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+REFERENCE_CACHE_PRUNE_INTERVAL_SECONDS = 600
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+TTL_BY_TYPE = {
+    "listing": REFERENCE_LISTING_TTL_SECONDS,
+    "article": REFERENCE_ARTICLE_TTL_SECONDS,
+}
+
+
+def _extract(html: str) -> Tuple[Optional[str], str]:
+    """Main text and title of a page (runs in a worker process)"""
+    import trafilatura
+
+    text = trafilatura.extract(
+        html,
+        include_comments=False,
+        include_tables=True,
+        no_fallback=False,
+        favor_precision=True
+    )
+    metadata = trafilatura.extract_metadata(html)
+    return text, (metadata.title if metadata and metadata.title else "")
+
+
+class _DiskCache:
+    """One JSON metadata file and one body file per URL"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key[:2], key)
+        return base + ".json", base + ".body"
+
+    def load(self, url: str) -> Optional[Tuple[Dict, bytes]]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None
+
+    def store(self, url: str, meta: Dict, body: Optional[bytes] = None):
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        if body is not None:
+            self._write(body_path, body)
+        self._write(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def prune(self, max_bytes: int, max_age_seconds: float) -> int:
+        """
+        Remove entries last written more than max_age_seconds ago, then the
+        oldest remaining ones until the cache fits in max_bytes. Returns the
+        number of entries removed.
+        """
+        entries = []  # (written_at, size, paths)
+        now = time.time()
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if name.endswith(".tmp"):
+                    if now - stat.st_mtime > 3600:  # left behind by a crashed write
+                        self._remove(path)
+                    continue
+                if not name.endswith(".json"):
+                    continue
+                body_path = path[:-len(".json")] + ".body"
+                try:
+                    size = stat.st_size + os.path.getsize(body_path)
+                except OSError:
+                    size = stat.st_size
+                entries.append((stat.st_mtime, size, (path, body_path)))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for written_at, size, paths in entries:
+            if now - written_at <= max_age_seconds and total <= max_bytes:
+                break
+            for path in paths:
+                self._remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        # Write then rename, so concurrent readers never see a partial file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+
+class ReferenceFetcherService:
+    """Cached, polite page fetches and off-loop extraction for agents"""
+
+    def __init__(self, cache_dir: str = REFERENCE_CACHE_DIR):
+        self.cache = _DiskCache(cache_dir)
+        self._semaphores = weakref.WeakKeyDictionary()  # loop -> overall concurrency Semaphore
+        self._executor = None
+        self._last_prune = 0.0
+        self.stats = {"fresh_hits": 0, "revalidated": 0, "downloads": 0, "errors": 0, "evicted": 0}
+
+    def _concurrency(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(REFERENCE_FETCH_CONCURRENCY)
+        return self._semaphores[loop]
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=REFERENCE_EXTRACT_WORKERS)
+        return self._executor
+
+    def shutdown(self):
+        """Stop the extraction pool (called on application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def fetch(self, url: str, url_type: str = "article") -> Optional[str]:
+        """
+        HTML of a page, or None if it could not be downloaded.
+        url_type 'listing' or 'article' picks the cache TTL.
+        """
+        ttl = TTL_BY_TYPE.get(url_type, REFERENCE_ARTICLE_TTL_SECONDS)
+        cached = await asyncio.to_thread(self.cache.load, url)
+        if cached and time.time() - cached[0].get("fetched_at", 0) < ttl:
+            self.stats["fresh_hits"] += 1
+            return self._decode(*cached)
+
+        headers = {}
+        if cached:
+            if cached[0].get("etag"):
+                headers["If-None-Match"] = cached[0]["etag"]
+            if cached[0].get("last_modified"):
+                headers["If-Modified-Since"] = cached[0]["last_modified"]
+
+        async with self._concurrency():
+            for attempt in range(REFERENCE_FETCH_RETRIES + 1):
+                try:
+                    async with domain_throttle.slot(url):
+                        response = await http_client_service.client().get(url, headers=headers)
+                except httpx.TransportError as e:
+                    error = e
+                else:
+                    if response.status_code not in RETRYABLE_STATUS_CODES:
+                        break
+                    error = f"status {response.status_code}"
+                if attempt < REFERENCE_FETCH_RETRIES:
+                    await asyncio.sleep(1.0 * 2 ** attempt)
+            else:
+                return self._fallback(url, cached, error)
+
+        if response.status_code == 304 and cached:
+            meta = dict(cached[0], fetched_at=time.time())
+            await asyncio.to_thread(self.cache.store, url, meta)
+            self.stats["revalidated"] += 1
+            return self._decode(meta, cached[1])
+        if response.status_code != 200:
+            return self._fallback(url, cached, f"status {response.status_code}")
+
+        meta = {
+            "url": url,
+            "fetched_at": time.time(),
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "encoding": response.encoding,
+        }
+        await asyncio.to_thread(self.cache.store, url, meta, response.content)
+        self.stats["downloads"] += 1
+        await self._maybe_prune()
+        return self._decode(meta, response.content)
+
+    async def _maybe_prune(self):
+        """Prune the disk cache at most every REFERENCE_CACHE_PRUNE_INTERVAL_SECONDS"""
+        if time.monotonic() - self._last_prune < REFERENCE_CACHE_PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_prune = time.monotonic()
+        try:
+            removed = await asyncio.to_thread(
+                self.cache.prune, REFERENCE_CACHE_MAX_MB * 1024 * 1024, REFERENCE_CACHE_MAX_AGE_SECONDS
+            )
+        except Exception as e:
+            print(f"⚠️ Reference cache prune failed: {e}")
+            return
+        self.stats["evicted"] += removed
+
+    async def extract(self, html: str) -> Tuple[Optional[str], str]:
+        """(main text, title) of a page via trafilatura, off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), _extract, html)
+
+    def get_metrics(self) -> Dict:
+        return dict(self.stats)
+
+    def _fallback(self, url: str, cached: Optional[Tuple[Dict, bytes]], error) -> Optional[str]:
+        """Serve a stale copy rather than nothing when the site is failing"""
+        self.stats["errors"] += 1
+        if cached:
+            print(f"⚠️ Fetch failed for {url} ({error}), using cached copy")
+            return self._decode(*cached)
+        print(f"❌ Fetch failed for {url}: {error}")
+        return None
+
+    @staticmethod
+    def _decode(meta: Dict, body: bytes) -> str:
+        try:
+            return body.decode(meta.get("encoding") or "utf-8", errors="replace")
+        except LookupError:
+            return body.decode("utf-8", errors="replace")
+
+
+# Singleton instance
+reference_fetcher_service = ReferenceFetcherService()
@@ -3,20 +3,37 @@ Release Scraper Service
 Fetches OTT/Theater release data from RSS feeds and websites
 """
 
-import httpx
-import asyncio
+from services.bulk_worker_pool import run_bounded
+from services.domain_throttle import domain_throttle
+from services.http_client_service import http_client_service
+import os
+import time
 import xml.etree.ElementTree as ET
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Optional
 from database import db
 import re
 import uuid
-from bs4 import BeautifulSoup
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from services.html_parser_service import make_soup
 
 # Collection names
 RELEASE_SOURCES = "release_sources"
 RELEASE_FEED_ITEMS = "release_feed_items"
 
+RELEASE_FETCH_PARALLELISM = int(os.environ.get("RELEASE_FETCH_PARALLELISM", "6"))  # sources at once
+RELEASE_DETAIL_PARALLELISM = int(os.environ.get("RELEASE_DETAIL_PARALLELISM", "4"))  # article pages at once per source
+DETAIL_SCRAPE_LIMIT = 20
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo:
+        return value
+    return value.replace(tzinfo=timezone.utc)  # pymongo returns naive UTC datetimes
+
 
 class ReleaseScraperService:
     """Service for fetching release data from RSS feeds and websites"""
@@ -66,6 +83,7 @@ class ReleaseScraperService:
     
     def __init__(self):
         self.is_running = False
+        self.last_run = None  # summary of the last fetch_all_sources run
     
     def _detect_languages(self, text: str) -> List[str]:
         """Detect all languages mentioned in text"""
@@ -231,11 +249,53 @@ class ReleaseScraperService:
         normalized_name = self._normalize_movie_name(movie_name)
         return f"{normalized_name}:{content_type}"
     
-    def _item_exists(self, movie_name: str, content_type: str) -> bool:
-        """Check if item already exists in the database"""
-        unique_key = self._create_unique_key(movie_name, content_type)
-        existing = db[RELEASE_FEED_ITEMS].find_one({"unique_key": unique_key})
-        return existing is not None
+    def _existing_keys(self, items: List[Dict]) -> set:
+        """unique_keys of items already stored, in one query for the whole batch"""
+        keys = list({item['unique_key'] for item in items})
+        if not keys:
+            return set()
+        cursor = db[RELEASE_FEED_ITEMS].find({"unique_key": {"$in": keys}}, {"unique_key": 1, "_id": 0})
+        return {doc['unique_key'] for doc in cursor}
+    
+    def _store_items(self, items: List[Dict]) -> Dict[str, int]:
+        """
+        Upsert items on unique_key in one unordered bulk write. New items are
+        inserted whole; items already stored only get last_seen_at refreshed.
+        "updated" therefore means "seen again": every stored item counts, since
+        last_seen_at always changes, even when nothing else about it did.
+        Duplicates within the batch, or inserted concurrently by another source
+        (unique index on unique_key), are counted as skipped.
+        """
+        now = datetime.now(timezone.utc)
+        operations = []
+        batch_keys = set()
+        for item in items:
+            if item['unique_key'] in batch_keys:
+                continue
+            batch_keys.add(item['unique_key'])
+            operations.append(UpdateOne(
+                {"unique_key": item['unique_key']},
+                {"$setOnInsert": item, "$set": {"last_seen_at": now}},
+                upsert=True
+            ))
+        
+        counts = {"inserted": 0, "updated": 0, "skipped": len(items) - len(operations)}
+        if not operations:
+            return counts
+        
+        try:
+            result = db[RELEASE_FEED_ITEMS].bulk_write(operations, ordered=False)
+            details = {"nUpserted": result.upserted_count, "nModified": result.modified_count, "writeErrors": []}
+        except BulkWriteError as e:
+            details = e.details
+            for error in details.get("writeErrors", []):
+                if error.get("code") != DUPLICATE_KEY_ERROR:
+                    print(f"   ⚠️ Error storing item: {error.get('errmsg')}")
+        
+        counts["inserted"] = details.get("nUpserted", 0)
+        counts["updated"] = details.get("nModified", 0)
+        counts["skipped"] += len(details.get("writeErrors", []))
+        return counts
     
     async def fetch_rss_feed(self, source: Dict) -> List[Dict]:
         """Fetch items from RSS feed"""
@@ -256,8 +316,9 @@ class ReleaseScraperService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url, headers=headers)
+            async with http_client_service.session('feed') as client:
+                async with domain_throttle.slot(url):
+                    response = await client.get(url, headers=headers)
                 
                 if response.status_code != 200:
                     print(f"❌ RSS fetch failed for {source['source_name']}: HTTP {response.status_code}")
@@ -295,7 +356,7 @@ class ReleaseScraperService:
                         
                         # Clean HTML from description
                         if description:
-                            soup = BeautifulSoup(description, 'html.parser')
+                            soup = make_soup(description)
                             description = soup.get_text(separator=' ', strip=True)
                         
                         combined_text = f"{title} {description}"
@@ -349,10 +410,6 @@ class ReleaseScraperService:
                         # Create unique key
                         unique_key = self._create_unique_key(movie_name, content_type)
                         
-                        # Check for duplicates
-                        if self._item_exists(movie_name, content_type):
-                            continue
-                        
                         item = {
                             'id': str(uuid.uuid4()),
                             'source_id': source.get('id'),
@@ -388,7 +445,7 @@ class ReleaseScraperService:
                         print(f"   ⚠️ Error parsing RSS entry: {e}")
                         continue
                 
-                print(f"   ✅ {source['source_name']}: {len(items)} new items from RSS")
+                print(f"   ✅ {source['source_name']}: {len(items)} items from RSS")
                 return items
                 
         except Exception as e:
@@ -414,14 +471,15 @@ class ReleaseScraperService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url, headers=headers)
+            async with http_client_service.session() as client:
+                async with domain_throttle.slot(url):
+                    response = await client.get(url, headers=headers)
                 
                 if response.status_code != 200:
                     print(f"❌ Website fetch failed for {source['source_name']}: HTTP {response.status_code}")
                     return []
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = make_soup(response.text)
                 
                 # Debug: Print page title to verify fetch
                 page_title = soup.find('title')
@@ -594,10 +652,6 @@ class ReleaseScraperService:
                         # Create unique key
                         unique_key = self._create_unique_key(movie_name, content_type)
                         
-                        # Check for duplicates
-                        if self._item_exists(movie_name, content_type):
-                            continue
-                        
                         item = {
                             'id': str(uuid.uuid4()),
                             'source_id': source.get('id'),
@@ -632,7 +686,7 @@ class ReleaseScraperService:
                         print(f"   ⚠️ Error parsing article: {e}")
                         continue
                 
-                print(f"   ✅ {source['source_name']}: {len(items)} new items from website")
+                print(f"   ✅ {source['source_name']}: {len(items)} items from website")
                 return items
                 
         except Exception as e:
@@ -648,15 +702,16 @@ class ReleaseScraperService:
             return item
         
         try:
-            async with httpx.AsyncClient(timeout=20.0, follow_redirects=True) as client:
-                response = await client.get(url, headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                })
+            async with http_client_service.session() as client:
+                async with domain_throttle.slot(url):
+                    response = await client.get(url, timeout=20.0, headers={
+                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                    })
                 
                 if response.status_code != 200:
                     return item
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = make_soup(response.text)
                 html_text = response.text
                 
                 # Extract YouTube URL
@@ -706,6 +761,7 @@ class ReleaseScraperService:
     async def fetch_source(self, source: Dict) -> Dict:
         """Fetch items from a single source"""
         source_type = source.get('source_type', 'rss')
+        started = time.monotonic()
         
         print(f"\n🔄 Fetching: {source['source_name']} ({source_type})")
         
@@ -714,40 +770,70 @@ class ReleaseScraperService:
         else:
             items = await self.fetch_website(source)
         
-        # Scrape article details for each item
-        enriched_items = []
-        for item in items[:20]:  # Limit to 20 for detail scraping (avoid rate limiting)
-            enriched = await self.scrape_article_details(item)
-            enriched_items.append(enriched)
-            await asyncio.sleep(0.5)  # Rate limiting
+        # One entry per unique_key; only items not stored yet are worth an article page request
+        by_key = {}
+        for item in items:
+            by_key.setdefault(item['unique_key'], item)
+        batch = list(by_key.values())
+        existing_keys = self._existing_keys(batch)
+        new_items = [item for item in batch if item['unique_key'] not in existing_keys]
+        seen_items = [item for item in batch if item['unique_key'] in existing_keys]
+        
+        # Scrape article details for the first new items, several at a time;
+        # domain_throttle keeps the request rate per site polite
+        enriched_items = await run_bounded(
+            new_items[:DETAIL_SCRAPE_LIMIT],
+            lambda index, item: self.scrape_article_details(item),
+            RELEASE_DETAIL_PARALLELISM
+        )
         
         # Add remaining items without enrichment
-        enriched_items.extend(items[20:])
+        enriched_items.extend(new_items[DETAIL_SCRAPE_LIMIT:])
         
         # Store items in database
-        new_count = 0
-        for item in enriched_items:
-            try:
-                # Double-check for duplicates before inserting
-                existing = db[RELEASE_FEED_ITEMS].find_one({"unique_key": item['unique_key']})
-                if not existing:
-                    db[RELEASE_FEED_ITEMS].insert_one(item)
-                    new_count += 1
-            except Exception as e:
-                print(f"   ⚠️ Error storing item: {e}")
+        counts = self._store_items(enriched_items + seen_items)
+        counts['skipped'] += len(items) - len(batch)
+        new_count = counts['inserted']
         
         # Update source last_fetch
+        duration = round(time.monotonic() - started, 2)
         db[RELEASE_SOURCES].update_one(
             {"id": source['id']},
-            {"$set": {"last_fetch": datetime.now(timezone.utc)}}
+            {"$set": {
+                "last_fetch": datetime.now(timezone.utc),
+                "last_fetch_seconds": duration,
+                "last_fetch_new_items": new_count
+            }}
         )
         
         return {
+            "source_id": source['id'],
             "source_name": source['source_name'],
             "total_fetched": len(items),
-            "new_items": new_count
+            "new_items": new_count,
+            "updated_items": counts['updated'],
+            "skipped_items": counts['skipped'],
+            "duration_seconds": duration
         }
     
+    async def _fetch_source_safely(self, source: Dict) -> Dict:
+        """fetch_source for a scheduled run: a failing source is reported, not raised"""
+        started = time.monotonic()
+        try:
+            return await self.fetch_source(source)
+        except Exception as e:
+            print(f"❌ Error fetching {source.get('source_name')}: {e}")
+            return {
+                "source_id": source.get('id'),
+                "source_name": source.get('source_name'),
+                "total_fetched": 0,
+                "new_items": 0,
+                "updated_items": 0,
+                "skipped_items": 0,
+                "duration_seconds": round(time.monotonic() - started, 2),
+                "error": str(e)
+            }
+    
     async def fetch_all_sources(self) -> Dict:
         """Fetch all active sources"""
         if self.is_running:
@@ -762,21 +848,28 @@ class ReleaseScraperService:
             if not sources:
                 return {"success": False, "message": "No active sources found"}
             
-            results = []
-            total_new = 0
+            # Stalest sources first, so a slow or interrupted run refreshes the oldest data
+            oldest = datetime.min.replace(tzinfo=timezone.utc)
+            sources.sort(key=lambda source: _as_utc(source.get('last_fetch')) or oldest)
             
-            for source in sources:
-                result = await self.fetch_source(source)
-                results.append(result)
-                total_new += result['new_items']
-                await asyncio.sleep(1)  # Rate limiting between sources
+            # Sources run in parallel; requests to the same site are still paced by domain_throttle
+            started_at = datetime.now(timezone.utc)
+            started = time.monotonic()
+            results = await run_bounded(sources, lambda index, source: self._fetch_source_safely(source),
+                                        RELEASE_FETCH_PARALLELISM)
             
-            return {
+            summary = {
                 "success": True,
                 "sources_fetched": len(sources),
-                "total_new_items": total_new,
+                "failed_sources": sum(1 for result in results if result.get('error')),
+                "total_new_items": sum(result['new_items'] for result in results),
+                "total_updated_items": sum(result['updated_items'] for result in results),
+                "started_at": started_at.isoformat(),
+                "duration_seconds": round(time.monotonic() - started, 2),
                 "results": results
             }
+            self.last_run = summary
+            return summary
             
         except Exception as e:
             print(f"❌ Fetch error: {e}")
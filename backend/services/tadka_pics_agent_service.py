@@ -5,7 +5,7 @@ Handles execution of AI agents to create Tadka Pics galleries from Websites or I
 import os
 import re
 import uuid
-import httpx
+from services.http_client_service import http_client_service
 import asyncio
 import tempfile
 import shutil
@@ -13,6 +13,9 @@ from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List, Tuple
 from urllib.parse import urljoin, urlparse, unquote
 from database import db
+from services.image_fetcher_service import image_fetcher_service, FetchBudget
+from services.image_variant_service import image_variant_service
+from services.media_asset_service import media_asset_service, stage_file
 import crud
 
 
@@ -23,17 +26,13 @@ class TadkaPicsAgentService:
         self.s3_service = None
         
     def _initialize_s3_service(self):
-        """Initialize S3 service using existing s3_service from server"""
+        """Use the shared s3_service, refreshing it only if aws-config changed"""
         from s3_service import s3_service
         
-        aws_config = crud.get_aws_config(db)
-        if not aws_config:
+        if s3_service.config is None and not crud.get_aws_config(db):
             raise ValueError("AWS configuration not found. Please configure S3 in System Settings.")
         
-        if not s3_service.is_enabled():
-            s3_service.initialize(aws_config)
-        
-        if not s3_service.is_enabled():
+        if not s3_service.ensure_current(db):
             raise ValueError("S3 service is not enabled. Please check AWS configuration.")
         
         self.s3_service = s3_service
@@ -55,7 +54,7 @@ class TadkaPicsAgentService:
         all_images = []
         seen_ids = set()
         
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+        async with http_client_service.session() as client:
             for url in urls:
                 if not url:
                     continue
@@ -312,61 +311,36 @@ class TadkaPicsAgentService:
 
     async def _download_images(self, images: List[Dict], temp_dir: str) -> List[Dict]:
         """Download images to temp directory"""
-        downloaded = []
         # Lower threshold for Instagram carousel images which may be smaller
         MIN_IMAGE_SIZE = 5 * 1024  # 5KB minimum (Instagram thumbnails are ~9KB)
         
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-            for i, img in enumerate(images):
-                try:
-                    url = img['url']
-                    print(f"⬇️ Downloading image {i+1}/{len(images)}...")
-                    
-                    response = await client.get(url, headers={
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                    })
-                    
-                    if response.status_code == 200:
-                        file_size = len(response.content)
-                        
-                        if file_size < MIN_IMAGE_SIZE:
-                            print(f"⏭️ Skipping small image ({file_size} bytes)")
-                            continue
-                        
-                        # Determine extension
-                        content_type = response.headers.get('content-type', '')
-                        ext = '.jpg'
-                        if 'png' in content_type:
-                            ext = '.png'
-                        elif 'webp' in content_type:
-                            ext = '.webp'
-                        
-                        filename = f"image_{len(downloaded)+1:03d}{ext}"
-                        filepath = os.path.join(temp_dir, filename)
-                        
-                        with open(filepath, 'wb') as f:
-                            f.write(response.content)
-                        
-                        downloaded.append({
-                            'local_path': filepath,
-                            'filename': filename,
-                            'original_url': url,
-                            'size': file_size
-                        })
-                        print(f"✅ Downloaded: {filename} ({file_size} bytes)")
-                        
-                except Exception as e:
-                    print(f"❌ Error downloading: {e}")
-                    continue
+        print(f"⬇️ Downloading {len(images)} images...")
+        fetched = await image_fetcher_service.fetch_many(
+            [img['url'] for img in images], temp_dir, min_size=MIN_IMAGE_SIZE, budget=FetchBudget()
+        )
+        
+        downloaded = []
+        for result in fetched:
+            if not result:
+                continue
+            filename = f"image_{len(downloaded)+1:03d}{result['ext']}"
+            filepath = os.path.join(temp_dir, filename)
+            os.replace(result['local_path'], filepath)
+            downloaded.append({
+                'local_path': filepath,
+                'filename': filename,
+                'original_url': result['original_url'],
+                'size': result['size']
+            })
+            print(f"✅ Downloaded: {filename} ({result['size']} bytes)")
         
         return downloaded
 
     async def _upload_images_to_s3(self, images: List[Dict], folder_path: str) -> List[Dict]:
-        """Upload images to S3"""
-        uploaded = []
+        """Upload images to S3 in parallel, keeping source order"""
         galleries_root = self.s3_service.config.get('galleries_root_folder', 'galleries')
         
-        for i, img in enumerate(images):
+        async def upload_one(i: int, img: Dict) -> Optional[Dict]:
             try:
                 local_path = img['local_path']
                 ext = os.path.splitext(img['filename'])[1].lower()
@@ -385,26 +359,38 @@ class TadkaPicsAgentService:
                 
                 print(f"☁️ Uploading to S3: {s3_key}")
                 
-                with open(local_path, 'rb') as f:
-                    file_content = f.read()
+                # Hashed and uploaded straight from the downloaded file, never read whole
+                staged = await asyncio.to_thread(stage_file, local_path, content_type)
                 
-                url = self.s3_service.upload_file(file_content, s3_key, content_type)
+                # Images already stored by an earlier run or upload are reused, not re-uploaded
+                asset = await media_asset_service.ingest_staged(staged, s3_key)
+                url = asset['url'] if asset else None
                 
-                if url:
-                    uploaded.append({
-                        'id': str(uuid.uuid4()),
-                        'name': new_filename,
-                        'url': url,
-                        's3_key': s3_key,
-                        'size': img['size']
-                    })
-                    print(f"✅ Uploaded: {url}")
+                if not url:
+                    return None
+                
+                if asset['deduplicated']:
+                    variants = crud.get_image_variants(db, url)
+                else:
+                    # Build responsive variants in the process pool next to the original
+                    variants = await image_variant_service.create_variants(local_path, s3_key, url)
+                print(f"✅ Uploaded: {url}")
+                return {
+                    'id': str(uuid.uuid4()),
+                    'name': new_filename,
+                    'url': url,
+                    's3_key': asset['key'],
+                    'size': img['size'],
+                    'variants': variants
+                }
                     
             except Exception as e:
                 print(f"❌ Error uploading: {e}")
-                continue
+                return None
         
-        return uploaded
+        # Streamed from disk and bounded by the S3 transfer pool; gather preserves image order
+        results = await asyncio.gather(*(upload_one(i, img) for i, img in enumerate(images)))
+        return [result for result in results if result]
 
     def _generate_gallery_id(self) -> str:
         """Generate unique gallery ID"""
@@ -524,7 +510,7 @@ class TadkaPicsAgentService:
                 if url_list:
                     embed_url = self._get_embed_url(url_list[0])
                     if embed_url:
-                        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+                        async with http_client_service.session() as client:
                             response = await client.get(embed_url, headers={
                                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
@@ -594,7 +580,7 @@ class TadkaPicsAgentService:
             
             # Generate folder path
             entity_folder_name = artist_name.lower().replace(' ', '_').replace('-', '_').replace('@', '')
-            next_number = crud.get_next_gallery_number(db, gallery_category, artist_name) or 1
+            next_number = crud.reserve_gallery_number(db, gallery_category, artist_name)
             folder_path = f"tadka_pics/{entity_folder_name}/v/{next_number}"
             
             # Upload to S3
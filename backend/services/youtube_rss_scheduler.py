@@ -1,14 +1,19 @@
 """
 YouTube RSS Scheduler Service
-Runs RSS feed fetching at configured intervals using APScheduler
+Ticks every YOUTUBE_RSS_TICK_SECONDS using APScheduler and polls only the
+channels that are due. Each channel's next poll adapts to its upload rate
+(see youtube_rss_service.poll_interval_minutes); frequency_hours is only
+the retry interval for channels that have never been fetched successfully.
 """
 
-import asyncio
+import os
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime, timezone
 from database import db
 
+YOUTUBE_RSS_TICK_SECONDS = int(os.environ.get("YOUTUBE_RSS_TICK_SECONDS", "60"))
+
 class YouTubeRSSScheduler:
     """Scheduler for YouTube RSS feed fetching"""
     
@@ -29,14 +34,14 @@ class YouTubeRSSScheduler:
         if config and config.get("enabled", False):
             frequency_hours = config.get("frequency_hours", 1)
             self.start_scheduler(frequency_hours)
-            print(f"📺 YouTube RSS Scheduler initialized - running every {frequency_hours} hour(s)")
+            print(f"📺 YouTube RSS Scheduler initialized - adaptive per-channel polling")
         else:
             print("📺 YouTube RSS Scheduler disabled (enable in Settings)")
         
         self.is_initialized = True
     
     def start_scheduler(self, frequency_hours: int = 1):
-        """Start or restart the scheduler with given frequency"""
+        """Start or restart the scheduler; frequency_hours is kept in the config as the retry interval"""
         # Stop existing scheduler if running
         self.stop_scheduler()
         
@@ -46,14 +51,14 @@ class YouTubeRSSScheduler:
         # Add job
         self.scheduler.add_job(
             self._run_fetch,
-            trigger=IntervalTrigger(hours=frequency_hours),
+            trigger=IntervalTrigger(seconds=YOUTUBE_RSS_TICK_SECONDS),
             id=self.JOB_ID,
             name="YouTube RSS Feed Fetch",
             replace_existing=True
         )
         
         self.scheduler.start()
-        print(f"✅ YouTube RSS Scheduler started - interval: {frequency_hours} hour(s)")
+        print(f"✅ YouTube RSS Scheduler started - tick: {YOUTUBE_RSS_TICK_SECONDS}s")
         
         # Update config
         db.system_settings.update_one(
@@ -74,34 +79,11 @@ class YouTubeRSSScheduler:
             print("⏹️ YouTube RSS Scheduler stopped")
     
     async def _run_fetch(self):
-        """Execute RSS fetch job"""
+        """Poll the channels that are due"""
         from services.youtube_rss_service import youtube_rss_service
         
-        print(f"\n⏰ Scheduled RSS fetch starting at {datetime.now(timezone.utc).isoformat()}")
-        
         try:
-            result = await youtube_rss_service.fetch_all_channels()
-            
-            # Update last fetch and next fetch times
-            config = db.system_settings.find_one({"setting_key": "youtube_rss_config"})
-            frequency_hours = config.get("frequency_hours", 1) if config else 1
-            
-            from datetime import timedelta
-            db.system_settings.update_one(
-                {"setting_key": "youtube_rss_config"},
-                {"$set": {
-                    "last_fetch": datetime.now(timezone.utc),
-                    "next_fetch": datetime.now(timezone.utc) + timedelta(hours=frequency_hours),
-                    "last_fetch_result": {
-                        "success": result.get("success"),
-                        "new_videos": result.get("new_videos", 0),
-                        "channels_fetched": result.get("channels_fetched", 0)
-                    }
-                }}
-            )
-            
-            print(f"✅ Scheduled RSS fetch complete: {result.get('new_videos', 0)} new videos")
-            
+            await youtube_rss_service.fetch_due_channels()
         except Exception as e:
             print(f"❌ Scheduled RSS fetch error: {e}")
             import traceback
@@ -4,17 +4,52 @@ Fetches videos from YouTube channels via RSS feeds (no API quota usage)
 Stores videos in youtube_videos collection for Video Agent to use
 """
 
-import httpx
-import asyncio
+from services.bulk_worker_pool import run_bounded
+from services.http_client_service import http_client_service
+import os
+import random
 import xml.etree.ElementTree as ET
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from database import db
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 import re
 
 # IST timezone offset
 IST = timezone(timedelta(hours=5, minutes=30))
 
+# Fields refreshed (together with fetched_at) when a stored video shows up again
+# with a new updated_at; everything else (channel metadata, is_used/is_skipped)
+# is set on first sight only
+VIDEO_MUTABLE_FIELDS = ('title', 'description', 'thumbnail', 'updated_at')
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Adaptive polling: each channel is polled again once about
+# YOUTUBE_RSS_UPLOADS_PER_POLL uploads are expected at its observed rate,
+# within the min/max bounds (overridable in youtube_rss_config)
+YOUTUBE_RSS_MIN_POLL_MINUTES = float(os.environ.get("YOUTUBE_RSS_MIN_POLL_MINUTES", "15"))
+YOUTUBE_RSS_MAX_POLL_MINUTES = float(os.environ.get("YOUTUBE_RSS_MAX_POLL_MINUTES", str(24 * 60)))
+YOUTUBE_RSS_UPLOADS_PER_POLL = float(os.environ.get("YOUTUBE_RSS_UPLOADS_PER_POLL", "0.5"))
+YOUTUBE_RSS_FETCH_CONCURRENCY = int(os.environ.get("YOUTUBE_RSS_FETCH_CONCURRENCY", "8"))
+YOUTUBE_RSS_MAX_CHANNELS_PER_TICK = int(os.environ.get("YOUTUBE_RSS_MAX_CHANNELS_PER_TICK", "50"))
+YOUTUBE_RSS_POLL_JITTER = 0.1  # +/- fraction of the interval, so channels drift apart
+
+
+def poll_interval_minutes(published_times: List[datetime], now: datetime, min_minutes: float, max_minutes: float) -> float:
+    """Minutes until a channel's next poll, from the publish times of its latest feed entries
+    
+    The rate is entries per hour since the oldest entry, so a channel that goes
+    quiet slows down on its own even while its feed is unchanged.
+    """
+    recent = [published for published in published_times if published <= now]
+    if not recent:
+        return max_minutes
+    span_hours = max((now - min(recent)).total_seconds() / 3600, 1.0)
+    uploads_per_hour = len(recent) / span_hours
+    return min(max(YOUTUBE_RSS_UPLOADS_PER_POLL * 60 / uploads_per_hour, min_minutes), max_minutes)
+
 class YouTubeRSSService:
     """Service for fetching YouTube videos via RSS feeds"""
     
@@ -48,157 +83,176 @@ class YouTubeRSSService:
         """
         # Use stored rss_url if available, otherwise generate from channel_id
         url = rss_url if rss_url else self.RSS_URL_TEMPLATE.format(channel_id=channel_id)
-        videos = []
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with http_client_service.session('feed') as client:
                 response = await client.get(url)
+            
+            if response.status_code != 200:
+                print(f"❌ RSS fetch failed for {channel_name}: HTTP {response.status_code}")
+                return []
+            
+            videos, _ = self.parse_feed(
+                response.text, channel_id, channel_name, channel_type, languages,
+                fetch_videos=fetch_videos, fetch_shorts=fetch_shorts, full_movies_only=full_movies_only
+            )
+            return videos
                 
-                if response.status_code != 200:
-                    print(f"❌ RSS fetch failed for {channel_name}: HTTP {response.status_code}")
-                    return []
+        except Exception as e:
+            print(f"❌ RSS error for {channel_name}: {e}")
+            return []
+    
+    def parse_feed(self, xml_text: str, channel_id: str, channel_name: str, channel_type: str, languages: List[str], fetch_videos: bool = True, fetch_shorts: bool = False, full_movies_only: bool = False) -> Tuple[List[Dict], List[datetime]]:
+        """Parse a channel's Atom feed
+        
+        Returns:
+            (videos passing the channel's filters, published time of every entry)
+        """
+        videos = []
+        published_times = []
+        
+        # Parse XML
+        root = ET.fromstring(xml_text)
+        
+        # Find all entry elements (videos)
+        entries = root.findall('atom:entry', self.NAMESPACES)
+        
+        for entry in entries:
+            try:
+                # Extract video ID
+                video_id_elem = entry.find('yt:videoId', self.NAMESPACES)
+                if video_id_elem is None:
+                    continue
+                video_id = video_id_elem.text
                 
-                # Parse XML
-                root = ET.fromstring(response.text)
+                # Extract title
+                title_elem = entry.find('atom:title', self.NAMESPACES)
+                title = title_elem.text if title_elem is not None else ""
                 
-                # Find all entry elements (videos)
-                entries = root.findall('atom:entry', self.NAMESPACES)
+                # Extract published date
+                published_elem = entry.find('atom:published', self.NAMESPACES)
+                published_at = published_elem.text if published_elem is not None else ""
+                try:
+                    # Every entry counts toward the channel's upload rate, filtered or not
+                    published_times.append(datetime.fromisoformat(published_at.replace('Z', '+00:00')))
+                except ValueError:
+                    pass
                 
-                for entry in entries:
-                    try:
-                        # Extract video ID
-                        video_id_elem = entry.find('yt:videoId', self.NAMESPACES)
-                        if video_id_elem is None:
-                            continue
-                        video_id = video_id_elem.text
-                        
-                        # Extract title
-                        title_elem = entry.find('atom:title', self.NAMESPACES)
-                        title = title_elem.text if title_elem is not None else ""
-                        
-                        # Extract published date
-                        published_elem = entry.find('atom:published', self.NAMESPACES)
-                        published_at = published_elem.text if published_elem is not None else ""
-                        
-                        # Extract updated date
-                        updated_elem = entry.find('atom:updated', self.NAMESPACES)
-                        updated_at = updated_elem.text if updated_elem is not None else ""
-                        
-                        # Extract link
-                        link_elem = entry.find('atom:link', self.NAMESPACES)
-                        video_url = link_elem.get('href') if link_elem is not None else f"https://www.youtube.com/watch?v={video_id}"
-                        
-                        # Extract media group for thumbnail and description
-                        media_group = entry.find('media:group', self.NAMESPACES)
-                        thumbnail = ""
-                        description = ""
-                        
-                        if media_group is not None:
-                            # Get thumbnail
-                            thumb_elem = media_group.find('media:thumbnail', self.NAMESPACES)
-                            if thumb_elem is not None:
-                                thumbnail = thumb_elem.get('url', '')
-                            
-                            # Get description
-                            desc_elem = media_group.find('media:description', self.NAMESPACES)
-                            if desc_elem is not None:
-                                description = desc_elem.text or ""
-                        
-                        # Try to detect language from title/description
-                        detected_language = self._detect_language(title, description, languages)
-                        
-                        # Detect video category from title
-                        detected_category = self._detect_video_category(title, description, video_url)
-                        
-                        # Check if video is a YouTube Short
-                        title_lower = title.lower()
-                        is_short = (
-                            '/shorts/' in video_url or 
-                            '#shorts' in title_lower or 
-                            '#short' in title_lower or
-                            detected_category == 'Shorts'
-                        )
-                        
-                        # Apply fetch_videos and fetch_shorts filters
-                        if is_short:
-                            if not fetch_shorts:
-                                continue  # Skip shorts if fetch_shorts is disabled
+                # Extract updated date
+                updated_elem = entry.find('atom:updated', self.NAMESPACES)
+                updated_at = updated_elem.text if updated_elem is not None else ""
+                
+                # Extract link
+                link_elem = entry.find('atom:link', self.NAMESPACES)
+                video_url = link_elem.get('href') if link_elem is not None else f"https://www.youtube.com/watch?v={video_id}"
+                
+                # Extract media group for thumbnail and description
+                media_group = entry.find('media:group', self.NAMESPACES)
+                thumbnail = ""
+                description = ""
+                
+                if media_group is not None:
+                    # Get thumbnail
+                    thumb_elem = media_group.find('media:thumbnail', self.NAMESPACES)
+                    if thumb_elem is not None:
+                        thumbnail = thumb_elem.get('url', '')
+                    
+                    # Get description
+                    desc_elem = media_group.find('media:description', self.NAMESPACES)
+                    if desc_elem is not None:
+                        description = desc_elem.text or ""
+                
+                # Try to detect language from title/description
+                detected_language = self._detect_language(title, description, languages)
+                
+                # Detect video category from title
+                detected_category = self._detect_video_category(title, description, video_url)
+                
+                # Check if video is a YouTube Short
+                title_lower = title.lower()
+                is_short = (
+                    '/shorts/' in video_url or 
+                    '#shorts' in title_lower or 
+                    '#short' in title_lower or
+                    detected_category == 'Shorts'
+                )
+                
+                # Apply fetch_videos and fetch_shorts filters
+                if is_short:
+                    if not fetch_shorts:
+                        continue  # Skip shorts if fetch_shorts is disabled
+                else:
+                    if not fetch_videos:
+                        continue  # Skip regular videos if fetch_videos is disabled
+                
+                # For movie_channel type, filter based on full_movies_only flag
+                if channel_type == 'movie_channel':
+                    if detected_category != 'Full Movie':
+                        if full_movies_only:
+                            # STRICT MODE: Only accept "Full Movie" keywords
+                            is_full_movie = any(kw in title_lower for kw in [
+                                'full movie', 'full film', 'complete movie', 'hd movie',
+                                'superhit movie', 'blockbuster movie', 'latest movie'
+                            ])
                         else:
-                            if not fetch_videos:
-                                continue  # Skip regular videos if fetch_videos is disabled
-                        
-                        # For movie_channel type, filter based on full_movies_only flag
-                        if channel_type == 'movie_channel':
-                            if detected_category != 'Full Movie':
-                                if full_movies_only:
-                                    # STRICT MODE: Only accept "Full Movie" keywords
-                                    is_full_movie = any(kw in title_lower for kw in [
-                                        'full movie', 'full film', 'complete movie', 'hd movie',
-                                        'superhit movie', 'blockbuster movie', 'latest movie'
-                                    ])
-                                else:
-                                    # RELAXED MODE: Accept broader movie patterns
-                                    is_full_movie = any(kw in title_lower for kw in [
-                                        'full movie', 'full film', 'complete movie', 'hd movie',
-                                        'superhit movie', 'blockbuster movie', 'latest movie',
-                                        'movie |', '| movie', ' movie ',  # Common patterns like "Title Movie | Channel"
-                                    ])
-                                
-                                # Skip shorts, trailers, promos, songs etc
-                                is_not_movie = any(kw in title_lower for kw in [
-                                    'trailer', 'teaser', 'promo', 'song', 'scene', 'clip',
-                                    'making', 'behind', 'interview', 'review', 'glimpse',
-                                    '#shorts', 'shorts', 'best scenes', 'comedy scenes',
-                                    'best movies of', 'top movies', 'new year special', 'grand finale'
-                                ])
-                                # Also skip YouTube Shorts
-                                if is_short:
-                                    is_not_movie = True
-                                
-                                if is_not_movie or not is_full_movie:
-                                    continue  # Skip non-movie content
-                                detected_category = 'Full Movie'
+                            # RELAXED MODE: Accept broader movie patterns
+                            is_full_movie = any(kw in title_lower for kw in [
+                                'full movie', 'full film', 'complete movie', 'hd movie',
+                                'superhit movie', 'blockbuster movie', 'latest movie',
+                                'movie |', '| movie', ' movie ',  # Common patterns like "Title Movie | Channel"
+                            ])
                         
-                        # Parse published date
-                        try:
-                            published_datetime = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                        except:
-                            published_datetime = datetime.now(timezone.utc)
-                        
-                        video = {
-                            'video_id': video_id,
-                            'title': title,
-                            'description': description[:1000] if description else "",  # Limit description length
-                            'thumbnail': thumbnail,
-                            'video_url': video_url,
-                            'published_at': published_datetime,
-                            'updated_at': updated_at,
-                            'channel_id': channel_id,
-                            'channel_name': channel_name,
-                            'channel_type': channel_type,
-                            'languages': languages,
-                            'detected_language': detected_language,
-                            'detected_category': detected_category,  # New field
-                            'fetched_at': datetime.now(timezone.utc),
-                            'is_used': False,  # Track if used by video agent
-                            'is_skipped': False,  # Track if manually skipped
-                            'source': 'rss'
-                        }
-                        
-                        videos.append(video)
+                        # Skip shorts, trailers, promos, songs etc
+                        is_not_movie = any(kw in title_lower for kw in [
+                            'trailer', 'teaser', 'promo', 'song', 'scene', 'clip',
+                            'making', 'behind', 'interview', 'review', 'glimpse',
+                            '#shorts', 'shorts', 'best scenes', 'comedy scenes',
+                            'best movies of', 'top movies', 'new year special', 'grand finale'
+                        ])
+                        # Also skip YouTube Shorts
+                        if is_short:
+                            is_not_movie = True
                         
-                    except Exception as e:
-                        print(f"   ⚠️ Error parsing entry: {e}")
-                        continue
+                        if is_not_movie or not is_full_movie:
+                            continue  # Skip non-movie content
+                        detected_category = 'Full Movie'
                 
-                if videos:
-                    print(f"   ✅ {channel_name}: {len(videos)} videos from RSS")
+                # Parse published date
+                try:
+                    published_datetime = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+                except:
+                    published_datetime = datetime.now(timezone.utc)
                 
-                return videos
+                video = {
+                    'video_id': video_id,
+                    'title': title,
+                    'description': description[:1000] if description else "",  # Limit description length
+                    'thumbnail': thumbnail,
+                    'video_url': video_url,
+                    'published_at': published_datetime,
+                    'updated_at': updated_at,
+                    'channel_id': channel_id,
+                    'channel_name': channel_name,
+                    'channel_type': channel_type,
+                    'languages': languages,
+                    'detected_language': detected_language,
+                    'detected_category': detected_category,  # New field
+                    'fetched_at': datetime.now(timezone.utc),
+                    'is_used': False,  # Track if used by video agent
+                    'is_skipped': False,  # Track if manually skipped
+                    'source': 'rss'
+                }
                 
-        except Exception as e:
-            print(f"❌ RSS error for {channel_name}: {e}")
-            return []
+                videos.append(video)
+                
+            except Exception as e:
+                print(f"   ⚠️ Error parsing entry: {e}")
+                continue
+        
+        if videos:
+            print(f"   ✅ {channel_name}: {len(videos)} videos from RSS")
+        
+        return videos, published_times
     
     def _detect_language(self, title: str, description: str, channel_languages: List[str]) -> str:
         """Detect video language from title/description
@@ -284,8 +338,145 @@ class YouTubeRSSService:
         
         return 'Other'
     
+    def get_poll_settings(self) -> Dict:
+        """Polling bounds from youtube_rss_config (env defaults)"""
+        config = db.system_settings.find_one({"setting_key": "youtube_rss_config"}) or {}
+        min_minutes = float(config.get("min_poll_minutes") or YOUTUBE_RSS_MIN_POLL_MINUTES)
+        max_minutes = max(float(config.get("max_poll_minutes") or YOUTUBE_RSS_MAX_POLL_MINUTES), min_minutes)
+        # Retry interval for a channel that fails before its first successful poll
+        default_minutes = min(max(float(config.get("frequency_hours") or 1) * 60, min_minutes), max_minutes)
+        return {"min_minutes": min_minutes, "max_minutes": max_minutes, "default_minutes": default_minutes}
+    
+    async def poll_channel(self, channel: Dict, settings: Dict) -> Dict:
+        """Conditionally fetch one channel's feed, store its videos and schedule its next poll
+        
+        The feed's ETag/Last-Modified are kept on the channel (rss_cache) and sent
+        back, so an unchanged feed costs a 304 with no body to parse. Never raises.
+        
+        Returns:
+            {'channel_name', 'status' ('ok'|'not_modified'|'error'), 'videos_found', 'new', 'updated'}
+        """
+        channel_id = channel.get('channel_id')
+        channel_name = channel.get('channel_name', 'Unknown')
+        url = channel.get('rss_url') or self.RSS_URL_TEMPLATE.format(channel_id=channel_id)
+        now = datetime.now(timezone.utc)
+        summary = {'channel_name': channel_name, 'status': 'error', 'videos_found': 0, 'new': 0, 'updated': 0}
+        update = {'rss_last_polled_at': now}
+        published_times = [
+            published.replace(tzinfo=timezone.utc) if published.tzinfo is None else published
+            for published in channel.get('rss_published_times') or []
+        ]
+        
+        # Validators belong to the URL they came from
+        cache = channel.get('rss_cache') or {}
+        headers = {}
+        if cache.get('url') == url:
+            if cache.get('etag'):
+                headers['If-None-Match'] = cache['etag']
+            if cache.get('last_modified'):
+                headers['If-Modified-Since'] = cache['last_modified']
+        
+        try:
+            async with http_client_service.session('feed') as client:
+                response = await client.get(url, headers=headers)
+            
+            if response.status_code == 304:
+                summary['status'] = 'not_modified'
+            elif response.status_code == 200:
+                videos, published_times = self.parse_feed(
+                    response.text, channel_id, channel_name,
+                    channel.get('channel_type', 'unknown'),
+                    channel.get('languages', ['Hindi']),
+                    fetch_videos=channel.get('fetch_videos', True),
+                    fetch_shorts=channel.get('fetch_shorts', False),
+                    full_movies_only=channel.get('full_movies_only', False)
+                )
+                counts = self.store_videos(videos)
+                summary.update(status='ok', videos_found=len(videos), new=counts['new'], updated=counts['updated'])
+                update['rss_cache'] = {
+                    'url': url,
+                    'etag': response.headers.get('etag'),
+                    'last_modified': response.headers.get('last-modified')
+                }
+                update['rss_published_times'] = published_times
+            else:
+                print(f"❌ RSS fetch failed for {channel_name}: HTTP {response.status_code}")
+        except Exception as e:
+            print(f"❌ RSS error for {channel_name}: {e}")
+        
+        if summary['status'] == 'error':
+            # Retry at the channel's current pace rather than hammering a failing feed
+            interval = channel.get('rss_poll_interval_minutes') or settings['default_minutes']
+        else:
+            interval = poll_interval_minutes(published_times, now, settings['min_minutes'], settings['max_minutes'])
+        interval *= 1 + random.uniform(-YOUTUBE_RSS_POLL_JITTER, YOUTUBE_RSS_POLL_JITTER)
+        
+        update['rss_last_poll_status'] = summary['status']
+        update['rss_poll_interval_minutes'] = round(interval, 1)
+        update['rss_next_poll_at'] = now + timedelta(minutes=interval)
+        db.youtube_channels.update_one({'_id': channel['_id']}, {'$set': update})
+        return summary
+    
+    async def _poll_channels(self, channels: List[Dict]) -> Dict:
+        """Poll channels a few at a time and total their results"""
+        settings = self.get_poll_settings()
+        results = await run_bounded(
+            channels,
+            lambda index, channel: self.poll_channel(channel, settings),
+            YOUTUBE_RSS_FETCH_CONCURRENCY
+        )
+        
+        totals = {
+            'total_videos': sum(result['videos_found'] for result in results),
+            'new_videos': sum(result['new'] for result in results),
+            'updated_videos': sum(result['updated'] for result in results),
+            'not_modified': sum(1 for result in results if result['status'] == 'not_modified'),
+            'errors': sum(1 for result in results if result['status'] == 'error'),
+            'channel_breakdown': [
+                {'channel_name': result['channel_name'], 'new_count': result['new'], 'updated_count': result['updated']}
+                for result in results if result['new'] > 0 or result['updated'] > 0
+            ]
+        }
+        
+        now = datetime.now(timezone.utc)
+        next_due = db.youtube_channels.find_one(
+            {"is_active": True, "channel_id": {"$ne": None, "$exists": True}},
+            {"rss_next_poll_at": 1},
+            sort=[("rss_next_poll_at", 1)]
+        )
+        db.system_settings.update_one(
+            {"setting_key": "youtube_rss_config"},
+            {"$set": {
+                "last_fetch": now,
+                "next_fetch": (next_due or {}).get("rss_next_poll_at"),
+                "last_fetch_result": {
+                    "success": True,
+                    "new_videos": totals['new_videos'],
+                    "channels_fetched": len(channels)
+                }
+            }},
+            upsert=True
+        )
+        return totals
+    
+    def _log_fetch(self, channels_processed: int, totals: Dict):
+        """Record a fetch run in rss_fetch_logs"""
+        from uuid import uuid4
+        errors = totals['errors']
+        db.rss_fetch_logs.insert_one({
+            'log_id': str(uuid4()),
+            'timestamp': datetime.now(timezone.utc),
+            'channels_processed': channels_processed,
+            'new_videos_count': totals['new_videos'],
+            'updated_videos_count': totals['updated_videos'],
+            'not_modified_count': totals['not_modified'],
+            'errors_count': errors,
+            'channel_breakdown': totals['channel_breakdown'],
+            'status': 'success' if errors == 0 else ('partial' if totals['new_videos'] > 0 else 'failed')
+        })
+    
     async def fetch_all_channels(self) -> Dict:
-        """Fetch videos from all active YouTube channels
+        """Fetch videos from all active YouTube channels now, regardless of their next poll time
         
         Returns:
             Dictionary with fetch results
@@ -310,112 +501,25 @@ class YouTubeRSSService:
                 }
             
             print(f"📺 Fetching RSS from {len(channels)} channels...")
-            
-            # Create tasks for parallel fetching
-            tasks = []
-            for channel in channels:
-                # Get fetch preferences (default: videos=True, shorts=False)
-                fetch_videos = channel.get('fetch_videos', True)
-                fetch_shorts = channel.get('fetch_shorts', False)
-                
-                task = self.fetch_channel_rss(
-                    channel_id=channel.get('channel_id'),
-                    channel_name=channel.get('channel_name', 'Unknown'),
-                    channel_type=channel.get('channel_type', 'unknown'),
-                    languages=channel.get('languages', ['Hindi']),
-                    rss_url=channel.get('rss_url'),  # Use stored RSS URL if available
-                    fetch_videos=fetch_videos,
-                    fetch_shorts=fetch_shorts
-                )
-                tasks.append(task)
-            
-            # Execute all fetches in parallel (with some rate limiting)
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Process results and store in database
-            total_videos = 0
-            new_videos = 0
-            updated_videos = 0
-            errors = 0
-            channel_breakdown = []  # Track new videos by channel
-            
-            for idx, result in enumerate(results):
-                if isinstance(result, Exception):
-                    print(f"   ❌ Task error: {result}")
-                    errors += 1
-                    continue
-                
-                channel_new_count = 0
-                channel_name = channels[idx].get('channel_name', 'Unknown') if idx < len(channels) else 'Unknown'
-                
-                for video in result:
-                    total_videos += 1
-                    
-                    # Check if video already exists
-                    existing = db.youtube_videos.find_one({'video_id': video['video_id']})
-                    
-                    if existing:
-                        # Update if newer
-                        if video.get('updated_at') != existing.get('updated_at'):
-                            db.youtube_videos.update_one(
-                                {'video_id': video['video_id']},
-                                {'$set': {
-                                    'title': video['title'],
-                                    'description': video['description'],
-                                    'thumbnail': video['thumbnail'],
-                                    'updated_at': video['updated_at'],
-                                    'fetched_at': video['fetched_at']
-                                }}
-                            )
-                            updated_videos += 1
-                    else:
-                        # Insert new video
-                        db.youtube_videos.insert_one(video)
-                        new_videos += 1
-                        channel_new_count += 1
-                
-                if channel_new_count > 0:
-                    channel_breakdown.append({
-                        'channel_name': channel_name,
-                        'new_count': channel_new_count
-                    })
-            
-            # Update last fetch timestamp
-            db.system_settings.update_one(
-                {"setting_key": "youtube_rss_config"},
-                {"$set": {"last_fetch": datetime.now(timezone.utc)}},
-                upsert=True
-            )
-            
-            # Log this fetch run
-            from uuid import uuid4
-            log_entry = {
-                'log_id': str(uuid4()),
-                'timestamp': datetime.now(timezone.utc),
-                'channels_processed': len(channels),
-                'new_videos_count': new_videos,
-                'updated_videos_count': updated_videos,
-                'errors_count': errors,
-                'channel_breakdown': channel_breakdown,
-                'status': 'success' if errors == 0 else ('partial' if new_videos > 0 else 'failed')
-            }
-            db.rss_fetch_logs.insert_one(log_entry)
+            totals = await self._poll_channels(channels)
+            self._log_fetch(len(channels), totals)
             
             result = {
                 "success": True,
                 "message": f"RSS fetch complete",
                 "channels_fetched": len(channels),
-                "total_videos": total_videos,
-                "new_videos": new_videos,
-                "updated_videos": updated_videos,
-                "errors": errors,
+                "total_videos": totals['total_videos'],
+                "new_videos": totals['new_videos'],
+                "updated_videos": totals['updated_videos'],
+                "not_modified": totals['not_modified'],
+                "errors": totals['errors'],
                 "fetched_at": datetime.now(timezone.utc).isoformat()
             }
             
             print(f"\n✅ RSS Fetch Complete:")
-            print(f"   Channels: {len(channels)}")
-            print(f"   Total Videos: {total_videos}")
-            print(f"   New: {new_videos}, Updated: {updated_videos}, Errors: {errors}")
+            print(f"   Channels: {len(channels)} ({totals['not_modified']} unchanged)")
+            print(f"   Total Videos: {totals['total_videos']}")
+            print(f"   New: {totals['new_videos']}, Updated: {totals['updated_videos']}, Errors: {totals['errors']}")
             
             return result
             
@@ -430,6 +534,54 @@ class YouTubeRSSService:
         finally:
             self.is_running = False
     
+    async def fetch_due_channels(self) -> Dict:
+        """Poll the channels whose next poll time has passed (scheduler tick)
+        
+        Each due channel is claimed by moving its rss_next_poll_at with a
+        conditional update, so several API processes never poll it together.
+        """
+        if self.is_running:
+            return {"success": False, "message": "RSS fetch already running"}
+        
+        self.is_running = True
+        try:
+            now = datetime.now(timezone.utc)
+            due = list(db.youtube_channels.find({
+                "is_active": True,
+                "channel_id": {"$ne": None, "$exists": True},
+                "$or": [{"rss_next_poll_at": {"$lte": now}}, {"rss_next_poll_at": None}]
+            }).sort("rss_next_poll_at", 1).limit(YOUTUBE_RSS_MAX_CHANNELS_PER_TICK))
+            
+            channels = []
+            lease_until = now + timedelta(minutes=10)
+            for channel in due:
+                claimed = db.youtube_channels.update_one(
+                    {"_id": channel["_id"], "rss_next_poll_at": channel.get("rss_next_poll_at")},
+                    {"$set": {"rss_next_poll_at": lease_until}}
+                )
+                if claimed.modified_count:
+                    channels.append(channel)
+            
+            if not channels:
+                return {"success": True, "channels_fetched": 0, "new_videos": 0}
+            
+            totals = await self._poll_channels(channels)
+            if totals['new_videos'] or totals['updated_videos'] or totals['errors']:
+                self._log_fetch(len(channels), totals)
+                print(f"📺 RSS poll: {len(channels)} due channels, {totals['new_videos']} new, "
+                      f"{totals['not_modified']} unchanged, {totals['errors']} errors")
+            
+            return {
+                "success": True,
+                "channels_fetched": len(channels),
+                "new_videos": totals['new_videos'],
+                "updated_videos": totals['updated_videos'],
+                "not_modified": totals['not_modified'],
+                "errors": totals['errors']
+            }
+        finally:
+            self.is_running = False
+    
     def get_videos_for_agent(
         self,
         channel_types: List[str],
@@ -603,6 +755,37 @@ class YouTubeRSSService:
         
         return filtered_videos
     
+    def store_videos(self, videos: List[Dict]) -> Dict[str, int]:
+        """Upsert feed videos on video_id in one unordered bulk write
+        
+        New videos are inserted whole. A stored video whose feed entry has a new
+        updated_at gets VIDEO_MUTABLE_FIELDS and fetched_at refreshed and counts
+        as updated; is_used, is_skipped and the rest are never overwritten.
+        
+        Returns:
+            {'new': inserted count, 'updated': modified count}
+        """
+        operations = []
+        for video in videos:
+            operations.append(UpdateOne(
+                {'video_id': video['video_id'], 'updated_at': {'$ne': video.get('updated_at')}},
+                {'$set': {**{field: video.get(field) for field in VIDEO_MUTABLE_FIELDS},
+                          'fetched_at': video.get('fetched_at')}}
+            ))
+            operations.append(UpdateOne({'video_id': video['video_id']}, {'$setOnInsert': video}, upsert=True))
+        if not operations:
+            return {'new': 0, 'updated': 0}
+        
+        try:
+            result = db.youtube_videos.bulk_write(operations, ordered=False)
+            return {'new': result.upserted_count, 'updated': result.modified_count}
+        except BulkWriteError as e:
+            # A video inserted concurrently (unique index on video_id) is already stored
+            for error in e.details.get('writeErrors', []):
+                if error.get('code') != DUPLICATE_KEY_ERROR:
+                    print(f"   ⚠️ Error storing video: {error.get('errmsg')}")
+            return {'new': e.details.get('nUpserted', 0), 'updated': e.details.get('nModified', 0)}
+    
     def mark_video_as_used(self, video_id: str) -> bool:
         """Mark a video as used by Video Agent"""
         result = db.youtube_videos.update_one(
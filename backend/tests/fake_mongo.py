@@ -0,0 +1,220 @@
+"""
+In-memory stand-in for the pymongo database used by service tests.
+Covers only the collection methods and operators the services call:
+equality and $gt/$gte/$lt/$lte/$ne/$in/$exists queries; $set, $setOnInsert,
+$inc, $max and $unset updates; upserts, unique indexes and unordered bulk writes.
+"""
+import copy
+import itertools
+from types import SimpleNamespace
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+DUPLICATE_KEY_ERROR = 11000
+_ids = itertools.count(1)
+_MISSING = object()
+
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        value = doc.get(field, _MISSING)
+        if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+            for op, operand in condition.items():
+                if op == "$exists":
+                    if (value is not _MISSING) != bool(operand):
+                        return False
+                elif op == "$ne":
+                    if value is not _MISSING and value == operand:
+                        return False
+                elif op == "$in":
+                    if value is _MISSING or value not in operand:
+                        return False
+                elif value is _MISSING or value is None:
+                    return False
+                elif op == "$gt" and not value > operand:
+                    return False
+                elif op == "$gte" and not value >= operand:
+                    return False
+                elif op == "$lt" and not value < operand:
+                    return False
+                elif op == "$lte" and not value <= operand:
+                    return False
+        elif value is _MISSING or value != condition:
+            return False
+    return True
+
+
+def _project(doc, projection):
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    included = [field for field, flag in projection.items() if flag and field != "_id"]
+    if included:
+        doc = {field: doc[field] for field in ["_id"] + included if field in doc}
+    for field, flag in projection.items():
+        if not flag:
+            doc.pop(field, None)
+    return doc
+
+
+def _apply(doc, update, inserting):
+    for field, value in update.get("$set", {}).items():
+        doc[field] = copy.deepcopy(value)
+    if inserting:
+        for field, value in update.get("$setOnInsert", {}).items():
+            doc[field] = copy.deepcopy(value)
+    for field, amount in update.get("$inc", {}).items():
+        doc[field] = doc.get(field, 0) + amount
+    for field, value in update.get("$max", {}).items():
+        if field not in doc or doc[field] is None or value > doc[field]:
+            doc[field] = value
+    for field in update.get("$unset", {}):
+        doc.pop(field, None)
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, field, direction=1):
+        self._docs.sort(key=lambda doc: doc.get(field), reverse=direction == -1)
+        return self
+
+    def limit(self, count):
+        if count:
+            self._docs = self._docs[:count]
+        return self
+
+    def __iter__(self):
+        return iter(self._docs)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = []
+        self.unique_fields = []
+
+    def create_index(self, keys, unique=False, **kwargs):
+        if unique:
+            self.unique_fields.append(keys if isinstance(keys, str) else keys[0][0])
+
+    def _check_unique(self, doc, ignore=None):
+        for field in self.unique_fields:
+            if field in doc and any(
+                other is not ignore and other.get(field) == doc[field] for other in self.docs
+            ):
+                raise DuplicateKeyError(f"E11000 duplicate key {field}: {doc[field]!r}", DUPLICATE_KEY_ERROR)
+
+    def _first(self, query):
+        return next((doc for doc in self.docs if _matches(doc, query)), None)
+
+    # ---- Reads ----
+
+    def find_one(self, query=None, projection=None):
+        doc = self._first(query or {})
+        return _project(doc, projection) if doc else None
+
+    def find(self, query=None, projection=None):
+        return FakeCursor([_project(doc, projection) for doc in self.docs if _matches(doc, query or {})])
+
+    def count_documents(self, query, limit=0):
+        count = sum(1 for doc in self.docs if _matches(doc, query))
+        return min(count, limit) if limit else count
+
+    def estimated_document_count(self):
+        return len(self.docs)
+
+    # ---- Writes ----
+
+    def insert_one(self, doc):
+        doc.setdefault("_id", next(_ids))
+        self._check_unique(doc)
+        self.docs.append(copy.deepcopy(doc))
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    def _update(self, query, update, upsert):
+        """Returns (before, after, inserted) for the matched or upserted document"""
+        doc = self._first(query)
+        if doc is not None:
+            before = copy.deepcopy(doc)
+            changed = copy.deepcopy(doc)
+            _apply(changed, update, inserting=False)
+            self._check_unique(changed, ignore=doc)
+            doc.clear()
+            doc.update(changed)
+            return before, doc, False
+        if not upsert:
+            return None, None, False
+        doc = {field: value for field, value in query.items() if not isinstance(value, dict)}
+        _apply(doc, update, inserting=True)
+        self.insert_one(doc)
+        return None, self.docs[-1], True
+
+    def update_one(self, query, update, upsert=False):
+        before, after, inserted = self._update(query, update, upsert)
+        return SimpleNamespace(
+            matched_count=int(before is not None),
+            modified_count=int(before is not None and before != after),
+            upserted_id=after["_id"] if inserted else None
+        )
+
+    def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=False):
+        before, after, _ = self._update(query, update, upsert)
+        doc = after if return_document else before
+        return _project(doc, projection) if doc else None
+
+    def find_one_and_delete(self, query, projection=None):
+        doc = self._first(query)
+        if doc is None:
+            return None
+        self.docs.remove(doc)
+        return _project(doc, projection)
+
+    def delete_one(self, query):
+        doc = self._first(query)
+        if doc is not None:
+            self.docs.remove(doc)
+        return SimpleNamespace(deleted_count=int(doc is not None))
+
+    def delete_many(self, query):
+        kept = [doc for doc in self.docs if not _matches(doc, query)]
+        deleted = len(self.docs) - len(kept)
+        self.docs = kept
+        return SimpleNamespace(deleted_count=deleted)
+
+    def bulk_write(self, operations, ordered=True):
+        """UpdateOne operations only, reported like pymongo (BulkWriteError on failures)"""
+        details = {"nUpserted": 0, "nMatched": 0, "nModified": 0, "writeErrors": []}
+        for index, operation in enumerate(operations):
+            try:
+                result = self.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+            except DuplicateKeyError as e:
+                details["writeErrors"].append({"index": index, "code": DUPLICATE_KEY_ERROR, "errmsg": str(e)})
+                if ordered:
+                    break
+                continue
+            details["nUpserted"] += int(result.upserted_id is not None)
+            details["nMatched"] += result.matched_count
+            details["nModified"] += result.modified_count
+        if details["writeErrors"]:
+            raise BulkWriteError(details)
+        return SimpleNamespace(
+            upserted_count=details["nUpserted"],
+            matched_count=details["nMatched"],
+            modified_count=details["nModified"]
+        )
+
+
+class FakeDatabase:
+    """db[name] and db.name both return the same FakeCollection"""
+
+    def __init__(self):
+        self._collections = {}
+
+    def __getitem__(self, name):
+        return self._collections.setdefault(name, FakeCollection())
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Parser throughput over the offline corpus, per tree-builder backend:
+    python backend/tests/html_corpus/benchmark_parsers.py [rounds]
+"""
+import sys
+import time
+
+from corpus import load_pages, parsers, unrecorded_sites
+
+import services.html_parser_service as html_parser_module
+from services.html_parser_service import BACKENDS, HTML_PARSE_POOL_MIN_BYTES, _available
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    pages = load_pages()
+    available = parsers()
+    total_bytes = sum(len(html) for _, html in pages)
+    print(f"📚 {len(pages)} pages, {total_bytes / 1024:.0f} KB, {rounds} rounds")
+    missing = unrecorded_sites()
+    if missing:
+        print(f"⚠️ Hand-built pages only for {', '.join(missing)}; figures are not representative "
+              f"until real pages are recorded with record_corpus.py")
+    pooled = sum(1 for _, html in pages if len(html) >= HTML_PARSE_POOL_MIN_BYTES)
+    if not pooled:
+        print(f"⚠️ No page reaches the process-pool threshold ({HTML_PARSE_POOL_MIN_BYTES // 1024} KB); "
+              f"record full-size IMDb and binged detail pages with record_corpus.py")
+
+    for backend in BACKENDS:
+        if not _available(backend):
+            print(f"⏭️ {backend}: not installed")
+            continue
+        html_parser_module.HTML_PARSER_BACKEND = backend
+        per_site = {}
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for entry, html in pages:
+                page_start = time.perf_counter()
+                available[entry["parser"]](html, entry["url"])
+                per_site[entry["site"]] = per_site.get(entry["site"], 0.0) + time.perf_counter() - page_start
+        elapsed = time.perf_counter() - start
+        print(f"\n{backend}: {len(pages) * rounds / elapsed:.1f} pages/s, "
+              f"{total_bytes * rounds / elapsed / 1024 / 1024:.2f} MB/s")
+        for site, seconds in sorted(per_site.items()):
+            print(f"   {site:<18} {1000 * seconds / rounds:8.2f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
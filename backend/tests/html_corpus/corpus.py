@@ -0,0 +1,63 @@
+"""
+Offline HTML corpus for the scraper parsers.
+manifest.json lists the pages; record_corpus.py adds real pages to it.
+"""
+import gzip
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+CORPUS_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(CORPUS_DIR, "manifest.json")
+
+
+def parsers():
+    """parser name -> callable(html, url) returning the extracted fields as a dict"""
+    from dataclasses import asdict
+    from services.binged_scraper_service import binged_scraper
+    from services.imdb_scraper_service import imdb_scraper
+    from services.movie_review_scraper_service import movie_review_scraper
+
+    return {
+        "review": lambda html, url: asdict(movie_review_scraper.parse_review(html, url)),
+        "imdb": lambda html, url: imdb_scraper.parse_movie_details(html, url),
+        "binged": lambda html, url: binged_scraper.parse_release_details(html, url),
+    }
+
+
+def pool_parsers():
+    """parser name -> the scraper method that html_parser_service.parse() sends to the worker pool"""
+    from services.binged_scraper_service import binged_scraper
+    from services.imdb_scraper_service import imdb_scraper
+    from services.movie_review_scraper_service import movie_review_scraper
+
+    return {
+        "review": movie_review_scraper.parse_review,
+        "imdb": imdb_scraper.parse_movie_details,
+        "binged": binged_scraper.parse_release_details,
+    }
+
+
+def unrecorded_sites():
+    """Sites in the manifest that only have hand-built pages, no recorded real page"""
+    pages = load_manifest()["pages"]
+    recorded = {entry["site"] for entry in pages if entry["file"].endswith(".gz")}
+    return sorted({entry["site"] for entry in pages} - recorded)
+
+
+def load_manifest():
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+
+def load_pages():
+    """[(entry, html)] for every page in the manifest"""
+    pages = []
+    for entry in load_manifest()["pages"]:
+        path = os.path.join(CORPUS_DIR, entry["file"])
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            pages.append((entry, f.read()))
+    return pages
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Record a real page into the parser corpus:
+    python backend/tests/html_corpus/record_corpus.py review https://www.gulte.com/moviereviews/...
+    python backend/tests/html_corpus/record_corpus.py imdb https://www.imdb.com/title/tt.../
+Pages are stored gzipped and added to manifest.json (re-recording a URL replaces it).
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+from urllib.parse import urlparse
+
+import httpx
+
+from corpus import CORPUS_DIR, MANIFEST_PATH, load_manifest, parsers
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] not in parsers():
+        print(__doc__)
+        sys.exit(1)
+    parser, url = sys.argv[1], sys.argv[2]
+    site = urlparse(url).netloc.lower().replace("www.", "").split(".")[0]
+
+    response = httpx.get(url, headers={"User-Agent": USER_AGENT}, follow_redirects=True, timeout=30)
+    response.raise_for_status()
+
+    file_name = f"{site}_{hashlib.sha1(url.encode()).hexdigest()[:10]}.html.gz"
+    with gzip.open(os.path.join(CORPUS_DIR, file_name), "wt", encoding="utf-8") as f:
+        f.write(response.text)
+
+    manifest = load_manifest()
+    manifest["pages"] = [entry for entry in manifest["pages"] if entry.get("url") != url]
+    manifest["pages"].append({"site": site, "parser": parser, "file": file_name, "url": url})
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    print(f"✅ Recorded {url} ({len(response.content)} bytes) as {file_name}")
+
+
+if __name__ == "__main__":
+    main()
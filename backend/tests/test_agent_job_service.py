@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test suite for agent job outcome handling
+    python -m pytest backend/tests/test_agent_job_service.py
+"""
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import services.agent_job_service as agent_job_module
+from services.agent_job_service import AgentJobService, result_error
+
+
+class ResultErrorTest(unittest.TestCase):
+    """Agent results that report failure fail the job instead of completing it"""
+
+    def test_reported_failures(self):
+        self.assertEqual(result_error({"success": False, "message": "Invalid listing page URL"}),
+                         "Invalid listing page URL")
+        self.assertEqual(result_error({"status": "failed", "error": "boom"}), "boom")
+        self.assertEqual(result_error({"success": False}), "Agent reported failure")
+
+    def test_successful_results(self):
+        self.assertIsNone(result_error({"success": True, "message": "Created 3 posts"}))
+        self.assertIsNone(result_error({"status": "completed"}))
+        self.assertIsNone(result_error(None))
+        self.assertIsNone(result_error([{"success": False}]))
+
+
+class ExecuteOutcomeTest(unittest.TestCase):
+    """Reported failures are final unless retryable; raised errors are retried"""
+
+    def _execute(self, outcome):
+        service = AgentJobService()
+        job = {"id": "job-1", "agent_id": "agent-1", "attempts": 1, "max_attempts": 3}
+        run_agent = mock.AsyncMock(side_effect=outcome) if isinstance(outcome, Exception) \
+            else mock.AsyncMock(return_value=outcome)
+        with mock.patch.object(agent_job_module, "run_agent", run_agent), \
+                mock.patch.object(service, "_finish") as finish, \
+                mock.patch.object(service, "_fail") as fail:
+            asyncio.run(service._execute(job))
+        return finish, fail
+
+    def test_reported_failure_is_not_rerun(self):
+        result = {"success": False, "message": "No new items to post"}
+        finish, fail = self._execute(result)
+        fail.assert_not_called()
+        finish.assert_called_once_with(mock.ANY, "failed", result=result, error="No new items to post")
+
+    def test_retryable_reported_failure_is_retried(self):
+        result = {"success": False, "error": "Listing page timed out", "retryable": True}
+        finish, fail = self._execute(result)
+        finish.assert_not_called()
+        fail.assert_called_once_with(mock.ANY, "Listing page timed out", result)
+
+    def test_raised_error_is_retried(self):
+        finish, fail = self._execute(RuntimeError("connection reset"))
+        finish.assert_not_called()
+        fail.assert_called_once_with(mock.ANY, "connection reset")
+
+    def test_success_completes(self):
+        finish, fail = self._execute({"success": True})
+        fail.assert_not_called()
+        finish.assert_called_once_with(mock.ANY, "completed", result={"success": True})
+
+
+if __name__ == "__main__":
+    unittest.main()
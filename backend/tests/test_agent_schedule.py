@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test suite for recurring agent next-run computation and jitter
+    python -m pytest backend/tests/test_agent_schedule.py
+"""
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.agent_schedule_service import (
+    AGENT_SCHEDULE_JITTER_SECONDS, next_slot, parse_post_time, plan_runs, spread_offsets
+)
+
+
+class AgentScheduleTest(unittest.TestCase):
+    """post_time parsing, selected days, timezones and jitter spread"""
+
+    def test_parse_post_time(self):
+        self.assertEqual(parse_post_time("9:00 AM"), (9, 0))
+        self.assertEqual(parse_post_time("12:30 AM"), (0, 30))
+        self.assertEqual(parse_post_time("12:00 PM"), (12, 0))
+        self.assertEqual(parse_post_time("09:30 PM"), (21, 30))
+        self.assertEqual(parse_post_time("21:30"), (21, 30))
+        self.assertIsNone(parse_post_time("13:00 PM"))
+        self.assertIsNone(parse_post_time(""))
+
+    def test_next_slot_in_agent_timezone(self):
+        agent = {"post_time": "09:00 AM", "timezone": "IST", "schedule_selection": "all_days"}
+        # 2026-03-02 is a Monday; 09:00 IST is 03:30 UTC
+        after = datetime(2026, 3, 2, 1, 0, tzinfo=timezone.utc)
+        self.assertEqual(next_slot(agent, after), datetime(2026, 3, 2, 3, 30, tzinfo=timezone.utc))
+        after = datetime(2026, 3, 2, 3, 30, tzinfo=timezone.utc)
+        self.assertEqual(next_slot(agent, after), datetime(2026, 3, 3, 3, 30, tzinfo=timezone.utc))
+
+    def test_next_slot_follows_dst_for_est(self):
+        agent = {"post_time": "09:00 AM", "timezone": "EST"}
+        # New York switches to daylight time on 2026-03-08
+        self.assertEqual(next_slot(agent, datetime(2026, 3, 6, 15, 0, tzinfo=timezone.utc)),
+                         datetime(2026, 3, 7, 14, 0, tzinfo=timezone.utc))
+        self.assertEqual(next_slot(agent, datetime(2026, 3, 8, 0, 0, tzinfo=timezone.utc)),
+                         datetime(2026, 3, 8, 13, 0, tzinfo=timezone.utc))
+
+    def test_next_slot_selected_days(self):
+        agent = {"post_time": "06:00 PM", "timezone": "IST", "schedule_selection": "scheduled_days",
+                 "selected_days": ["Friday"]}
+        slot = next_slot(agent, datetime(2026, 3, 2, 0, 0, tzinfo=timezone.utc))
+        self.assertEqual(slot, datetime(2026, 3, 6, 12, 30, tzinfo=timezone.utc))
+        self.assertIsNone(next_slot(dict(agent, selected_days=[]), datetime(2026, 3, 2, tzinfo=timezone.utc)))
+
+    def test_spread_offsets_are_stable_and_inside_window(self):
+        ids = [f"agent-{i}" for i in range(5)]
+        offsets = spread_offsets(ids)
+        self.assertEqual(offsets, spread_offsets(list(reversed(ids))))
+        ordered = sorted(offsets.values())
+        self.assertTrue(all(0 <= value < AGENT_SCHEDULE_JITTER_SECONDS for value in ordered))
+        share = AGENT_SCHEDULE_JITTER_SECONDS / len(ids)
+        self.assertTrue(all(b - a >= share / 2 for a, b in zip(ordered, ordered[1:])))
+
+    def test_offsets_stay_put_as_agents_fire_one_by_one(self):
+        agents = [{"id": f"agent-{i}", "mode": "recurring", "post_time": "09:00 AM", "timezone": "IST"}
+                  for i in range(5)]
+        slot = datetime(2026, 3, 2, 3, 30, tzinfo=timezone.utc)
+        planned = plan_runs(agents, slot - timedelta(hours=1))
+        self.assertEqual({entry[0] for entry in planned.values()}, {slot})
+
+        # Fire in run order, re-planning after each one as fire_due does
+        fired_at = {}
+        for agent_id, (_, run_at) in sorted(planned.items(), key=lambda item: item[1][1]):
+            self.assertEqual(plan_runs(agents, run_at)[agent_id], (slot, run_at))
+            next(agent for agent in agents if agent["id"] == agent_id)["last_fired_slot"] = slot
+            fired_at[agent_id] = run_at
+        self.assertEqual(fired_at, {agent_id: run_at for agent_id, (_, run_at) in planned.items()})
+        # Everyone moves on to the next day's slot
+        replanned = plan_runs(agents, slot + timedelta(minutes=30))
+        self.assertEqual({entry[0] for entry in replanned.values()}, {slot + timedelta(days=1)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test suite for the bulk worker pool used by bulk-mode agents
+    python -m pytest backend/tests/test_bulk_worker_pool.py
+"""
+import asyncio
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.bulk_worker_pool import OrderedClaims, bulk_parallelism, run_bounded, run_until
+
+
+class BulkWorkerPoolTest(unittest.TestCase):
+    """Bounded parallelism, ordering and per-run dedup"""
+
+    def test_results_keep_input_order_and_bound(self):
+        running = {"now": 0, "peak": 0}
+
+        async def worker(index, item):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(random.uniform(0, 0.02))
+            running["now"] -= 1
+            return item * 10
+
+        results = asyncio.run(run_bounded(list(range(20)), worker, 4))
+
+        self.assertEqual(results, [item * 10 for item in range(20)])
+        self.assertEqual(running["peak"], 4)
+
+    def test_run_until_never_overshoots_target(self):
+        started = []
+
+        async def worker(index, item):
+            started.append(index)
+            await asyncio.sleep(random.uniform(0, 0.02))
+            return item % 2 == 0  # every other item succeeds
+
+        results = asyncio.run(run_until(list(range(20)), worker, 8, target=3, succeeded=bool))
+
+        self.assertEqual(results.count(True), 3)
+        self.assertEqual(results, [True, False, True, False, True])
+        self.assertEqual(sorted(started), list(range(5)))
+
+    def test_ordered_claims_prefer_earlier_items(self):
+        claims = OrderedClaims(4)
+        keys = ["a", "b", "a", "b"]
+
+        async def worker(index, key):
+            # Later items finish scraping first
+            await asyncio.sleep(0.01 * (4 - index))
+            return await claims.claim(index, key)
+
+        results = asyncio.run(run_bounded(keys, claims.claims(worker), 4))
+        self.assertEqual(results, [True, True, False, False])
+
+    def test_parallelism_is_clamped(self):
+        self.assertEqual(bulk_parallelism({"bulk_parallelism": 100}), 16)
+        self.assertEqual(bulk_parallelism({"bulk_parallelism": 2}), 2)
+        self.assertGreaterEqual(bulk_parallelism({}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
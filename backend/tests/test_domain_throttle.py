@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test suite for per-domain scraper politeness
+    python -m pytest backend/tests/test_domain_throttle.py
+"""
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.domain_throttle import DomainThrottle, domain_of
+
+
+class DomainThrottleTest(unittest.TestCase):
+    """Token bucket pacing per domain; domains do not wait on each other"""
+
+    def _request_times(self, throttle, urls):
+        starts = {}
+
+        async def request(url):
+            async with throttle.slot(url):
+                starts.setdefault(domain_of(url), []).append(time.monotonic())
+
+        async def main():
+            await asyncio.gather(*(request(url) for url in urls))
+
+        begin = time.monotonic()
+        asyncio.run(main())
+        return {domain: [round(t - begin, 2) for t in times] for domain, times in starts.items()}
+
+    def test_same_domain_is_paced_after_burst(self):
+        throttle = DomainThrottle(rate=20, burst=2, concurrency=4)
+        times = self._request_times(throttle, [f"https://www.example.com/{i}" for i in range(4)])
+        self.assertEqual(list(times), ["example.com"])
+        # Two requests from the burst, then one every 50 ms
+        self.assertLess(times["example.com"][1], 0.03)
+        self.assertGreaterEqual(times["example.com"][3], 0.09)
+
+    def test_domains_do_not_wait_on_each_other(self):
+        throttle = DomainThrottle(rate=5, burst=1, concurrency=1)
+        times = self._request_times(throttle, [f"https://site{i}.example/page" for i in range(5)])
+        self.assertEqual(len(times), 5)
+        self.assertTrue(all(domain_times[0] < 0.05 for domain_times in times.values()))
+        self.assertEqual(throttle.get_metrics()["domains"]["site0.example"]["requests"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
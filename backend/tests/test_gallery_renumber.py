@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test suite for gallery renumbering and the folder image counter
+    python -m pytest backend/tests/test_gallery_renumber.py
+"""
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import crud
+import s3_service as s3_module
+import services.gallery_renumber_service as renumber_module
+from fake_mongo import FakeDatabase
+from models.mongodb_collections import GALLERY_COUNTERS
+from services.gallery_renumber_service import GalleryRenumberService, plan_renumber
+
+FOLDER = "actress/jane-doe/1"
+PREFIX = f"galleries/{FOLDER}/"
+
+
+class PlanRenumberTest(unittest.TestCase):
+
+    def test_gaps_are_closed_and_variants_follow(self):
+        moves = plan_renumber(["1.jpg", "3.jpg", "3_card.webp", "7.png", "notes.txt"])
+        self.assertEqual(moves, [("3.jpg", "2.jpg"), ("7.png", "3.png"), ("3_card.webp", "2_card.webp")])
+
+
+class RenumberCounterTest(unittest.TestCase):
+    """The counter is only reset when no numbers were reserved while the job ran"""
+
+    def setUp(self):
+        self.db = FakeDatabase()
+        self.db_patch = mock.patch.object(renumber_module, "db", self.db)
+        self.db_patch.start()
+        self.addCleanup(self.db_patch.stop)
+        # 1.jpg and 3.jpg stored, 4 and 5 already handed out
+        crud.set_gallery_counter(self.db, "folder", FOLDER, "next_image_number", 6)
+
+    def run_job(self, on_copy=None):
+        async def run_in_pool(func, *args):
+            return func(*args)
+
+        def copy_object(source, dest):
+            if on_copy:
+                on_copy()
+            return True
+
+        s3 = mock.MagicMock()
+        s3.config = {"galleries_root_folder": "galleries"}
+        s3.run_in_pool = run_in_pool
+        s3.list_objects.return_value = [{"Key": PREFIX + "1.jpg"}, {"Key": PREFIX + "3.jpg"}]
+        s3.copy_object.side_effect = copy_object
+        s3.build_url.side_effect = lambda key: f"https://cdn.example.com/{key}"
+
+        service = GalleryRenumberService()
+        with mock.patch.object(s3_module, "s3_service", s3), \
+                mock.patch.object(crud, "rename_image_urls"):
+            asyncio.run(service._run_s3("job-1", FOLDER))
+
+    def counter(self):
+        return crud.read_gallery_counter(self.db, "folder", FOLDER, "next_image_number")
+
+    def test_counter_follows_renumbered_images(self):
+        self.run_job()
+        self.assertEqual(self.counter(), 3)
+
+    def test_numbers_reserved_during_the_job_are_not_reused(self):
+        reserved = []
+
+        def reserve():
+            if not reserved:
+                reserved.append(crud.reserve_image_numbers(self.db, FOLDER, 2, lambda folder: 1))
+
+        self.run_job(on_copy=reserve)
+        self.assertEqual(reserved, [6])
+        self.assertEqual(self.counter(), 8)
+
+    def test_missing_counter_is_left_for_seeding(self):
+        self.db[GALLERY_COUNTERS].delete_many({})
+        self.run_job()
+        self.assertIsNone(self.counter())
+
+
+if __name__ == "__main__":
+    unittest.main()
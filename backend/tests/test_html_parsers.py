@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test suite for the pluggable HTML parser backend
+Every page in tests/html_corpus must give the same extracted fields with the
+lxml and html.parser tree builders, inline and in the worker pool. lxml stays
+opt-in until every site has a recorded real page (record_corpus.py):
+    python -m pytest backend/tests/test_html_parsers.py
+"""
+import asyncio
+import os
+import sys
+import unittest
+from dataclasses import asdict, is_dataclass
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'html_corpus'))
+
+import services.html_parser_service as html_parser_module
+from services.html_parser_service import HtmlParserService, _available
+
+from corpus import load_pages, parsers, pool_parsers, unrecorded_sites
+
+
+def extract_with(backend, parser, html, url):
+    configured = html_parser_module.HTML_PARSER_BACKEND
+    html_parser_module.HTML_PARSER_BACKEND = backend
+    try:
+        return parser(html, url)
+    finally:
+        html_parser_module.HTML_PARSER_BACKEND = configured
+
+
+def _upper(html, suffix):
+    return html.upper() + suffix
+
+
+@unittest.skipUnless(_available("lxml"), "lxml is not installed")
+class HtmlParserBackendTest(unittest.TestCase):
+    """Same fields from every corpus page whichever backend builds the tree"""
+
+    def test_backends_extract_same_fields(self):
+        available = parsers()
+        for entry, html in load_pages():
+            with self.subTest(site=entry["site"], file=entry["file"]):
+                parser = available[entry["parser"]]
+                reference = extract_with("html.parser", parser, html, entry["url"])
+                self.assertEqual(extract_with("lxml", parser, html, entry["url"]), reference)
+
+    def test_corpus_pages_are_parsed(self):
+        available = parsers()
+        for entry, html in load_pages():
+            with self.subTest(site=entry["site"]):
+                fields = available[entry["parser"]](html, entry["url"])
+                self.assertTrue(fields and fields.get("movie_name"), f"no movie name from {entry['file']}")
+
+    def test_every_site_has_a_recorded_page(self):
+        missing = unrecorded_sites()
+        if missing:
+            self.skipTest(f"lxml default on hold, no recorded real pages for: {', '.join(missing)}")
+
+
+class HtmlParserPoolTest(unittest.TestCase):
+    """Small pages are parsed inline, large pages in the worker pool"""
+
+    def test_parse_inline_and_in_pool(self):
+        service = HtmlParserService(max_workers=1)
+        large = "x" * html_parser_module.HTML_PARSE_POOL_MIN_BYTES
+
+        async def main():
+            return await service.parse(_upper, "<p>a</p>", "!"), await service.parse(_upper, large, "!")
+
+        try:
+            small_result, large_result = asyncio.run(main())
+        finally:
+            service.shutdown()
+        self.assertEqual(small_result, "<P>A</P>!")
+        self.assertEqual(large_result, large.upper() + "!")
+        self.assertIsNone(service._executor)
+
+    def test_corpus_pages_parse_the_same_in_the_pool(self):
+        service = HtmlParserService(max_workers=1)
+        methods = pool_parsers()
+        pages = load_pages()
+
+        async def main():
+            return [await service.parse(methods[entry["parser"]], html, entry["url"]) for entry, html in pages]
+
+        # Send every page to the pool, whatever its size
+        try:
+            with mock.patch.object(html_parser_module, "HTML_PARSE_POOL_MIN_BYTES", 0):
+                pooled = asyncio.run(main())
+        finally:
+            service.shutdown()
+        for (entry, html), result in zip(pages, pooled):
+            with self.subTest(site=entry["site"]):
+                inline = methods[entry["parser"]](html, entry["url"])
+                if is_dataclass(inline):
+                    inline, result = asdict(inline), asdict(result)
+                self.assertEqual(result, inline)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test suite for the shared scraper HTTP clients
+    python -m pytest backend/tests/test_http_client_service.py
+"""
+import asyncio
+import os
+import sys
+import unittest
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.http_client_service import HttpClientService, _TimedTransport
+
+
+class HttpClientServiceTest(unittest.TestCase):
+    """Client reuse per profile and per-host metrics"""
+
+    def test_clients_are_shared_and_survive_sessions(self):
+        service = HttpClientService()
+
+        async def main():
+            async with service.session() as first:
+                pass
+            second = service.client()
+            feed = service.client("feed")
+            shared = first is second and not first.is_closed and feed is not first
+            await service.aclose()
+            return shared, first.is_closed, service.get_metrics()["open_clients"]
+
+        self.assertEqual(asyncio.run(main()), (True, True, 0))
+
+    def test_requests_are_timed_per_host(self):
+        service = HttpClientService()
+
+        def handler(request):
+            if request.url.host == "down.example":
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200 if request.url.path == "/" else 404)
+
+        async def main():
+            transport = _TimedTransport(httpx.MockTransport(handler), service.host_stats)
+            async with httpx.AsyncClient(transport=transport) as client:
+                await client.get("https://a.example/")
+                await client.get("https://a.example/missing")
+                with self.assertRaises(httpx.ConnectError):
+                    await client.get("https://down.example/")
+
+        asyncio.run(main())
+        hosts = service.get_metrics()["hosts"]
+        self.assertEqual(hosts["a.example"]["requests"], 2)
+        self.assertEqual(hosts["a.example"]["statuses"], {200: 1, 404: 1})
+        self.assertEqual(hosts["down.example"]["errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
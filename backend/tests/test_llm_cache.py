@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test suite for the LLM response cache
+    python -m pytest backend/tests/test_llm_cache.py
+"""
+import asyncio
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import services.llm_cache_service as cache_module
+import services.llm_gateway_service as gateway_module
+from fake_mongo import FakeDatabase
+from models.mongodb_collections import LLM_CACHE
+from services.llm_cache_service import LLMCacheService, cache_key
+from services.llm_gateway_service import LLMGatewayService, LLMTarget
+
+KEY_ARGS = ("openai", "gpt-4o", "You are an editor.", "Write about the trailer.", 2000, 0.7, None)
+
+
+class CacheKeyTest(unittest.TestCase):
+    """Keys are stable and cover every generation setting"""
+
+    def test_same_request_same_key(self):
+        self.assertEqual(cache_key(*KEY_ARGS), cache_key(*KEY_ARGS))
+        self.assertEqual(len(cache_key(*KEY_ARGS)), 64)
+        # A missing system prompt is the same request as an empty one
+        self.assertEqual(cache_key("openai", "gpt-4o", None, "p", 10), cache_key("openai", "gpt-4o", "", "p", 10))
+
+    def test_every_setting_changes_the_key(self):
+        keys = {cache_key(*KEY_ARGS)}
+        for index, value in enumerate(("anthropic", "gpt-4o-mini", "Other system", "Other prompt", 4000, 0.2, "{}")):
+            args = list(KEY_ARGS)
+            args[index] = value
+            keys.add(cache_key(*args))
+        self.assertEqual(len(keys), len(KEY_ARGS) + 1)
+
+
+class LLMCacheServiceTest(unittest.TestCase):
+    """Lookup, TTL filtering, LRU eviction and hit/miss metrics against a fake collection"""
+
+    def setUp(self):
+        self.db = FakeDatabase()
+        self.db[LLM_CACHE].create_index("key", unique=True)
+        patcher = mock.patch.object(cache_module, "db", self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = LLMCacheService()
+
+    def entry(self, key):
+        return self.db[LLM_CACHE].find_one({"key": key})
+
+    def test_put_then_get(self):
+        self.assertIsNone(self.cache.get("k1", "post"))
+        self.cache.put("k1", "answer", "openai", "gpt-4o", "post")
+        self.assertEqual(self.cache.get("k1", "post"), "answer")
+
+        entry = self.entry("k1")
+        self.assertEqual(entry["hits"], 1)
+        expected_expiry = datetime.now(timezone.utc) + timedelta(hours=cache_module.LLM_CACHE_TTL_HOURS)
+        self.assertAlmostEqual(entry["expires_at"].timestamp(), expected_expiry.timestamp(), delta=5)
+        self.assertEqual(self.cache.get_metrics()["by_agent_type"]["post"],
+                         {"hits": 1, "misses": 1, "stores": 1, "hit_rate": 0.5})
+
+    def test_expired_entries_are_not_served(self):
+        self.cache.put("k1", "answer", "openai", "gpt-4o")
+        self.db[LLM_CACHE].update_one({"key": "k1"}, {"$set": {"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)}})
+        self.assertIsNone(self.cache.get("k1"))
+
+    def test_empty_responses_are_not_cached(self):
+        self.cache.put("k1", "", "openai", "gpt-4o")
+        self.assertIsNone(self.entry("k1"))
+
+    def test_evict_drops_least_recently_used(self):
+        now = datetime.now(timezone.utc)
+        for age, key in enumerate(("newest", "recent", "old", "oldest")):
+            self.cache.put(key, f"answer {key}", "openai", "gpt-4o")
+            self.db[LLM_CACHE].update_one({"key": key}, {"$set": {"last_used_at": now - timedelta(hours=age)}})
+        # Reading an old entry makes it the most recently used
+        self.cache.get("oldest")
+
+        with mock.patch.object(cache_module, "LLM_CACHE_MAX_ENTRIES", 2):
+            self.assertEqual(self.cache.evict(), 2)
+            self.assertEqual(self.cache.evict(), 0)
+        self.assertEqual(sorted(entry["key"] for entry in self.db[LLM_CACHE].find()), ["newest", "oldest"])
+
+    def test_stores_trigger_eviction(self):
+        with mock.patch.object(cache_module, "LLM_CACHE_MAX_ENTRIES", 3), \
+                mock.patch.object(cache_module, "EVICT_CHECK_EVERY", 5):
+            for number in range(5):
+                self.cache.put(f"k{number}", "answer", "openai", "gpt-4o")
+        self.assertEqual(self.db[LLM_CACHE].estimated_document_count(), 3)
+
+
+class GatewayCacheTest(unittest.TestCase):
+    """complete() answers repeats from the cache unless cache=False"""
+
+    def setUp(self):
+        self.db = FakeDatabase()
+        for patcher in (
+            mock.patch.object(cache_module, "db", self.db),
+            mock.patch.object(gateway_module, "LLM_CACHE_ENABLED", True),
+            mock.patch.object(gateway_module, "llm_cache_service", LLMCacheService()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.gateway = LLMGatewayService()
+        self.provider = mock.AsyncMock(return_value=("fresh answer", 120))
+        self.gateway._complete = self.provider
+        self.target = LLMTarget(provider="openai", model="gpt-4o", api_key="test")
+
+    def complete(self, prompt, **kwargs):
+        return asyncio.run(self.gateway.complete("System", prompt, target=self.target, agent_type="post", **kwargs))
+
+    def test_repeat_is_served_from_cache(self):
+        self.assertEqual(self.complete("Write it"), "fresh answer")
+        self.assertEqual(self.complete("Write it"), "fresh answer")
+        self.assertEqual(self.provider.await_count, 1)
+        self.assertEqual(self.db[LLM_CACHE].estimated_document_count(), 1)
+
+    def test_cache_false_skips_lookup_and_store(self):
+        self.complete("Write it")
+        self.complete("Write it", cache=False)
+        self.complete("Something else", cache=False)
+        self.assertEqual(self.provider.await_count, 3)
+        self.assertEqual(self.db[LLM_CACHE].estimated_document_count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test suite for the LLM rate limiter
+Runs against a fake provider, no API keys needed:
+    python -m pytest backend/tests/test_llm_rate_limiter.py
+"""
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services import llm_rate_limiter_service as limiter_module
+from services.llm_rate_limiter_service import LLMRateLimiterService, TokenBucket
+
+
+class FakeResponse:
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+
+
+class FakeProviderError(Exception):
+    """Shaped like the OpenAI/Anthropic SDK errors: status_code plus the HTTP response"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse(headers)
+
+
+class FakeProvider:
+    """Answers after a short delay, failing with the queued errors first"""
+
+    def __init__(self, errors=(), latency=0.01):
+        self.errors = list(errors)
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def complete(self):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.errors:
+                raise self.errors.pop(0)
+            return f"answer {self.calls}"
+        finally:
+            self.in_flight -= 1
+
+
+@mock.patch.object(limiter_module, "LLM_BACKOFF_BASE_SECONDS", 0.01)
+class LLMRateLimiterTest(unittest.TestCase):
+    """Concurrency, pacing and retries against a fake provider"""
+
+    def setUp(self):
+        self.limiter = LLMRateLimiterService(
+            limits={"fake": {"rpm": 6000, "tpm": 1000000, "max_concurrency": 8}}, overrides={}
+        )
+
+    def run_calls(self, provider, count, **kwargs):
+        async def run_all():
+            return await asyncio.gather(*(
+                self.limiter.run("fake", "model", provider.complete, **kwargs) for _ in range(count)
+            ))
+        return asyncio.run(run_all())
+
+    def test_concurrency_starts_at_initial_limit(self):
+        provider = FakeProvider(latency=0.05)
+        results = self.run_calls(provider, 20)
+
+        self.assertEqual(len(results), 20)
+        self.assertLessEqual(provider.peak_in_flight, limiter_module.LLM_INITIAL_CONCURRENCY + 2)
+        metrics = self.limiter.get_metrics()["models"]["fake/model"]
+        self.assertEqual(metrics["calls"], 20)
+        self.assertEqual(metrics["in_flight"], 0)
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.assertGreater(metrics["concurrency_limit"], limiter_module.LLM_INITIAL_CONCURRENCY)
+
+    def test_throttle_halves_limit_and_honours_retry_after(self):
+        provider = FakeProvider(errors=[FakeProviderError(429, {"retry-after": "0.3"})])
+        started = time.monotonic()
+        result = self.run_calls(provider, 1)[0]
+
+        self.assertEqual(result, "answer 2")
+        self.assertGreaterEqual(time.monotonic() - started, 0.3)
+        metrics = self.limiter.get_metrics()["models"]["fake/model"]
+        self.assertEqual(metrics["throttled"], 1)
+        self.assertEqual(metrics["retries"], 1)
+        self.assertLess(metrics["concurrency_limit"], limiter_module.LLM_INITIAL_CONCURRENCY)
+
+    def test_client_errors_are_not_retried(self):
+        provider = FakeProvider(errors=[FakeProviderError(400)])
+        with self.assertRaises(FakeProviderError):
+            self.run_calls(provider, 1)
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(self.limiter.get_metrics()["models"]["fake/model"]["failures"], 1)
+
+    def test_non_idempotent_calls_are_not_retried(self):
+        provider = FakeProvider(errors=[FakeProviderError(503)])
+        with self.assertRaises(FakeProviderError):
+            self.run_calls(provider, 1, idempotent=False)
+        self.assertEqual(provider.calls, 1)
+
+    def test_retries_give_up_after_max(self):
+        provider = FakeProvider(errors=[FakeProviderError(500)] * (limiter_module.LLM_MAX_RETRIES + 1))
+        with self.assertRaises(FakeProviderError):
+            self.run_calls(provider, 1)
+        self.assertEqual(provider.calls, limiter_module.LLM_MAX_RETRIES + 1)
+
+    def test_queue_depth_while_waiting(self):
+        provider = FakeProvider(latency=0.2)
+
+        async def scenario():
+            tasks = [asyncio.ensure_future(self.limiter.run("fake", "model", provider.complete)) for _ in range(10)]
+            await asyncio.sleep(0.05)
+            depth = self.limiter.get_metrics()["queue_depth"]
+            await asyncio.gather(*tasks)
+            return depth
+
+        depth = asyncio.run(scenario())
+        self.assertEqual(depth, 10 - limiter_module.LLM_INITIAL_CONCURRENCY)
+
+    def test_token_bucket_paces_after_burst(self):
+        bucket = TokenBucket(per_minute=120)  # 2 per second, burst of 120
+        delays = [bucket.reserve(60) for _ in range(3)]
+
+        self.assertEqual(delays[:2], [0.0, 0.0])
+        self.assertAlmostEqual(delays[2], 30.0, delta=0.1)
+
+    def test_unused_tokens_are_given_back(self):
+        limiter = LLMRateLimiterService(limits={"fake": {"rpm": 6000, "tpm": 40000}}, overrides={})
+        provider = FakeProvider()
+
+        async def run_all():
+            # Each call reserves 20000 but reports 1500 used: all ten run without pacing
+            for _ in range(10):
+                await limiter.run("fake", "model", provider.complete, tokens=20000, used_tokens=lambda result: 1500)
+
+        started = time.monotonic()
+        asyncio.run(run_all())
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(provider.calls, 10)
+
+    def test_failed_attempts_give_their_tokens_back(self):
+        limiter = LLMRateLimiterService(limits={"fake": {"rpm": 6000, "tpm": 40000}}, overrides={})
+        provider = FakeProvider(errors=[FakeProviderError(429), FakeProviderError(503)])
+
+        async def call():
+            return await limiter.run("fake", "model", provider.complete, tokens=30000, used_tokens=lambda result: 30000)
+
+        started = time.monotonic()
+        asyncio.run(call())
+        # Three attempts of 30000 against a 40000 bucket: only the successful one is charged
+        self.assertLess(time.monotonic() - started, 5.0)
+        self.assertEqual(provider.calls, 3)
+        self.assertAlmostEqual(limiter._models[("fake", "model")].tokens.level, 10000, delta=100)
+
+    def test_completion_budget_is_not_reserved_in_full(self):
+        self.assertEqual(limiter_module.estimate_tokens("x" * 400, max_tokens=20000),
+                         100 + limiter_module.LLM_COMPLETION_TOKEN_ESTIMATE)
+        self.assertEqual(limiter_module.estimate_tokens("x" * 400, max_tokens=300), 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
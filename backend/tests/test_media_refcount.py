@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test suite for media asset reference counting
+Uploads, dedup, article updates and deletes must keep refcounts exact: an
+image is deleted from storage only when its last reference goes.
+    python -m pytest backend/tests/test_media_refcount.py
+"""
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import crud
+import s3_service as s3_module
+import services.media_asset_service as media_asset_module
+from fake_mongo import FakeDatabase
+from models.mongodb_collections import ARTICLES, IMAGE_VARIANTS, MEDIA_ASSETS
+from services.media_asset_service import content_addressed_key, hash_content, media_asset_service
+
+CONTENT = b"\x89PNG\r\n\x1a\n" + b"poster" * 100
+CDN = "https://cdn.example.com/"
+
+
+class MediaRefcountTest(unittest.TestCase):
+    """Refcount and storage deletes after every step of an image's life"""
+
+    def setUp(self):
+        self.db = FakeDatabase()
+        self.db[MEDIA_ASSETS].create_index("hash", unique=True)
+
+        self.s3 = mock.MagicMock()
+        self.s3.is_enabled.return_value = True
+        self.s3.upload_file_async = mock.AsyncMock(side_effect=lambda content, key, content_type: CDN + key)
+
+        for patcher in (
+            mock.patch.object(media_asset_module, "db", self.db),
+            mock.patch.object(s3_module, "s3_service", self.s3),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def ingest(self, key, content=CONTENT):
+        return asyncio.run(media_asset_service.ingest(content, key, "image/png"))
+
+    def refcount(self, url):
+        asset = self.db[MEDIA_ASSETS].find_one({"url": url})
+        return asset["refcount"] if asset else None
+
+    def add_article(self, article_id, image):
+        self.db[ARTICLES].insert_one({"id": article_id, "title": f"Article {article_id}", "image": image})
+
+    def deleted_urls(self):
+        return [call.args[0] for call in self.s3.delete_file.call_args_list]
+
+    def test_upload_dedup_update_and_delete(self):
+        key = content_addressed_key("articles", hash_content(CONTENT), ".png")
+        first = self.ingest(key)
+        url = first["url"]
+        self.assertFalse(first["deduplicated"])
+        self.assertEqual(self.refcount(url), 1)
+        self.assertEqual(self.s3.upload_file_async.await_count, 1)
+
+        # Same bytes uploaded again: no second PUT, one more reference
+        second = self.ingest("articles/2026/01/01/copy.png")
+        self.assertTrue(second["deduplicated"])
+        self.assertEqual(second["url"], url)
+        self.assertEqual(self.refcount(url), 2)
+        self.assertEqual(self.s3.upload_file_async.await_count, 1)
+
+        self.add_article(1, url)
+        self.add_article(2, url)
+        self.db[IMAGE_VARIANTS].insert_one({"original_url": url, "variants": [{"url": url + ".card.webp"}]})
+
+        # Deleting one article keeps the image for the other
+        crud.delete_article(self.db, 1, self.s3)
+        self.assertEqual(self.refcount(url), 1)
+        self.assertEqual(self.deleted_urls(), [])
+
+        # Saving the article with the same image does not release it
+        crud.update_article_cms(self.db, 2, {"image": url}, self.s3)
+        self.assertEqual(self.refcount(url), 1)
+        self.assertEqual(self.deleted_urls(), [])
+
+        # Replacing the image drops the last reference: object and variants go
+        crud.update_article_cms(self.db, 2, {"image": CDN + "articles/other.png"}, self.s3)
+        self.assertIsNone(self.refcount(url))
+        self.assertEqual(self.deleted_urls(), [url])
+        self.s3.delete_files.assert_called_once_with([url + ".card.webp"])
+        self.assertIsNone(self.db[IMAGE_VARIANTS].find_one({"original_url": url}))
+
+    def test_acquire_takes_a_reference(self):
+        url = self.ingest("galleries/cover/1.png")["url"]
+        crud.acquire_image(self.db, url)
+        self.assertEqual(self.refcount(url), 2)
+
+        self.assertFalse(crud.release_image(self.db, url, self.s3))
+        self.assertTrue(crud.release_image(self.db, url, self.s3))
+        self.assertIsNone(self.refcount(url))
+        self.assertEqual(self.deleted_urls(), [url])
+
+    def test_pending_deletes_are_batched(self):
+        url = self.ingest("galleries/set/1.png")["url"]
+        pending = []
+        self.assertTrue(crud.release_image(self.db, url, self.s3, pending))
+        self.assertEqual(pending, [url])
+        self.s3.delete_file.assert_not_called()
+
+    def test_images_without_asset_record_are_deleted_directly(self):
+        legacy = CDN + "articles/2024/05/01/legacy.jpg"
+        self.add_article(3, legacy)
+        crud.delete_article(self.db, 3, self.s3)
+        self.assertEqual(self.deleted_urls(), [legacy])
+
+
+if __name__ == "__main__":
+    unittest.main()
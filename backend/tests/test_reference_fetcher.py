@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test suite for the cached, per-domain reference page fetcher
+    python -m pytest backend/tests/test_reference_fetcher.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import services.reference_fetcher_service as fetcher_module
+from services.domain_throttle import DomainThrottle
+from services.reference_fetcher_service import ReferenceFetcherService, _DiskCache
+
+
+@mock.patch.object(fetcher_module, "domain_throttle", DomainThrottle(rate=1000, burst=10, concurrency=4))
+@mock.patch.object(fetcher_module, "REFERENCE_FETCH_RETRIES", 0)
+class ReferenceFetcherTest(unittest.TestCase):
+    """Fresh hits, conditional revalidation and stale fallback"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.requests = []
+        self.responses = []
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _run(self, coro_factory):
+        service = ReferenceFetcherService(self.temp_dir.name)
+
+        def handler(request):
+            self.requests.append(request)
+            return self.responses.pop(0)
+
+        async def main():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            shared = fetcher_module.http_client_service
+            fetcher_module.http_client_service = SimpleNamespace(client=lambda profile="default": client)
+            try:
+                return await coro_factory(service)
+            finally:
+                fetcher_module.http_client_service = shared
+                await client.aclose()
+        return asyncio.run(main())
+
+    def test_fresh_copy_is_served_without_request(self):
+        self.responses = [httpx.Response(200, content=b"<html>one</html>", headers={"etag": '"v1"'})]
+
+        async def twice(service):
+            return [await service.fetch("https://example.com/a", "article") for _ in range(2)]
+
+        self.assertEqual(self._run(twice), ["<html>one</html>"] * 2)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_stale_copy_is_revalidated(self):
+        self.responses = [
+            httpx.Response(200, content=b"<html>list</html>", headers={"etag": '"v1"'}),
+            httpx.Response(304),
+        ]
+
+        async def expire_and_refetch(service):
+            await service.fetch("https://example.com/news", "listing")
+            meta, body = service.cache.load("https://example.com/news")
+            service.cache.store("https://example.com/news", dict(meta, fetched_at=time.time() - 3600))
+            return await service.fetch("https://example.com/news", "listing")
+
+        self.assertEqual(self._run(expire_and_refetch), "<html>list</html>")
+        self.assertEqual(self.requests[1].headers.get("if-none-match"), '"v1"')
+
+    def test_stale_copy_used_when_site_fails(self):
+        self.responses = [httpx.Response(200, content=b"<html>old</html>"), httpx.Response(503)]
+
+        async def expire_and_fail(service):
+            await service.fetch("https://example.com/news", "listing")
+            meta, _ = service.cache.load("https://example.com/news")
+            service.cache.store("https://example.com/news", dict(meta, fetched_at=0))
+            return await service.fetch("https://example.com/news", "listing"), await service.fetch("https://example.com/x")
+
+        self.responses.append(httpx.Response(404))
+        self.assertEqual(self._run(expire_and_fail), ("<html>old</html>", None))
+
+
+class DiskCachePruneTest(unittest.TestCase):
+    """Expired entries go first, then the oldest until the cache fits"""
+
+    def test_prune_by_age_then_size(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = _DiskCache(directory)
+            now = time.time()
+            for index, age in enumerate([10 * 86400, 300, 200, 100]):
+                url = f"https://example.com/{index}"
+                cache.store(url, {"url": url}, b"x" * 1000)
+                for path in cache._paths(url):
+                    os.utime(path, (now - age, now - age))
+
+            # The 10-day-old entry is expired; of the rest only two fit
+            self.assertEqual(cache.prune(max_bytes=2100, max_age_seconds=86400), 2)
+            self.assertEqual([cache.load(f"https://example.com/{i}") is not None for i in range(4)],
+                             [False, False, True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
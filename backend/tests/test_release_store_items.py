@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test suite for the release feed bulk upsert counters
+    python -m pytest backend/tests/test_release_store_items.py
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+from pymongo.errors import BulkWriteError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import services.release_scraper_service as release_module
+from fake_mongo import DUPLICATE_KEY_ERROR, FakeDatabase
+from services.release_scraper_service import RELEASE_FEED_ITEMS, ReleaseScraperService
+
+
+def item(key, title=None):
+    return {"unique_key": key, "title": title or f"Release {key}", "source_id": "src-1"}
+
+
+class StoreItemsTest(unittest.TestCase):
+    """inserted / updated (seen again) / skipped counts of _store_items"""
+
+    def setUp(self):
+        self.db = FakeDatabase()
+        self.db[RELEASE_FEED_ITEMS].create_index("unique_key", unique=True)
+        patcher = mock.patch.object(release_module, "db", self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = ReleaseScraperService()
+
+    def stored(self, key):
+        return self.db[RELEASE_FEED_ITEMS].find_one({"unique_key": key}, {"_id": 0})
+
+    def test_new_items_are_inserted_and_batch_duplicates_skipped(self):
+        counts = self.service._store_items([item("a"), item("b"), item("a", "Duplicate")])
+        self.assertEqual(counts, {"inserted": 2, "updated": 0, "skipped": 1})
+        self.assertEqual(self.stored("a")["title"], "Release a")
+        self.assertIsNotNone(self.stored("a")["last_seen_at"])
+
+    def test_stored_items_count_as_seen_again(self):
+        self.service._store_items([item("a")])
+        first_seen = self.stored("a")["last_seen_at"]
+
+        counts = self.service._store_items([item("a", "Changed title"), item("c")])
+        self.assertEqual(counts, {"inserted": 1, "updated": 1, "skipped": 0})
+        # Only last_seen_at changes on a stored item
+        self.assertEqual(self.stored("a")["title"], "Release a")
+        self.assertGreater(self.stored("a")["last_seen_at"], first_seen)
+
+    def test_concurrent_inserts_are_skipped(self):
+        # Another source inserted "b" between our lookup and our upsert
+        error = BulkWriteError({
+            "nUpserted": 1, "nMatched": 0, "nModified": 0,
+            "writeErrors": [{"index": 1, "code": DUPLICATE_KEY_ERROR, "errmsg": "E11000 duplicate key"}],
+        })
+        with mock.patch.object(self.db[RELEASE_FEED_ITEMS], "bulk_write", side_effect=error):
+            counts = self.service._store_items([item("a"), item("b"), item("b")])
+        self.assertEqual(counts, {"inserted": 1, "updated": 0, "skipped": 2})
+
+    def test_nothing_to_store(self):
+        self.assertEqual(self.service._store_items([]), {"inserted": 0, "updated": 0, "skipped": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test suite for the concurrent S3 transfer layer
+Runs against moto's in-memory S3, no AWS account needed:
+    pip install "moto[s3]" && python -m pytest backend/tests/test_s3_transfer.py
+"""
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    import boto3
+    from moto import mock_aws
+except ImportError:  # moto is a test-only dependency
+    mock_aws = None
+
+from s3_service import S3Service
+
+BUCKET = "tadka-transfer-test"
+
+
+@unittest.skipIf(mock_aws is None, "moto is not installed")
+class S3TransferTest(unittest.TestCase):
+    """Parallel uploads, multipart and batched deletes against moto"""
+
+    def setUp(self):
+        self.mock = mock_aws()
+        self.mock.start()
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+
+        self.service = S3Service()
+        self.service.initialize({
+            "is_enabled": True,
+            "aws_access_key_id": "testing",
+            "aws_secret_access_key": "testing",
+            "aws_region": "us-east-1",
+            "s3_bucket_name": BUCKET,
+            "max_file_size_mb": 50
+        })
+
+    def tearDown(self):
+        self.mock.stop()
+
+    def test_upload_many_keeps_order(self):
+        items = [
+            {"content": f"image-{i}".encode(), "key": f"galleries/test/{i + 1}.jpg", "content_type": "image/jpeg"}
+            for i in range(25)
+        ]
+        urls = asyncio.run(self.service.upload_many(items))
+
+        self.assertEqual(len(urls), 25)
+        for i, url in enumerate(urls):
+            self.assertTrue(url.endswith(f"galleries/test/{i + 1}.jpg"))
+            self.assertEqual(self.service.key_from_url(url), f"galleries/test/{i + 1}.jpg")
+        self.assertEqual(len(self.service.list_objects("galleries/test/")), 25)
+
+    def test_multipart_upload_above_threshold(self):
+        content = os.urandom(self.service.transfer_config.multipart_threshold + 1024)
+        url = self.service.upload_file(content, "articles/large.jpg", "image/jpeg")
+
+        self.assertIsNotNone(url)
+        stored = self.service.s3_client.get_object(Bucket=BUCKET, Key="articles/large.jpg")["Body"].read()
+        self.assertEqual(stored, content)
+
+    def test_size_limit_is_not_retried(self):
+        self.service.config["max_file_size_mb"] = 1
+        url = asyncio.run(self.service.upload_file_async(b"x" * (2 * 1024 * 1024), "articles/too-big.jpg"))
+        self.assertIsNone(url)
+
+    def test_delete_files_in_batches(self):
+        items = [{"content": b"x", "key": f"galleries/bulk/{i}.jpg"} for i in range(1205)]
+        urls = asyncio.run(self.service.upload_many(items))
+
+        deleted = self.service.delete_files(urls)
+
+        self.assertEqual(deleted, 1205)
+        self.assertEqual(self.service.list_objects("galleries/bulk/"), [])
+
+    def test_presigned_multipart_upload(self):
+        import requests
+
+        part_size = self.service.transfer_config.multipart_chunksize
+        content = os.urandom(part_size + 2048)
+        presign = self.service.start_presigned_multipart("galleries/direct/1.jpg", "image/jpeg", len(content))
+        self.assertEqual(len(presign["parts"]), 2)
+
+        parts = []
+        for part in presign["parts"]:
+            start = (part["part_number"] - 1) * part_size
+            response = requests.put(part["url"], data=content[start:start + part_size])
+            self.assertEqual(response.status_code, 200)
+            parts.append({"part_number": part["part_number"], "etag": response.headers["ETag"]})
+
+        self.assertTrue(self.service.complete_multipart("galleries/direct/1.jpg", presign["upload_id"], parts))
+        self.assertEqual(self.service.head_object("galleries/direct/1.jpg")["ContentLength"], len(content))
+
+    def test_presigned_post_pins_key_and_type(self):
+        post = self.service.presign_post("articles/2025/01/01/1.png", "image/png", 1024)
+
+        self.assertEqual(post["fields"]["key"], "articles/2025/01/01/1.png")
+        self.assertEqual(post["fields"]["Content-Type"], "image/png")
+        self.assertIsNone(self.service.head_object("articles/2025/01/01/1.png"))
+
+    def test_initialize_reuses_client_for_same_credentials(self):
+        client = self.service.s3_client
+        self.service.initialize({**self.service.config, "max_file_size_mb": 20, "config_version": 2})
+
+        self.assertIs(self.service.s3_client, client)
+        self.assertEqual(self.service.get_metrics()["client_builds"], 1)
+
+        self.service.initialize({**self.service.config, "aws_region": "eu-west-1", "config_version": 3})
+        self.assertIsNot(self.service.s3_client, client)
+        self.assertEqual(self.service.get_metrics()["config_version"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test suite for adaptive YouTube RSS poll intervals
+    python -m pytest backend/tests/test_youtube_rss_polling.py
+"""
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.youtube_rss_service import YOUTUBE_RSS_UPLOADS_PER_POLL, poll_interval_minutes
+
+NOW = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+def uploads(count, hours_apart):
+    return [NOW - timedelta(hours=i * hours_apart) for i in range(count)]
+
+
+class PollIntervalTest(unittest.TestCase):
+    """Interval follows the upload rate within the min/max bounds"""
+
+    def test_interval_follows_upload_rate(self):
+        # 15 uploads over the last 28 hours: ~0.5 per hour
+        interval = poll_interval_minutes(uploads(15, 2), NOW, 1, 10000)
+        self.assertAlmostEqual(interval, YOUTUBE_RSS_UPLOADS_PER_POLL * 60 * 28 / 15, places=3)
+
+    def test_busy_and_dormant_channels_hit_the_bounds(self):
+        self.assertEqual(poll_interval_minutes(uploads(15, 0.1), NOW, 15, 1440), 15)
+        self.assertEqual(poll_interval_minutes(uploads(15, 24 * 30), NOW, 15, 1440), 1440)
+        self.assertEqual(poll_interval_minutes([], NOW, 15, 1440), 1440)
+
+    def test_quiet_feed_slows_down_over_time(self):
+        times = uploads(15, 1)
+        soon = poll_interval_minutes(times, NOW, 1, 10000)
+        later = poll_interval_minutes(times, NOW + timedelta(days=2), 1, 10000)
+        self.assertGreater(later, soon)
+
+    def test_future_publish_times_are_ignored(self):
+        # Scheduled premieres list a publish time ahead of now
+        times = uploads(4, 6) + [NOW + timedelta(days=1)]
+        self.assertEqual(poll_interval_minutes(times, NOW, 1, 10000), poll_interval_minutes(uploads(4, 6), NOW, 1, 10000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test suite for storing YouTube RSS videos
+Re-ingesting a feed must not reset a video's agent state:
+    python -m pytest backend/tests/test_youtube_store_videos.py
+"""
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import services.youtube_rss_service as youtube_module
+from fake_mongo import FakeDatabase
+from services.youtube_rss_service import YouTubeRSSService
+
+FIRST_FETCH = datetime(2026, 3, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def feed_video(video_id, title="Trailer", updated_at="2026-03-01T06:00:00+00:00", fetched_at=FIRST_FETCH):
+    return {
+        'video_id': video_id,
+        'title': title,
+        'description': "Official trailer",
+        'thumbnail': f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+        'video_url': f"https://www.youtube.com/watch?v={video_id}",
+        'updated_at': updated_at,
+        'channel_id': "UC123",
+        'channel_name': "Studio",
+        'fetched_at': fetched_at,
+        'is_used': False,
+        'is_skipped': False,
+        'source': 'rss'
+    }
+
+
+class StoreVideosTest(unittest.TestCase):
+    """$setOnInsert for new videos, $set of the mutable fields for changed ones"""
+
+    def setUp(self):
+        self.db = FakeDatabase()
+        self.db.youtube_videos.create_index("video_id", unique=True)
+        patcher = mock.patch.object(youtube_module, "db", self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = YouTubeRSSService()
+
+    def stored(self, video_id):
+        return self.db.youtube_videos.find_one({'video_id': video_id}, {'_id': 0})
+
+    def test_new_videos_are_inserted_whole(self):
+        self.assertEqual(self.service.store_videos([feed_video("a"), feed_video("b")]), {'new': 2, 'updated': 0})
+        self.assertEqual(self.stored("a"), feed_video("a"))
+
+    def test_reingest_keeps_agent_state(self):
+        self.service.store_videos([feed_video("a"), feed_video("b")])
+        self.service.mark_video_as_used("a")
+        self.service.mark_video_as_skipped("b")
+
+        # Unchanged entries: nothing is written, not even fetched_at
+        refetch = FIRST_FETCH + timedelta(hours=1)
+        counts = self.service.store_videos([feed_video("a", fetched_at=refetch), feed_video("b", fetched_at=refetch)])
+        self.assertEqual(counts, {'new': 0, 'updated': 0})
+        self.assertEqual(self.stored("a")["fetched_at"], FIRST_FETCH)
+
+        # A changed entry refreshes title, updated_at and fetched_at only
+        changed = feed_video("a", title="New trailer", updated_at="2026-03-02T06:00:00+00:00", fetched_at=refetch)
+        counts = self.service.store_videos([changed, feed_video("b", fetched_at=refetch), feed_video("c", fetched_at=refetch)])
+        self.assertEqual(counts, {'new': 1, 'updated': 1})
+
+        video = self.stored("a")
+        self.assertEqual(video["title"], "New trailer")
+        self.assertEqual(video["updated_at"], "2026-03-02T06:00:00+00:00")
+        self.assertEqual(video["fetched_at"], refetch)
+        self.assertTrue(video["is_used"])
+        self.assertTrue(self.stored("b")["is_skipped"])
+        self.assertFalse(self.stored("c")["is_used"])
+
+    def test_nothing_to_store(self):
+        self.assertEqual(self.service.store_videos([]), {'new': 0, 'updated': 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ import AdManagement from './AdManagement';
 import GroupedPosts from './GroupedPosts';
 import CricketSchedulesManagement from './CricketSchedulesManagement';
 import { getSortedStates, getStateNameByCode } from '../../utils/statesConfig';
+import { uploadImageDirect } from '../../utils/directUpload';
 
 // Topic Management Modal Component
 const TopicManagementModal = ({ article, currentTopics, onClose, onTopicToggle }) => {
@@ -2251,28 +2252,30 @@ const Dashboard = () => {
       });
       console.log(`📊 Max image number from state: ${maxFromState}`);
       
-      // STEP 2: Get max number from S3 (for safety)
-      let maxFromS3 = 0;
+      // STEP 2: Reserve numbers for this batch; the server counter is shared by every uploader
+      const imageFiles = files.filter(file => file.type.startsWith('image/'));
+      let startNumber = maxFromState + 1;
       try {
+        const reserveData = new FormData();
+        reserveData.append('folder_path', folderPath);
+        reserveData.append('count', Math.max(imageFiles.length, 1));
+        reserveData.append('min_number', maxFromState + 1);
         const response = await fetch(
-          `${process.env.REACT_APP_BACKEND_URL}/api/cms/gallery-next-image-number?folder_path=${encodeURIComponent(folderPath)}`
+          `${process.env.REACT_APP_BACKEND_URL}/api/cms/gallery-image-numbers/reserve`,
+          { method: 'POST', body: reserveData }
         );
         if (response.ok) {
           const data = await response.json();
-          maxFromS3 = data.next_number - 1; // next_number is already +1, so subtract to get max
-          console.log(`📊 Max image number from S3: ${maxFromS3}`);
+          startNumber = Math.max(startNumber, data.first_number);
         }
       } catch (error) {
-        console.error('⚠️ Error fetching S3 image numbers (will use state only):', error);
+        console.error('⚠️ Error reserving image numbers (will use state only):', error);
       }
-      
-      // STEP 3: Use the HIGHER number to avoid conflicts
-      const startNumber = Math.max(maxFromState, maxFromS3) + 1;
       console.log(`✅ Starting upload at image number: ${startNumber}`);
       
-      // STEP 4: Upload files to S3
-      for (let index = 0; index < files.length; index++) {
-        const file = files[index];
+      // STEP 3: Upload files to S3
+      for (let index = 0; index < imageFiles.length; index++) {
+        const file = imageFiles[index];
         if (file.type.startsWith('image/')) {
           const imageNumber = startNumber + index;
           const fileExtension = file.name.split('.').pop();
@@ -2280,23 +2283,31 @@ const Dashboard = () => {
           console.log(`📤 Uploading ${file.name} as ${imageNumber}.${fileExtension}`);
           
           try {
-            // Create FormData for upload
-            const formData = new FormData();
-            formData.append('file', file);
-            formData.append('folder_path', folderPath);
-            formData.append('image_number', imageNumber);
+            // Upload straight to S3 with a presigned request; null means direct uploads are unavailable
+            let uploadData = await uploadImageDirect(file, { target: 'galleries', folderPath, imageNumber });
+            let uploadResponse = null;
             
-            // Upload to S3
-            const uploadResponse = await fetch(
-              `${process.env.REACT_APP_BACKEND_URL}/api/cms/upload-gallery-image`,
-              {
-                method: 'POST',
-                body: formData
+            if (!uploadData) {
+              // Create FormData for upload
+              const formData = new FormData();
+              formData.append('file', file);
+              formData.append('folder_path', folderPath);
+              formData.append('image_number', imageNumber);
+              
+              // Upload to S3 through the API
+              uploadResponse = await fetch(
+                `${process.env.REACT_APP_BACKEND_URL}/api/cms/upload-gallery-image`,
+                {
+                  method: 'POST',
+                  body: formData
+                }
+              );
+              if (uploadResponse.ok) {
+                uploadData = await uploadResponse.json();
               }
-            );
+            }
             
-            if (uploadResponse.ok) {
-              const uploadData = await uploadResponse.json();
+            if (uploadData) {
               console.log('✅ Image uploaded to S3:', uploadData.url);
               console.log('✅ S3 Key:', uploadData.s3_key);
               
@@ -7,6 +7,8 @@ const CommentSection = ({ articleId, commentType = 'regular', headerTitle = 'Com
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [submitting, setSubmitting] = useState(false);
   const [totalCount, setTotalCount] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [existingReview, setExistingReview] = useState(null);
   const [isEditing, setIsEditing] = useState(false);
 
@@ -24,6 +26,7 @@ const CommentSection = ({ articleId, commentType = 'regular', headerTitle = 'Com
         const data = await response.json();
         setComments(data.comments || []);
         setTotalCount(data.count || 0);
+        setNextCursor(data.next_cursor || null);
       }
     } catch (error) {
       console.error('Error fetching comments:', error);
@@ -32,6 +35,25 @@ const CommentSection = ({ articleId, commentType = 'regular', headerTitle = 'Com
     }
   };
 
+  const fetchMoreComments = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await fetch(
+        `${process.env.REACT_APP_BACKEND_URL}/api/articles/${articleId}/comments?comment_type=${commentType}&cursor=${encodeURIComponent(nextCursor)}`
+      );
+      if (response.ok) {
+        const data = await response.json();
+        setComments(prev => [...prev, ...(data.comments || [])]);
+        setNextCursor(data.next_cursor || null);
+      }
+    } catch (error) {
+      console.error('Error fetching more comments:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleOpenModal = async () => {
     // Check if user has already reviewed (only for review type)
     if (commentType === 'review') {
@@ -199,6 +221,15 @@ const CommentSection = ({ articleId, commentType = 'regular', headerTitle = 'Com
               <p className="text-gray-700 text-xs whitespace-pre-wrap text-left">{comment.comment}</p>
             </div>
           ))}
+          {nextCursor && (
+            <button
+              onClick={fetchMoreComments}
+              disabled={loadingMore}
+              className="w-full py-2 text-xs font-medium text-gray-700 hover:text-gray-900 disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : `Show more (${Math.max(totalCount - comments.length, 0)})`}
+            </button>
+          )}
         </div>
       )}
 
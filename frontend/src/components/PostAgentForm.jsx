@@ -23,6 +23,7 @@ const PostAgentForm = ({ onClose, onSave, editingAgent }) => {
     split_paragraphs: 2,
     reference_urls: [],
     posts_count: 1,  // Number of posts to create from listing page (1-100)
+    bulk_parallelism: null,  // Listing items processed at once (null = server default)
     image_option: 'web_search',
     content_workflow: 'in_review',
     is_top_story: false,
@@ -32,6 +33,7 @@ const PostAgentForm = ({ onClose, onSave, editingAgent }) => {
     adhoc_post_time: '09:00 AM',
     is_active: true,
     custom_prompt: '',  // Custom prompt for this agent instance
+    pipeline_mode: 'multi_step',  // 'multi_step' or 'single_pass' (one structured LLM call per post)
     // Movie Review Agent fields
     max_reviews_from_listing: 10,  // Number of reviews to fetch from listing page
     // Photo Gallery Agent fields
@@ -283,6 +285,9 @@ const PostAgentForm = ({ onClose, onSave, editingAgent }) => {
     if (['max_reviews_from_listing', 'lookback_days', 'max_images', 'split_paragraphs'].includes(name)) {
       processedValue = parseInt(value, 10);
     }
+    if (name === 'bulk_parallelism') {
+      processedValue = value ? parseInt(value, 10) : null;
+    }
     
     // Update form data
     setFormData(prev => {
@@ -1004,6 +1009,24 @@ const PostAgentForm = ({ onClose, onSave, editingAgent }) => {
                   </label>
                 </div>
               </div>
+
+              {/* Generation Mode - post agents only */}
+              {formData.agent_type === 'post' && (
+                <div className="pt-2 text-left">
+                  <label className="block text-xs font-medium text-gray-700 mb-1">
+                    Generation Mode
+                  </label>
+                  <select
+                    name="pipeline_mode"
+                    value={formData.pipeline_mode || 'multi_step'}
+                    onChange={handleInputChange}
+                    className="w-full px-3 py-1.5 border border-gray-300 rounded text-sm focus:ring-2 focus:ring-blue-500 focus:border-blue-500"
+                  >
+                    <option value="multi_step">Multi-step (optimize, write, polish, title, summary)</option>
+                    <option value="single_pass">Single pass (one call for article, title, summary and tags)</option>
+                  </select>
+                </div>
+              )}
             </div>
             )}
 
@@ -2400,6 +2423,24 @@ Instructions:
                   </p>
                 </div>
 
+                {/* Reviews processed in parallel */}
+                <div className="text-left">
+                  <label className="block text-sm font-medium text-gray-700 mb-2">
+                    Reviews Processed in Parallel
+                  </label>
+                  <select
+                    name="bulk_parallelism"
+                    value={formData.bulk_parallelism || ''}
+                    onChange={handleInputChange}
+                    className="w-full px-3 py-2 border border-gray-300 rounded-lg text-sm focus:ring-2 focus:ring-purple-500 focus:border-purple-500"
+                  >
+                    <option value="">Default</option>
+                    {[1, 2, 4, 6, 8].map(num => (
+                      <option key={num} value={num}>{num}</option>
+                    ))}
+                  </select>
+                </div>
+
                 {/* Content Workflow */}
                 <div className="text-left">
                   <label className="block text-sm font-medium text-gray-700 mb-2">
@@ -2515,6 +2556,24 @@ Instructions:
                   </p>
                 </div>
 
+                {/* Reviews processed in parallel */}
+                <div className="text-left">
+                  <label className="block text-sm font-medium text-gray-700 mb-2">
+                    Reviews Processed in Parallel
+                  </label>
+                  <select
+                    name="bulk_parallelism"
+                    value={formData.bulk_parallelism || ''}
+                    onChange={handleInputChange}
+                    className="w-full px-3 py-2 border border-gray-300 rounded-lg text-sm focus:ring-2 focus:ring-teal-500 focus:border-teal-500"
+                  >
+                    <option value="">Default</option>
+                    {[1, 2, 4, 6, 8].map(num => (
+                      <option key={num} value={num}>{num}</option>
+                    ))}
+                  </select>
+                </div>
+
                 {/* Content Workflow */}
                 <div className="text-left">
                   <label className="block text-sm font-medium text-gray-700 mb-2">
@@ -2739,6 +2798,22 @@ Instructions:
                   The agent will scrape the latest {formData.posts_count || 1} article(s) from the listing page and create posts for each.
                 </p>
               </div>
+              <div className="text-left">
+                <label className="block text-xs font-medium text-gray-700 mb-1">
+                  Posts Processed in Parallel
+                </label>
+                <select
+                  name="bulk_parallelism"
+                  value={formData.bulk_parallelism || ''}
+                  onChange={handleInputChange}
+                  className="w-24 px-3 py-1.5 border border-gray-300 rounded text-sm focus:ring-2 focus:ring-blue-500 focus:border-blue-500"
+                >
+                  <option value="">Default</option>
+                  {[1, 2, 4, 6, 8].map(num => (
+                    <option key={num} value={num}>{num}</option>
+                  ))}
+                </select>
+              </div>
             </div>
             )}
 
@@ -6,6 +6,7 @@ const VideoModal = ({ isOpen, onClose, video }) => {
   const [commentName, setCommentName] = useState('');
   const [commentText, setCommentText] = useState('');
   const [responses, setResponses] = useState([]);
+  const [responseCount, setResponseCount] = useState(0); // all responses; the list is only the latest page
   const [loading, setLoading] = useState(false);
   const [nameDisabled, setNameDisabled] = useState(false);
   const [planningToWatch, setPlanningToWatch] = useState(null); // 'yes' or 'no'
@@ -48,9 +49,11 @@ const VideoModal = ({ isOpen, onClose, video }) => {
       const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/videos/${video.id}/watch-responses`);
       const data = await response.json();
       setResponses(data.responses || []);
+      setResponseCount((data.planning_count || 0) + (data.not_planning_count || 0));
     } catch (error) {
       console.error('Error fetching responses:', error);
       setResponses([]);
+      setResponseCount(0);
     }
   };
 
@@ -259,7 +262,7 @@ const VideoModal = ({ isOpen, onClose, video }) => {
         >
           <div className="h-full flex flex-col">
             <div className="flex justify-between items-center px-3 py-2 border-b border-gray-600 flex-shrink-0">
-              <h3 className="text-white font-semibold text-xs">User Responses ({responses.length})</h3>
+              <h3 className="text-white font-semibold text-xs">User Responses ({responseCount})</h3>
               <button
                 onClick={() => setShowResponses(false)}
                 className="text-gray-400 hover:text-white"
@@ -80,6 +80,24 @@ const AIAgents = () => {
     setShowAgentForm(true);
   };
 
+  // Runs are queued as jobs; poll the job until it finishes and return its result
+  const AGENT_JOB_POLL_MS = 3000;
+  const AGENT_JOB_WAIT_MS = 2 * 60 * 60 * 1000;
+  const waitForAgentJob = async (jobId) => {
+    const deadline = Date.now() + AGENT_JOB_WAIT_MS;
+    while (Date.now() < deadline) {
+      await new Promise(resolve => setTimeout(resolve, AGENT_JOB_POLL_MS));
+      const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/agent-jobs/${jobId}`);
+      if (response.status === 404) return { success: false, message: 'Agent run not found' };
+      if (!response.ok) continue;
+      const job = await response.json();
+      if (job.active) continue;
+      if (job.status === 'completed') return job.result || {};
+      return { success: false, message: job.error || `Agent run ${job.status}` };
+    }
+    return { success: false, message: 'Agent is still running; check its status later' };
+  };
+
   const handleRunAgent = async (agentId) => {
     // Check if agent is already running
     if (runningAgents.has(agentId)) return;
@@ -92,7 +110,8 @@ const AIAgents = () => {
       const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/ai-agents/${agentId}/run`, {
         method: 'POST'
       });
-      const data = await response.json();
+      const queued = await response.json();
+      const data = response.ok ? await waitForAgentJob(queued.job_id) : queued;
       
       if (response.ok && (data.success || data.status === 'success')) {
         // Handle different agent types
@@ -163,17 +163,14 @@ const ArticlePage = () => {
 
   const fetchUserRatings = async (articleId) => {
     try {
-      const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/articles/${articleId}/comments?comment_type=review`);
+      const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/articles/${articleId}/comments/summary`);
       if (response.ok) {
         const data = await response.json();
-        const comments = data.comments || [];
         
-        // Filter comments with ratings and calculate average
-        const ratingsOnly = comments.filter(c => c.rating).map(c => parseInt(c.rating));
-        if (ratingsOnly.length > 0) {
-          const average = ratingsOnly.reduce((sum, rating) => sum + rating, 0) / ratingsOnly.length;
-          setUserRating(average.toFixed(1));
-          setReviewCount(ratingsOnly.length);
+        // Average and count are maintained server-side in comment_stats
+        if (data.rating_count > 0) {
+          setUserRating(data.average_rating.toFixed(1));
+          setReviewCount(data.rating_count);
         }
       }
     } catch (err) {
@@ -0,0 +1,77 @@
+// Presigned browser-to-S3 uploads. The API signs the request and verifies the
+// stored object; the image bytes go straight to S3.
+// Returns null when direct uploads are unavailable (e.g. S3 disabled) so the
+// caller can fall back to the proxied upload endpoint.
+
+const API_URL = process.env.REACT_APP_BACKEND_URL;
+
+const uploadParts = async (file, presign) => {
+  const parts = [];
+  for (const part of presign.parts) {
+    const start = (part.part_number - 1) * presign.part_size;
+    const response = await fetch(part.url, {
+      method: 'PUT',
+      body: file.slice(start, start + presign.part_size)
+    });
+    if (!response.ok) {
+      throw new Error(`Part ${part.part_number} failed with status ${response.status}`);
+    }
+    // The bucket CORS policy must expose the ETag header
+    parts.push({ part_number: part.part_number, etag: response.headers.get('ETag') });
+  }
+  return parts;
+};
+
+export const uploadImageDirect = async (file, { target = 'articles', folderPath = null, imageNumber = null } = {}) => {
+  const presignResponse = await fetch(`${API_URL}/api/cms/direct-upload/presign`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      filename: file.name,
+      content_type: file.type,
+      size: file.size,
+      target,
+      folder_path: folderPath,
+      image_number: imageNumber
+    })
+  });
+
+  if (presignResponse.status === 400) {
+    return null;
+  }
+  if (!presignResponse.ok) {
+    const errorData = await presignResponse.json().catch(() => ({}));
+    throw new Error(errorData.detail || `Failed to prepare upload for ${file.name}`);
+  }
+
+  const presign = await presignResponse.json();
+  let parts = null;
+
+  try {
+    if (presign.mode === 'multipart') {
+      parts = await uploadParts(file, presign);
+    } else {
+      const formData = new FormData();
+      Object.entries(presign.fields).forEach(([key, value]) => formData.append(key, value));
+      formData.append('file', file);
+      const s3Response = await fetch(presign.url, { method: 'POST', body: formData });
+      if (!s3Response.ok) {
+        throw new Error(`S3 rejected the upload with status ${s3Response.status}`);
+      }
+    }
+  } catch (error) {
+    fetch(`${API_URL}/api/cms/direct-upload/${presign.upload_id}`, { method: 'DELETE' }).catch(() => {});
+    throw error;
+  }
+
+  const completeResponse = await fetch(`${API_URL}/api/cms/direct-upload/complete`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ upload_id: presign.upload_id, parts })
+  });
+  const result = await completeResponse.json();
+  if (!completeResponse.ok) {
+    throw new Error(result.detail || `Failed to verify upload of ${file.name}`);
+  }
+  return result;
+};